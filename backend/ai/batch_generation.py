@@ -0,0 +1,215 @@
+"""
+Batch generation of AI resources (exercises, texts, ...) for one or more sessions.
+
+One LLM call is made per resource to generate. The calls are fanned out with asyncio:
+- at most AI_BATCH_CONCURRENCY calls in flight per batch (semaphore),
+- a process-wide rate limit per provider (AI_RATE_LIMITS, requests per second), shared
+  by all concurrent batches so that parallel requests do not exceed the provider quota,
+- transient failures (timeouts, connection errors, 429, 5xx) are retried up to
+  AI_BATCH_MAX_RETRIES times with exponential backoff and full jitter.
+
+The LangChain clients used here are created with max_retries=0: retries are handled by
+this module only, so each attempt goes through the rate limiter.
+
+Generating a sequence's material therefore takes about
+ceil(resources / concurrency) LLM round trips instead of one per resource. The database
+insert is done by the caller, in a single transaction (crud.create_resources_bulk).
+"""
+from dataclasses import dataclass
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from backend.ai.llm_interface import get_llm_client
+from backend.ai.schemas import GenerationFailure, ResourceSpec
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+# Provider SDK exceptions without an HTTP status code (openai, google.api_core)
+TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "TooManyRequests",
+}
+_TITLE_PREFIX_RE = re.compile(r"^titre\s*:\s*", re.IGNORECASE)
+
+@dataclass
+class GenerationTarget:
+    """A session to generate resources for, with the context given to the model."""
+    session_id: int
+    session_title: str
+    session_description: Optional[str] = None
+    sequence_title: Optional[str] = None
+
+@dataclass
+class GeneratedDraft:
+    """A generated resource, not yet stored."""
+    session_id: int
+    type_id: int
+    sub_type_id: int
+    title: str
+    description: str
+
+class AsyncRateLimiter:
+    """
+    Spaces out calls to at most `rate_per_second` (no burst).
+
+    Each caller reserves the next free slot under a thread lock (no await inside, so the
+    limiter works across event loops and threads) and then sleeps until its slot.
+    """
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """Parses AI_RATE_LIMITS ("openai=5,gemini=1") into {provider: requests per second}."""
+    limits: Dict[str, float] = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        provider, rate = item.split("=", 1)
+        try:
+            limits[provider.strip().lower()] = float(rate)
+        except ValueError:
+            logger.warning(f"Invalid AI_RATE_LIMITS entry ignored: {item!r}")
+    return limits
+
+_rate_limiters: Dict[str, AsyncRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str) -> AsyncRateLimiter:
+    """Process-wide rate limiter of a provider (unlimited if absent from AI_RATE_LIMITS)."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None:
+            limiter = AsyncRateLimiter(parse_rate_limits(settings.AI_RATE_LIMITS).get(provider, 0.0))
+            _rate_limiters[provider] = limiter
+        return limiter
+
+def is_transient_error(error: Exception) -> bool:
+    """True for errors worth retrying: timeouts, connection errors, rate limits and 5xx."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status_code in TRANSIENT_STATUS_CODES:
+        return True
+    return type(error).__name__ in TRANSIENT_ERROR_NAMES
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(max, base * 2^attempt)]."""
+    ceiling = min(settings.AI_BATCH_RETRY_MAX_DELAY_SECONDS, settings.AI_BATCH_RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+def build_messages(target: GenerationTarget, spec: ResourceSpec, index: int) -> list:
+    """Prompt for one resource (the index varies the content between resources of a spec)."""
+    instructions = (
+        "Tu es un assistant pour enseignants de français langue étrangère. Tu rédiges des ressources "
+        "pédagogiques prêtes à l'emploi. Réponds en français, avec le titre de la ressource sur la "
+        "première ligne, puis son contenu. N'ajoute aucun commentaire."
+    )
+    context = [f"Séance : {target.session_title}"]
+    if target.sequence_title:
+        context.insert(0, f"Séquence : {target.sequence_title}")
+    if target.session_description:
+        context.append(f"Description de la séance : {target.session_description}")
+    request = f"Ressource à produire : {spec.instructions}"
+    if spec.count > 1:
+        request += f"\nC'est la ressource {index} sur {spec.count} : elle doit être différente des autres."
+    return [SystemMessage(content=instructions), HumanMessage(content="\n".join(context) + "\n\n" + request)]
+
+def parse_generated(content: str, default_title: str) -> Tuple[str, str]:
+    """Splits a model answer into (title, content): first non-empty line, then the rest."""
+    lines = content.strip().splitlines()
+    if len(lines) < 2:
+        return default_title, content.strip()
+    # Markdown heading / bold markers, then an optional "Titre :" label
+    title = _TITLE_PREFIX_RE.sub("", lines[0].strip().strip("*# ")).strip("*# ")
+    body = "\n".join(lines[1:]).strip()
+    return (title[:200] or default_title), body
+
+async def _invoke_with_retry(llm: BaseChatModel, limiter: AsyncRateLimiter, messages: list) -> str:
+    attempt = 0
+    while True:
+        await limiter.acquire()
+        try:
+            response = await llm.ainvoke(messages)
+            return response.content if isinstance(response.content, str) else str(response.content)
+        except Exception as e:
+            if attempt >= settings.AI_BATCH_MAX_RETRIES or not is_transient_error(e):
+                raise
+            delay = retry_delay(attempt)
+            attempt += 1
+            logger.warning(f"Transient LLM error ({type(e).__name__}: {e}), retry {attempt}/{settings.AI_BATCH_MAX_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+async def generate_resources(
+    targets: List[GenerationTarget], specs: List[ResourceSpec],
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+) -> Tuple[List[GeneratedDraft], List[GenerationFailure]]:
+    """
+    Generates `spec.count` resources of every spec for every target session, concurrently.
+
+    `on_progress(done, total)` is awaited each time a resource is finished (generated or failed),
+    e.g. to update the progress of a background job.
+
+    Returns:
+        (drafts, failures): drafts in a stable order (target, spec, index), and the
+        resources that failed after retries. One failure does not cancel the others.
+
+    Raises:
+        ValueError: If the configured provider is invalid (before any call).
+    """
+    provider = settings.AI_PROVIDER.lower()
+    # Retries are handled here (through the rate limiter), not inside the SDK client
+    llm = get_llm_client() if provider == "fake" else get_llm_client(max_retries=0)
+    limiter = get_rate_limiter(provider)
+    semaphore = asyncio.Semaphore(max(settings.AI_BATCH_CONCURRENCY, 1))
+
+    jobs = [(target, spec, index) for target in targets for spec in specs for index in range(1, spec.count + 1)]
+    logger.info(f"Batch generation: {len(jobs)} resource(s) for {len(targets)} session(s), concurrency {settings.AI_BATCH_CONCURRENCY}")
+
+    done = 0
+
+    async def run(target: GenerationTarget, spec: ResourceSpec, index: int):
+        nonlocal done
+        async with semaphore:
+            try:
+                content = await _invoke_with_retry(llm, limiter, build_messages(target, spec, index))
+                title, body = parse_generated(content, default_title=f"{spec.instructions[:80]} ({index})")
+                result = GeneratedDraft(session_id=target.session_id, type_id=spec.type_id, sub_type_id=spec.sub_type_id, title=title, description=body)
+            except Exception as e:
+                logger.error(f"Generation failed for session {target.session_id} ({spec.instructions[:40]!r} #{index}): {e}")
+                result = GenerationFailure(session_id=target.session_id, instructions=spec.instructions, index=index, error=str(e) or type(e).__name__)
+        done += 1
+        if on_progress is not None:
+            await on_progress(done, len(jobs))
+        return result
+
+    started_at = time.perf_counter()
+    results = await asyncio.gather(*(run(*job) for job in jobs))
+    drafts = [result for result in results if isinstance(result, GeneratedDraft)]
+    failures = [result for result in results if isinstance(result, GenerationFailure)]
+    logger.info(f"Batch generation done in {(time.perf_counter() - started_at) * 1000:.0f} ms: {len(drafts)} generated, {len(failures)} failed")
+    return drafts, failures
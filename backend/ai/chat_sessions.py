@@ -0,0 +1,80 @@
+"""
+Hot in-memory window of recent server-side chat sessions.
+
+For each recently used chat session, the owner id and the last AI_CHAT_SESSION_WINDOW_MESSAGES
+messages are kept in an LRU (AI_CHAT_SESSION_CACHE_SIZE sessions, idle TTL
+AI_CHAT_SESSION_CACHE_TTL_SECONDS). A follow-up message in an active conversation then
+needs no database read at all: ownership and history come from here, and only the two new
+messages (user + assistant) are written.
+
+The cache is per process: with several workers, a session used on another worker is
+simply reloaded from the database (it is append-only, so a reload is always correct).
+"""
+from dataclasses import dataclass
+import threading
+from typing import Dict, List, Optional
+import logging
+
+from backend.ai.response_cache import TTLCache
+from backend.ai.schemas import ChatMessage
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ChatSessionWindow:
+    user_id: int
+    messages: List[ChatMessage]
+
+class ChatSessionWindowCache:
+    """LRU of chat_session_id -> (owner, recent messages), with hit/miss counters."""
+
+    def __init__(self, max_size: int, ttl_seconds: float, window_size: int):
+        self.window_size = window_size
+        self._windows = TTLCache(max_size, ttl_seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chat_session_id: int) -> Optional[ChatSessionWindow]:
+        window = self._windows.get(str(chat_session_id))
+        with self._lock:
+            if window is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if window is None:
+            return None
+        # Copy: callers must not mutate the cached list
+        return ChatSessionWindow(user_id=window.user_id, messages=list(window.messages))
+
+    def set(self, chat_session_id: int, user_id: int, messages: List[ChatMessage]):
+        self._windows.set(str(chat_session_id), ChatSessionWindow(user_id=user_id, messages=messages[-self.window_size:]))
+
+    def append(self, chat_session_id: int, new_messages: List[ChatMessage]):
+        """Adds messages already written to the database (no-op if the session is not cached)."""
+        with self._lock:
+            window = self._windows.get(str(chat_session_id))
+            if window is not None:
+                self.set(chat_session_id, window.user_id, window.messages + new_messages)
+
+    def invalidate(self, chat_session_id: int):
+        self._windows.pop(str(chat_session_id))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._windows),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._windows.evictions,
+            }
+
+chat_session_windows = ChatSessionWindowCache(
+    max_size=settings.AI_CHAT_SESSION_CACHE_SIZE,
+    ttl_seconds=settings.AI_CHAT_SESSION_CACHE_TTL_SECONDS,
+    window_size=settings.AI_CHAT_SESSION_WINDOW_MESSAGES,
+)
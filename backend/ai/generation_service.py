@@ -1,13 +1,25 @@
 from backend.ai.llm_interface import get_llm_client
+from backend.ai.response_cache import response_cache
+from backend.ai.history_manager import history_manager
 from backend.ai.schemas import ChatInput, ChatOutput, ChatMessage
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
-from typing import List
+from backend.config import get_settings
+from dataclasses import dataclass
+import dataclasses
+import json
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import threading
+import time
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 def _convert_to_langchain_messages(history: List[ChatMessage], new_user_message: str) -> List[BaseMessage]:
     """Converts chat history and the new message to LangChain's message format."""
     messages: List[BaseMessage] = []
@@ -25,6 +37,10 @@ def _convert_to_langchain_messages(history: List[ChatMessage], new_user_message:
     messages.append(HumanMessage(content=new_user_message))
     return messages
 
+def _get_model_name(llm: BaseChatModel) -> str:
+    """Model name of a LangChain chat model (part of the response cache key)."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or llm._llm_type
+
 async def get_chat_response(input_data: ChatInput) -> ChatOutput:
     """
     Gets a response from the configured LLM based on the input message and history.
@@ -38,13 +54,21 @@ async def get_chat_response(input_data: ChatInput) -> ChatOutput:
     Raises:
         Exception: If there is an error during LLM invocation.
     """
-    logger.info(f"Received chat request. History length: {len(input_data.history)}, Provider: {get_llm_client()._llm_type}")
+    llm = get_llm_client()
+    logger.info(f"Received chat request. History length: {len(input_data.history)}, Provider: {llm._llm_type}")
+
+    provider, model = settings.AI_PROVIDER.lower(), _get_model_name(llm)
+    cached = await response_cache.lookup(provider, model, input_data.history, input_data.message)
+    if cached is not None:
+        logger.info(f"Chat response served from cache (tier: {cached.tier})")
+        return ChatOutput(response=cached.response, cached=True, cache_tier=cached.tier, similarity=cached.similarity)
     
     try:
-        llm = get_llm_client()
-        
+        # Keep the prompt within the token budget (older turns replaced by a summary)
+        history = await history_manager.compact(input_data.history, input_data.message, llm)
+
         # Convert history and new message to LangChain format
-        langchain_messages = _convert_to_langchain_messages(input_data.history, input_data.message)
+        langchain_messages = _convert_to_langchain_messages(history, input_data.message)
         
         logger.debug(f"Invoking LLM with messages: {langchain_messages}")
         
@@ -61,6 +85,7 @@ async def get_chat_response(input_data: ChatInput) -> ChatOutput:
             response_content = str(ai_response) 
 
         logger.info(f"LLM invocation successful. Response length: {len(response_content)}")
+        await response_cache.store(provider, model, input_data.history, input_data.message, response_content)
         return ChatOutput(response=response_content)
 
     except Exception as e:
@@ -69,3 +94,103 @@ async def get_chat_response(input_data: ChatInput) -> ChatOutput:
         # Or return a specific error response
         # return ChatOutput(response=f"An error occurred: {e}") 
         raise e
+
+
+@dataclass
+class StreamEvent:
+    """One event of a streamed chat response: a text delta, or the final summary."""
+    type: str  # "token" | "done"
+    content: str = ""
+    ttft_ms: Optional[float] = None
+    duration_ms: Optional[float] = None
+
+    def to_sse(self) -> str:
+        """Serializes the event as a Server-Sent Event (`event:` type + JSON `data:`)."""
+        data = {key: value for key, value in dataclasses.asdict(self).items() if value not in (None, "") and key != "type"}
+        return f"event: {self.type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class ChatStreamStats:
+    """Process-wide counters for streamed chat responses (time-to-first-token, cancellations)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.ttft_count = 0
+        self.ttft_total_ms = 0.0
+        self.ttft_max_ms = 0.0
+
+    def record_ttft(self, ttft_ms: float):
+        with self._lock:
+            self.ttft_count += 1
+            self.ttft_total_ms += ttft_ms
+            self.ttft_max_ms = max(self.ttft_max_ms, ttft_ms)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "started": self.started,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "ttft_avg_ms": round(self.ttft_total_ms / self.ttft_count, 1) if self.ttft_count else 0.0,
+                "ttft_max_ms": round(self.ttft_max_ms, 1),
+            }
+
+chat_stream_stats = ChatStreamStats()
+
+async def stream_chat_response(input_data: ChatInput) -> AsyncIterator[StreamEvent]:
+    """
+    Streams the LLM response token by token (LangChain `astream`).
+
+    Yields a "token" event per non-empty text delta, then a single "done" event carrying
+    the time-to-first-token and total duration. If the consumer stops iterating (client
+    disconnected), the underlying LLM stream is closed and the request is counted as cancelled.
+
+    Raises:
+        ValueError: If the configured provider is invalid (raised before the first event).
+        Exception: If there is an error during LLM streaming.
+    """
+    llm = get_llm_client()
+    history = await history_manager.compact(input_data.history, input_data.message, llm)
+    langchain_messages = _convert_to_langchain_messages(history, input_data.message)
+    logger.info(f"Streaming chat request. History length: {len(input_data.history)}, Provider: {llm._llm_type}")
+
+    chat_stream_stats.increment("started")
+    started_at = time.perf_counter()
+    ttft_ms: Optional[float] = None
+    response_length = 0
+    try:
+        async for chunk in llm.astream(langchain_messages):
+            content = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            if not content:
+                continue
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started_at) * 1000
+                chat_stream_stats.record_ttft(ttft_ms)
+                logger.info(f"Time to first token: {ttft_ms:.0f} ms")
+            response_length += len(content)
+            yield StreamEvent(type="token", content=content)
+    except (asyncio.CancelledError, GeneratorExit):
+        chat_stream_stats.increment("cancelled")
+        logger.info(f"Chat stream cancelled by client after {(time.perf_counter() - started_at) * 1000:.0f} ms ({response_length} chars sent)")
+        raise
+    except Exception as e:
+        chat_stream_stats.increment("failed")
+        logger.error(f"Error during LLM streaming: {e}", exc_info=True)
+        raise
+
+    duration_ms = (time.perf_counter() - started_at) * 1000
+    chat_stream_stats.increment("completed")
+    logger.info(f"LLM streaming successful. Response length: {response_length}, duration: {duration_ms:.0f} ms")
+    yield StreamEvent(
+        type="done",
+        ttft_ms=round(ttft_ms, 1) if ttft_ms is not None else None,
+        duration_ms=round(duration_ms, 1)
+    )
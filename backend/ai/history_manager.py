@@ -0,0 +1,227 @@
+"""
+Chat history compaction under a prompt token budget.
+
+Each request keeps:
+- every system message (pinned, in order),
+- the most recent turns that fit in AI_HISTORY_TOKEN_BUDGET (minus the new message),
+- a running summary of the older turns, as one system message.
+
+The cut between summarized and kept turns is aligned on AI_HISTORY_SUMMARY_BATCH
+messages, so the summary only changes every few turns. Summaries are cached by a chained
+hash of the summarized messages: when the cut moves forward, the cached summary of the
+previous prefix is extended with the newly dropped turns only (one small LLM call),
+never recomputed from the start. The prompt size therefore stays roughly constant
+however long the conversation runs.
+
+The tokenizer is loaded once, off the event loop (`load_tokenizer`, called from the app
+lifespan): tiktoken may download its encoding file on first use.
+"""
+import hashlib
+import math
+from typing import List, Optional, Protocol, Tuple
+import logging
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from starlette.concurrency import run_in_threadpool
+
+from backend.ai.response_cache import TTLCache
+from backend.ai.schemas import ChatMessage
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Per-message formatting overhead (role + separators), as counted by OpenAI chat models
+MESSAGE_TOKEN_OVERHEAD = 4
+SUMMARY_PREFIX = "Résumé de la conversation précédente : "
+
+class Tokenizer(Protocol):
+    """Anything that can count the tokens of a text."""
+    name: str
+
+    def count_tokens(self, text: str) -> int:
+        ...
+
+class ApproximateTokenizer:
+    """Local estimate without any dependency: ~4 characters per token (never under 1 per word)."""
+    name = "approximate"
+
+    def count_tokens(self, text: str) -> int:
+        return max(math.ceil(len(text) / 4), len(text.split()))
+
+class TiktokenTokenizer:
+    """Exact counts for OpenAI models (tiktoken)."""
+    name = "tiktoken"
+
+    def __init__(self, model: str):
+        import tiktoken
+        try:
+            self._encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+def get_tokenizer() -> Tokenizer:
+    """
+    Tokenizer selected by AI_TOKENIZER: "tiktoken", "approximate", or "auto"
+    (tiktoken if it is installed and its encoding can be loaded, else approximate).
+    """
+    choice = settings.AI_TOKENIZER.lower()
+    if choice in ("auto", "tiktoken"):
+        try:
+            return TiktokenTokenizer(settings.OPENAI_CHAT_MODEL)
+        except Exception as e:
+            # Not installed, or encoding file not downloadable (offline)
+            if choice == "tiktoken":
+                logger.warning(f"tiktoken unavailable, falling back to approximate token counts: {e}")
+    return ApproximateTokenizer()
+
+def _chain_hash(previous: str, message: ChatMessage) -> str:
+    return hashlib.sha256(f"{previous}\x1f{message.role}\x1f{message.content}".encode("utf-8")).hexdigest()
+
+def _format_transcript(messages: List[ChatMessage]) -> str:
+    labels = {"user": "Utilisateur", "assistant": "Assistant", "system": "Système"}
+    return "\n".join(f"{labels.get(m.role, m.role)} : {m.content}" for m in messages)
+
+class HistoryManager:
+    """Keeps chat requests within the prompt token budget (see module docstring)."""
+
+    def __init__(self, tokenizer: Optional[Tokenizer] = None):
+        self._tokenizer = tokenizer
+        # chained hash of the summarized messages -> summary text
+        self.summaries = TTLCache(settings.AI_HISTORY_SUMMARY_CACHE_SIZE, settings.AI_CACHE_TTL_SECONDS)
+        self.summaries_computed = 0
+        self.summaries_reused = 0
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        if self._tokenizer is None:
+            self._set_loaded(get_tokenizer())
+        return self._tokenizer
+
+    def _set_loaded(self, tokenizer: Tokenizer):
+        if self._tokenizer is None:
+            self._tokenizer = tokenizer
+            logger.info(f"History token counting with the '{tokenizer.name}' tokenizer")
+
+    async def load_tokenizer(self):
+        """Loads the AI_TOKENIZER tokenizer in a worker thread (tiktoken may download its encoding)."""
+        if self._tokenizer is None:
+            self._set_loaded(await run_in_threadpool(get_tokenizer))
+
+    def set_tokenizer(self, tokenizer: Tokenizer):
+        """Plugs another tokenizer (e.g. a model-specific local one)."""
+        self._tokenizer = tokenizer
+
+    def count_message_tokens(self, message: ChatMessage) -> int:
+        return self.tokenizer.count_tokens(message.content) + MESSAGE_TOKEN_OVERHEAD
+
+    def split(self, history: List[ChatMessage], new_message: str) -> Tuple[List[ChatMessage], List[ChatMessage], List[ChatMessage]]:
+        """Splits the history into (pinned system messages, turns to summarize, turns to keep)."""
+        pinned = [m for m in history if m.role == "system"]
+        turns = [m for m in history if m.role != "system"]
+
+        budget = settings.AI_HISTORY_TOKEN_BUDGET - self.tokenizer.count_tokens(new_message) - MESSAGE_TOKEN_OVERHEAD
+        budget -= sum(self.count_message_tokens(m) for m in pinned)
+        total = sum(self.count_message_tokens(m) for m in turns)
+        if total <= budget:
+            return pinned, [], turns
+
+        # Room for the summary itself
+        budget -= settings.AI_HISTORY_SUMMARY_MAX_TOKENS + MESSAGE_TOKEN_OVERHEAD
+        kept_tokens, cut = 0, len(turns)
+        while cut > 0:
+            tokens = self.count_message_tokens(turns[cut - 1])
+            if kept_tokens + tokens > budget:
+                break
+            kept_tokens += tokens
+            cut -= 1
+        # Align the cut on a batch boundary (only moves it forward: still within budget)
+        batch = max(settings.AI_HISTORY_SUMMARY_BATCH, 1)
+        cut = min(math.ceil(cut / batch) * batch, len(turns))
+        return pinned, turns[:cut], turns[cut:]
+
+    async def compact(self, history: List[ChatMessage], new_message: str, llm: BaseChatModel) -> List[ChatMessage]:
+        """Returns the history to send: pinned system messages, summary of older turns, recent turns."""
+        # Normally already loaded by the app lifespan; never load it on the event loop
+        await self.load_tokenizer()
+        pinned, to_summarize, kept = self.split(history, new_message)
+        if not to_summarize:
+            return history
+
+        summary = await self._get_summary(to_summarize, llm)
+        logger.info(
+            f"Chat history compacted: {len(to_summarize)} old message(s) summarized, {len(kept)} recent kept"
+            + ("" if summary else " (no summary available)")
+        )
+        compacted = list(pinned)
+        if summary:
+            compacted.append(ChatMessage(role="system", content=SUMMARY_PREFIX + summary))
+        compacted.extend(kept)
+        return compacted
+
+    async def _get_summary(self, messages: List[ChatMessage], llm: BaseChatModel) -> Optional[str]:
+        # Chained hashes of every prefix: find the longest already summarized one
+        prefix_hashes, current = [], ""
+        for message in messages:
+            current = _chain_hash(current, message)
+            prefix_hashes.append(current)
+
+        previous_summary, start = None, 0
+        for index in range(len(messages) - 1, -1, -1):
+            cached = self.summaries.get(prefix_hashes[index])
+            if cached is None:
+                continue
+            if index == len(messages) - 1:
+                self.summaries_reused += 1
+                return cached
+            previous_summary, start = cached, index + 1
+            break
+
+        try:
+            summary = await self._summarize(previous_summary, messages[start:], llm)
+        except Exception as e:
+            # Without a summary the old turns are simply dropped: the chat still works
+            logger.warning(f"History summarization failed, older turns dropped: {e}")
+            return previous_summary
+        self.summaries.set(prefix_hashes[-1], summary)
+        self.summaries_computed += 1
+        return summary
+
+    async def _summarize(self, previous_summary: Optional[str], messages: List[ChatMessage], llm: BaseChatModel) -> str:
+        max_words = max(int(settings.AI_HISTORY_SUMMARY_MAX_TOKENS * 0.75), 20)
+        instructions = (
+            "Tu résumes une conversation entre un enseignant de français et son assistant. "
+            f"Produis un résumé factuel de {max_words} mots maximum, qui conserve les demandes, "
+            "les décisions et les informations utiles pour la suite. Réponds uniquement par le résumé."
+        )
+        content = ""
+        if previous_summary:
+            content += f"Résumé existant :\n{previous_summary}\n\nNouveaux échanges à intégrer :\n"
+        content += _format_transcript(messages)
+        response = await llm.ainvoke([SystemMessage(content=instructions), HumanMessage(content=content)])
+        summary = response.content if isinstance(response.content, str) else str(response.content)
+        return self._truncate(summary.strip(), settings.AI_HISTORY_SUMMARY_MAX_TOKENS)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Hard cap on the summary size, in case the model ignores the length instruction."""
+        if self.tokenizer.count_tokens(text) <= max_tokens:
+            return text
+        words = text.split()
+        while words and self.tokenizer.count_tokens(" ".join(words)) > max_tokens:
+            words = words[:int(len(words) * 0.9)]
+        return " ".join(words) + " …"
+
+    def stats(self):
+        return {
+            # Not loaded here: stats are read on the event loop (/metrics)
+            "tokenizer": self._tokenizer.name if self._tokenizer is not None else None,
+            "summaries_cached": len(self.summaries),
+            "summaries_computed": self.summaries_computed,
+            "summaries_reused": self.summaries_reused,
+        }
+
+history_manager = HistoryManager()
@@ -1,57 +1,280 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+import logging
+import threading
+import time
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.outputs import LLMResult
 from backend.config import get_settings
+from backend.metrics import Counter, Histogram
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+# --- Metrics (registered in the app's /metrics registry by monitoring.py) ---
+
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "LLM call latency (whole response, streamed or not)",
+    ["provider", "model", "outcome"], buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the LLM provider", ["provider", "model", "direction"])
+# Calls still pending after this many entries are assumed lost (e.g. stream abandoned without callback)
+MAX_PENDING_CALLS = 10000
+
+class LLMCallMetrics(BaseCallbackHandler):
+    """
+    LangChain callback attached to every registry client: records the latency and the
+    token usage of each call (chat, streaming, history summaries, batch generation).
+
+    Token counts come from the provider's usage metadata; calls without usage data
+    (fake provider, streams without usage) only record their latency.
+    """
+    run_inline = True  # Cheap handler: run in the caller's context, not in an executor
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def _start(self, run_id: UUID):
+        if len(self._started) >= MAX_PENDING_CALLS:
+            self._started.clear()
+        self._started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id: UUID, outcome: str):
+        started_at = self._started.pop(run_id, None)
+        if started_at is not None:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started_at, provider=self.provider, model=self.model, outcome=outcome)
 
-def get_llm_client() -> BaseChatModel:
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        self._finish(run_id, "ok")
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        if not (input_tokens or output_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens, output_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        if input_tokens:
+            LLM_TOKENS.inc(input_tokens, provider=self.provider, model=self.model, direction="input")
+        if output_tokens:
+            LLM_TOKENS.inc(output_tokens, provider=self.provider, model=self.model, direction="output")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._finish(run_id, "error")
+
+@dataclass(frozen=True)
+class LLMClientKey:
+    """Identifies one chat model instance: provider, model name and extra constructor parameters."""
+    provider: str
+    model: str
+    params: Tuple[Tuple[str, Any], ...] = ()
+
+class LLMClientRegistry:
     """
-    Factory function to get an instance of the configured chat model.
+    Process-wide registry of chat model clients.
+
+    One client is created per (provider, model, parameters) and reused by every request.
+    OpenAI clients share a single pooled keep-alive HTTP transport (httpx), so consecutive
+    chats reuse open TLS connections instead of paying a new handshake each time.
+    Gemini clients manage their own transport; they are cached but not pooled here.
 
-    Reads the AI_PROVIDER from settings and instantiates either
-    ChatOpenAI or ChatGoogleGenerativeAI accordingly, passing the
-    respective API keys and model names from settings.
+    `startup()` / `shutdown()` are called from the app lifespan. Clients are also created
+    lazily on first use, so scripts and tests that do not run the lifespan still work.
+    """
+
+    def __init__(self):
+        self._clients: Dict[LLMClientKey, BaseChatModel] = {}
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self.created = 0
+        self.hits = 0
+        self.http_requests = 0
+
+    # --- HTTP transport ---
+
+    def _ensure_http_clients(self):
+        # Called with the lock held
+        if self._http_async_client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        timeout = httpx.Timeout(settings.LLM_HTTP_TIMEOUT_SECONDS, connect=10.0)
+
+        async def _count_request(request: httpx.Request):
+            self.http_requests += 1
+
+        def _count_sync_request(request: httpx.Request):
+            self.http_requests += 1
+
+        self._http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout, event_hooks={"request": [_count_request]})
+        self._http_client = httpx.Client(limits=limits, timeout=timeout, event_hooks={"request": [_count_sync_request]})
+
+    # --- Clients ---
+
+    def get(self, provider: Optional[str] = None, model: Optional[str] = None, **params) -> BaseChatModel:
+        """
+        Returns the shared client for this provider/model/parameters, creating it on first use.
+
+        Args:
+            provider: "openai", "gemini" or "fake" (defaults to settings.AI_PROVIDER).
+            model: Model name (defaults to the provider's configured model).
+            **params: Extra constructor parameters (e.g. temperature). Each distinct set
+                of parameters gets its own client.
+
+        Raises:
+            ValueError: If the provider is not supported or its API key is missing.
+        """
+        provider = (provider or settings.AI_PROVIDER).lower()
+        key = LLMClientKey(provider=provider, model=model or self._default_model(provider), params=tuple(sorted(params.items())))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            client = self._create(key)
+            self._clients[key] = client
+            self.created += 1
+            logger.info(f"LLM client created: provider={key.provider}, model={key.model}, params={dict(key.params)}")
+            return client
+
+    @staticmethod
+    def _default_model(provider: str) -> str:
+        if provider == "openai":
+            return settings.OPENAI_CHAT_MODEL
+        if provider == "gemini":
+            return settings.GEMINI_CHAT_MODEL
+        return provider
+
+    def _create(self, key: LLMClientKey) -> BaseChatModel:
+        # Called with the lock held
+        params = dict(key.params)
+        params.setdefault("callbacks", [LLMCallMetrics(key.provider, key.model)])
+        if key.provider == "openai":
+            if not settings.OPENAI_API_KEY:
+                raise ValueError("OpenAI API key is missing in the configuration.")
+            self._ensure_http_clients()
+            return ChatOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                model=key.model,
+                base_url=settings.OPENAI_BASE_URL or None,
+                http_client=self._http_client,
+                http_async_client=self._http_async_client,
+                **params
+            )
+        elif key.provider == "gemini":
+            if not settings.GOOGLE_API_KEY:
+                raise ValueError("Google API key is missing in the configuration.")
+            return ChatGoogleGenerativeAI(
+                google_api_key=settings.GOOGLE_API_KEY,
+                model=key.model,
+                **params
+                # convert_system_message_to_human=True # Might be needed depending on model/usage
+            )
+        elif key.provider == "fake":
+            # Offline model: streams FAKE_LLM_RESPONSE character by character
+            return FakeListChatModel(
+                responses=[settings.FAKE_LLM_RESPONSE],
+                sleep=settings.FAKE_LLM_TOKEN_DELAY_MS / 1000,
+                **params
+            )
+        else:
+            raise ValueError(f"Unsupported AI provider configured: {key.provider}")
+
+    # --- Lifespan ---
+
+    async def startup(self):
+        """Creates the configured default client (and optionally warms its connection up)."""
+        try:
+            self.get()
+        except ValueError as e:
+            # The app must still start without AI configuration; /ai routes will answer 503
+            logger.warning(f"LLM client not created at startup: {e}")
+            return
+        if settings.LLM_WARMUP_ON_STARTUP:
+            await self.warm_up()
+
+    async def warm_up(self):
+        """Opens a pooled connection to the OpenAI API (DNS + TCP + TLS) before the first chat."""
+        if settings.AI_PROVIDER.lower() != "openai" or self._http_async_client is None:
+            return
+        base_url = (settings.OPENAI_BASE_URL or DEFAULT_OPENAI_BASE_URL).rstrip("/")
+        try:
+            response = await self._http_async_client.get(
+                f"{base_url}/models", headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
+            )
+            logger.info(f"LLM connection warmed up ({base_url}, status {response.status_code})")
+        except httpx.HTTPError as e:
+            logger.warning(f"LLM warm-up failed ({base_url}): {e}")
+
+    async def shutdown(self):
+        """Closes the pooled HTTP connections and forgets every client."""
+        with self._lock:
+            http_client, http_async_client = self._http_client, self._http_async_client
+            self._http_client = self._http_async_client = None
+            self._clients.clear()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+        if http_client is not None:
+            http_client.close()
+        logger.info("LLM clients closed")
+
+    # --- Monitoring ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Registry and connection pool counters (for monitoring)."""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "clients": len(self._clients),
+                "created": self.created,
+                "hits": self.hits,
+                "http_requests": self.http_requests,
+                "pool_connections": 0,
+                "pool_idle_connections": 0,
+            }
+            # httpx does not expose its pool publicly: read httpcore's connection list if available
+            pool = getattr(getattr(self._http_async_client, "_transport", None), "_pool", None)
+            for connection in getattr(pool, "connections", []):
+                stats["pool_connections"] += 1
+                if connection.is_idle():
+                    stats["pool_idle_connections"] += 1
+            return stats
+
+llm_registry = LLMClientRegistry()
+
+def get_llm_client(**params) -> BaseChatModel:
+    """
+    Returns the shared chat model for the configured AI_PROVIDER.
+
+    Reads the AI_PROVIDER from settings and returns the registry's ChatOpenAI,
+    ChatGoogleGenerativeAI or (AI_PROVIDER=fake) offline FakeListChatModel instance,
+    created once per process with the respective API keys and model names from settings.
 
     Returns:
-        BaseChatModel: An instance of the configured chat model.
+        BaseChatModel: The shared instance of the configured chat model.
 
     Raises:
         ValueError: If the configured AI_PROVIDER is not supported.
     """
-    provider = settings.AI_PROVIDER.lower()
-    
-    if provider == "openai":
-        if not settings.OPENAI_API_KEY:
-            raise ValueError("OpenAI API key is missing in the configuration.")
-        return ChatOpenAI(
-            api_key=settings.OPENAI_API_KEY, 
-            model=settings.OPENAI_CHAT_MODEL
-            # Add other parameters like temperature if needed
-            # temperature=0.7 
-        )
-    elif provider == "gemini":
-        if not settings.GOOGLE_API_KEY:
-            raise ValueError("Google API key is missing in the configuration.")
-        return ChatGoogleGenerativeAI(
-            google_api_key=settings.GOOGLE_API_KEY,
-            model=settings.GEMINI_CHAT_MODEL
-            # Add other parameters like temperature if needed
-            # temperature=0.7
-            # convert_system_message_to_human=True # Might be needed depending on model/usage
-        )
-    else:
-        raise ValueError(f"Unsupported AI provider configured: {settings.AI_PROVIDER}")
-
-# Example usage (optional, for testing purposes)
-# if __name__ == "__main__":
-#     try:
-#         llm = get_llm_client()
-#         print(f"Successfully instantiated LLM client for provider: {settings.AI_PROVIDER}")
-#         print(f"Model type: {type(llm)}")
-#         # Example invocation (will cost credits!)
-#         # from langchain_core.messages import HumanMessage
-#         # response = llm.invoke([HumanMessage(content="Hello!")])
-#         # print("LLM Response:", response.content)
-#     except ValueError as e:
-#         print(f"Error: {e}")
+    return llm_registry.get(**params)
@@ -0,0 +1,259 @@
+"""
+Response cache in front of the AI chat (generation_service.get_chat_response).
+
+Three tiers, checked in order:
+- exact: in-memory LRU with TTL, keyed on a SHA-256 of the normalized
+  (provider, model, history, message). Normalization: Unicode NFKC, case folding,
+  whitespace collapsing.
+- persistent (AI_CACHE_PERSISTENT_ENABLED): same key, stored in the `ai_response_cache`
+  table so answers survive restarts and are shared by all workers.
+- similar (AI_CACHE_SIMILARITY_ENABLED): for questions without history only, a locally
+  computed embedding (hashed words and trigrams, no model download, no API call) is
+  compared by cosine similarity to previous questions; the closest answer is reused
+  above AI_CACHE_SIMILARITY_THRESHOLD.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from backend.ai.schemas import ChatMessage
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 1024
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A cache hit: the stored response, the tier that served it and (similar tier) the score."""
+    response: str
+    tier: str  # "exact" | "persistent" | "similar"
+    similarity: Optional[float] = None
+
+def normalize_text(text: str) -> str:
+    """Normalizes a message so trivially different spellings share a cache key."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+def make_cache_key(provider: str, model: str, history: List[ChatMessage], message: str) -> str:
+    """SHA-256 of the normalized (provider, model, history, message)."""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "history": [[m.role, normalize_text(m.content)] for m in history],
+        "message": normalize_text(message),
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _embedding_tokens(text: str) -> List[str]:
+    """Words of a message, case-folded, without accents or punctuation."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD_RE.findall(text)
+
+def _hash_feature(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little") % EMBEDDING_DIMENSIONS
+
+def embed_text(text: str) -> Dict[int, float]:
+    """
+    Local embedding: L2-normalized counts of hashed features (sparse vector).
+
+    Features are the words and the character trigrams of each word, after removing
+    accents and punctuation. This matches rewordings such as "explique-moi" or a missing
+    accent, while a different content word ("être" / "avoir") lowers the score; it is
+    not a semantic model.
+    """
+    counts: Dict[int, float] = {}
+    for word in _embedding_tokens(text):
+        features = [f"w:{word}"]
+        padded = f" {word} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        for feature in features:
+            index = _hash_feature(feature)
+            counts[index] = counts.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in counts.values()))
+    return {index: value / norm for index, value in counts.items()} if norm else {}
+
+def cosine_similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Cosine similarity of two L2-normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+class TTLCache:
+    """Bounded LRU cache with per-entry expiry, thread-safe."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry is not None else None
+
+    def items(self) -> List[Tuple[str, object]]:
+        """Snapshot of the non-expired entries."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class ResponseCache:
+    """Exact / persistent / similarity cache for chat responses, with per-tier hit counters."""
+
+    def __init__(self):
+        self.exact = TTLCache(settings.AI_CACHE_MAX_SIZE, settings.AI_CACHE_TTL_SECONDS)
+        # Similar tier: key -> (provider, model, embedding, response)
+        self.similar = TTLCache(settings.AI_CACHE_MAX_SIZE, settings.AI_CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+        self.hits = {"exact": 0, "persistent": 0, "similar": 0}
+        self.misses = 0
+
+    def _count(self, tier: Optional[str]):
+        with self._lock:
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits[tier] += 1
+
+    async def lookup(self, provider: str, model: str, history: List[ChatMessage], message: str) -> Optional[CachedResponse]:
+        """Returns a cached response for this request, or None (cache disabled or miss)."""
+        if not settings.AI_CACHE_ENABLED:
+            return None
+        key = make_cache_key(provider, model, history, message)
+
+        response = self.exact.get(key)
+        if response is not None:
+            self._count("exact")
+            return CachedResponse(response=response, tier="exact")
+
+        if settings.AI_CACHE_PERSISTENT_ENABLED:
+            response = await self._lookup_persistent(key)
+            if response is not None:
+                self.exact.set(key, response)
+                self._count("persistent")
+                return CachedResponse(response=response, tier="persistent")
+
+        if settings.AI_CACHE_SIMILARITY_ENABLED and not history:
+            match = self._lookup_similar(provider, model, message)
+            if match is not None:
+                self._count("similar")
+                return match
+
+        self._count(None)
+        return None
+
+    def _lookup_similar(self, provider: str, model: str, message: str) -> Optional[CachedResponse]:
+        query = embed_text(message)
+        best_score, best_response = 0.0, None
+        for _, (entry_provider, entry_model, embedding, response) in self.similar.items():
+            if entry_provider != provider or entry_model != model:
+                continue
+            score = cosine_similarity(query, embedding)
+            if score > best_score:
+                best_score, best_response = score, response
+        if best_response is not None and best_score >= settings.AI_CACHE_SIMILARITY_THRESHOLD:
+            logger.info(f"Similar cached question found (similarity {best_score:.3f})")
+            return CachedResponse(response=best_response, tier="similar", similarity=round(best_score, 4))
+        return None
+
+    async def store(self, provider: str, model: str, history: List[ChatMessage], message: str, response: str):
+        """Stores a fresh LLM response in every enabled tier."""
+        if not settings.AI_CACHE_ENABLED or not response:
+            return
+        key = make_cache_key(provider, model, history, message)
+        self.exact.set(key, response)
+        if settings.AI_CACHE_SIMILARITY_ENABLED and not history:
+            self.similar.set(key, (provider, model, embed_text(message), response))
+        if settings.AI_CACHE_PERSISTENT_ENABLED:
+            await self._store_persistent(key, provider, model, response)
+
+    # --- Persistent tier (SQL) ---
+    # Top-level `crud` / `database` modules (not `backend.`): same engine and models as the app
+
+    async def _lookup_persistent(self, key: str) -> Optional[str]:
+        from crud import aio as crud_aio
+        from database import AsyncSessionLocal
+        try:
+            async with AsyncSessionLocal() as db:
+                return await crud_aio.get_cached_ai_response(db, key=key)
+        except Exception as e:
+            # The cache must never break the chat
+            logger.warning(f"Persistent AI cache lookup failed: {e}")
+            return None
+
+    async def _store_persistent(self, key: str, provider: str, model: str, response: str):
+        from crud import aio as crud_aio
+        from database import AsyncSessionLocal
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud_aio.store_ai_response(
+                    db, key=key, provider=provider, model=model, response=response,
+                    ttl_seconds=settings.AI_CACHE_PERSISTENT_TTL_SECONDS
+                )
+        except Exception as e:
+            logger.warning(f"Persistent AI cache store failed: {e}")
+
+    def clear(self):
+        self.exact.clear()
+        self.similar.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Cache counters (for monitoring)."""
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                "size": len(self.exact),
+                "similar_size": len(self.similar),
+                "hits_exact": self.hits["exact"],
+                "hits_persistent": self.hits["persistent"],
+                "hits_similar": self.hits["similar"],
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.exact.evictions,
+            }
+
+response_cache = ResponseCache()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
 
 class ChatMessage(BaseModel):
     """Represents a single message in the chat history."""
@@ -30,4 +30,58 @@ class ChatOutput(BaseModel):
         ..., 
         description="The response generated by the AI assistant."
     )
+    cached: bool = Field(
+        default=False,
+        description="True if the response was served from the response cache (no LLM call)."
+    )
+    cache_tier: Optional[Literal["exact", "persistent", "similar"]] = Field(
+        default=None,
+        description="Cache tier that served the response, if cached."
+    )
+    similarity: Optional[float] = Field(
+        default=None,
+        description="Similarity between this question and the cached one (similar tier only)."
+    )
     # We could add more info later, like token usage, etc.
+
+
+class ResourceSpec(BaseModel):
+    """One kind of resource to generate for every target session."""
+    type_id: int = Field(..., description="Resource type of the generated resources.")
+    sub_type_id: int = Field(..., description="Resource sub-type (must belong to type_id).")
+    instructions: str = Field(
+        ..., min_length=1, max_length=2000,
+        description="What to generate, e.g. \"Exercice sur les articles définis et indéfinis\"."
+    )
+    count: int = Field(default=1, ge=1, le=50, description="Number of resources to generate per session.")
+
+class BatchGenerationInput(BaseModel):
+    """Input schema for batch resource generation: one target (session or sequence) and resource specs."""
+    session_id: Optional[int] = Field(default=None, description="Generate for this session only.")
+    sequence_id: Optional[int] = Field(default=None, description="Generate for every session of this sequence.")
+    specs: List[ResourceSpec] = Field(..., min_length=1, description="Resources to generate for each session.")
+
+    @model_validator(mode="after")
+    def check_single_target(self):
+        if (self.session_id is None) == (self.sequence_id is None):
+            raise ValueError("Exactly one of session_id or sequence_id must be provided")
+        return self
+
+class GeneratedResource(BaseModel):
+    """A resource created by a batch generation."""
+    id: int
+    session_id: int
+    title: str
+
+class GenerationFailure(BaseModel):
+    """A resource that could not be generated (after retries)."""
+    session_id: int
+    instructions: str
+    index: int = Field(..., description="1-based index of the resource within its spec.")
+    error: str
+
+class BatchGenerationOutput(BaseModel):
+    """Output schema for batch resource generation."""
+    created: List[GeneratedResource]
+    failed: List[GenerationFailure] = []
+    duration_ms: float = Field(..., description="Total wall time of the generation (LLM calls + insert).")
@@ -27,6 +27,12 @@ from models import session # Ajoutez l'import pour Session
 from models import resource # Ajoutez l'import pour Resource
 from models import objective # Ajoutez l'import pour Objective
 from models import association_tables # Importez pour les tables d'association
+from models import user_stats # Compteurs agrégés du dashboard
+from models import blob # Stockage dédupliqué des fichiers
+from models import upload_session # Uploads reprenables par blocs
+from models import ai_response_cache # Cache persistant des réponses du chat IA
+from models import chat_session # Conversations IA stockées côté serveur
+from models import job # Tâches de fond (file durable)
 # from models import autre_modele # Ajoutez d'autres imports si nécessaire
 
 # this is the Alembic Config object, which provides
@@ -47,6 +53,17 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Exclut de l'autogénération l'index de recherche plein texte, créé en SQL brut
+    (colonnes search_vector et index GIN PostgreSQL, tables FTS5 SQLite : voir models/search_index.py)."""
+    if type_ == "column" and name == "search_vector":
+        return False
+    if type_ == "index" and name.endswith("_search_vector"):
+        return False
+    if type_ == "table" and name.startswith("search_index"):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -69,6 +86,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -92,7 +110,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,39 @@
+"""add_user_stats_table
+
+Revision ID: c1d2e3f4a5b6
+Revises: b6c5f8d9e0a1
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1d2e3f4a5b6'
+down_revision: Union[str, None] = 'b6c5f8d9e0a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Créer la table des compteurs agrégés par utilisateur (dashboard)."""
+    # Les lignes sont créées à la première lecture du dashboard (backfill depuis les tables)
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('progression_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sequence_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('session_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resource_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Supprimer la table des compteurs."""
+    op.drop_table('user_stats')
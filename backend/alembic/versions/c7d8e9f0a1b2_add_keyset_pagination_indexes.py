@@ -0,0 +1,43 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: c7d8e9f0a1b2
+Revises: b6c7d8e9f0a1
+Create Date: 2026-10-18 22:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d8e9f0a1b2'
+down_revision: Union[str, None] = 'b6c7d8e9f0a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nom de l'index, table, colonnes) : filtre de la liste puis clé de tri du curseur
+INDEXES = [
+    ('ix_resources_user_id_id', 'resources', ['user_id', 'id']),
+    ('ix_sequences_user_id_id', 'sequences', ['user_id', 'id']),
+    ('ix_sequences_progression_id_id', 'sequences', ['progression_id', 'id']),
+    ('ix_sessions_user_id_id', 'sessions', ['user_id', 'id']),
+    ('ix_sessions_sequence_id_id', 'sessions', ['sequence_id', 'id']),
+    ('ix_progressions_user_id_id', 'progressions', ['user_id', 'id']),
+    ('ix_resource_subtypes_type_id_id', 'resource_subtypes', ['type_id', 'id']),
+    ('ix_chat_sessions_user_id_updated_at_id', 'chat_sessions', ['user_id', 'updated_at', 'id']),
+    ('ix_jobs_user_id_id', 'jobs', ['user_id', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Créer les index composites de la pagination par curseur."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Supprimer les index composites de la pagination par curseur."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
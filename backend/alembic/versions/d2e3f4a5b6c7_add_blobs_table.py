@@ -0,0 +1,46 @@
+"""add_blobs_table
+
+Revision ID: d2e3f4a5b6c7
+Revises: c1d2e3f4a5b6
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e3f4a5b6c7'
+down_revision: Union[str, None] = 'c1d2e3f4a5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Créer la table des blobs (fichiers adressés par leur contenu) et la lier aux ressources."""
+    op.create_table(
+        'blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('mime_type', sa.String(), nullable=False),
+        sa.Column('storage_path', sa.String(), nullable=False, comment='Chemin relatif à UPLOADS_BASE_DIR'),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    # Les ressources existantes gardent leur fichier dans UPLOADS_BASE_DIR/<user_id>/ (blob_sha256 NULL)
+    with op.batch_alter_table('resources') as batch_op:
+        batch_op.add_column(sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_resources_blob_sha256', ['blob_sha256'], unique=False)
+        batch_op.create_foreign_key('fk_resources_blob_sha256', 'blobs', ['blob_sha256'], ['sha256'])
+
+
+def downgrade() -> None:
+    """Supprimer le lien ressources -> blobs puis la table des blobs."""
+    with op.batch_alter_table('resources') as batch_op:
+        batch_op.drop_constraint('fk_resources_blob_sha256', type_='foreignkey')
+        batch_op.drop_index('ix_resources_blob_sha256')
+        batch_op.drop_column('blob_sha256')
+    op.drop_table('blobs')
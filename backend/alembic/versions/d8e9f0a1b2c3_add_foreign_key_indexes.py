@@ -0,0 +1,45 @@
+"""add_foreign_key_indexes
+
+Revision ID: d8e9f0a1b2c3
+Revises: c7d8e9f0a1b2
+Create Date: 2026-10-18 23:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e9f0a1b2c3'
+down_revision: Union[str, None] = 'c7d8e9f0a1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nom de l'index, table, colonnes). Les index (user_id, id), (progression_id, id) et
+# (sequence_id, id) de sequences, sessions, resources et progressions sont créés par
+# c7d8e9f0a1b2 (pagination par curseur) et servent aussi les recherches par clé étrangère.
+INDEXES = [
+    ('ix_objectives_user_id_id', 'objectives', ['user_id', 'id']),
+    ('ix_resources_type_id', 'resources', ['type_id']),
+    ('ix_resources_sub_type_id', 'resources', ['sub_type_id']),
+    ('ix_upload_sessions_resource_id', 'upload_sessions', ['resource_id']),
+    # Tables d'association : la clé primaire commence par la séance / séquence, les
+    # recherches inverses (par ressource ou par objectif) ont besoin de leur propre index
+    ('ix_session_resource_resource_id', 'session_resource', ['resource_id', 'session_id']),
+    ('ix_session_objective_association_objective_id', 'session_objective_association', ['objective_id', 'session_id']),
+    ('ix_sequence_objective_association_objective_id', 'sequence_objective_association', ['objective_id', 'sequence_id']),
+]
+
+
+def upgrade() -> None:
+    """Créer les index des clés étrangères et des recherches inverses d'association."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Supprimer les index des clés étrangères et des recherches inverses d'association."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
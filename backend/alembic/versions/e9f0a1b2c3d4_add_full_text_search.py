@@ -0,0 +1,84 @@
+"""add_full_text_search
+
+Revision ID: e9f0a1b2c3d4
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9f0a1b2c3d4'
+down_revision: Union[str, None] = 'd8e9f0a1b2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (code FTS5, table, [(colonne, poids)]) : le titre d'abord
+SOURCES = [
+    (1, 'resources', [('title', 'A'), ('description', 'B')]),
+    (2, 'sessions', [('title', 'A'), ('description', 'B'), ('notes', 'C')]),
+    (3, 'sequences', [('title', 'A'), ('description', 'B')]),
+    (4, 'progressions', [('title', 'A'), ('description', 'B')]),
+    (5, 'objectives', [('title', 'A'), ('description', 'B')]),
+]
+
+
+def upgrade() -> None:
+    """Créer l'index de recherche plein texte (tsvector + GIN sous PostgreSQL, FTS5 sous SQLite)."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute("""
+            DO $$ BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'french_unaccent') THEN
+                    CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french);
+                    ALTER TEXT SEARCH CONFIGURATION french_unaccent
+                        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+                END IF;
+            END $$
+        """)
+        for _, table, columns in SOURCES:
+            vector = " || ".join(
+                f"setweight(to_tsvector('french_unaccent'::regconfig, coalesce({column}, '')), '{weight}')"
+                for column, weight in columns
+            )
+            op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED")
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "user_id UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        for code, table, columns in SOURCES:
+            body = " || ' ' || ".join(f"coalesce({{row}}.{column}, '')" for column, _ in columns[1:])
+            insert = (
+                "INSERT OR REPLACE INTO search_index(rowid, user_id, title, body) "
+                f"VALUES ({{row}}.id * 8 + {code}, {{row}}.user_id, coalesce({{row}}.title, ''), {body});"
+            )
+            delete = f"DELETE FROM search_index WHERE rowid = old.id * 8 + {code};"
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert.format(row='new')} END")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} BEGIN {delete} {insert.format(row='new')} END")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END")
+            op.execute(
+                "INSERT OR REPLACE INTO search_index(rowid, user_id, title, body) "
+                f"SELECT src.id * 8 + {code}, src.user_id, coalesce(src.title, ''), {body.format(row='src')} FROM {table} AS src"
+            )
+
+
+def downgrade() -> None:
+    """Supprimer l'index de recherche plein texte."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for _, table, _ in reversed(SOURCES):
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent")
+    elif dialect == 'sqlite':
+        for _, table, _ in reversed(SOURCES):
+            for suffix in ('ad', 'au', 'ai'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+        op.execute("DROP TABLE IF EXISTS search_index")
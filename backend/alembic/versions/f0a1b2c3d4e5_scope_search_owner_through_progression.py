@@ -0,0 +1,63 @@
+"""scope_search_owner_through_progression
+
+Revision ID: f0a1b2c3d4e5
+Revises: e9f0a1b2c3d4
+Create Date: 2026-10-20 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0a1b2c3d4e5'
+down_revision: Union[str, None] = 'e9f0a1b2c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Les séances et séquences créées par l'API n'ont pas de user_id : leur propriétaire
+# est celui de la progression. (code FTS5, table, colonnes après le titre, propriétaire)
+SOURCES = [
+    (2, 'sessions', ['description', 'notes'],
+     "(SELECT owner2.user_id FROM sequences AS owner1 JOIN progressions AS owner2 "
+     "ON owner2.id = owner1.progression_id WHERE owner1.id = {row}.sequence_id)"),
+    (3, 'sequences', ['description'],
+     "(SELECT owner1.user_id FROM progressions AS owner1 WHERE owner1.id = {row}.progression_id)"),
+]
+
+
+def _replace_triggers(owner_of) -> None:
+    """Recréer les triggers FTS5 des séances et séquences et réindexer leurs lignes."""
+    for code, table, columns, owner in SOURCES:
+        owner = owner_of(owner)
+        body = " || ' ' || ".join(f"coalesce({{row}}.{column}, '')" for column in columns)
+        insert = (
+            "INSERT OR REPLACE INTO search_index(rowid, user_id, title, body) "
+            f"VALUES ({{row}}.id * 8 + {code}, {owner}, coalesce({{row}}.title, ''), {body});"
+        )
+        delete = f"DELETE FROM search_index WHERE rowid = old.id * 8 + {code};"
+        for suffix in ('ai', 'au', 'ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+        op.execute(f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert.format(row='new')} END")
+        op.execute(f"CREATE TRIGGER {table}_search_au AFTER UPDATE ON {table} BEGIN {delete} {insert.format(row='new')} END")
+        op.execute(f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END")
+        op.execute(
+            "INSERT OR REPLACE INTO search_index(rowid, user_id, title, body) "
+            f"SELECT src.id * 8 + {code}, {owner.format(row='src')}, coalesce(src.title, ''), {body.format(row='src')} FROM {table} AS src"
+        )
+
+
+def upgrade() -> None:
+    """Indexer les séances et séquences sous le propriétaire de leur progression (SQLite).
+
+    Sous PostgreSQL, le propriétaire est résolu à la recherche (crud/search.py) : rien à migrer.
+    """
+    if op.get_bind().dialect.name == 'sqlite':
+        _replace_triggers(lambda owner: owner)
+
+
+def downgrade() -> None:
+    """Revenir au user_id de chaque ligne (SQLite)."""
+    if op.get_bind().dialect.name == 'sqlite':
+        _replace_triggers(lambda owner: "{row}.user_id")
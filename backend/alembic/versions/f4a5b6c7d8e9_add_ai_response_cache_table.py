@@ -0,0 +1,40 @@
+"""add_ai_response_cache_table
+
+Revision ID: f4a5b6c7d8e9
+Revises: e3f4a5b6c7d8
+Create Date: 2026-10-18 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a5b6c7d8e9'
+down_revision: Union[str, None] = 'e3f4a5b6c7d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Créer la table du cache persistant des réponses du chat IA."""
+    op.create_table(
+        'ai_response_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_ai_response_cache_expires_at'), 'ai_response_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Supprimer la table du cache des réponses IA."""
+    op.drop_index(op.f('ix_ai_response_cache_expires_at'), table_name='ai_response_cache')
+    op.drop_table('ai_response_cache')
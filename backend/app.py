@@ -1,5 +1,6 @@
 import os
 import sys
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 # Ajouter le dossier parent au PYTHONPATH
@@ -9,7 +10,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
 from fastapi import FastAPI, Depends, HTTPException
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from typing import List
@@ -27,6 +27,20 @@ from routers.objective import objective_router
 from routers.user import user_router
 from routers import ai_router  # Importation du routeur AI
 from routers.dashboard import dashboard_router # Importation du routeur Dashboard
+from routers.tree import tree_router
+from routers.upload import upload_router
+from routers.chat_session import chat_session_router
+from routers.job import job_router
+from routers.search import search_router
+from routers.curriculum import curriculum_router
+from routers.debug import debug_router
+from routers.metrics import metrics_router
+from media import MediaStaticFiles
+from backend.ai.llm_interface import llm_registry
+from backend.ai.history_manager import history_manager
+from job_queue import job_workers
+from sql_instrumentation import SqlInstrumentationMiddleware
+from monitoring import MetricsMiddleware
 from schemas.sequence import SequenceRead, SequenceReadSimple
 from schemas.objective import ObjectiveRead
 
@@ -47,6 +61,18 @@ settings = get_settings()
 # from fastapi_cache.decorator import cache
 # --- Fin cache désactivé ---
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients LLM partagés (un par fournisseur/modèle) et leur pool de connexions HTTP
+    await llm_registry.startup()
+    # Tokenizer de l'historique du chat (tiktoken peut télécharger son encodage : hors boucle d'événements)
+    await history_manager.load_tokenizer()
+    # Workers des tâches de fond (table jobs)
+    await job_workers.start()
+    yield
+    await job_workers.stop()
+    await llm_registry.shutdown()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="""
@@ -99,11 +125,44 @@ app = FastAPI(
         {
             "name": "dashboard",
             "description": "Opérations du dashboard"
+        },
+        {
+            "name": "tree",
+            "description": "Arbre pédagogique complet de l'utilisateur"
+        },
+        {
+            "name": "uploads",
+            "description": "Uploads reprenables par blocs (gros fichiers audio/vidéo)"
+        },
+        {
+            "name": "chat_sessions",
+            "description": "Conversations avec l'assistant IA stockées côté serveur"
+        },
+        {
+            "name": "jobs",
+            "description": "Suivi des tâches de fond (génération IA, traitement de fichiers)"
+        },
+        {
+            "name": "search",
+            "description": "Recherche plein texte dans les contenus de l'utilisateur"
+        },
+        {
+            "name": "curriculum",
+            "description": "Export et import d'un programme complet (archive ZIP)"
+        },
+        {
+            "name": "debug",
+            "description": "Outils de diagnostic (instrumentation SQL), désactivés en production"
+        },
+        {
+            "name": "monitoring",
+            "description": "Métriques au format Prometheus"
         }
     ],
     docs_url=settings.DOCS_URL,
     redoc_url=settings.REDOC_URL,
-    openapi_url=settings.OPENAPI_URL
+    openapi_url=settings.OPENAPI_URL,
+    lifespan=lifespan
 )
 
 # --- Cache désactivé temporairement --- 
@@ -136,8 +195,14 @@ app.add_middleware(
     allow_credentials=True, # Autoriser les cookies/jetons dans les requêtes cross-origin
     allow_methods=["*"],    # Autoriser toutes les méthodes (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],    # Autoriser tous les en-têtes
+    expose_headers=["X-Next-Cursor"], # Curseur de la page suivante des listes (voir pagination.py)
 )
 
+# Nombre et durée des requêtes SQL de chaque requête HTTP (Server-Timing), détection des N+1
+app.add_middleware(SqlInstrumentationMiddleware)
+# Latence par route et requêtes en cours, exposées sur /metrics (ajouté en dernier : mesure toute la pile)
+app.add_middleware(MetricsMiddleware)
+
 # Inclusion des routes d'authentification
 app.include_router(
     auth_router,
@@ -208,9 +273,63 @@ app.include_router(
     tags=["dashboard"]
 )
 
+# Inclusion de la route de l'arbre pédagogique
+app.include_router(
+    tree_router,
+    prefix="/api/v1/tree",
+    tags=["tree"]
+)
+
+# Inclusion des routes d'upload reprenable
+app.include_router(
+    upload_router,
+    prefix="/api/v1/uploads",
+    tags=["uploads"]
+)
+
+# Inclusion des routes des conversations IA
+app.include_router(
+    chat_session_router,
+    prefix="/api/v1/chat-sessions",
+    tags=["chat_sessions"]
+)
+
+# Inclusion des routes des tâches de fond
+app.include_router(
+    job_router,
+    prefix="/api/v1/jobs",
+    tags=["jobs"]
+)
+
+# Inclusion de la route de recherche plein texte
+app.include_router(
+    search_router,
+    prefix="/api/v1/search",
+    tags=["search"]
+)
+
+# Inclusion des routes d'export/import du programme (GET /api/v1/export, POST /api/v1/import)
+app.include_router(
+    curriculum_router,
+    prefix="/api/v1",
+    tags=["curriculum"]
+)
+
+# Inclusion du rapport d'instrumentation SQL (désactivé en production par défaut)
+if settings.SQL_DEBUG_ENDPOINT_ENABLED:
+    app.include_router(
+        debug_router,
+        prefix="/api/v1/debug",
+        tags=["debug"]
+    )
+
+# Inclusion de la route des métriques (GET /metrics, hors préfixe /api/v1 comme attendu par Prometheus)
+app.include_router(metrics_router)
+
 # --- Monter le dossier d'uploads en utilisant la config --- 
 # Le dossier est déjà créé par la logique dans config.py
-app.mount(settings.MEDIA_URL_PREFIX, StaticFiles(directory=str(settings.UPLOADS_BASE_DIR)), name="user_uploads")
+# MediaStaticFiles : ETag/304, cache immuable des blobs, dossier upload_sessions non exposé
+app.mount(settings.MEDIA_URL_PREFIX, MediaStaticFiles(directory=str(settings.UPLOADS_BASE_DIR)), name="user_uploads")
 logger.info(f"Montage des médias depuis '{settings.UPLOADS_BASE_DIR}' sur l'URL '{settings.MEDIA_URL_PREFIX}'")
 # --- Fin montage Render Disk --- 
 
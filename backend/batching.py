@@ -0,0 +1,28 @@
+"""
+Aides communes aux routes d'opérations par lot (POST /sessions/batch, PATCH /resources/batch,
+PUT /objectives/links/batch). Les écritures sont faites dans crud/batch.py.
+"""
+from fastapi import HTTPException, status
+from typing import List
+
+from config import get_settings
+from schemas.batch import BatchItemResult, BatchResult
+
+settings = get_settings()
+
+def check_batch_size(count: int):
+    """Refuse un lot de plus de BATCH_MAX_ITEMS éléments (400)."""
+    if count > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trop d'éléments dans le lot ({count}, maximum {settings.BATCH_MAX_ITEMS})"
+        )
+
+def batch_result(results: List[dict]) -> BatchResult:
+    """Résultats par élément (crud/batch.py) -> réponse avec les totaux."""
+    items = [BatchItemResult(**result) for result in results]
+    return BatchResult(
+        applied=sum(1 for item in items if item.status in ("created", "updated")),
+        failed=sum(1 for item in items if item.status == "error"),
+        results=items,
+    )
@@ -0,0 +1,12 @@
+"""
+Banc de performance : génération de tenants synthétiques et charge HTTP rejouée.
+
+- fixtures.py : enseignants fictifs (progressions → séquences → séances → ressources,
+  objectifs) insérés en masse, à une échelle configurable.
+- load.py : générateur de charge asynchrone (arbre, dashboard, liste des ressources,
+  upload, chat sur le LLM factice) et mesures par scénario.
+- report.py : rapport JSON (p50/p95/p99, débit, requêtes SQL par requête) et comparaison
+  entre deux rapports, pour détecter une régression avant un déploiement.
+
+Utilisation (depuis le dossier backend) : `python -m benchmarks --help`.
+"""
@@ -0,0 +1,169 @@
+"""
+Ligne de commande du banc de performance (depuis le dossier backend) :
+
+    python -m benchmarks seed --scale medium            # tenants synthétiques (base DATABASE_URL)
+    python -m benchmarks run --users 20 --duration 60   # charge sur l'application chargée en processus
+    python -m benchmarks run --base-url http://localhost:10000 --output rapport.json
+    python -m benchmarks compare base.json rapport.json # code de sortie 1 si régression
+    python -m benchmarks clear                          # suppression des tenants
+
+`run --baseline base.json` enchaîne la comparaison. Pour comparer deux commits : même
+base, même échelle, mêmes paramètres de `run` (vérifiés par `compare`).
+"""
+from dotenv import load_dotenv
+
+# Charger les variables d'environnement AVANT d'importer database.py
+load_dotenv()
+
+import argparse
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+import logging
+import os
+import sys
+
+from benchmarks.fixtures import SCALES, Scale, clear_tenants, seed_tenants
+from benchmarks.load import DEFAULT_MIX, SCENARIOS, run_load
+from benchmarks.report import build_report, compare_reports, format_report, load_report, meta_differences, save_report
+
+logger = logging.getLogger("benchmarks")
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def _parse_mix(value: str):
+    """"tree=30,chat=10" -> {"tree": 30, "chat": 10}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS or not weight.strip().isdigit():
+            raise argparse.ArgumentTypeError(f"Mélange invalide : {item!r} (scénarios : {', '.join(SCENARIOS)})")
+        mix[name.strip()] = int(weight)
+    return mix
+
+def _scale_from_args(args) -> Scale:
+    scale = SCALES[args.scale]
+    overrides = {
+        key: getattr(args, key)
+        for key in ("teachers", "progressions", "sequences", "sessions", "resources")
+        if getattr(args, key) is not None
+    }
+    return replace(scale, **overrides)
+
+def _seed(args) -> int:
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        totals = seed_tenants(db, _scale_from_args(args), seed=args.seed, reset=not args.keep)
+    finally:
+        db.close()
+    print(f"Tenants générés : {totals}")
+    return 0
+
+def _clear(args) -> int:
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        print(f"{clear_tenants(db)} tenant(s) supprimé(s)")
+    finally:
+        db.close()
+    return 0
+
+def _compare(base, new, args) -> int:
+    for difference in meta_differences(base, new):
+        print(f"Attention, paramètres différents : {difference}")
+    lines, regressions = compare_reports(base, new, args.max_regression, args.min_delta_ms)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRégressions :")
+        for regression in regressions:
+            print(f"- {regression}")
+        return 1
+    print("\nAucune régression.")
+    return 0
+
+def _run(args) -> int:
+    meta = {
+        "target": args.base_url or "in-process",
+        "database": None,
+        "scale": args.scale,
+        "mix": args.mix,
+        "duration_seconds": args.duration,
+        "warmup_seconds": args.warmup,
+        "seed": args.seed,
+        "upload_bytes": args.upload_bytes,
+    }
+    if not args.base_url:
+        from database import engine
+        meta["database"] = engine.dialect.name
+    result = asyncio.run(run_load(
+        base_url=args.base_url, users=args.users, duration=args.duration, warmup=args.warmup,
+        mix=args.mix, seed=args.seed, upload_bytes=args.upload_bytes,
+    ))
+    report = build_report(result, meta)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = (report["meta"]["git"]["commit"] or "nogit")[:12]
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    save_report(report, output)
+    print(format_report(report))
+    print(f"\nRapport : {output}")
+    if args.baseline:
+        print()
+        return _compare(load_report(args.baseline), report, args)
+    return 0
+
+def _add_compare_options(parser):
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Hausse relative du p95 / baisse du débit tolérée (0.15 = 15 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Hausse absolue du p95 ignorée (bruit de mesure)")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Banc de performance de l'API Flash Français.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Génère les tenants synthétiques")
+    seed.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    for key in ("teachers", "progressions", "sequences", "sessions", "resources"):
+        seed.add_argument(f"--{key}", type=int, default=None, help="Remplace la valeur de l'échelle")
+    seed.add_argument("--seed", type=int, default=42, help="Graine du générateur (données déterministes)")
+    seed.add_argument("--keep", action="store_true", help="Ne pas supprimer les tenants existants")
+    seed.set_defaults(handler=_seed)
+
+    clear = commands.add_parser("clear", help="Supprime les tenants synthétiques")
+    clear.set_defaults(handler=_clear)
+
+    run = commands.add_parser("run", help="Rejoue un mélange de requêtes et écrit le rapport")
+    run.add_argument("--base-url", default=None, help="Serveur à tester (par défaut : application chargée dans ce processus)")
+    run.add_argument("--users", type=int, default=10, help="Utilisateurs virtuels simultanés")
+    run.add_argument("--duration", type=float, default=30.0, help="Durée mesurée (s)")
+    run.add_argument("--warmup", type=float, default=5.0, help="Durée de chauffe non mesurée (s)")
+    run.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX), help="Poids des scénarios, ex: tree=30,dashboard=20,resources=30,upload=10,chat=10")
+    run.add_argument("--scale", choices=sorted(SCALES), default="medium", help="Échelle des tenants (reportée dans le rapport)")
+    run.add_argument("--seed", type=int, default=42, help="Graine du tirage des scénarios")
+    run.add_argument("--upload-bytes", type=int, default=64 * 1024, help="Taille des fichiers du scénario upload")
+    run.add_argument("--output", default=None, help=f"Fichier du rapport (par défaut : {RESULTS_DIR}/<date>-<commit>.json)")
+    run.add_argument("--baseline", default=None, help="Rapport de référence à comparer")
+    _add_compare_options(run)
+    run.set_defaults(handler=_run)
+
+    compare = commands.add_parser("compare", help="Compare deux rapports (code de sortie 1 si régression)")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    _add_compare_options(compare)
+    compare.set_defaults(handler=lambda args: _compare(load_report(args.base), load_report(args.new), args))
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "run":
+        # Les logs INFO de l'application (une ou plusieurs lignes par requête) fausseraient les mesures
+        logging.getLogger().setLevel(logging.WARNING)
+        logger.setLevel(logging.INFO)
+    try:
+        return args.handler(args)
+    except (RuntimeError, ValueError) as e:
+        print(f"Erreur : {e}")
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
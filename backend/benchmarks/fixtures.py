@@ -0,0 +1,228 @@
+"""
+Tenants synthétiques pour le banc de performance.
+
+Chaque tenant est un enseignant avec `progressions` progressions, chacune de `sequences`
+séquences de `sessions` séances, chaque séance ayant `resources` ressources ; des
+objectifs sont liés aux séquences et aux séances. Les lignes sont insérées en masse
+(crud.bulk : `insert(...)` par lots de BATCH_ROWS, ids relus avec RETURNING), sans passer
+par le CRUD unitaire : 1000 tenants à l'échelle « large » représentent des millions de lignes.
+
+Les tenants sont reconnaissables à leur email (`teacherNNNNN@` + BENCH_EMAIL_DOMAIN), ce
+qui permet de les supprimer sans toucher aux autres données. La génération est
+déterministe (titres et dates tirés d'un `random.Random(seed)`), pour que deux bases
+peuplées avec la même échelle soient comparables.
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+import random
+import time
+from typing import Dict, List
+import logging
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from crud.bulk import insert_returning_ids, insert_rows
+from hashing import get_password_hash
+from models import (
+    ChatSession, ChatSessionMessage, Job, Objective, Progression, Resource, Sequence,
+    Session as SessionModel, UploadSession, User, UserRole, UserStats,
+)
+from models.association_tables import (
+    sequence_objective_association, session_objective_association, session_resource_association,
+)
+from models.resource import ResourceSubType, ResourceType
+
+logger = logging.getLogger(__name__)
+
+BENCH_EMAIL_DOMAIN = "bench.flash-francais.test"
+# Mot de passe commun des tenants (haché une seule fois)
+BENCH_PASSWORD = "bench-password"
+@dataclass(frozen=True)
+class Scale:
+    """Volume généré : `teachers` tenants, et pour chacun les quantités imbriquées."""
+    teachers: int
+    progressions: int
+    sequences: int  # Par progression
+    sessions: int  # Par séquence
+    resources: int  # Par séance
+    objectives: int = 10  # Par enseignant
+
+    def rows_per_teacher(self) -> int:
+        sequences = self.progressions * self.sequences
+        sessions = sequences * self.sessions
+        return self.progressions + sequences + sessions * (1 + 2 * self.resources) + self.objectives
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+SCALES = {
+    "smoke": Scale(teachers=5, progressions=2, sequences=3, sessions=3, resources=2),
+    "medium": Scale(teachers=50, progressions=10, sequences=5, sessions=5, resources=3),
+    "large": Scale(teachers=1000, progressions=20, sequences=10, sessions=10, resources=5),
+}
+
+_TOPICS = [
+    "le présent", "le passé composé", "l'imparfait", "le futur simple", "les articles",
+    "la nourriture", "la famille", "les vêtements", "les transports", "la météo",
+    "les prépositions de lieu", "la négation", "les pronoms COD", "le conditionnel",
+    "le subjonctif", "les monuments de Paris", "les loisirs", "la ville", "le corps", "l'école",
+]
+_RESOURCE_KINDS = ["Fiche", "Exercice", "Audio", "Vidéo", "Quiz", "Texte"]
+
+def bench_email(index: int) -> str:
+    return f"teacher{index:05d}@{BENCH_EMAIL_DOMAIN}"
+
+def _resource_type_ids(db: Session):
+    """Premier type/sous-type de ressource, créés s'ils n'existent pas (base vide)."""
+    sub_type = db.scalars(select(ResourceSubType).order_by(ResourceSubType.id).limit(1)).first()
+    if sub_type is None:
+        resource_type = db.scalars(select(ResourceType).order_by(ResourceType.id).limit(1)).first()
+        if resource_type is None:
+            resource_type = ResourceType(key="bench_document", value="Document")
+            db.add(resource_type)
+            db.flush()
+        sub_type = ResourceSubType(key="bench_fiche", value="Fiche", type_id=resource_type.id)
+        db.add(sub_type)
+        db.flush()
+    return sub_type.type_id, sub_type.id
+
+def bench_user_ids(db: Session) -> List[int]:
+    return list(db.scalars(select(User.id).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}")).order_by(User.id)))
+
+def clear_tenants(db: Session) -> int:
+    """Supprime les tenants du banc et toutes leurs données. Renvoie le nombre de tenants supprimés."""
+    user_ids = bench_user_ids(db)
+    if not user_ids:
+        return 0
+    session_ids = select(SessionModel.id).where(SessionModel.user_id.in_(user_ids))
+    sequence_ids = select(Sequence.id).where(Sequence.user_id.in_(user_ids))
+    chat_ids = select(ChatSession.id).where(ChatSession.user_id.in_(user_ids))
+    resource_ids = select(Resource.id).where(Resource.user_id.in_(user_ids))
+    # Ordre inverse des dépendances (SQLite n'applique pas ON DELETE CASCADE par défaut)
+    db.execute(delete(session_resource_association).where(session_resource_association.c.session_id.in_(session_ids)))
+    db.execute(delete(session_resource_association).where(session_resource_association.c.resource_id.in_(resource_ids)))
+    db.execute(delete(session_objective_association).where(session_objective_association.c.session_id.in_(session_ids)))
+    db.execute(delete(sequence_objective_association).where(sequence_objective_association.c.sequence_id.in_(sequence_ids)))
+    db.execute(delete(ChatSessionMessage).where(ChatSessionMessage.chat_session_id.in_(chat_ids)))
+    for model in (ChatSession, UploadSession, Job, Resource, SessionModel, Sequence, Progression, Objective, UserStats):
+        db.execute(delete(model).where(model.user_id.in_(user_ids)))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.commit()
+    return len(user_ids)
+
+def _seed_teacher(db: Session, rng: random.Random, index: int, user_id: int, scale: Scale, type_ids) -> Dict[str, int]:
+    type_id, sub_type_id = type_ids
+    start_date = datetime(2024, 9, 2)
+
+    objective_ids = insert_returning_ids(db, Objective, [
+        {
+            "title": f"[bench {index:05d}] {rng.choice(_TOPICS).capitalize()} #{k + 1}",
+            "description": f"Objectif {k + 1} de l'enseignant {index}",
+            "user_id": user_id,
+        }
+        for k in range(scale.objectives)
+    ])
+    progression_ids = insert_returning_ids(db, Progression, [
+        {"title": f"Progression {p + 1} : {rng.choice(_TOPICS)}", "description": f"Parcours {p + 1}", "user_id": user_id}
+        for p in range(scale.progressions)
+    ])
+    sequence_ids = insert_returning_ids(db, Sequence, [
+        {
+            "title": f"Séquence {s + 1} : {rng.choice(_TOPICS)}",
+            "description": f"Séquence {s + 1} de la progression {p + 1}",
+            "user_id": user_id,
+            "progression_id": progression_id,
+        }
+        for p, progression_id in enumerate(progression_ids)
+        for s in range(scale.sequences)
+    ])
+    session_ids = insert_returning_ids(db, SessionModel, [
+        {
+            "title": f"Séance {n + 1} : {rng.choice(_TOPICS)}",
+            "description": "Séance générée pour le banc de performance",
+            "date": start_date + timedelta(days=rng.randint(0, 300)),
+            "duration": rng.choice((30, 45, 60, 90)),
+            "user_id": user_id,
+            "sequence_id": sequence_id,
+        }
+        for sequence_id in sequence_ids
+        for n in range(scale.sessions)
+    ])
+    resource_ids = insert_returning_ids(db, Resource, [
+        {
+            "title": f"{rng.choice(_RESOURCE_KINDS)} : {rng.choice(_TOPICS)} ({r + 1})",
+            "description": f"Support sur {rng.choice(_TOPICS)} et {rng.choice(_TOPICS)}",
+            "type_id": type_id,
+            "sub_type_id": sub_type_id,
+            "source_type": "ai",
+            "user_id": user_id,
+        }
+        for _ in session_ids
+        for r in range(scale.resources)
+    ])
+
+    if objective_ids:
+        insert_rows(db, sequence_objective_association, [
+            {"sequence_id": sequence_id, "objective_id": objective_id}
+            for sequence_id in sequence_ids
+            for objective_id in rng.sample(objective_ids, min(2, len(objective_ids)))
+        ])
+        insert_rows(db, session_objective_association, [
+            {"session_id": session_id, "objective_id": rng.choice(objective_ids)} for session_id in session_ids
+        ])
+    insert_rows(db, session_resource_association, [
+        {"session_id": session_id, "resource_id": resource_ids[n * scale.resources + r]}
+        for n, session_id in enumerate(session_ids)
+        for r in range(scale.resources)
+    ])
+
+    # Compteurs du dashboard : les insertions en masse ne passent pas par increment_user_counter
+    counts = {
+        "progression_count": len(progression_ids),
+        "sequence_count": len(sequence_ids),
+        "session_count": len(session_ids),
+        "resource_count": len(resource_ids),
+    }
+    db.execute(insert(UserStats), [{"user_id": user_id, **counts}])
+    return counts
+
+def seed_tenants(db: Session, scale: Scale, seed: int = 42, reset: bool = True) -> Dict[str, int]:
+    """Génère `scale.teachers` tenants (après suppression des précédents si `reset`).
+
+    Le commit est fait après chaque enseignant : une génération interrompue laisse des
+    tenants complets, supprimés par le prochain `reset`.
+    """
+    if reset:
+        removed = clear_tenants(db)
+        if removed:
+            logger.info(f"{removed} tenant(s) de banc supprimé(s)")
+    rng = random.Random(seed)
+    type_ids = _resource_type_ids(db)
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    existing = set(db.scalars(select(User.email).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}"))))
+
+    logger.info(f"Génération de {scale.teachers} tenant(s), ~{scale.rows_per_teacher()} lignes chacun")
+    started_at = time.perf_counter()
+    totals = {"teachers": 0, "progression_count": 0, "sequence_count": 0, "session_count": 0, "resource_count": 0}
+    for index in range(scale.teachers):
+        email = bench_email(index)
+        if email in existing:
+            continue
+        user_id = db.scalars(insert(User).values(
+            email=email,
+            first_name="Bench",
+            last_name=f"Teacher {index:05d}",
+            hashed_password=hashed_password,
+            role=UserRole.TEACHER,
+            is_active=True,
+        ).returning(User.id)).one()
+        counts = _seed_teacher(db, rng, index, user_id, scale, type_ids)
+        db.commit()
+        totals["teachers"] += 1
+        for key, value in counts.items():
+            totals[key] += value
+        if (index + 1) % 50 == 0:
+            logger.info(f"{index + 1}/{scale.teachers} tenants générés ({time.perf_counter() - started_at:.1f} s)")
+    logger.info(f"Génération terminée en {time.perf_counter() - started_at:.1f} s : {totals}")
+    return totals
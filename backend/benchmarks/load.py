@@ -0,0 +1,228 @@
+"""
+Générateur de charge asynchrone (httpx) : des utilisateurs virtuels rejouent un mélange
+de scénarios pondérés pendant une durée fixe, en boucle fermée (chaque utilisateur
+enchaîne ses requêtes sans pause : la charge est fixée par `users`).
+
+Scénarios (poids par défaut dans DEFAULT_MIX) :
+- tree : GET /tree/ (arbre complet de l'enseignant)
+- dashboard : GET /dashboard/summary
+- resources : GET /resources/?limit=50
+- upload : POST /resources/ avec un fichier texte (contenu unique : pas de déduplication)
+- chat : message dans une conversation serveur ; le serveur doit tourner avec
+  AI_PROVIDER=fake (automatique en mode `in_process`)
+
+Chaque utilisateur virtuel se connecte avec un tenant de fixtures.py. Le nombre de
+requêtes SQL de chaque réponse est lu dans l'en-tête Server-Timing (voir
+sql_instrumentation.py) : il est absent si SQL_INSTRUMENTATION_ENABLED=false.
+Le tirage des scénarios est déterministe (`seed`) : deux exécutions avec les mêmes
+paramètres rejouent la même suite de scénarios par utilisateur.
+"""
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import asyncio
+import os
+import random
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+import httpx
+
+from benchmarks.fixtures import BENCH_PASSWORD, bench_email
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+DEFAULT_MIX = {"tree": 30, "dashboard": 20, "resources": 30, "upload": 10, "chat": 10}
+# Le streaming du LLM factice est immédiat : la mesure porte sur le serveur, pas sur le modèle
+FAKE_LLM_TOKEN_DELAY_MS = "0"
+
+_QUERIES_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+@dataclass
+class Sample:
+    """Une requête mesurée."""
+    scenario: str
+    seconds: float
+    status_code: int
+    ok: bool
+    queries: Optional[int] = None
+    db_ms: Optional[float] = None
+
+@dataclass
+class VirtualUser:
+    index: int
+    headers: Dict[str, str]
+    type_id: int
+    sub_type_id: int
+    rng: random.Random
+    chat_session_id: Optional[int] = None
+    uploads: int = 0
+
+@dataclass
+class LoadResult:
+    samples: List[Sample] = field(default_factory=list)
+    duration_seconds: float = 0.0
+    users: int = 0
+
+def parse_server_timing(value: Optional[str]):
+    """(nombre de requêtes SQL, durée SQL en ms) depuis l'en-tête Server-Timing, ou (None, None)."""
+    match = _QUERIES_RE.search(value or "")
+    if match is None:
+        return None, None
+    return int(match.group(2)), float(match.group(1))
+
+# --- Scénarios : chacun envoie une requête et renvoie (réponse, code attendu) ---
+
+async def _tree(client: httpx.AsyncClient, user: VirtualUser):
+    return await client.get(f"{API_PREFIX}/tree/", headers=user.headers), 200
+
+async def _dashboard(client: httpx.AsyncClient, user: VirtualUser):
+    return await client.get(f"{API_PREFIX}/dashboard/summary", headers=user.headers), 200
+
+async def _resources(client: httpx.AsyncClient, user: VirtualUser):
+    return await client.get(f"{API_PREFIX}/resources/", params={"limit": 50}, headers=user.headers), 200
+
+async def _upload(client: httpx.AsyncClient, user: VirtualUser, size: int = 64 * 1024):
+    user.uploads += 1
+    # Préfixe unique : chaque upload crée un nouveau blob (chemin d'écriture complet)
+    content = f"bench {user.index} {user.uploads} {time.time_ns()}\n".encode()
+    content += b"x" * max(size - len(content), 0)
+    response = await client.post(
+        f"{API_PREFIX}/resources/",
+        headers=user.headers,
+        data={
+            "title": f"Upload de banc {user.uploads}",
+            "type_id": str(user.type_id),
+            "sub_type_id": str(user.sub_type_id),
+            "source_type": "file",
+        },
+        files={"file": (f"bench-{user.uploads}.txt", content, "text/plain")},
+    )
+    return response, 200
+
+async def _chat(client: httpx.AsyncClient, user: VirtualUser):
+    return await client.post(
+        f"{API_PREFIX}/chat-sessions/{user.chat_session_id}/messages",
+        headers=user.headers,
+        json={"message": user.rng.choice(["Bonjour", "Propose un exercice sur le passé composé", "Merci !"])},
+    ), 200
+
+SCENARIOS: Dict[str, Callable[[httpx.AsyncClient, VirtualUser], Awaitable]] = {
+    "tree": _tree,
+    "dashboard": _dashboard,
+    "resources": _resources,
+    "upload": _upload,
+    "chat": _chat,
+}
+
+async def _login_tenants(client: httpx.AsyncClient, wanted: int) -> List[Dict[str, str]]:
+    """En-têtes d'authentification des tenants teacher00000, teacher00001... (au plus `wanted`)."""
+    tenants = []
+    for index in range(wanted):
+        response = await client.post(
+            f"{API_PREFIX}/auth/token", data={"username": bench_email(index), "password": BENCH_PASSWORD}
+        )
+        if response.status_code != 200:
+            break
+        tenants.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    if not tenants:
+        raise RuntimeError(
+            f"Connexion du tenant {bench_email(0)} impossible : générer les tenants avec `python -m benchmarks seed`"
+        )
+    return tenants
+
+async def _prepare_user(client: httpx.AsyncClient, index: int, headers: Dict[str, str], seed: int, mix: Dict[str, int]) -> VirtualUser:
+    response = await client.get(f"{API_PREFIX}/resource-types/subtypes", params={"limit": 1}, headers=headers)
+    response.raise_for_status()
+    sub_types = response.json()
+    if not sub_types:
+        raise RuntimeError("Aucun sous-type de ressource : générer les tenants avec `python -m benchmarks seed`")
+    user = VirtualUser(
+        index=index, headers=headers, type_id=sub_types[0]["type_id"], sub_type_id=sub_types[0]["id"],
+        rng=random.Random(f"{seed}-{index}"),
+    )
+    if mix.get("chat"):
+        response = await client.post(f"{API_PREFIX}/chat-sessions/", json={"title": "Banc"}, headers=headers)
+        response.raise_for_status()
+        user.chat_session_id = response.json()["id"]
+    return user
+
+async def _run_user(client, user: VirtualUser, mix: Dict[str, int], deadline: float, record: bool, result: LoadResult, upload_bytes: int):
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        scenario = user.rng.choices(names, weights)[0]
+        started_at = time.perf_counter()
+        try:
+            if scenario == "upload":
+                response, expected = await _upload(client, user, upload_bytes)
+            else:
+                response, expected = await SCENARIOS[scenario](client, user)
+            queries, db_ms = parse_server_timing(response.headers.get("Server-Timing"))
+            sample = Sample(scenario, time.perf_counter() - started_at, response.status_code, response.status_code == expected, queries, db_ms)
+            if not sample.ok:
+                logger.warning(f"{scenario} : code {response.status_code} ({response.text[:200]})")
+        except httpx.HTTPError as e:
+            sample = Sample(scenario, time.perf_counter() - started_at, 0, False)
+            logger.warning(f"{scenario} : {e!r}")
+        if record:
+            result.samples.append(sample)
+
+@asynccontextmanager
+async def _client(base_url: Optional[str], timeout: float):
+    """Client HTTP vers `base_url`, ou vers l'application chargée dans ce processus (base_url=None)."""
+    if base_url:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+    os.environ["AI_PROVIDER"] = "fake"
+    os.environ.setdefault("FAKE_LLM_TOKEN_DELAY_MS", FAKE_LLM_TOKEN_DELAY_MS)
+    from app import app  # Import tardif : la configuration lit l'environnement au chargement
+    from database import async_engine
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                yield client
+    finally:
+        # Connexions du pool asynchrone fermées dans cette boucle (sinon leurs threads bloquent la sortie)
+        await async_engine.dispose()
+
+async def run_load(
+    base_url: Optional[str] = None,
+    users: int = 10,
+    duration: float = 30.0,
+    warmup: float = 5.0,
+    mix: Optional[Dict[str, int]] = None,
+    seed: int = 42,
+    upload_bytes: int = 64 * 1024,
+    timeout: float = 60.0,
+) -> LoadResult:
+    """Rejoue le mélange `mix` avec `users` utilisateurs virtuels.
+
+    Les `warmup` premières secondes (caches froids, pool de connexions à remplir) ne sont
+    pas comptées. `base_url=None` : application chargée dans ce processus (le générateur
+    partage alors la boucle asyncio du serveur, les latences sont à comparer entre elles).
+    """
+    mix = dict(mix or DEFAULT_MIX)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Scénario(s) inconnu(s) : {', '.join(sorted(unknown))}")
+    result = LoadResult(users=users)
+    async with _client(base_url, timeout) as client:
+        # Un tenant par utilisateur virtuel (les tenants sont réutilisés s'il y a plus d'utilisateurs)
+        tenants = await _login_tenants(client, users)
+        virtual_users = [
+            await _prepare_user(client, index, tenants[index % len(tenants)], seed, mix) for index in range(users)
+        ]
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*[_run_user(client, user, mix, deadline, False, result, upload_bytes) for user in virtual_users])
+        started_at = time.perf_counter()
+        deadline = started_at + duration
+        await asyncio.gather(*[_run_user(client, user, mix, deadline, True, result, upload_bytes) for user in virtual_users])
+        result.duration_seconds = time.perf_counter() - started_at
+    return result
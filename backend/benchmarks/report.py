@@ -0,0 +1,160 @@
+"""
+Rapports du banc de performance et comparaison entre deux rapports.
+
+Un rapport (JSON) contient, par scénario et au total : nombre de requêtes, erreurs,
+latences (moyenne, p50, p95, p99, max en ms), débit (requêtes/s) et requêtes SQL par
+requête HTTP ; et dans `meta` ce qui conditionne la comparabilité : commit git, échelle
+des tenants, mélange de scénarios, utilisateurs, durée, base de données.
+
+`compare_reports` signale une régression quand, pour un scénario :
+- le p95 augmente de plus de `max_regression` (relatif) et de plus de `min_delta_ms`
+  (bruit de mesure sur les requêtes très courtes) ;
+- le nombre moyen de requêtes SQL augmente de plus d'une demi-requête (il ne dépend pas de
+  la machine : pas de tolérance relative) ;
+- le taux d'erreur augmente ;
+ou quand le débit total baisse de plus de `max_regression`.
+"""
+from datetime import datetime, timezone
+import json
+import math
+import platform
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from benchmarks.load import LoadResult, Sample
+
+REPORT_VERSION = 1
+# Champs de `meta` qui doivent être identiques pour comparer deux rapports
+COMPARABLE_META = ("target", "database", "scale", "mix", "users", "duration_seconds", "seed")
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Percentile par interpolation linéaire entre rangs (`values` trié)."""
+    if not values:
+        return None
+    position = (len(values) - 1) * fraction
+    lower, upper = math.floor(position), math.ceil(position)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+def summarize(samples: Iterable[Sample], duration_seconds: float) -> Dict[str, Any]:
+    samples = list(samples)
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    queries = [sample.queries for sample in samples if sample.queries is not None]
+    db_ms = [sample.db_ms for sample in samples if sample.db_ms is not None]
+    errors = sum(1 for sample in samples if not sample.ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": _round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": _round(len(samples) / duration_seconds) if duration_seconds else 0.0,
+        "latency_ms": {
+            "mean": _round(sum(latencies) / len(latencies)) if latencies else None,
+            "p50": _round(percentile(latencies, 0.50)),
+            "p95": _round(percentile(latencies, 0.95)),
+            "p99": _round(percentile(latencies, 0.99)),
+            "max": _round(latencies[-1]) if latencies else None,
+        },
+        "queries_per_request": {
+            "mean": _round(sum(queries) / len(queries)) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+        "db_ms_mean": _round(sum(db_ms) / len(db_ms)) if db_ms else None,
+    }
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def git_meta() -> Dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+def build_report(result: LoadResult, meta: Dict[str, Any]) -> Dict[str, Any]:
+    by_scenario: Dict[str, List[Sample]] = {}
+    for sample in result.samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            **meta,
+            "git": git_meta(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "users": result.users,
+        },
+        "total": summarize(result.samples, result.duration_seconds),
+        "scenarios": {name: summarize(samples, result.duration_seconds) for name, samples in sorted(by_scenario.items())},
+    }
+
+def save_report(report: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path} : version de rapport {report.get('version')} non prise en charge")
+    return report
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Tableau texte d'un rapport (une ligne par scénario, puis le total)."""
+    git = report["meta"].get("git") or {}
+    lines = [
+        f"Commit {(git.get('commit') or '?')[:12]}{' (modifié)' if git.get('dirty') else ''} - "
+        f"{report['meta'].get('users')} utilisateurs, {report['meta'].get('duration_seconds')} s",
+        f"{'scénario':<12}{'req':>8}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'SQL/req':>9}",
+    ]
+    rows = list(report["scenarios"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        latency, queries = stats["latency_ms"], stats["queries_per_request"]
+        lines.append(
+            f"{name:<12}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9}"
+            f"{_cell(latency['p50'])}{_cell(latency['p95'])}{_cell(latency['p99'])}{_cell(queries['mean'])}"
+        )
+    return "\n".join(lines)
+
+def _cell(value: Optional[float], width: int = 9) -> str:
+    return f"{'-' if value is None else value:>{width}}"
+
+def meta_differences(base: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Paramètres qui diffèrent entre deux rapports (comparaison peu fiable)."""
+    return [
+        f"{key} : {base['meta'].get(key)!r} -> {new['meta'].get(key)!r}"
+        for key in COMPARABLE_META if base["meta"].get(key) != new["meta"].get(key)
+    ]
+
+def compare_reports(
+    base: Dict[str, Any], new: Dict[str, Any], max_regression: float = 0.15, min_delta_ms: float = 5.0
+) -> Tuple[List[str], List[str]]:
+    """Compare `new` à `base`. Renvoie (lignes du tableau, régressions détectées)."""
+    lines = [f"{'scénario':<12}{'p95 base':>10}{'p95':>10}{'écart':>9}{'SQL base':>10}{'SQL':>7}"]
+    regressions = []
+    for name in sorted(set(base["scenarios"]) | set(new["scenarios"])):
+        before, after = base["scenarios"].get(name), new["scenarios"].get(name)
+        if before is None or after is None:
+            lines.append(f"{name:<12} présent dans un seul rapport")
+            continue
+        p95_before, p95_after = before["latency_ms"]["p95"], after["latency_ms"]["p95"]
+        change = (p95_after - p95_before) / p95_before if p95_before else 0.0
+        sql_before, sql_after = before["queries_per_request"]["mean"], after["queries_per_request"]["mean"]
+        lines.append(
+            f"{name:<12}{p95_before:>10}{p95_after:>10}{change:>+9.0%}{_cell(sql_before, 10)}{_cell(sql_after, 7)}"
+        )
+        if change > max_regression and p95_after - p95_before > min_delta_ms:
+            regressions.append(f"{name} : p95 {p95_before} -> {p95_after} ms ({change:+.0%})")
+        if sql_before is not None and sql_after is not None and sql_after > sql_before + 0.5:
+            regressions.append(f"{name} : requêtes SQL par requête {sql_before} -> {sql_after}")
+        if after["error_rate"] > before["error_rate"]:
+            regressions.append(f"{name} : taux d'erreur {before['error_rate']:.2%} -> {after['error_rate']:.2%}")
+    throughput_before, throughput_after = base["total"]["throughput_rps"], new["total"]["throughput_rps"]
+    if throughput_before and (throughput_before - throughput_after) / throughput_before > max_regression:
+        regressions.append(f"débit total {throughput_before} -> {throughput_after} req/s")
+    return lines, regressions
@@ -29,18 +29,85 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Cache token -> utilisateur (évite la lecture de la table users à chaque requête)
+    PRINCIPAL_CACHE_ENABLED: bool = os.getenv('PRINCIPAL_CACHE_ENABLED', 'true').lower() == 'true'
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+    PRINCIPAL_CACHE_MAX_SIZE: int = int(os.getenv('PRINCIPAL_CACHE_MAX_SIZE', '10000'))
+
+    # Hachage bcrypt : coût, et pool dédié (au-delà de MAX_PENDING demandes -> 503 + Retry-After)
+    BCRYPT_ROUNDS: int = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '64'))
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = int(os.getenv('PASSWORD_HASH_RETRY_AFTER_SECONDS', '2'))
+
     # Configuration de l'IA
     OPENAI_API_KEY: str = os.getenv('OPENAI_API_KEY', '')
     GOOGLE_API_KEY: str = os.getenv('GOOGLE_API_KEY', '')
     AI_PROVIDER: str = os.getenv('AI_PROVIDER', 'openai')
     OPENAI_CHAT_MODEL: str = os.getenv('OPENAI_CHAT_MODEL', 'gpt-3.5-turbo')
     GEMINI_CHAT_MODEL: str = os.getenv('GEMINI_CHAT_MODEL', 'gemini-pro')
+    OPENAI_BASE_URL: str = os.getenv('OPENAI_BASE_URL', '')  # Vide = API OpenAI (peut pointer vers un proxy ou un serveur de test)
+    # Connexions HTTP partagées par les clients LLM (keep-alive : pas de nouvelle poignée de main TLS par requête)
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv('LLM_HTTP_MAX_CONNECTIONS', '20'))
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv('LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS', '10'))
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv('LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS', '60'))
+    LLM_HTTP_TIMEOUT_SECONDS: float = float(os.getenv('LLM_HTTP_TIMEOUT_SECONDS', '60'))
+    LLM_WARMUP_ON_STARTUP: bool = os.getenv('LLM_WARMUP_ON_STARTUP', 'false').lower() == 'true'
+    # Cache des réponses du chat IA : exact (mémoire), persistant (table ai_response_cache), par similarité
+    AI_CACHE_ENABLED: bool = os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true'
+    AI_CACHE_TTL_SECONDS: int = int(os.getenv('AI_CACHE_TTL_SECONDS', '86400'))
+    AI_CACHE_MAX_SIZE: int = int(os.getenv('AI_CACHE_MAX_SIZE', '1000'))
+    AI_CACHE_PERSISTENT_ENABLED: bool = os.getenv('AI_CACHE_PERSISTENT_ENABLED', 'false').lower() == 'true'
+    AI_CACHE_PERSISTENT_TTL_SECONDS: int = int(os.getenv('AI_CACHE_PERSISTENT_TTL_SECONDS', str(7 * 86400)))
+    AI_CACHE_SIMILARITY_ENABLED: bool = os.getenv('AI_CACHE_SIMILARITY_ENABLED', 'false').lower() == 'true'
+    AI_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv('AI_CACHE_SIMILARITY_THRESHOLD', '0.92'))
+    # Historique du chat : budget de tokens du prompt, au-delà les anciens échanges sont résumés
+    AI_TOKENIZER: str = os.getenv('AI_TOKENIZER', 'auto')  # auto, tiktoken ou approximate
+    AI_HISTORY_TOKEN_BUDGET: int = int(os.getenv('AI_HISTORY_TOKEN_BUDGET', '3000'))
+    AI_HISTORY_SUMMARY_MAX_TOKENS: int = int(os.getenv('AI_HISTORY_SUMMARY_MAX_TOKENS', '300'))
+    AI_HISTORY_SUMMARY_BATCH: int = int(os.getenv('AI_HISTORY_SUMMARY_BATCH', '6'))
+    AI_HISTORY_SUMMARY_CACHE_SIZE: int = int(os.getenv('AI_HISTORY_SUMMARY_CACHE_SIZE', '1000'))
+    # Conversations IA côté serveur : fenêtre en mémoire des sessions récentes (LRU)
+    AI_CHAT_SESSION_CACHE_SIZE: int = int(os.getenv('AI_CHAT_SESSION_CACHE_SIZE', '500'))
+    AI_CHAT_SESSION_CACHE_TTL_SECONDS: int = int(os.getenv('AI_CHAT_SESSION_CACHE_TTL_SECONDS', '3600'))
+    AI_CHAT_SESSION_WINDOW_MESSAGES: int = int(os.getenv('AI_CHAT_SESSION_WINDOW_MESSAGES', '200'))
+    # Génération de ressources par lots : appels LLM en parallèle, débit limité par fournisseur, reprises
+    AI_BATCH_CONCURRENCY: int = int(os.getenv('AI_BATCH_CONCURRENCY', '8'))
+    AI_BATCH_MAX_RESOURCES: int = int(os.getenv('AI_BATCH_MAX_RESOURCES', '200'))
+    AI_BATCH_MAX_RETRIES: int = int(os.getenv('AI_BATCH_MAX_RETRIES', '3'))
+    AI_BATCH_RETRY_BASE_DELAY_SECONDS: float = float(os.getenv('AI_BATCH_RETRY_BASE_DELAY_SECONDS', '1'))
+    AI_BATCH_RETRY_MAX_DELAY_SECONDS: float = float(os.getenv('AI_BATCH_RETRY_MAX_DELAY_SECONDS', '20'))
+    AI_RATE_LIMITS: str = os.getenv('AI_RATE_LIMITS', 'openai=5,gemini=1')  # Requêtes/seconde par fournisseur (absent = illimité)
+    # AI_PROVIDER=fake : modèle factice (réponse fixe, streamée caractère par caractère) pour tester sans clé API
+    FAKE_LLM_RESPONSE: str = os.getenv('FAKE_LLM_RESPONSE', "Bonjour ! Je suis l'assistant de test.")
+    FAKE_LLM_TOKEN_DELAY_MS: int = int(os.getenv('FAKE_LLM_TOKEN_DELAY_MS', '20'))
+
+    # Tâches de fond (table jobs) exécutées par des workers dans le processus de l'API
+    JOBS_ENABLED: bool = os.getenv('JOBS_ENABLED', 'true').lower() == 'true'
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv('JOB_WORKER_CONCURRENCY', '2'))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv('JOB_POLL_INTERVAL_SECONDS', '2'))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_RETRY_BASE_DELAY_SECONDS: float = float(os.getenv('JOB_RETRY_BASE_DELAY_SECONDS', '10'))
+    JOB_TIMEOUT_SECONDS: int = int(os.getenv('JOB_TIMEOUT_SECONDS', '900'))
+    JOB_STALE_AFTER_SECONDS: int = int(os.getenv('JOB_STALE_AFTER_SECONDS', '1800'))  # > JOB_TIMEOUT_SECONDS
+    JOB_RETENTION_DAYS: int = int(os.getenv('JOB_RETENTION_DAYS', '7'))
 
     # Préfixe URL pour servir les fichiers média
     MEDIA_URL_PREFIX: str = "/media/uploads" 
+    # Si défini (ex: "/protected-media"), les fichiers sont envoyés par nginx via X-Accel-Redirect (sendfile)
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
 
     # --- Ajout des paramètres d'upload manquants ---
     MAX_UPLOAD_SIZE_MB: int = int(os.getenv('MAX_UPLOAD_SIZE_MB', '10')) # Taille max en Mo, défaut 10 Mo
+    UPLOAD_CHUNK_SIZE_KB: int = int(os.getenv('UPLOAD_CHUNK_SIZE_KB', '1024')) # Taille des blocs lors de l'écriture des uploads
+    # Uploads reprenables (gros fichiers audio/vidéo envoyés par blocs)
+    RESUMABLE_UPLOAD_MAX_SIZE_MB: int = int(os.getenv('RESUMABLE_UPLOAD_MAX_SIZE_MB', '500'))
+    RESUMABLE_UPLOAD_CHUNK_SIZE_MB: int = int(os.getenv('RESUMABLE_UPLOAD_CHUNK_SIZE_MB', '5'))
+    RESUMABLE_UPLOAD_EXPIRE_HOURS: int = int(os.getenv('RESUMABLE_UPLOAD_EXPIRE_HOURS', '48'))
+    # Import d'un programme complet (POST /api/v1/import) : taille maximale de l'archive ZIP ; chaque fichier est limité à RESUMABLE_UPLOAD_MAX_SIZE_MB
+    CURRICULUM_IMPORT_MAX_SIZE_MB: int = int(os.getenv('CURRICULUM_IMPORT_MAX_SIZE_MB', '2048'))
+    # Opérations par lot (POST /sessions/batch, PATCH /resources/batch, PUT /objectives/links/batch) : éléments maximum par requête
+    BATCH_MAX_ITEMS: int = int(os.getenv('BATCH_MAX_ITEMS', '500'))
     ALLOWED_UPLOAD_MIME_TYPES: List[str] = [
         "image/jpeg",
         "image/png",
@@ -53,6 +120,22 @@ class Settings(BaseSettings):
     ]
     # -----------------------------------------------
 
+    # Compteurs par utilisateur (table user_stats) pour le résumé du dashboard
+    DASHBOARD_COUNTERS_ENABLED: bool = os.getenv('DASHBOARD_COUNTERS_ENABLED', 'true').lower() == 'true'
+
+    # Instrumentation SQL par requête HTTP (Server-Timing, détection des N+1, voir sql_instrumentation.py)
+    SQL_INSTRUMENTATION_ENABLED: bool = os.getenv('SQL_INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5'))  # Exécutions d'un même SELECT dans une requête
+    # Rapport /debug/sql (authentifié) ; non défini : activé sauf en production (résolu dans get_settings)
+    SQL_DEBUG_ENDPOINT_ENABLED: Optional[bool] = (
+        os.getenv('SQL_DEBUG_ENDPOINT_ENABLED').lower() == 'true' if os.getenv('SQL_DEBUG_ENDPOINT_ENABLED') else None
+    )
+    SQL_DEBUG_HISTORY_SIZE: int = int(os.getenv('SQL_DEBUG_HISTORY_SIZE', '200'))  # Dernières requêtes HTTP gardées pour /debug/sql
+
+    # Métriques au format Prometheus sur GET /metrics (voir monitoring.py)
+    METRICS_ENABLED: bool = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN: str = os.getenv('METRICS_TOKEN', '')  # Si défini, /metrics exige "Authorization: Bearer <token>"
+
     # Chemin de base pour le stockage des uploads - Initialisé à None
     UPLOADS_BASE_DIR: Optional[Path] = None
 
@@ -110,5 +193,9 @@ def get_settings() -> Settings:
         local_db_url = os.environ.get("DATABASE_URL")
         if local_db_url:
             settings.DATABASE_URL = local_db_url
+
+    # Défaut du rapport SQL selon l'environnement final (RENDER=true force la production)
+    if settings.SQL_DEBUG_ENDPOINT_ENABLED is None:
+        settings.SQL_DEBUG_ENDPOINT_ENABLED = settings.ENV.lower() != "production"
     
     return settings
@@ -5,6 +5,7 @@ from crud.user import (
     get_users,
     create_user,
     authenticate_user,
+    update_password_hash,
     update_user,
     delete_user
 )
@@ -41,6 +42,7 @@ from crud.resource import (
     get_resources_by_session,
     get_resources_standalone,
     create_resource,
+    create_resources_bulk,
     update_resource,
     delete_resource
 )
@@ -100,6 +102,7 @@ __all__ = [
     "get_resources_by_session",
     "get_resources_standalone",
     "create_resource",
+    "create_resources_bulk",
     "update_resource",
     "delete_resource",
     # Resource Type exports
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+from models import AIResponseCacheEntry
+from typing import Optional
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+def get_cached_ai_response(db: Session, key: str) -> Optional[str]:
+    """Renvoie la réponse mémorisée pour cette clé si elle n'a pas expiré (et compte le hit)."""
+    entry = (
+        db.query(AIResponseCacheEntry)
+        .filter(AIResponseCacheEntry.key == key, AIResponseCacheEntry.expires_at > datetime.utcnow())
+        .first()
+    )
+    if entry is None:
+        return None
+    entry.hit_count = AIResponseCacheEntry.hit_count + 1
+    db.commit()
+    return entry.response
+
+def store_ai_response(db: Session, key: str, provider: str, model: str, response: str, ttl_seconds: int) -> AIResponseCacheEntry:
+    """Mémorise (ou remplace) la réponse associée à une clé."""
+    now = datetime.utcnow()
+    entry = db.query(AIResponseCacheEntry).filter(AIResponseCacheEntry.key == key).first()
+    if entry is None:
+        entry = AIResponseCacheEntry(key=key, provider=provider, model=model, hit_count=0)
+        db.add(entry)
+    entry.response = response
+    entry.created_at = now
+    entry.expires_at = now + timedelta(seconds=ttl_seconds)
+    db.commit()
+    return entry
+
+def purge_expired_ai_responses(db: Session) -> int:
+    """Supprime les réponses expirées ; renvoie le nombre de lignes supprimées."""
+    deleted = (
+        db.query(AIResponseCacheEntry)
+        .filter(AIResponseCacheEntry.expires_at <= datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    if deleted:
+        logger.info(f"{deleted} réponse(s) IA expirée(s) supprimée(s) du cache")
+    return deleted
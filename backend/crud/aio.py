@@ -0,0 +1,172 @@
+"""
+Équivalents asynchrones des fonctions CRUD, pour les routeurs utilisant `get_async_db`.
+
+Chaque fonction de `crud.__all__` est exposée ici sous le même nom, en version `async`.
+L'appel est exécuté via `AsyncSession.run_sync` : le code CRUD synchrone existant est
+réutilisé tel quel, mais les allers-retours SQL passent par le driver asynchrone
+(asyncpg / aiosqlite) et ne bloquent donc pas la boucle d'événements.
+
+Les schémas de réponse contenant des relations (ex: SequenceRead.objectives) déclenchent
+des chargements paresseux, impossibles hors de `run_sync`. Passer `response_model=...`
+pour sérialiser le résultat à l'intérieur de l'appel :
+
+    sequences = await crud_aio.get_sequences(db, user_id=1, response_model=List[SequenceRead])
+"""
+from functools import lru_cache, wraps
+from typing import Any, Callable
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+from crud import dashboard, tree, user_stats, upload_session, ai_response_cache, chat_session, job, search, curriculum, batch
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+async def run(db: AsyncSession, fn: Callable, *args, response_model: Any = None, **kwargs):
+    """Exécute une fonction CRUD synchrone sur une AsyncSession.
+
+    Args:
+        db (AsyncSession): La session asynchrone de la requête
+        fn (Callable): Fonction CRUD synchrone prenant la session en premier argument
+        response_model (optional): Schéma Pydantic (ou type List[...]) pour sérialiser
+            le résultat avant de quitter `run_sync`
+
+    Returns:
+        Le résultat de `fn`, ou sa version sérialisée si `response_model` est fourni.
+    """
+    def _call(sync_db):
+        result = fn(sync_db, *args, **kwargs)
+        if response_model is not None and result is not None:
+            return _type_adapter(response_model).validate_python(result, from_attributes=True)
+        return result
+    return await db.run_sync(_call)
+
+def _make_async(fn: Callable) -> Callable:
+    @wraps(fn)
+    async def wrapper(db: AsyncSession, *args, response_model: Any = None, **kwargs):
+        return await run(db, fn, *args, response_model=response_model, **kwargs)
+    return wrapper
+
+# --- Fonctions CRUD asynchrones (même nom, même signature, session asynchrone) ---
+
+# User
+get_user = _make_async(crud.get_user)
+get_user_by_email = _make_async(crud.get_user_by_email)
+get_users = _make_async(crud.get_users)
+create_user = _make_async(crud.create_user)
+update_user = _make_async(crud.update_user)
+update_password_hash = _make_async(crud.update_password_hash)
+delete_user = _make_async(crud.delete_user)
+
+# Progression
+get_progression = _make_async(crud.get_progression)
+get_progressions = _make_async(crud.get_progressions)
+create_progression = _make_async(crud.create_progression)
+update_progression = _make_async(crud.update_progression)
+delete_progression = _make_async(crud.delete_progression)
+
+# Sequence
+get_sequence = _make_async(crud.get_sequence)
+get_sequences = _make_async(crud.get_sequences)
+get_sequences_by_progression = _make_async(crud.get_sequences_by_progression)
+create_sequence = _make_async(crud.create_sequence)
+update_sequence = _make_async(crud.update_sequence)
+delete_sequence = _make_async(crud.delete_sequence)
+
+# Session
+get_session = _make_async(crud.get_session)
+get_sessions = _make_async(crud.get_sessions)
+get_sessions_by_sequence = _make_async(crud.get_sessions_by_sequence)
+create_session = _make_async(crud.create_session)
+update_session = _make_async(crud.update_session)
+delete_session = _make_async(crud.delete_session)
+
+# Resource
+get_resource = _make_async(crud.get_resource)
+get_resources = _make_async(crud.get_resources)
+get_resources_by_session = _make_async(crud.get_resources_by_session)
+get_resources_standalone = _make_async(crud.get_resources_standalone)
+create_resource = _make_async(crud.create_resource)
+create_resources_bulk = _make_async(crud.create_resources_bulk)
+update_resource = _make_async(crud.update_resource)
+delete_resource = _make_async(crud.delete_resource)
+
+# Resource Type
+get_resource_types = _make_async(crud.get_resource_types)
+get_resource_type = _make_async(crud.get_resource_type)
+get_resource_type_by_key = _make_async(crud.get_resource_type_by_key)
+get_resource_subtypes = _make_async(crud.get_resource_subtypes)
+get_resource_subtype = _make_async(crud.get_resource_subtype)
+get_resource_subtype_by_key = _make_async(crud.get_resource_subtype_by_key)
+
+# Objective
+get_objective = _make_async(crud.get_objective)
+get_objective_by_title = _make_async(crud.get_objective_by_title)
+get_objectives = _make_async(crud.get_objectives)
+create_objective = _make_async(crud.create_objective)
+update_objective = _make_async(crud.update_objective)
+delete_objective = _make_async(crud.delete_objective)
+add_objective_to_sequence = _make_async(crud.add_objective_to_sequence)
+remove_objective_from_sequence = _make_async(crud.remove_objective_from_sequence)
+add_objective_to_session = _make_async(crud.add_objective_to_session)
+remove_objective_from_session = _make_async(crud.remove_objective_from_session)
+get_objectives_by_sequence = _make_async(crud.get_objectives_by_sequence)
+get_objectives_by_session = _make_async(crud.get_objectives_by_session)
+get_sequences_by_objective = _make_async(crud.get_sequences_by_objective)
+get_sessions_by_objective = _make_async(crud.get_sessions_by_objective)
+
+# Upload reprenable
+get_upload_session = _make_async(upload_session.get_upload_session)
+create_upload_session = _make_async(upload_session.create_upload_session)
+claim_upload_session = _make_async(upload_session.claim_upload_session)
+release_upload_session = _make_async(upload_session.release_upload_session)
+complete_upload_session = _make_async(upload_session.complete_upload_session)
+delete_upload_session = _make_async(upload_session.delete_upload_session)
+purge_expired_upload_sessions = _make_async(upload_session.purge_expired_upload_sessions)
+
+# Cache des réponses IA
+get_cached_ai_response = _make_async(ai_response_cache.get_cached_ai_response)
+store_ai_response = _make_async(ai_response_cache.store_ai_response)
+purge_expired_ai_responses = _make_async(ai_response_cache.purge_expired_ai_responses)
+
+# Conversations IA
+get_chat_session = _make_async(chat_session.get_chat_session)
+get_chat_sessions = _make_async(chat_session.get_chat_sessions)
+create_chat_session = _make_async(chat_session.create_chat_session)
+get_chat_messages = _make_async(chat_session.get_chat_messages)
+append_chat_messages = _make_async(chat_session.append_chat_messages)
+delete_chat_session = _make_async(chat_session.delete_chat_session)
+
+# Tâches de fond
+create_job = _make_async(job.create_job)
+get_job = _make_async(job.get_job)
+get_jobs = _make_async(job.get_jobs)
+claim_next_job = _make_async(job.claim_next_job)
+update_job_progress = _make_async(job.update_job_progress)
+complete_job = _make_async(job.complete_job)
+fail_job = _make_async(job.fail_job)
+release_job = _make_async(job.release_job)
+retry_job = _make_async(job.retry_job)
+delete_job = _make_async(job.delete_job)
+requeue_stale_jobs = _make_async(job.requeue_stale_jobs)
+purge_finished_jobs = _make_async(job.purge_finished_jobs)
+count_jobs_by_status = _make_async(job.count_jobs_by_status)
+
+# Recherche plein texte
+search_items = _make_async(search.search_items)
+
+# Export / import d'un programme complet
+get_curriculum_export = _make_async(curriculum.get_curriculum_export)
+import_curriculum = _make_async(curriculum.import_curriculum)
+
+# Opérations par lot
+apply_session_batch = _make_async(batch.apply_session_batch)
+update_resources_batch = _make_async(batch.update_resources_batch)
+set_objective_links_batch = _make_async(batch.set_objective_links_batch)
+
+# Arbre pédagogique et dashboard
+get_user_tree = _make_async(tree.get_user_tree)
+get_dashboard_aggregates = _make_async(dashboard.get_dashboard_aggregates)
+get_user_counters = _make_async(user_stats.get_user_counters)
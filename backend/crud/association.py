@@ -0,0 +1,143 @@
+"""
+Mise à jour des liens many-to-many (tables de models/association_tables.py) par différence.
+
+Au lieu de charger les collections ORM (`db_session.objectives`, `db_resource.sessions`) et
+de les comparer objet par objet, les liens actuels sont lus en une requête sur la table
+d'association ; la différence avec les liens voulus donne les lignes à ajouter et à retirer,
+écrites par un INSERT multi-lignes et un DELETE. Le nombre de requêtes ne dépend pas du
+nombre d'objectifs ou de séances liés.
+
+Les écritures passant par la table et non par les collections, les relations déjà chargées
+dans la session (des deux côtés) sont expirées : elles sont relues au prochain accès.
+"""
+from dataclasses import dataclass
+from sqlalchemy.orm import Session
+from sqlalchemy import Table, delete, select, tuple_
+from models import Objective, Resource, Sequence, Session as SessionModel
+from models.association_tables import (
+    sequence_objective_association,
+    session_objective_association,
+    session_resource_association,
+)
+from crud.bulk import batches, insert_rows
+from typing import Dict, Iterable, List, Set, Tuple
+
+@dataclass(frozen=True)
+class Association:
+    """Table d'association vue depuis un côté "propriétaire" (dont on remplace les liens)."""
+    table: Table
+    owner_key: str
+    target_key: str
+    # Relations ORM à expirer après écriture (propriétaire.owner_attr, cible.target_attr)
+    owner_model: type
+    owner_attr: str
+    target_model: type
+    target_attr: str
+
+    @property
+    def owner_column(self):
+        return self.table.c[self.owner_key]
+
+    @property
+    def target_column(self):
+        return self.table.c[self.target_key]
+
+SEQUENCE_OBJECTIVES = Association(sequence_objective_association, "sequence_id", "objective_id", Sequence, "objectives", Objective, "sequences")
+SESSION_OBJECTIVES = Association(session_objective_association, "session_id", "objective_id", SessionModel, "objectives", Objective, "sessions")
+RESOURCE_SESSIONS = Association(session_resource_association, "resource_id", "session_id", Resource, "sessions", SessionModel, "resources")
+
+LinkPairs = List[Tuple[int, int]]
+
+def existing_ids(db: Session, model, ids: Iterable[int]) -> Set[int]:
+    """Ids de `ids` présents dans la table de `model` (une requête IN par tranche)."""
+    found: Set[int] = set()
+    for batch in batches(sorted(set(ids))):
+        found.update(db.scalars(select(model.id).where(model.id.in_(batch))).all())
+    return found
+
+def get_links(db: Session, association: Association, owner_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """Liens actuels de chaque propriétaire : {owner_id: {target_id, ...}}."""
+    links: Dict[int, Set[int]] = {owner_id: set() for owner_id in owner_ids}
+    statement = select(association.owner_column, association.target_column)
+    for batch in batches(sorted(links)):
+        for owner_id, target_id in db.execute(statement.where(association.owner_column.in_(batch))):
+            links[owner_id].add(target_id)
+    return links
+
+def diff_links(current: Dict[int, Set[int]], wanted: Dict[int, Iterable[int]]) -> Tuple[LinkPairs, LinkPairs]:
+    """Paires (owner_id, target_id) à ajouter et à retirer pour passer de `current` à `wanted`."""
+    added: LinkPairs = []
+    removed: LinkPairs = []
+    for owner_id, target_ids in wanted.items():
+        target_ids = list(dict.fromkeys(target_ids))
+        existing = current.get(owner_id, set())
+        added.extend((owner_id, target_id) for target_id in target_ids if target_id not in existing)
+        removed.extend((owner_id, target_id) for target_id in sorted(existing - set(target_ids)))
+    return added, removed
+
+def _expire_loaded(db: Session, association: Association, pairs: LinkPairs):
+    """Expire les relations chargées des objets touchés (les collections ne voient pas les écritures directes)."""
+    owner_ids = {owner_id for owner_id, _ in pairs}
+    target_ids = {target_id for _, target_id in pairs}
+    for instance in list(db.identity_map.values()):
+        if isinstance(instance, association.owner_model) and instance.id in owner_ids:
+            db.expire(instance, [association.owner_attr])
+        elif isinstance(instance, association.target_model) and instance.id in target_ids:
+            db.expire(instance, [association.target_attr])
+
+def apply_link_diff(db: Session, association: Association, added: LinkPairs, removed: LinkPairs):
+    """Écrit une différence : un DELETE (paires en IN) et un INSERT multi-lignes, sans commit."""
+    columns = tuple_(association.owner_column, association.target_column)
+    for batch in batches(removed):
+        db.execute(delete(association.table).where(columns.in_(batch)))
+    insert_rows(db, association.table, [
+        {association.owner_key: owner_id, association.target_key: target_id}
+        for owner_id, target_id in added
+    ])
+    if added or removed:
+        _expire_loaded(db, association, added + removed)
+
+def replace_links(db: Session, association: Association, wanted: Dict[int, Iterable[int]]) -> Tuple[LinkPairs, LinkPairs]:
+    """Remplace les liens de chaque propriétaire de `wanted` par les cibles indiquées (sans commit).
+
+    Les liens inchangés ne sont pas réécrits. Les cibles doivent exister (validées par l'appelant).
+
+    Args:
+        db (Session): La session de base de données
+        association (Association): La table visée (ex: SESSION_OBJECTIVES)
+        wanted (Dict[int, Iterable[int]]): {owner_id: target_ids voulus}
+
+    Returns:
+        Tuple[LinkPairs, LinkPairs]: Les paires ajoutées et retirées
+    """
+    if not wanted:
+        return [], []
+    added, removed = diff_links(get_links(db, association, wanted), wanted)
+    apply_link_diff(db, association, added, removed)
+    return added, removed
+
+def add_links(db: Session, association: Association, owner_id: int, target_ids: Iterable[int]) -> LinkPairs:
+    """Ajoute des liens à un propriétaire, en ignorant ceux qui existent déjà (sans commit)."""
+    target_ids = list(dict.fromkeys(target_ids))
+    if not target_ids:
+        return []
+    existing = set(db.scalars(
+        select(association.target_column)
+        .where(association.owner_column == owner_id, association.target_column.in_(target_ids))
+    ).all())
+    added = [(owner_id, target_id) for target_id in target_ids if target_id not in existing]
+    apply_link_diff(db, association, added, [])
+    return added
+
+def remove_links(db: Session, association: Association, owner_id: int, target_ids: Iterable[int]) -> int:
+    """Retire des liens d'un propriétaire (sans commit) ; renvoie le nombre de liens supprimés."""
+    target_ids = list(dict.fromkeys(target_ids))
+    if not target_ids:
+        return 0
+    result = db.execute(
+        delete(association.table)
+        .where(association.owner_column == owner_id, association.target_column.in_(target_ids))
+    )
+    if result.rowcount:
+        _expire_loaded(db, association, [(owner_id, target_id) for target_id in target_ids])
+    return result.rowcount
@@ -0,0 +1,291 @@
+"""
+Opérations par lot (routes POST /sessions/batch, PATCH /resources/batch, PUT /objectives/links/batch).
+
+Les ids reçus sont validés par une requête IN par type (séances, séquences, objectifs...),
+les écritures sont groupées (UPDATE par clé primaire en executemany, INSERT multi-lignes
+pour les créations, différence des liens via crud/association.py) et le tout est validé
+par un seul commit.
+
+Chaque fonction renvoie un résultat par élément (schemas.batch.BatchItemResult) : les
+éléments invalides sont signalés et ignorés, les autres appliqués. Avec all_or_nothing=True,
+rien n'est écrit dès qu'un élément est invalide (les éléments valides sont "skipped").
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.sql import Select
+from models import Objective, Progression, Resource, Sequence, Session as SessionModel
+from models.resource import ResourceSubType, ResourceType
+from schemas.objective import ObjectiveLinksBatchItem
+from schemas.resource import ResourceBatchItem
+from schemas.session import SessionBatchItem
+from crud.association import RESOURCE_SESSIONS, SEQUENCE_OBJECTIVES, SESSION_OBJECTIVES, existing_ids, replace_links
+from crud.bulk import batches, insert_returning_ids
+from crud.user_stats import increment_user_counter
+from typing import Dict, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _select_in(db: Session, statement: Select, column, ids: Set[int]) -> List:
+    """Exécute `statement` restreint à `column IN ids` (une requête par tranche de BATCH_ROWS)."""
+    rows = []
+    for batch in batches(sorted(ids)):
+        rows.extend(db.execute(statement.where(column.in_(batch))).all())
+    return rows
+
+# Propriété vérifiée via la progression : Sequence.user_id et Session.user_id ne sont pas
+# renseignés par POST /sequences et POST /sessions
+def _owned_sequence_ids(db: Session, user_id: int, ids: Set[int]) -> Set[int]:
+    statement = (
+        select(Sequence.id)
+        .join(Progression, Sequence.progression_id == Progression.id)
+        .where(Progression.user_id == user_id)
+    )
+    return {row[0] for row in _select_in(db, statement, Sequence.id, ids)}
+
+def _owned_session_ids(db: Session, user_id: int, ids: Set[int]) -> Set[int]:
+    # Une séance appartient au propriétaire de la progression de sa séquence
+    statement = (
+        select(SessionModel.id)
+        .join(Sequence, SessionModel.sequence_id == Sequence.id)
+        .join(Progression, Sequence.progression_id == Progression.id)
+        .where(Progression.user_id == user_id)
+    )
+    return {row[0] for row in _select_in(db, statement, SessionModel.id, ids)}
+
+def _result(index: int, status: str, id: Optional[int] = None, detail: Optional[str] = None) -> dict:
+    return {"index": index, "id": id, "status": status, "detail": detail}
+
+def _should_apply(results: List[dict], all_or_nothing: bool) -> bool:
+    """Indique si les éléments valides doivent être écrits (sinon ils passent en "skipped")."""
+    if all_or_nothing and any(result["status"] == "error" for result in results):
+        for result in results:
+            if result["status"] != "error":
+                result["status"] = "skipped"
+        return False
+    return True
+
+# --- Séances --- #
+
+# Colonnes renseignées à la création d'une séance (lignes homogènes pour l'INSERT multi-lignes)
+_SESSION_COLUMNS = ("title", "date", "notes", "duration", "sequence_id")
+
+def _session_row(item: SessionBatchItem) -> dict:
+    row = item.model_dump(exclude_unset=True, exclude={"id", "objective_ids"})
+    if row.get("duration") is not None:
+        # La colonne stocke des minutes (models.session)
+        row["duration"] = int(row["duration"].total_seconds() // 60)
+    return row
+
+def _session_item_error(item: SessionBatchItem, row: dict, sequence_ids: Set[int], session_ids: Set[int], objective_ids: Set[int], seen: Set[int]) -> Optional[str]:
+    if item.id is not None:
+        if item.id not in session_ids:
+            return f"Séance {item.id} introuvable"
+        if item.id in seen:
+            return f"Séance {item.id} présente plusieurs fois dans le lot"
+        if not row and item.objective_ids is None:
+            return "Aucune donnée fournie pour la mise à jour"
+        if any(key in row and row[key] is None for key in ("title", "sequence_id")):
+            return "title et sequence_id ne peuvent pas être vides"
+    elif any(row.get(key) is None for key in ("title", "date", "sequence_id")):
+        return "title, date et sequence_id sont requis pour créer une séance"
+    if item.sequence_id is not None and item.sequence_id not in sequence_ids:
+        return f"Séquence {item.sequence_id} introuvable"
+    missing_objectives = set(item.objective_ids or []) - objective_ids
+    if missing_objectives:
+        return f"Objectif(s) introuvable(s) : {sorted(missing_objectives)}"
+    return None
+
+def apply_session_batch(db: Session, user_id: int, items: List[SessionBatchItem], all_or_nothing: bool = False) -> List[dict]:
+    """Crée (éléments sans `id`) et met à jour des séances de l'utilisateur en une transaction.
+
+    `objective_ids`, s'il est fourni, remplace les objectifs de la séance.
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): Propriétaire des séquences et séances visées
+        items (List[SessionBatchItem]): Éléments du lot
+        all_or_nothing (bool, optional): Ne rien écrire si un élément est invalide. Defaults to False.
+
+    Returns:
+        List[dict]: Un résultat par élément, dans l'ordre reçu
+    """
+    sequence_ids = _owned_sequence_ids(db, user_id, {item.sequence_id for item in items if item.sequence_id is not None})
+    session_ids = _owned_session_ids(db, user_id, {item.id for item in items if item.id is not None})
+    objective_ids = existing_ids(db, Objective, {oid for item in items for oid in item.objective_ids or []})
+
+    results: List[dict] = []
+    creates, updates = [], []
+    seen: Set[int] = set()
+    for index, item in enumerate(items):
+        row = _session_row(item)
+        error = _session_item_error(item, row, sequence_ids, session_ids, objective_ids, seen)
+        if item.id is not None:
+            seen.add(item.id)
+        if error:
+            results.append(_result(index, "error", item.id, error))
+        elif item.id is None:
+            results.append(_result(index, "created"))
+            creates.append((results[-1], row, item.objective_ids))
+        else:
+            results.append(_result(index, "updated", item.id))
+            updates.append((item.id, row, item.objective_ids))
+    if not _should_apply(results, all_or_nothing) or not (creates or updates):
+        return results
+
+    try:
+        new_ids = insert_returning_ids(db, SessionModel, [
+            {**{key: row.get(key) for key in _SESSION_COLUMNS}, "user_id": user_id}
+            for _, row, _ in creates
+        ])
+        for (result, _, _), new_id in zip(creates, new_ids):
+            result["id"] = new_id
+        update_rows = [{"id": session_id, **row} for session_id, row, _ in updates if row]
+        if update_rows:
+            # UPDATE par clé primaire, exécuté en executemany (regroupé par jeu de colonnes)
+            db.execute(update(SessionModel), update_rows)
+
+        linked = [(result["id"], ids) for result, _, ids in creates if ids] + [
+            (session_id, ids) for session_id, _, ids in updates if ids is not None
+        ]
+        replace_links(db, SESSION_OBJECTIVES, dict(linked))
+        if creates:
+            increment_user_counter(db, user_id, "total_sessions", len(creates))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Lot de séances (utilisateur {user_id}) : {len(creates)} créée(s), {len(updates)} modifiée(s), {len(items) - len(creates) - len(updates)} en erreur")
+    return results
+
+# --- Ressources --- #
+
+_RESOURCE_REQUIRED = ("title", "type_id", "sub_type_id")
+
+def _resource_item_error(item: ResourceBatchItem, row: dict, resources: Dict[int, tuple], sub_types: Dict[int, int], type_ids: Set[int], session_ids: Set[int], seen: Set[int]) -> Optional[str]:
+    if item.id not in resources:
+        return f"Ressource {item.id} introuvable"
+    if item.id in seen:
+        return f"Ressource {item.id} présente plusieurs fois dans le lot"
+    if not row and item.session_ids is None:
+        return "Aucune donnée fournie pour la mise à jour"
+    if any(key in row and row[key] is None for key in _RESOURCE_REQUIRED):
+        return "title, type_id et sub_type_id ne peuvent pas être vides"
+    if item.type_id is not None and item.type_id not in type_ids:
+        return f"Type {item.type_id} introuvable"
+    if item.sub_type_id is not None and item.sub_type_id not in sub_types:
+        return f"Sous-type {item.sub_type_id} introuvable"
+    current_type_id, current_sub_type_id = resources[item.id]
+    type_id = row.get("type_id", current_type_id)
+    sub_type_id = row.get("sub_type_id", current_sub_type_id)
+    if ("type_id" in row or "sub_type_id" in row) and sub_type_id is not None and sub_types.get(sub_type_id, type_id) != type_id:
+        return f"Le sous-type {sub_type_id} n'appartient pas au type {type_id}"
+    missing_sessions = {sid for sid in item.session_ids or [] if sid} - session_ids
+    if missing_sessions:
+        return f"Séance(s) introuvable(s) : {sorted(missing_sessions)}"
+    return None
+
+def update_resources_batch(db: Session, user_id: int, items: List[ResourceBatchItem], all_or_nothing: bool = False) -> List[dict]:
+    """Met à jour des ressources de l'utilisateur (champs et séances liées) en une transaction.
+
+    `session_ids`, s'il est fourni, remplace les séances de la ressource. Les fichiers ne
+    sont pas modifiables par lot (PUT /resources/{id}).
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): Propriétaire des ressources et séances visées
+        items (List[ResourceBatchItem]): Éléments du lot
+        all_or_nothing (bool, optional): Ne rien écrire si un élément est invalide. Defaults to False.
+
+    Returns:
+        List[dict]: Un résultat par élément, dans l'ordre reçu
+    """
+    resources = {
+        row.id: (row.type_id, row.sub_type_id)
+        for row in _select_in(db, select(Resource.id, Resource.type_id, Resource.sub_type_id).where(Resource.user_id == user_id), Resource.id, {item.id for item in items})
+    }
+    type_ids = {row[0] for row in _select_in(db, select(ResourceType.id), ResourceType.id, {item.type_id for item in items if item.type_id is not None})}
+    sub_type_ids = {item.sub_type_id for item in items if item.sub_type_id is not None}
+    sub_type_ids.update(sub_type_id for _, sub_type_id in resources.values() if sub_type_id is not None)
+    sub_types = {row.id: row.type_id for row in _select_in(db, select(ResourceSubType.id, ResourceSubType.type_id), ResourceSubType.id, sub_type_ids)}
+    session_ids = _owned_session_ids(db, user_id, {sid for item in items for sid in item.session_ids or [] if sid})
+
+    results: List[dict] = []
+    updates = []
+    seen: Set[int] = set()
+    for index, item in enumerate(items):
+        row = item.model_dump(exclude_unset=True, exclude={"id", "session_ids"})
+        error = _resource_item_error(item, row, resources, sub_types, type_ids, session_ids, seen)
+        seen.add(item.id)
+        if error:
+            results.append(_result(index, "error", item.id, error))
+        else:
+            results.append(_result(index, "updated", item.id))
+            updates.append((item.id, row, item.session_ids))
+    if not _should_apply(results, all_or_nothing) or not updates:
+        return results
+
+    try:
+        update_rows = [{"id": resource_id, **row} for resource_id, row, _ in updates if row]
+        if update_rows:
+            db.execute(update(Resource), update_rows)
+        replace_links(db, RESOURCE_SESSIONS, {
+            resource_id: [sid for sid in ids if sid] for resource_id, _, ids in updates if ids is not None
+        })
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Lot de ressources (utilisateur {user_id}) : {len(updates)} modifiée(s), {len(items) - len(updates)} en erreur")
+    return results
+
+# --- Liens objectifs <-> séances / séquences --- #
+
+def set_objective_links_batch(db: Session, user_id: int, items: List[ObjectiveLinksBatchItem], all_or_nothing: bool = False) -> List[dict]:
+    """Remplace les objectifs de plusieurs séances et séquences de l'utilisateur en une transaction.
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): Propriétaire des séances et séquences visées
+        items (List[ObjectiveLinksBatchItem]): Éléments du lot (séance ou séquence, objectifs)
+        all_or_nothing (bool, optional): Ne rien écrire si un élément est invalide. Defaults to False.
+
+    Returns:
+        List[dict]: Un résultat par élément (id de la séance ou de la séquence), dans l'ordre reçu
+    """
+    session_ids = _owned_session_ids(db, user_id, {item.session_id for item in items if item.session_id is not None})
+    sequence_ids = _owned_sequence_ids(db, user_id, {item.sequence_id for item in items if item.sequence_id is not None})
+    objective_ids = existing_ids(db, Objective, {oid for item in items for oid in item.objective_ids})
+
+    results: List[dict] = []
+    session_links: Dict[int, List[int]] = {}
+    sequence_links: Dict[int, List[int]] = {}
+    for index, item in enumerate(items):
+        if item.session_id is not None:
+            label, target_id, owned, links = "Séance", item.session_id, session_ids, session_links
+        else:
+            label, target_id, owned, links = "Séquence", item.sequence_id, sequence_ids, sequence_links
+        missing_objectives = set(item.objective_ids) - objective_ids
+        if target_id not in owned:
+            results.append(_result(index, "error", target_id, f"{label} {target_id} introuvable"))
+        elif target_id in links:
+            results.append(_result(index, "error", target_id, f"{label} {target_id} présente plusieurs fois dans le lot"))
+        elif missing_objectives:
+            results.append(_result(index, "error", target_id, f"Objectif(s) introuvable(s) : {sorted(missing_objectives)}"))
+        else:
+            results.append(_result(index, "updated", target_id))
+        links.setdefault(target_id, list(dict.fromkeys(item.objective_ids)) if results[-1]["status"] == "updated" else None)
+    session_links = {target_id: ids for target_id, ids in session_links.items() if ids is not None}
+    sequence_links = {target_id: ids for target_id, ids in sequence_links.items() if ids is not None}
+    if not _should_apply(results, all_or_nothing) or not (session_links or sequence_links):
+        return results
+
+    try:
+        replace_links(db, SESSION_OBJECTIVES, session_links)
+        replace_links(db, SEQUENCE_OBJECTIVES, sequence_links)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Lot de liens d'objectifs (utilisateur {user_id}) : {len(session_links)} séance(s), {len(sequence_links)} séquence(s)")
+    return results
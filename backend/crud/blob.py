@@ -0,0 +1,103 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update, delete, select
+from sqlalchemy.exc import IntegrityError
+from models import Blob
+from typing import Optional
+from config import get_settings
+from file_storage import publish_staged_blob, discard_staged_blob
+from pathlib import Path
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def get_blob(db: Session, sha256: str) -> Optional[Blob]:
+    """Récupère un blob par son SHA-256."""
+    return db.query(Blob).filter(Blob.sha256 == sha256).first()
+
+def acquire_blob(
+    db: Session, sha256: str, size: int, mime_type: str, storage_path: str, count: int = 1,
+    staged_path: Optional[Path] = None,
+):
+    """Ajoute `count` références à un blob, en le créant si nécessaire (sans commit).
+
+    L'incrément est fait en SQL (ref_count = ref_count + count) pour rester exact
+    si plusieurs ressources référencent le même contenu en parallèle.
+
+    Si le blob est déjà référencé, son fichier est en place : le fichier reçu
+    (`staged_path`, voir file_storage.store_upload_blob) est supprimé sans être publié.
+    Sinon (ligne créée, ou reprise d'un blob dont la dernière référence vient d'être
+    retirée), il est publié après l'écriture de la ligne, donc sous son verrou : une
+    suppression concurrente du même blob (`purge_blob`) a soit lieu avant, et le fichier
+    est réécrit, soit attend le commit et voit la nouvelle référence.
+    """
+    result = db.execute(
+        update(Blob).where(Blob.sha256 == sha256, Blob.ref_count > 0).values(ref_count=Blob.ref_count + count)
+    )
+    if result.rowcount:
+        logger.info(f"Blob {sha256[:12]}... déjà stocké : référence ajoutée")
+        discard_staged_blob(staged_path)
+        return
+    result = db.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + count))
+    if not result.rowcount:
+        try:
+            with db.begin_nested():
+                db.add(Blob(sha256=sha256, size=size, mime_type=mime_type, storage_path=storage_path, ref_count=count))
+            logger.info(f"Nouveau blob {sha256[:12]}... ({size} octets)")
+        except IntegrityError:
+            # Créé entre-temps par une autre requête, qui publie son propre fichier
+            db.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + count))
+            discard_staged_blob(staged_path)
+            return
+    publish_staged_blob(staged_path, storage_path)
+
+def release_blob(db: Session, sha256: str) -> bool:
+    """Retire une référence à un blob (sans commit).
+
+    La ligne et le fichier ne sont pas supprimés ici : si la transaction est annulée
+    (ex: validation refusée après coup), le compteur est restauré et le fichier est
+    toujours là. Lorsque le compteur atteint zéro, l'appelant supprime le blob après
+    le commit (`purge_blob`).
+
+    Returns:
+        bool: True si le blob n'est plus référencé (à passer à `purge_blob` après le commit)
+    """
+    # Les ressources modifiées/supprimées ne doivent plus référencer le blob avant sa suppression
+    db.flush()
+    db.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - 1))
+    ref_count = db.execute(select(Blob.ref_count).where(Blob.sha256 == sha256)).scalar()
+    return ref_count is not None and ref_count <= 0
+
+def purge_blob(db: Session, sha256: str) -> bool:
+    """Supprime un blob qui n'est plus référencé, ligne puis fichier (avec commit).
+
+    À appeler après le commit de `release_blob`. Le fichier est supprimé pendant que la
+    ligne supprimée est verrouillée : un `acquire_blob` concurrent du même contenu attend
+    le commit puis recrée la ligne et republie le fichier ; s'il a repris le blob avant,
+    la ligne n'est plus à zéro et rien n'est supprimé.
+
+    Returns:
+        bool: True si la ligne et le fichier ont été supprimés
+    """
+    try:
+        storage_path = db.execute(select(Blob.storage_path).where(Blob.sha256 == sha256)).scalar()
+        result = db.execute(delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0))
+        if storage_path is None or not result.rowcount:
+            db.rollback()
+            return False
+        remove_blob_file(storage_path)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"Blob {sha256[:12]}... n'est plus référencé : supprimé")
+    return True
+
+def remove_blob_file(storage_path: str):
+    """Supprime du disque le fichier d'un blob (appelé par `purge_blob`)."""
+    path = settings.UPLOADS_BASE_DIR / storage_path
+    try:
+        path.unlink(missing_ok=True)
+        logger.info(f"Fichier du blob supprimé : {path}")
+    except OSError as e:
+        logger.error(f"Erreur lors de la suppression du fichier du blob {path}: {e}")
@@ -0,0 +1,26 @@
+"""
+Écritures et lectures en masse : INSERT multi-lignes (avec RETURNING) et listes IN découpées
+en tranches, partagées par les opérations par lot, l'import de programme et les liens many-to-many.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from typing import Iterable, List
+
+# Lignes par instruction INSERT / valeurs par liste IN (limite de variables de SQLite)
+BATCH_ROWS = 1000
+
+def batches(rows: List, size: int = BATCH_ROWS) -> Iterable[List]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    """INSERT ... RETURNING en masse ; ids renvoyés dans l'ordre des lignes."""
+    ids: List[int] = []
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    for batch in batches(rows):
+        ids.extend(db.scalars(statement, batch).all())
+    return ids
+
+def insert_rows(db: Session, table, rows: List[dict]):
+    for batch in batches(rows):
+        db.execute(insert(table), batch)
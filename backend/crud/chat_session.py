@@ -0,0 +1,70 @@
+from sqlalchemy.orm import Session
+from models import ChatSession, ChatSessionMessage
+from typing import List, Optional, Tuple
+from datetime import datetime
+import logging
+
+from pagination import keyset
+
+logger = logging.getLogger(__name__)
+
+def get_chat_session(db: Session, chat_session_id: int, user_id: int) -> Optional[ChatSession]:
+    """Récupère une conversation appartenant à l'utilisateur."""
+    return (
+        db.query(ChatSession)
+        .filter(ChatSession.id == chat_session_id, ChatSession.user_id == user_id)
+        .first()
+    )
+
+def get_chat_sessions(db: Session, user_id: int, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[ChatSession]:
+    """Liste les conversations de l'utilisateur, la plus récente d'abord (tri sur (updated_at, id))."""
+    query = db.query(ChatSession).filter(ChatSession.user_id == user_id)
+    return keyset(query, [ChatSession.updated_at, ChatSession.id], after, skip, limit, descending=True).all()
+
+def create_chat_session(db: Session, user_id: int, title: Optional[str] = None) -> ChatSession:
+    """Crée une conversation vide."""
+    db_chat_session = ChatSession(user_id=user_id, title=title, message_count=0)
+    db.add(db_chat_session)
+    db.commit()
+    db.refresh(db_chat_session)
+    return db_chat_session
+
+def get_chat_messages(db: Session, chat_session_id: int, limit: Optional[int] = None) -> List[ChatSessionMessage]:
+    """Messages d'une conversation dans l'ordre ; avec `limit`, seulement les plus récents."""
+    query = db.query(ChatSessionMessage).filter(ChatSessionMessage.chat_session_id == chat_session_id)
+    if limit is None:
+        return query.order_by(ChatSessionMessage.id).all()
+    recent = query.order_by(ChatSessionMessage.id.desc()).limit(limit).all()
+    return list(reversed(recent))
+
+def append_chat_messages(db: Session, chat_session_id: int, messages: List[Tuple[str, str]]) -> List[ChatSessionMessage]:
+    """Ajoute des messages (rôle, contenu) à la fin d'une conversation, en une transaction.
+
+    Le titre de la conversation est initialisé avec le début du premier message utilisateur.
+    """
+    db_chat_session = db.query(ChatSession).filter(ChatSession.id == chat_session_id).first()
+    if db_chat_session is None:
+        raise ValueError(f"Conversation {chat_session_id} non trouvée")
+
+    db_messages = [
+        ChatSessionMessage(chat_session_id=chat_session_id, role=role, content=content)
+        for role, content in messages
+    ]
+    db.add_all(db_messages)
+    if not db_chat_session.title:
+        first_user_message = next((content for role, content in messages if role == "user"), None)
+        if first_user_message:
+            db_chat_session.title = first_user_message.strip()[:200]
+    db_chat_session.message_count = ChatSession.message_count + len(db_messages)
+    db_chat_session.updated_at = datetime.utcnow()
+    db.commit()
+    return db_messages
+
+def delete_chat_session(db: Session, chat_session_id: int) -> bool:
+    """Supprime une conversation et ses messages."""
+    db_chat_session = db.query(ChatSession).filter(ChatSession.id == chat_session_id).first()
+    if not db_chat_session:
+        return False
+    db.delete(db_chat_session)
+    db.commit()
+    return True
@@ -0,0 +1,295 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
+from models import Progression, Sequence, Session as SessionModel, Resource, Objective, Blob
+from models.resource import ResourceType, ResourceSubType
+from models.association_tables import (
+    sequence_objective_association,
+    session_objective_association,
+    session_resource_association,
+)
+from schemas.curriculum import CurriculumManifest, CURRICULUM_FORMAT, CURRICULUM_FORMAT_VERSION
+from schemas.resource import ResourceFileUpload
+from crud.blob import acquire_blob
+from crud.bulk import batches, insert_returning_ids, insert_rows
+from crud.user_stats import increment_user_counter
+from media import resolve_media_path
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _archive_path(resource_id: int, sha256: str, storage_path: str) -> str:
+    suffix = Path(storage_path).suffix
+    # Un même contenu n'est écrit qu'une fois dans l'archive, quel que soit le nombre de ressources
+    return f"files/{sha256}{suffix}" if sha256 else f"files/legacy/{resource_id}{suffix}"
+
+def get_curriculum_export(db: Session, user_id: int) -> Tuple[dict, Dict[str, str]]:
+    """Lit tout le programme d'un utilisateur pour l'export, en un nombre fixe de requêtes.
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): ID de l'utilisateur exporté
+
+    Returns:
+        Tuple[dict, Dict[str, str]]: Le manifeste (schéma CurriculumManifest) et, pour
+        chaque fichier à inclure, son chemin dans l'archive -> chemin relatif à UPLOADS_BASE_DIR.
+    """
+    user_progression_ids = select(Progression.id).where(Progression.user_id == user_id)
+    user_sequence_ids = select(Sequence.id).where(Sequence.progression_id.in_(user_progression_ids))
+    user_session_ids = select(SessionModel.id).where(SessionModel.sequence_id.in_(user_sequence_ids))
+
+    progressions = db.execute(
+        select(Progression.id, Progression.title, Progression.description)
+        .where(Progression.user_id == user_id).order_by(Progression.id)
+    ).all()
+    sequences = db.execute(
+        select(Sequence.id, Sequence.progression_id, Sequence.title, Sequence.description)
+        .where(Sequence.progression_id.in_(user_progression_ids)).order_by(Sequence.id)
+    ).all()
+    sessions = db.execute(
+        select(
+            SessionModel.id, SessionModel.sequence_id, SessionModel.title, SessionModel.description,
+            SessionModel.date, SessionModel.duration, SessionModel.notes,
+        )
+        .where(SessionModel.sequence_id.in_(user_sequence_ids)).order_by(SessionModel.id)
+    ).all()
+    sequence_objective_rows = db.execute(
+        select(sequence_objective_association.c.sequence_id, sequence_objective_association.c.objective_id)
+        .where(sequence_objective_association.c.sequence_id.in_(user_sequence_ids))
+    ).all()
+    session_objective_rows = db.execute(
+        select(session_objective_association.c.session_id, session_objective_association.c.objective_id)
+        .where(session_objective_association.c.session_id.in_(user_session_ids))
+    ).all()
+    session_resource_rows = db.execute(
+        select(session_resource_association.c.session_id, session_resource_association.c.resource_id)
+        .where(session_resource_association.c.session_id.in_(user_session_ids))
+    ).all()
+    resources = db.execute(
+        select(
+            Resource.id, Resource.title, Resource.description, Resource.source_type,
+            Resource.file_name, Resource.file_type, Resource.file_size, Resource.file_path, Resource.blob_sha256,
+            ResourceType.key.label("type_key"), ResourceSubType.key.label("sub_type_key"),
+            Blob.storage_path,
+        )
+        .join(ResourceType, Resource.type_id == ResourceType.id)
+        .join(ResourceSubType, Resource.sub_type_id == ResourceSubType.id)
+        .outerjoin(Blob, Resource.blob_sha256 == Blob.sha256)
+        .where(Resource.user_id == user_id).order_by(Resource.id)
+    ).all()
+    # Objectifs de l'utilisateur, et ceux (d'autres utilisateurs) liés à ses séquences/séances
+    linked_objective_ids = {row.objective_id for row in sequence_objective_rows} | {row.objective_id for row in session_objective_rows}
+    objectives = db.execute(
+        select(Objective.id, Objective.title, Objective.description)
+        .where(or_(Objective.user_id == user_id, Objective.id.in_(linked_objective_ids))).order_by(Objective.id)
+    ).all()
+
+    sequence_objectives: Dict[int, List[int]] = {}
+    for row in sequence_objective_rows:
+        sequence_objectives.setdefault(row.sequence_id, []).append(row.objective_id)
+    session_objectives: Dict[int, List[int]] = {}
+    for row in session_objective_rows:
+        session_objectives.setdefault(row.session_id, []).append(row.objective_id)
+    resource_sessions: Dict[int, List[int]] = {}
+    for row in session_resource_rows:
+        resource_sessions.setdefault(row.resource_id, []).append(row.session_id)
+
+    files: Dict[str, str] = {}
+    resource_items = []
+    for row in resources:
+        file = None
+        relative_path = row.storage_path or (resolve_media_path(row.file_path) if row.file_path else None)
+        if row.source_type == "file" and relative_path:
+            archive_path = _archive_path(row.id, row.blob_sha256, relative_path)
+            files[archive_path] = relative_path
+            file = {
+                "archive_path": archive_path, "name": row.file_name, "type": row.file_type,
+                "size": row.file_size, "sha256": row.blob_sha256,
+            }
+        resource_items.append({
+            "id": row.id, "title": row.title, "description": row.description,
+            "type_key": row.type_key, "sub_type_key": row.sub_type_key, "source_type": row.source_type,
+            "file": file, "session_ids": sorted(resource_sessions.get(row.id, [])),
+        })
+
+    manifest = {
+        "format": CURRICULUM_FORMAT,
+        "version": CURRICULUM_FORMAT_VERSION,
+        "exported_at": datetime.utcnow(),
+        "objectives": [dict(row._mapping) for row in objectives],
+        "progressions": [dict(row._mapping) for row in progressions],
+        "sequences": [
+            {**row._mapping, "objective_ids": sorted(sequence_objectives.get(row.id, []))} for row in sequences
+        ],
+        "sessions": [
+            {**row._mapping, "objective_ids": sorted(session_objectives.get(row.id, []))} for row in sessions
+        ],
+        "resources": resource_items,
+    }
+    logger.info(
+        f"Export du programme de l'utilisateur {user_id}: {len(progressions)} progression(s), {len(sequences)} séquence(s), "
+        f"{len(sessions)} séance(s), {len(resources)} ressource(s), {len(files)} fichier(s)"
+    )
+    return manifest, files
+
+def _check_references(manifest: CurriculumManifest, files: Dict[str, ResourceFileUpload]):
+    """Vérifie que les ids référencés existent dans le manifeste (ValueError sinon)."""
+    objective_ids = {objective.id for objective in manifest.objectives}
+    progression_ids = {progression.id for progression in manifest.progressions}
+    sequence_ids = {sequence.id for sequence in manifest.sequences}
+    session_ids = {session.id for session in manifest.sessions}
+    for sequence in manifest.sequences:
+        if sequence.progression_id not in progression_ids:
+            raise ValueError(f"Séquence {sequence.id} : progression {sequence.progression_id} absente du manifeste")
+        if set(sequence.objective_ids) - objective_ids:
+            raise ValueError(f"Séquence {sequence.id} : objectif(s) absent(s) du manifeste")
+    for session in manifest.sessions:
+        if session.sequence_id not in sequence_ids:
+            raise ValueError(f"Séance {session.id} : séquence {session.sequence_id} absente du manifeste")
+        if set(session.objective_ids) - objective_ids:
+            raise ValueError(f"Séance {session.id} : objectif(s) absent(s) du manifeste")
+    for resource in manifest.resources:
+        if set(resource.session_ids) - session_ids:
+            raise ValueError(f"Ressource {resource.id} : séance(s) absente(s) du manifeste")
+        if resource.file is not None and resource.file.archive_path not in files:
+            raise ValueError(f"Ressource {resource.id} : fichier {resource.file.archive_path} absent de l'archive")
+
+def _ids_by_key(db: Session, model, keys: set) -> Dict[str, int]:
+    found = dict(db.execute(select(model.key, model.id).where(model.key.in_(keys))).all()) if keys else {}
+    missing = keys - set(found)
+    if missing:
+        raise ValueError(f"Type(s) de ressource inconnu(s) sur cette instance : {', '.join(sorted(missing))}")
+    return found
+
+def import_curriculum(db: Session, user_id: int, manifest: CurriculumManifest, files: Dict[str, ResourceFileUpload]) -> dict:
+    """Crée le programme décrit par `manifest` pour l'utilisateur, en une seule transaction.
+
+    Chaque table est remplie par des INSERT ... RETURNING en masse ; les ids du manifeste
+    sont remplacés par les ids créés (progression -> séquences -> séances -> ressources).
+    Les objectifs ayant le titre d'un objectif existant (titre unique) sont réutilisés.
+    Les fichiers sont déjà dans le stockage par contenu (`files` : chemin dans l'archive ->
+    blob) ; chaque blob reçoit une référence par ressource. Tout est annulé en cas d'erreur.
+
+    Raises:
+        ValueError: Manifeste incohérent ou type de ressource inconnu
+
+    Returns:
+        dict: Compteurs (schéma CurriculumImportResult, sans les compteurs de fichiers)
+    """
+    if manifest.version > CURRICULUM_FORMAT_VERSION:
+        raise ValueError(f"Version d'archive {manifest.version} non prise en charge (maximum {CURRICULUM_FORMAT_VERSION})")
+    _check_references(manifest, files)
+    type_ids = _ids_by_key(db, ResourceType, {resource.type_key for resource in manifest.resources})
+    sub_type_ids = _ids_by_key(db, ResourceSubType, {resource.sub_type_key for resource in manifest.resources})
+
+    try:
+        # Objectifs : réutilisés par titre, créés sinon
+        titles = list(dict.fromkeys(objective.title for objective in manifest.objectives))
+        objective_by_title: Dict[str, int] = {}
+        for batch in batches(titles):
+            objective_by_title.update(db.execute(select(Objective.title, Objective.id).where(Objective.title.in_(batch))).all())
+        reused = len(objective_by_title)
+        new_objectives = {
+            objective.title: objective for objective in manifest.objectives if objective.title not in objective_by_title
+        }
+        new_ids = insert_returning_ids(db, Objective, [
+            {"title": objective.title, "description": objective.description, "user_id": user_id}
+            for objective in new_objectives.values()
+        ])
+        objective_by_title.update(zip(new_objectives, new_ids))
+        objective_ids = {objective.id: objective_by_title[objective.title] for objective in manifest.objectives}
+
+        progression_ids = dict(zip(
+            [progression.id for progression in manifest.progressions],
+            insert_returning_ids(db, Progression, [
+                {"title": progression.title, "description": progression.description, "user_id": user_id}
+                for progression in manifest.progressions
+            ]),
+        ))
+        sequence_ids = dict(zip(
+            [sequence.id for sequence in manifest.sequences],
+            insert_returning_ids(db, Sequence, [
+                {
+                    "title": sequence.title, "description": sequence.description, "user_id": user_id,
+                    "progression_id": progression_ids[sequence.progression_id],
+                }
+                for sequence in manifest.sequences
+            ]),
+        ))
+        session_ids = dict(zip(
+            [session.id for session in manifest.sessions],
+            insert_returning_ids(db, SessionModel, [
+                {
+                    "title": session.title, "description": session.description, "date": session.date,
+                    "duration": session.duration, "notes": session.notes, "user_id": user_id,
+                    "sequence_id": sequence_ids[session.sequence_id],
+                }
+                for session in manifest.sessions
+            ]),
+        ))
+
+        # Fichiers : une référence au blob par ressource qui l'utilise
+        references = Counter(resource.file.archive_path for resource in manifest.resources if resource.file is not None)
+        for archive_path, count in references.items():
+            stored = files[archive_path]
+            acquire_blob(
+                db, stored.sha256, stored.file_size, stored.file_type, stored.storage_path, count=count,
+                staged_path=stored.staged_path,
+            )
+        resource_rows = []
+        for resource in manifest.resources:
+            row = {
+                "title": resource.title, "description": resource.description, "source_type": resource.source_type,
+                "type_id": type_ids[resource.type_key], "sub_type_id": sub_type_ids[resource.sub_type_key],
+                "user_id": user_id, "file_name": None, "file_type": None, "file_size": None,
+                "file_path": None, "blob_sha256": None,
+            }
+            if resource.file is not None:
+                stored = files[resource.file.archive_path]
+                row.update(
+                    file_name=resource.file.name or stored.file_name, file_type=stored.file_type,
+                    file_size=stored.file_size, blob_sha256=stored.sha256,
+                    file_path=str(Path("uploads") / stored.storage_path),
+                )
+            resource_rows.append(row)
+        resource_ids = dict(zip([resource.id for resource in manifest.resources], insert_returning_ids(db, Resource, resource_rows)))
+
+        # Associations (dédoublonnées : deux objectifs du manifeste peuvent désigner le même objectif)
+        insert_rows(db, sequence_objective_association, [
+            {"sequence_id": sequence_ids[sequence.id], "objective_id": objective_id}
+            for sequence in manifest.sequences
+            for objective_id in dict.fromkeys(objective_ids[old_id] for old_id in sequence.objective_ids)
+        ])
+        insert_rows(db, session_objective_association, [
+            {"session_id": session_ids[session.id], "objective_id": objective_id}
+            for session in manifest.sessions
+            for objective_id in dict.fromkeys(objective_ids[old_id] for old_id in session.objective_ids)
+        ])
+        insert_rows(db, session_resource_association, [
+            {"session_id": session_ids[session_id], "resource_id": resource_ids[resource.id]}
+            for resource in manifest.resources
+            for session_id in dict.fromkeys(resource.session_ids)
+        ])
+
+        increment_user_counter(db, user_id, "total_progressions", len(progression_ids))
+        increment_user_counter(db, user_id, "total_sequences", len(sequence_ids))
+        increment_user_counter(db, user_id, "total_sessions", len(session_ids))
+        increment_user_counter(db, user_id, "total_resources", len(resource_ids))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    result = {
+        "progressions": len(progression_ids),
+        "sequences": len(sequence_ids),
+        "sessions": len(session_ids),
+        "resources": len(resource_ids),
+        "objectives_created": len(new_ids),
+        "objectives_reused": reused,
+    }
+    logger.info(f"Programme importé pour l'utilisateur {user_id}: {result}")
+    return result
@@ -0,0 +1,88 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, literal, null, union_all
+from models import Progression, Sequence, Session as SessionModel, Resource
+from models.association_tables import session_resource_association
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Clés des compteurs exposés par le dashboard (alignées sur les StatItem du routeur)
+COUNT_KEYS = ("total_progressions", "total_sequences", "total_sessions", "total_resources")
+
+def _count_subqueries(user_id: int) -> Dict[str, object]:
+    """Sous-requêtes scalaires comptant les entités d'un utilisateur (une par compteur)."""
+    return {
+        "total_progressions": select(func.count(Progression.id)).where(Progression.user_id == user_id).scalar_subquery(),
+        "total_sequences": select(func.count(Sequence.id)).where(Sequence.user_id == user_id).scalar_subquery(),
+        "total_sessions": select(func.count(SessionModel.id)).where(SessionModel.user_id == user_id).scalar_subquery(),
+        "total_resources": select(func.count(Resource.id)).where(Resource.user_id == user_id).scalar_subquery(),
+    }
+
+def compute_user_counts(db: Session, user_id: int) -> Dict[str, int]:
+    """Compte progressions, séquences, séances et ressources d'un utilisateur en une seule requête."""
+    subqueries = _count_subqueries(user_id)
+    row = db.execute(select(*[subquery.label(key) for key, subquery in subqueries.items()])).one()
+    return {key: getattr(row, key) or 0 for key in COUNT_KEYS}
+
+def get_dashboard_aggregates(db: Session, user_id: int, include_counts: bool = True) -> dict:
+    """Calcule les statistiques et les listes d'éléments vides du dashboard en une seule requête SQL.
+
+    La requête s'appuie sur des CTE (progressions, séquences et séances de l'utilisateur)
+    et renvoie uniquement des tuples (type, id, titre) : aucun objet ORM n'est chargé.
+    Les compteurs sont renvoyés dans la colonne `id` des lignes `total_*`.
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): ID de l'utilisateur
+        include_counts (bool, optional): Inclure les compteurs dans la requête
+            (inutile lorsque la table user_stats est utilisée). Defaults to True.
+
+    Returns:
+        dict: {"counts": {...} ou None, "progressions_without_sequences": [(id, titre)],
+               "sequences_without_sessions": [...], "sessions_without_resources": [...]}
+    """
+    user_progressions = (
+        select(Progression.id, Progression.title)
+        .where(Progression.user_id == user_id)
+        .cte("user_progressions")
+    )
+    user_sequences = (
+        select(Sequence.id, Sequence.title)
+        .where(Sequence.user_id == user_id)
+        .cte("user_sequences")
+    )
+    user_sessions = (
+        select(SessionModel.id, SessionModel.title)
+        .where(SessionModel.user_id == user_id)
+        .cte("user_sessions")
+    )
+
+    selects = [
+        select(literal("progressions_without_sequences").label("kind"), user_progressions.c.id, user_progressions.c.title)
+        .where(~select(Sequence.id).where(Sequence.progression_id == user_progressions.c.id).exists()),
+        select(literal("sequences_without_sessions").label("kind"), user_sequences.c.id, user_sequences.c.title)
+        .where(~select(SessionModel.id).where(SessionModel.sequence_id == user_sequences.c.id).exists()),
+        select(literal("sessions_without_resources").label("kind"), user_sessions.c.id, user_sessions.c.title)
+        .where(~select(session_resource_association.c.resource_id)
+               .where(session_resource_association.c.session_id == user_sessions.c.id).exists()),
+    ]
+    if include_counts:
+        for key, subquery in _count_subqueries(user_id).items():
+            selects.append(select(literal(key).label("kind"), subquery.label("id"), null().label("title")))
+
+    statement = union_all(*selects)
+    rows = db.execute(statement.order_by(statement.selected_columns.kind, statement.selected_columns.id)).all()
+
+    result: dict = {
+        "counts": {} if include_counts else None,
+        "progressions_without_sequences": [],
+        "sequences_without_sessions": [],
+        "sessions_without_resources": [],
+    }
+    for kind, item_id, title in rows:
+        if kind in COUNT_KEYS:
+            result["counts"][kind] = item_id or 0
+        else:
+            result[kind].append((item_id, title))
+    return result
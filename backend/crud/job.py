@@ -0,0 +1,178 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models import Job
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+
+from pagination import keyset
+
+logger = logging.getLogger(__name__)
+
+# Tâches qui ne seront plus exécutées (sauf relance manuelle)
+FINISHED_STATUSES = ("succeeded", "failed", "dead")
+
+def create_job(db: Session, kind: str, payload: Dict[str, Any], user_id: Optional[int], max_attempts: int) -> Job:
+    """Met une tâche en file (exécutée dès qu'un worker est libre)."""
+    db_job = Job(
+        kind=kind,
+        payload=payload,
+        user_id=user_id,
+        status="queued",
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow(),
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_job(db: Session, job_id: int, user_id: Optional[int] = None) -> Optional[Job]:
+    """Récupère une tâche (appartenant à l'utilisateur si user_id est fourni)."""
+    query = db.query(Job).filter(Job.id == job_id)
+    if user_id is not None:
+        query = query.filter(Job.user_id == user_id)
+    return query.first()
+
+def get_jobs(db: Session, user_id: int, status: Optional[str] = None, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[Job]:
+    """Liste les tâches d'un utilisateur, la plus récente d'abord."""
+    query = db.query(Job).filter(Job.user_id == user_id)
+    if status is not None:
+        query = query.filter(Job.status == status)
+    return keyset(query, [Job.id], after, skip, limit, descending=True).all()
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """Prend la prochaine tâche prête (queued, run_after passé) pour ce worker.
+
+    La prise est un UPDATE conditionnel (status encore 'queued') : si un autre worker,
+    éventuellement d'un autre processus, a pris la tâche entre-temps, aucune ligne n'est
+    modifiée et la candidate suivante est essayée. Fonctionne sur PostgreSQL comme sur SQLite.
+    """
+    now = datetime.utcnow()
+    candidate_ids = [
+        row[0] for row in db.query(Job.id)
+        .filter(Job.status == "queued", Job.run_after <= now)
+        .order_by(Job.run_after, Job.id)
+        .limit(5)
+        .all()
+    ]
+    for job_id in candidate_ids:
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == job_id, Job.status == "queued")
+            .update(
+                {"status": "running", "locked_by": worker_id, "locked_at": now,
+                 "started_at": now, "attempts": Job.attempts + 1},
+                synchronize_session=False
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.query(Job).filter(Job.id == job_id).first()
+    return None
+
+def update_job_progress(db: Session, job_id: int, progress: float):
+    """Met à jour l'avancement d'une tâche en cours."""
+    db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+        {"progress": min(max(progress, 0.0), 1.0)}, synchronize_session=False
+    )
+    db.commit()
+
+def complete_job(db: Session, job_id: int, result: Any) -> Optional[Job]:
+    """Marque une tâche comme réussie et enregistre son résultat."""
+    db_job = db.query(Job).filter(Job.id == job_id).first()
+    if not db_job:
+        return None
+    db_job.status = "succeeded"
+    db_job.result = result
+    db_job.error = None
+    db_job.progress = 1.0
+    db_job.finished_at = datetime.utcnow()
+    db_job.locked_by = None
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def fail_job(db: Session, job_id: int, error: str, retry_delay_seconds: Optional[float] = None) -> Optional[Job]:
+    """Enregistre l'échec d'une tentative.
+
+    Avec `retry_delay_seconds` et des tentatives restantes, la tâche est remise en file
+    après ce délai. Sinon elle passe en 'dead' (tentatives épuisées) ou en 'failed'
+    (erreur définitive, sans nouvelle tentative).
+    """
+    db_job = db.query(Job).filter(Job.id == job_id).first()
+    if not db_job:
+        return None
+    now = datetime.utcnow()
+    db_job.error = error
+    db_job.locked_by = None
+    if retry_delay_seconds is not None and db_job.attempts < db_job.max_attempts:
+        db_job.status = "queued"
+        db_job.run_after = now + timedelta(seconds=retry_delay_seconds)
+    else:
+        db_job.status = "dead" if retry_delay_seconds is not None else "failed"
+        db_job.finished_at = now
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def release_job(db: Session, job_id: int):
+    """Remet en file une tâche interrompue par l'arrêt du serveur (la tentative n'est pas comptée)."""
+    db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+        {"status": "queued", "locked_by": None, "attempts": Job.attempts - 1, "run_after": datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+
+def retry_job(db: Session, job_id: int) -> Optional[Job]:
+    """Relance une tâche en échec (failed ou dead) avec un nouveau jeu de tentatives."""
+    db_job = db.query(Job).filter(Job.id == job_id).first()
+    if not db_job or db_job.status not in ("failed", "dead"):
+        return None
+    db_job.status = "queued"
+    db_job.attempts = 0
+    db_job.progress = 0.0
+    db_job.run_after = datetime.utcnow()
+    db_job.finished_at = None
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def delete_job(db: Session, job_id: int) -> bool:
+    """Supprime une tâche en file ou terminée (une tâche en cours ne peut pas être supprimée)."""
+    deleted = db.query(Job).filter(Job.id == job_id, Job.status != "running").delete(synchronize_session=False)
+    db.commit()
+    return deleted > 0
+
+def requeue_stale_jobs(db: Session, stale_after_seconds: int) -> int:
+    """Remet en file les tâches 'running' abandonnées (worker arrêté brutalement).
+
+    La tentative interrompue reste comptée : une tâche qui fait tomber son worker
+    finit donc en 'dead' au lieu de boucler.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+    stale_jobs = db.query(Job).filter(Job.status == "running", Job.locked_at < cutoff).all()
+    for db_job in stale_jobs:
+        db_job.locked_by = None
+        db_job.error = "Worker interrompu pendant l'exécution"
+        if db_job.attempts < db_job.max_attempts:
+            db_job.status = "queued"
+            db_job.run_after = datetime.utcnow()
+        else:
+            db_job.status = "dead"
+            db_job.finished_at = datetime.utcnow()
+    db.commit()
+    if stale_jobs:
+        logger.warning(f"{len(stale_jobs)} tâche(s) abandonnée(s) remise(s) en file ou en lettres mortes")
+    return len(stale_jobs)
+
+def purge_finished_jobs(db: Session, older_than_days: int) -> int:
+    """Supprime les tâches réussies plus anciennes que la durée de rétention (les échecs sont conservés)."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = db.query(Job).filter(Job.status == "succeeded", Job.finished_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def count_jobs_by_status(db: Session) -> Dict[str, int]:
+    """Nombre de tâches par statut (pour la supervision)."""
+    return dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
@@ -1,7 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
 from models import Objective, Sequence, Session # Import models
 from schemas.objective import ObjectiveCreate, ObjectiveUpdate # Import schemas
+from pagination import keyset
+from crud.association import SEQUENCE_OBJECTIVES, SESSION_OBJECTIVES, add_links, remove_links
 
 def get_objective(db: Session, objective_id: int):
     """Récupère un objectif par son ID."""
@@ -11,9 +13,10 @@ def get_objective_by_title(db: Session, title: str):
     """Récupère un objectif par son titre (qui est unique)."""
     return db.query(Objective).filter(Objective.title == title).first()
 
-def get_objectives(db: Session, skip: int = 0, limit: int = 100):
-    """Récupère une liste d'objectifs."""
-    return db.query(Objective).offset(skip).limit(limit).all()
+def get_objectives(db: Session, skip: int = 0, limit: int = 100, after: tuple = None):
+    """Récupère une liste d'objectifs (après le curseur `after` s'il est fourni)."""
+    query = db.query(Objective).options(selectinload(Objective.sequences), selectinload(Objective.sessions))
+    return keyset(query, [Objective.id], after, skip, limit).all()
 
 def create_objective(db: Session, objective: ObjectiveCreate):
     """Crée un nouvel objectif."""
@@ -67,8 +70,8 @@ def add_objective_to_sequence(db: Session, sequence_id: int, objective_id: int):
     db_objective = get_objective(db, objective_id)
     if not db_sequence or not db_objective:
         raise ValueError("Sequence or Objective not found")
-    if db_objective not in db_sequence.objectives:
-        db_sequence.objectives.append(db_objective)
+    # Lien ajouté s'il n'existe pas, sans charger les objectifs de la séquence
+    if add_links(db, SEQUENCE_OBJECTIVES, sequence_id, [objective_id]):
         db.commit()
     return db_sequence
 
@@ -77,8 +80,7 @@ def remove_objective_from_sequence(db: Session, sequence_id: int, objective_id:
     db_objective = get_objective(db, objective_id)
     if not db_sequence or not db_objective:
         raise ValueError("Sequence or Objective not found")
-    if db_objective in db_sequence.objectives:
-        db_sequence.objectives.remove(db_objective)
+    if remove_links(db, SEQUENCE_OBJECTIVES, sequence_id, [objective_id]):
         db.commit()
     return db_sequence
 
@@ -87,8 +89,7 @@ def add_objective_to_session(db: Session, session_id: int, objective_id: int):
     db_objective = get_objective(db, objective_id)
     if not db_session or not db_objective:
         raise ValueError("Session or Objective not found")
-    if db_objective not in db_session.objectives:
-        db_session.objectives.append(db_objective)
+    if add_links(db, SESSION_OBJECTIVES, session_id, [objective_id]):
         db.commit()
     return db_session
 
@@ -97,8 +98,7 @@ def remove_objective_from_session(db: Session, session_id: int, objective_id: in
     db_objective = get_objective(db, objective_id)
     if not db_session or not db_objective:
         raise ValueError("Session or Objective not found")
-    if db_objective in db_session.objectives:
-        db_session.objectives.remove(db_objective)
+    if remove_links(db, SESSION_OBJECTIVES, session_id, [objective_id]):
         db.commit()
     return db_session
 
@@ -3,6 +3,8 @@ from models import Progression, Sequence, User
 from schemas.progression import ProgressionCreate, ProgressionUpdate
 from sqlalchemy import func
 from typing import List, Optional
+from crud.user_stats import increment_user_counter
+from pagination import keyset
 
 def get_progression(db: Session, progression_id: int, user_id: int):
     query = db.query(Progression).filter(Progression.id == progression_id)
@@ -10,11 +12,11 @@ def get_progression(db: Session, progression_id: int, user_id: int):
         query = query.filter(Progression.user_id == user_id)
     return query.first()
 
-def get_progressions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+def get_progressions(db: Session, user_id: int, skip: int = 0, limit: int = 100, after: Optional[tuple] = None):
     query = db.query(Progression)
     if user_id:
         query = query.filter(Progression.user_id == user_id)
-    return query.offset(skip).limit(limit).all()
+    return keyset(query, [Progression.id], after, skip, limit).all()
 
 def count_progressions(db: Session, user_id: int) -> int:
     """Compte le nombre total de progressions pour un utilisateur."""
@@ -27,6 +29,7 @@ def create_progression(db: Session, progression: ProgressionCreate, user_id: int
         user_id=user_id # Assigner l'ID de l'utilisateur
     )
     db.add(db_progression)
+    increment_user_counter(db, user_id, "total_progressions")
     db.commit()
     db.refresh(db_progression)
     return db_progression
@@ -47,6 +50,7 @@ def delete_progression(db: Session, progression_id: int, user_id: int):
     if db_progression is None:
         return None
     db.delete(db_progression)
+    increment_user_counter(db, db_progression.user_id, "total_progressions", -1)
     db.commit()
     return True
 
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from models import Resource, Session as SessionModel, User 
 from schemas.resource import ResourceCreate, ResourceUpdate, ResourceFileUpload 
 from sqlalchemy import or_
@@ -7,6 +7,10 @@ import logging
 import os
 from pathlib import Path
 from config import get_settings
+from crud.user_stats import increment_user_counter
+from crud.blob import acquire_blob, release_blob, purge_blob
+from crud.association import RESOURCE_SESSIONS, add_links, existing_ids, replace_links
+from pagination import keyset
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
@@ -16,6 +20,23 @@ def get_upload_path(user_id: int, file_name: str) -> str:
     user_folder = Path("uploads") / str(user_id) 
     return str(user_folder / file_name)
 
+def _set_file_fields(db: Session, db_resource: Resource, file_upload: ResourceFileUpload):
+    """Renseigne les champs fichier d'une ressource ; référence le blob si le fichier est stocké par contenu."""
+    db_resource.file_name = file_upload.file_name
+    db_resource.file_type = file_upload.file_type
+    db_resource.file_size = file_upload.file_size
+    if file_upload.sha256:
+        acquire_blob(
+            db, file_upload.sha256, file_upload.file_size, file_upload.file_type, file_upload.storage_path,
+            staged_path=file_upload.staged_path,
+        )
+        db_resource.blob_sha256 = file_upload.sha256
+        # Chemin relatif servi sous MEDIA_URL_PREFIX (ex: uploads/blobs/ab/cd/<sha>.pdf)
+        db_resource.file_path = str(Path("uploads") / file_upload.storage_path)
+    else:
+        db_resource.blob_sha256 = None
+        db_resource.file_path = get_upload_path(db_resource.user_id, file_upload.file_name)
+
 def get_resource(db: Session, resource_id: int):
     resource = db.query(Resource).options(
         joinedload(Resource.type),
@@ -24,13 +45,16 @@ def get_resource(db: Session, resource_id: int):
     ).filter(Resource.id == resource_id).first()
     return resource
 
-def get_resources(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+def get_resources(db: Session, user_id: int, skip: int = 0, limit: int = 100, after: Optional[tuple] = None):
     logger.info(f"Recherche des ressources pour l'utilisateur {user_id}")
-    resources = db.query(Resource).options(
-        joinedload(Resource.sessions),
+    # Collection chargée en selectinload (une requête IN sur les ids de la page) : avec un
+    # joinedload, LIMIT porterait sur les lignes jointes (une par séance) et non sur les ressources
+    query = db.query(Resource).options(
+        selectinload(Resource.sessions),
         joinedload(Resource.type),
         joinedload(Resource.sub_type)
-    ).filter(Resource.user_id == user_id).offset(skip).limit(limit).all()
+    ).filter(Resource.user_id == user_id)
+    resources = keyset(query, [Resource.id], after, skip, limit).all()
     logger.info(f"Nombre de ressources trouvées pour l'utilisateur {user_id}: {len(resources)}")
     return resources
 
@@ -56,7 +80,7 @@ def get_resources_by_session(db: Session, session_id: int, user_id: int, skip: i
         resources = db.query(Resource).options(
                 joinedload(Resource.type),
                 joinedload(Resource.sub_type),
-                joinedload(Resource.sessions)
+                selectinload(Resource.sessions)
             ).filter(
                 Resource.id.in_(resource_ids),
                 Resource.user_id == user_id  
@@ -70,20 +94,21 @@ def get_resources_by_session(db: Session, session_id: int, user_id: int, skip: i
         logger.error(f"Erreur lors de la recherche des ressources pour la session {session_id}: {str(e)}")
         raise 
 
-def get_resources_standalone(db: Session, skip: int = 0, limit: int = 100):
-    """Récupère les ressources qui ne sont liées à aucune session."""
-    # Attention: Cette fonction ne filtre pas par user_id actuellement.
-    # Elle retourne toutes les ressources sans session.
+def get_resources_standalone(db: Session, user_id: Optional[int] = None, skip: int = 0, limit: int = 100, after: Optional[tuple] = None):
+    """Récupère les ressources qui ne sont liées à aucune session (de l'utilisateur si user_id est fourni)."""
     from models.association_tables import session_resource_association
-    subquery = db.query(session_resource_association.c.resource_id).subquery()
-    return (
-        db.query(Resource)
-        .outerjoin(subquery, Resource.id == subquery.c.resource_id)
-        .filter(subquery.c.resource_id == None)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = db.query(Resource).options(
+        selectinload(Resource.sessions),
+        joinedload(Resource.type),
+        joinedload(Resource.sub_type)
+    ).filter(
+        ~db.query(session_resource_association.c.resource_id)
+        .filter(session_resource_association.c.resource_id == Resource.id)
+        .exists()
     )
+    if user_id is not None:
+        query = query.filter(Resource.user_id == user_id)
+    return keyset(query, [Resource.id], after, skip, limit).all()
 
 def create_resource(db: Session, resource: ResourceCreate, file_upload: Optional[ResourceFileUpload] = None) -> Resource:
     if resource.user_id is not None:
@@ -93,15 +118,12 @@ def create_resource(db: Session, resource: ResourceCreate, file_upload: Optional
     else:
         raise ValueError("user_id is required to create a resource")
 
-    db_sessions = []
-    if resource.session_ids and len(resource.session_ids) > 0:
-        valid_session_ids = [sid for sid in resource.session_ids if sid is not None and sid != 0]
-        if valid_session_ids:
-            db_sessions = db.query(SessionModel).filter(SessionModel.id.in_(valid_session_ids)).all()
-            if len(db_sessions) != len(valid_session_ids):
-                found_ids = {s.id for s in db_sessions}
-                missing_ids = set(valid_session_ids) - found_ids
-                raise ValueError(f"Session(s) not found: {missing_ids}")
+    session_ids = list(dict.fromkeys(sid for sid in resource.session_ids or [] if sid is not None and sid != 0))
+    if session_ids:
+        found_ids = existing_ids(db, SessionModel, session_ids)
+        if len(found_ids) != len(session_ids):
+            missing_ids = set(session_ids) - found_ids
+            raise ValueError(f"Session(s) not found: {missing_ids}")
 
     db_resource = Resource(
         title=resource.title,
@@ -115,25 +137,76 @@ def create_resource(db: Session, resource: ResourceCreate, file_upload: Optional
     if resource.source_type == 'file':
         if not file_upload:
             raise ValueError("File information is required when source_type is 'file'")
-        db_resource.file_name = file_upload.file_name
-        db_resource.file_type = file_upload.file_type
-        db_resource.file_size = file_upload.file_size
-        db_resource.file_path = get_upload_path(resource.user_id, file_upload.file_name)
+        _set_file_fields(db, db_resource, file_upload)
     elif file_upload:
         logger.warning("File information provided but source_type is not 'file'. File info will be ignored.")
 
     db.add(db_resource)
+    increment_user_counter(db, resource.user_id, "total_resources")
+    db.flush()  # Attribue l'id avant l'insertion des liens
+    add_links(db, RESOURCE_SESSIONS, db_resource.id, session_ids)
     db.commit()
-    db.refresh(db_resource) 
-    
-    if db_sessions:
-        db_resource.sessions = db_sessions
-        db.commit() 
-        db.refresh(db_resource) 
     
-    db_resource_loaded = get_resource(db, db_resource.id) 
+    db_resource_loaded = get_resource(db, db_resource.id)
 
-    return db_resource_loaded 
+    return db_resource_loaded
+
+def create_resources_bulk(db: Session, resources: List[ResourceCreate]) -> List[Resource]:
+    """Crée plusieurs ressources sans fichier (ex: générées par l'IA) en une seule transaction.
+
+    Les ressources sont insérées ensemble (un seul flush), puis leurs liens vers les séances
+    en un seul INSERT multi-lignes ; tout est annulé si une séance n'existe pas.
+
+    Args:
+        db (Session): La session de base de données
+        resources (List[ResourceCreate]): Ressources à créer (source_type 'ai')
+
+    Returns:
+        List[Resource]: Les ressources créées, dans l'ordre reçu
+    """
+    from models.association_tables import session_resource_association
+
+    if not resources:
+        return []
+    if any(resource.source_type == 'file' for resource in resources):
+        raise ValueError("Bulk creation only supports resources without file (source_type 'ai')")
+
+    session_ids = {sid for resource in resources for sid in (resource.session_ids or []) if sid}
+    if session_ids:
+        found_ids = {row[0] for row in db.query(SessionModel.id).filter(SessionModel.id.in_(session_ids)).all()}
+        missing_ids = session_ids - found_ids
+        if missing_ids:
+            raise ValueError(f"Session(s) not found: {missing_ids}")
+
+    db_resources = [
+        Resource(
+            title=resource.title,
+            description=resource.description,
+            type_id=resource.type_id,
+            sub_type_id=resource.sub_type_id,
+            user_id=resource.user_id,
+            source_type=resource.source_type
+        )
+        for resource in resources
+    ]
+    try:
+        db.add_all(db_resources)
+        db.flush()  # Attribue les ids sans valider la transaction
+        links = [
+            {"session_id": sid, "resource_id": db_resource.id}
+            for resource, db_resource in zip(resources, db_resources)
+            for sid in dict.fromkeys(resource.session_ids or []) if sid
+        ]
+        if links:
+            db.execute(session_resource_association.insert(), links)
+        for user_id in {resource.user_id for resource in resources}:
+            increment_user_counter(db, user_id, "total_resources", sum(1 for r in resources if r.user_id == user_id))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info(f"{len(db_resources)} ressource(s) créée(s) en une transaction ({len(links)} lien(s) vers des séances)")
+    return db_resources
 
 def update_resource(db: Session, resource_id: int, resource_update: ResourceUpdate, file_upload: Optional[ResourceFileUpload] = None) -> Optional[Resource]:
     db_resource = db.query(Resource).filter(Resource.id == resource_id).first()
@@ -146,6 +219,18 @@ def update_resource(db: Session, resource_id: int, resource_update: ResourceUpda
 
     old_file_path_relative = db_resource.file_path # Stocker l'ancien chemin relatif
     old_user_id = db_resource.user_id # Nécessaire pour construire l'ancien chemin absolu
+    old_blob_sha256 = db_resource.blob_sha256 # Ancien contenu dans le stockage dédupliqué
+    unreferenced_blob = False
+    legacy_file_to_remove: Optional[Path] = None # Ancien fichier hors stockage dédupliqué, supprimé après le commit
+
+    # Valider les séances avant de toucher aux fichiers : un refus ne doit rien laisser sur le disque
+    new_session_ids: Optional[List[int]] = None
+    if "session_ids" in update_data and update_data["session_ids"] is not None:
+        new_session_ids = list(dict.fromkeys(sid for sid in update_data["session_ids"] if sid is not None and sid != 0))
+        found_ids = existing_ids(db, SessionModel, new_session_ids)
+        if len(found_ids) != len(new_session_ids):
+            missing_ids = set(new_session_ids) - found_ids
+            raise ValueError(f"Session(s) not found for update: {missing_ids}")
 
     for key, value in update_data.items():
         if key not in ['session_ids', 'source_type']:
@@ -154,10 +239,7 @@ def update_resource(db: Session, resource_id: int, resource_update: ResourceUpda
     if new_file_provided:
         logger.info(f"Nouveau fichier fourni pour la ressource {resource_id}: {file_upload.file_name}")
         # 1. Préparer les nouvelles informations du fichier
-        db_resource.file_name = file_upload.file_name
-        db_resource.file_type = file_upload.file_type
-        db_resource.file_size = file_upload.file_size
-        db_resource.file_path = get_upload_path(db_resource.user_id, file_upload.file_name)
+        _set_file_fields(db, db_resource, file_upload)
         # S'assurer que le type est 'file'
         db_resource.source_type = 'file'
         # Potentiellement nullifier les champs conflictuels (url, ai_content)
@@ -165,42 +247,36 @@ def update_resource(db: Session, resource_id: int, resource_update: ResourceUpda
         db_resource.ai_generated_content = None
         logger.info(f"Informations BDD mises à jour pour le fichier de la ressource {resource_id}")
 
-        # 2. Supprimer l'ancien fichier PHYSIQUE (si existant)
-        if db_resource.source_type == 'file' and old_file_path_relative:
+        # 2. Libérer l'ancien contenu : le blob n'est supprimé qu'après le commit, s'il n'est plus référencé
+        if old_blob_sha256:
+            unreferenced_blob = release_blob(db, old_blob_sha256)
+        # Ancien fichier hors stockage dédupliqué : le fichier PHYSIQUE est supprimé après le commit
+        elif db_resource.source_type == 'file' and old_file_path_relative:
             # Extraire le nom de fichier du chemin relatif stocké
             old_filename = Path(old_file_path_relative).name
             # Construire le chemin ABSOLU correct de l'ancien fichier
-            absolute_old_file_path = settings.UPLOADS_BASE_DIR / str(old_user_id) / old_filename
- 
-            if absolute_old_file_path.exists():
-                try:
-                    absolute_old_file_path.unlink() # Utiliser unlink() de Path
-                    logger.info(f"Ancien fichier supprimé physiquement : {absolute_old_file_path}")
-                except OSError as e:
-                    # Log l'erreur mais continuer, la màj BDD est prioritaire
-                    logger.error(f"Erreur lors de la suppression de l'ancien fichier {absolute_old_file_path}: {e}")
-            else:
-                logger.warning(f"Ancien fichier non trouvé pour suppression: {absolute_old_file_path}")
+            legacy_file_to_remove = settings.UPLOADS_BASE_DIR / str(old_user_id) / old_filename
         
-    if "session_ids" in update_data and update_data["session_ids"] is not None:
-        new_session_ids = set(sid for sid in update_data["session_ids"] if sid is not None and sid != 0)
-        
-        if not new_session_ids:
-            db_resource.sessions = []
-            logger.info(f"Toutes les sessions dissociées de la ressource {resource_id}")
-        else:
-            db_sessions = db.query(SessionModel).filter(SessionModel.id.in_(new_session_ids)).all()
-            found_ids = {s.id for s in db_sessions}
-            if found_ids != new_session_ids:
-                missing_ids = new_session_ids - found_ids
-                raise ValueError(f"Session(s) not found for update: {missing_ids}")
-            
-            db_resource.sessions = db_sessions
-            logger.info(f"Sessions mises à jour pour la ressource {resource_id}: {new_session_ids}")
+    if new_session_ids is not None:
+        # Seuls les liens ajoutés / retirés sont écrits
+        added, removed = replace_links(db, RESOURCE_SESSIONS, {resource_id: new_session_ids})
+        logger.info(f"Sessions mises à jour pour la ressource {resource_id}: {len(added)} ajoutée(s), {len(removed)} retirée(s)")
     
     db.add(db_resource) 
     db.commit()
     db.refresh(db_resource) 
+    if unreferenced_blob:
+        purge_blob(db, old_blob_sha256)
+    if legacy_file_to_remove is not None:
+        if legacy_file_to_remove.exists():
+            try:
+                legacy_file_to_remove.unlink() # Utiliser unlink() de Path
+                logger.info(f"Ancien fichier supprimé physiquement : {legacy_file_to_remove}")
+            except OSError as e:
+                # Log l'erreur mais continuer, la màj BDD est faite
+                logger.error(f"Erreur lors de la suppression de l'ancien fichier {legacy_file_to_remove}: {e}")
+        else:
+            logger.warning(f"Ancien fichier non trouvé pour suppression: {legacy_file_to_remove}")
 
     db_resource_loaded = get_resource(db, db_resource.id)
     return db_resource_loaded 
@@ -209,15 +285,22 @@ def delete_resource(db: Session, resource_id: int) -> bool:
     db_resource = db.query(Resource).get(resource_id)
     
     if db_resource:
-        if db_resource.source_type == 'file' and db_resource.file_path and os.path.exists(db_resource.file_path):
-            try:
-                os.remove(db_resource.file_path)
-                logger.info(f"Fichier associé supprimé : {db_resource.file_path}")
-            except OSError as e:
-                logger.error(f"Erreur lors de la suppression du fichier {db_resource.file_path}: {e}")
-            
+        # Fichier hors stockage dédupliqué ; un blob n'est supprimé que s'il n'est plus référencé (release_blob).
+        # Dans les deux cas, le fichier n'est supprimé qu'après le commit
+        legacy_file_path = db_resource.file_path if db_resource.source_type == 'file' and not db_resource.blob_sha256 else None
+        blob_sha256 = db_resource.blob_sha256
         db.delete(db_resource)
+        increment_user_counter(db, db_resource.user_id, "total_resources", -1)
+        unreferenced_blob = bool(blob_sha256) and release_blob(db, blob_sha256)
         db.commit()
+        if unreferenced_blob:
+            purge_blob(db, blob_sha256)
+        if legacy_file_path and os.path.exists(legacy_file_path):
+            try:
+                os.remove(legacy_file_path)
+                logger.info(f"Fichier associé supprimé : {legacy_file_path}")
+            except OSError as e:
+                logger.error(f"Erreur lors de la suppression du fichier {legacy_file_path}: {e}")
         logger.info(f"Ressource {resource_id} supprimée de la base de données.")
         return True
         
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
 from models.resource import ResourceType, ResourceSubType
 from typing import List, Optional
+from pagination import keyset
 
-def get_resource_types(db: Session, skip: int = 0, limit: int = 100) -> List[ResourceType]:
+def get_resource_types(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[ResourceType]:
     """
     Récupère tous les types de ressources.
     
@@ -10,11 +11,12 @@ def get_resource_types(db: Session, skip: int = 0, limit: int = 100) -> List[Res
         db: Session de base de données
         skip: Nombre d'éléments à sauter (pour la pagination)
         limit: Nombre maximum d'éléments à retourner
+        after: Curseur décodé (id du dernier type lu), prioritaire sur skip
         
     Returns:
         Liste des types de ressources
     """
-    return db.query(ResourceType).offset(skip).limit(limit).all()
+    return keyset(db.query(ResourceType), [ResourceType.id], after, skip, limit).all()
 
 def get_resource_type(db: Session, type_id: int) -> Optional[ResourceType]:
     """
@@ -42,7 +44,7 @@ def get_resource_type_by_key(db: Session, key: str) -> Optional[ResourceType]:
     """
     return db.query(ResourceType).filter(ResourceType.key == key).first()
 
-def get_resource_subtypes(db: Session, type_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[ResourceSubType]:
+def get_resource_subtypes(db: Session, type_id: Optional[int] = None, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[ResourceSubType]:
     """
     Récupère les sous-types de ressources, optionnellement filtrés par type_id.
     
@@ -51,6 +53,7 @@ def get_resource_subtypes(db: Session, type_id: Optional[int] = None, skip: int
         type_id: ID du type parent (optionnel)
         skip: Nombre d'éléments à sauter (pour la pagination)
         limit: Nombre maximum d'éléments à retourner
+        after: Curseur décodé (id du dernier sous-type lu), prioritaire sur skip
         
     Returns:
         Liste des sous-types de ressources
@@ -58,7 +61,7 @@ def get_resource_subtypes(db: Session, type_id: Optional[int] = None, skip: int
     query = db.query(ResourceSubType)
     if type_id is not None:
         query = query.filter(ResourceSubType.type_id == type_id)
-    return query.offset(skip).limit(limit).all()
+    return keyset(query, [ResourceSubType.id], after, skip, limit).all()
 
 def get_resource_subtype(db: Session, subtype_id: int) -> Optional[ResourceSubType]:
     """
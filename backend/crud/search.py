@@ -0,0 +1,156 @@
+from sqlalchemy import column, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Sequence
+import html
+import re
+import logging
+
+from models.search_index import FTS_TABLE, KIND_SLOTS, SEARCH_CONFIG, SEARCH_SOURCES, owner_sql
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de mots d'une recherche (au-delà, ils sont ignorés)
+MAX_QUERY_TERMS = 8
+# Délimiteurs des passages trouvés (caractères d'usage privé), remplacés par <mark>
+# après l'échappement HTML du texte
+_MARK_START, _MARK_END = "\ue000", "\ue001"
+_TERM_RE = re.compile(r"\w+")
+
+def query_terms(query: str) -> List[str]:
+    """Mots recherchés (lettres et chiffres uniquement : aucune syntaxe de requête n'est transmise)."""
+    return _TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+
+def _highlighted(value: Optional[str]) -> str:
+    return html.escape(value or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+def _search_postgres(db: Session, user_id: int, terms: List[str], kinds: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+    # Tous les mots sont requis ; le dernier est un préfixe (recherche pendant la frappe)
+    tsquery = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+    hits = " UNION ALL ".join(
+        f"SELECT '{kind}' AS kind, src.id, src.title, "
+        f"concat_ws(' ', {', '.join(f'src.{column}' for column, _ in columns[1:])}) AS body, "
+        f"ts_rank_cd(src.search_vector, query.q, 32) AS rank "
+        f"FROM {table} AS src, query WHERE {owner_sql(kind, 'src')} = :user_id AND src.search_vector @@ query.q"
+        for kind, (_, table, columns) in SEARCH_SOURCES.items() if kind in kinds
+    )
+    # ts_headline (coûteux) n'est calculé que pour les résultats retenus
+    statement = text(f"""
+        WITH query AS (SELECT to_tsquery('{SEARCH_CONFIG}', :tsquery) AS q),
+        hits AS (SELECT * FROM ({hits}) AS all_hits ORDER BY rank DESC, id LIMIT :limit)
+        SELECT hits.kind, hits.id, hits.title, hits.rank,
+            ts_headline('{SEARCH_CONFIG}', coalesce(hits.title, ''), query.q, :title_options) AS title_highlight,
+            ts_headline('{SEARCH_CONFIG}', coalesce(hits.body, ''), query.q, :snippet_options) AS snippet
+        FROM hits, query
+        ORDER BY hits.rank DESC, hits.id
+    """)
+    selection = f"StartSel={_MARK_START}, StopSel={_MARK_END}"
+    rows = db.execute(statement, {
+        "tsquery": tsquery,
+        "user_id": user_id,
+        "limit": limit,
+        "title_options": f"HighlightAll=true, {selection}",
+        "snippet_options": f"MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=\" … \", {selection}",
+    }).all()
+    return [
+        {"kind": row.kind, "id": row.id, "title": row.title, "rank": float(row.rank),
+         "title_highlight": row.title_highlight, "snippet": row.snippet}
+        for row in rows
+    ]
+
+def _search_sqlite(db: Session, user_id: int, terms: List[str], kinds: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    codes = {SEARCH_SOURCES[kind][0]: kind for kind in kinds}
+    statement = text(f"""
+        SELECT rowid, title,
+            highlight({FTS_TABLE}, 1, :start, :end) AS title_highlight,
+            snippet({FTS_TABLE}, 2, :start, :end, ' … ', 18) AS snippet,
+            bm25({FTS_TABLE}, 0.0, 10.0, 1.0) AS score
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH :match AND user_id = :user_id
+            AND rowid % {KIND_SLOTS} IN ({', '.join(str(code) for code in codes)})
+        ORDER BY score
+        LIMIT :limit
+    """)
+    rows = db.execute(statement, {
+        "match": match, "user_id": user_id, "limit": limit, "start": _MARK_START, "end": _MARK_END,
+    }).all()
+    # bm25 : plus petit = plus pertinent ; rang renvoyé dans le même sens que PostgreSQL
+    return [
+        {"kind": codes[row.rowid % KIND_SLOTS], "id": row.rowid // KIND_SLOTS, "title": row.title,
+         "rank": -float(row.score), "title_highlight": row.title_highlight, "snippet": row.snippet}
+        for row in rows
+    ]
+
+def _mark_terms(value: Optional[str], terms: List[str]) -> str:
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    return pattern.sub(lambda match: f"{_MARK_START}{match.group(0)}{_MARK_END}", value or "")
+
+def _snippet(body: str, terms: List[str], max_words: int = 18) -> str:
+    """Extrait d'environ `max_words` mots autour du premier mot trouvé."""
+    words = body.split()
+    lowered_terms = [term.lower() for term in terms]
+    first = next((index for index, word in enumerate(words) if any(term in word.lower() for term in lowered_terms)), None)
+    if first is None:
+        return ""
+    start = max(first - max_words // 3, 0)
+    excerpt = " ".join(words[start:start + max_words])
+    return ("… " if start > 0 else "") + excerpt + (" …" if start + max_words < len(words) else "")
+
+def _search_like(db: Session, user_id: int, terms: List[str], kinds: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+    # Repli portable (ni index, ni accents ignorés, ni racinisation) : chaque mot doit apparaître dans une colonne
+    hits: List[Dict[str, Any]] = []
+    for kind in kinds:
+        _, table_name, columns = SEARCH_SOURCES[kind]
+        source = table(table_name, column("id"), *(column(name) for name, _ in columns))
+        searched = [source.c[name] for name, _ in columns]
+        owner = literal_column(owner_sql(kind, table_name))
+        statement = (
+            select(source)
+            .where(owner == user_id, *(or_(*(col.icontains(term, autoescape=True) for col in searched)) for term in terms))
+            .order_by(source.c.id)
+            .limit(limit)
+        )
+        for row in db.execute(statement).mappings():
+            title = row["title"] or ""
+            body = " ".join(row[name] or "" for name, _ in columns[1:])
+            hits.append({
+                "kind": kind, "id": row["id"], "title": row["title"],
+                # Part des mots présents dans le titre (le titre pèse le plus, comme dans les index)
+                "rank": sum(term.lower() in title.lower() for term in terms) / len(terms),
+                "title_highlight": _mark_terms(title, terms), "snippet": _mark_terms(_snippet(body, terms), terms),
+            })
+    hits.sort(key=lambda hit: (-hit["rank"], hit["id"]))
+    return hits[:limit]
+
+def search_items(db: Session, user_id: int, query: str, kinds: Optional[Sequence[str]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Recherche plein texte dans les ressources, séances, séquences, progressions et objectifs d'un utilisateur.
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): Propriétaire des éléments recherchés
+        query (str): Texte saisi ; tous les mots sont requis, le dernier peut être incomplet
+        kinds (Sequence[str], optional): Types d'éléments à chercher (tous par défaut)
+        limit (int, optional): Nombre maximal de résultats. Defaults to 20.
+
+    Returns:
+        List[dict]: Résultats du plus pertinent au moins pertinent (kind, id, title, rank),
+        avec le titre et un extrait mis en évidence (HTML échappé, passages entre <mark>).
+
+    Sur une base autre que PostgreSQL ou SQLite, la recherche se fait par ILIKE (sans index).
+    """
+    terms = query_terms(query)
+    kinds = [kind for kind in (kinds or SEARCH_SOURCES) if kind in SEARCH_SOURCES]
+    if not terms or not kinds:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        rows = _search_postgres(db, user_id, terms, kinds, limit)
+    elif dialect == "sqlite":
+        rows = _search_sqlite(db, user_id, terms, kinds, limit)
+    else:
+        logger.warning(f"Pas d'index plein texte pour la base '{dialect}' : recherche par ILIKE")
+        rows = _search_like(db, user_id, terms, kinds, limit)
+    for row in rows:
+        row["title_highlight"] = _highlighted(row["title_highlight"])
+        row["snippet"] = _highlighted(row["snippet"])
+    return rows
@@ -4,12 +4,14 @@ from models import Sequence, Session as SessionModel # Import Sequence model AND
 from schemas.sequence import SequenceCreate, SequenceUpdate # Import schemas
 from sqlalchemy import func
 from typing import List
+from crud.user_stats import increment_user_counter
+from pagination import keyset
 
 def get_sequence(db: Session, sequence_id: int):
     """Récupère une séquence par son ID."""
     return db.query(Sequence).filter(Sequence.id == sequence_id).first()
 
-def get_sequences(db: Session, user_id: int = None, skip: int = 0, limit: int = 100):
+def get_sequences(db: Session, user_id: int = None, skip: int = 0, limit: int = 100, after: tuple = None):
     """Récupère une liste de séquences.
     
     Args:
@@ -17,17 +19,19 @@ def get_sequences(db: Session, user_id: int = None, skip: int = 0, limit: int =
         user_id (int, optional): ID de l'utilisateur pour filtrer les séquences
         skip (int, optional): Nombre d'éléments à sauter. Defaults to 0.
         limit (int, optional): Nombre maximum d'éléments à retourner. Defaults to 100.
+        after (tuple, optional): Curseur décodé (id de la dernière séquence lue), prioritaire sur skip.
     """
     query = db.query(Sequence)
     if user_id is not None:
         query = query.filter(Sequence.user_id == user_id)
-    return query.offset(skip).limit(limit).all()
+    query = query.options(selectinload(Sequence.objectives))
+    return keyset(query, [Sequence.id], after, skip, limit).all()
 
 def count_sequences(db: Session, user_id: int) -> int:
     """Compte le nombre total de séquences pour un utilisateur."""
     return db.query(Sequence).filter(Sequence.user_id == user_id).count()
 
-def get_sequences_by_progression(db: Session, progression_id: int, user_id: int = None, skip: int = 0, limit: int = 100):
+def get_sequences_by_progression(db: Session, progression_id: int, user_id: int = None, skip: int = 0, limit: int = 100, after: tuple = None):
     """Récupère les séquences appartenant à une progression spécifique.
     
     Args:
@@ -36,16 +40,19 @@ def get_sequences_by_progression(db: Session, progression_id: int, user_id: int
         user_id (int, optional): ID de l'utilisateur pour filtrer les séquences
         skip (int, optional): Nombre d'éléments à sauter. Defaults to 0.
         limit (int, optional): Nombre maximum d'éléments à retourner. Defaults to 100.
+        after (tuple, optional): Curseur décodé (id de la dernière séquence lue), prioritaire sur skip.
     """
     query = db.query(Sequence).filter(Sequence.progression_id == progression_id)
     if user_id is not None:
         query = query.filter(Sequence.user_id == user_id)
-    return query.options(selectinload(Sequence.objectives)).offset(skip).limit(limit).all()
+    query = query.options(selectinload(Sequence.objectives))
+    return keyset(query, [Sequence.id], after, skip, limit).all()
 
 def create_sequence(db: Session, sequence: SequenceCreate):
     """Crée une nouvelle séquence."""
     db_sequence = Sequence(**sequence.model_dump())
     db.add(db_sequence)
+    increment_user_counter(db, db_sequence.user_id, "total_sequences")
     db.commit()
     db.refresh(db_sequence)
     return db_sequence
@@ -69,6 +76,7 @@ def delete_sequence(db: Session, sequence_id: int):
     if db_sequence is None:
         return None # Ou False si vous préférez un booléen
     db.delete(db_sequence)
+    increment_user_counter(db, db_sequence.user_id, "total_sequences", -1)
     db.commit()
     return True # Confirme la suppression
 
@@ -2,9 +2,14 @@ from sqlalchemy.orm import Session, selectinload
 from models import Session, Objective, Resource
 from models.association_tables import session_resource_association
 from schemas.session import SessionCreate, SessionUpdate
-from crud.objective import get_objective
+from crud.association import SESSION_OBJECTIVES, existing_ids, replace_links
 from sqlalchemy import func
 from typing import List
+from crud.user_stats import increment_user_counter
+from pagination import keyset
+import logging
+
+logger = logging.getLogger(__name__)
 
 def get_session(db: Session, session_id: int):
     """Récupère une séance par son ID, en chargeant explicitement les relations."""
@@ -14,11 +19,12 @@ def get_session(db: Session, session_id: int):
         selectinload(Session.sequence)
     ).filter(Session.id == session_id).first()
 
-def get_sessions(db: Session, skip: int = 0, limit: int = 100):
-    """Récupère une liste de séances."""
-    return db.query(Session).offset(skip).limit(limit).all()
+def get_sessions(db: Session, skip: int = 0, limit: int = 100, after: tuple = None):
+    """Récupère une liste de séances (après le curseur `after` s'il est fourni)."""
+    query = db.query(Session).options(selectinload(Session.objectives))
+    return keyset(query, [Session.id], after, skip, limit).all()
 
-def get_sessions_by_sequence(db: Session, sequence_id: int, user_id: int = None, skip: int = 0, limit: int = 100):
+def get_sessions_by_sequence(db: Session, sequence_id: int, user_id: int = None, skip: int = 0, limit: int = 100, after: tuple = None):
     """Récupère les séances appartenant à une séquence spécifique.
     
     Args:
@@ -27,11 +33,13 @@ def get_sessions_by_sequence(db: Session, sequence_id: int, user_id: int = None,
         user_id (int, optional): ID de l'utilisateur pour filtrer les séances
         skip (int, optional): Nombre d'éléments à sauter. Defaults to 0.
         limit (int, optional): Nombre maximum d'éléments à retourner. Defaults to 100.
+        after (tuple, optional): Curseur décodé (id de la dernière séance lue), prioritaire sur skip.
     """
     query = db.query(Session).filter(Session.sequence_id == sequence_id)
     if user_id is not None:
         query = query.filter(Session.user_id == user_id)
-    return query.offset(skip).limit(limit).all()
+    query = query.options(selectinload(Session.objectives))
+    return keyset(query, [Session.id], after, skip, limit).all()
 
 def count_sessions(db: Session, user_id: int) -> int:
     """Compte le nombre total de sessions pour un utilisateur."""
@@ -41,36 +49,29 @@ def create_session(db: Session, session: SessionCreate):
     """Crée une nouvelle séance."""
     db_session = Session(**session.model_dump())
     db.add(db_session)
+    increment_user_counter(db, db_session.user_id, "total_sessions")
     db.commit()
     db.refresh(db_session)
     return db_session
 
 def update_session(db: Session, session_id: int, session_update: SessionUpdate):
     """Met à jour une séance existante, y compris ses objectifs associés."""
-    db_session = get_session(db, session_id=session_id)
+    # Objectifs non préchargés : ils sont remplacés en SQL, puis relus pour la réponse
+    db_session = db.query(Session).filter(Session.id == session_id).first()
     if db_session is None:
         return None
 
     update_data = session_update.model_dump(exclude_unset=True)
     new_objective_ids = update_data.pop('objective_ids', None) # Récupérer et retirer objective_ids
 
-    # Gérer la mise à jour de la relation many-to-many avec les objectifs
+    # Remplacer les objectifs associés : différence calculée sur la table d'association
     if new_objective_ids is not None: # Si une liste (même vide) est fournie
-        # Récupérer les objets Objective correspondants aux IDs fournis
-        new_objectives = []
-        for obj_id in new_objective_ids:
-            db_objective = get_objective(db, objective_id=obj_id)
-            if db_objective:
-                new_objectives.append(db_objective)
-            else:
-                # Gérer le cas où un ID d'objectif fourni n'existe pas
-                # Option 1: Ignorer silencieusement
-                # Option 2: Lever une exception (peut-être préférable)
-                # raise ValueError(f"Objective with id {obj_id} not found")
-                print(f"Warning: Objective with id {obj_id} not found, skipping.") # Option 1 pour le moment
-
-        # Assigner la nouvelle liste d'objets Objective à la relation
-        db_session.objectives = new_objectives
+        found_ids = existing_ids(db, Objective, new_objective_ids)
+        missing_ids = [obj_id for obj_id in new_objective_ids if obj_id not in found_ids]
+        if missing_ids:
+            # IDs d'objectifs inexistants ignorés (comportement historique)
+            logger.warning(f"Objectif(s) introuvable(s) ignoré(s) pour la séance {session_id}: {missing_ids}")
+        replace_links(db, SESSION_OBJECTIVES, {session_id: [obj_id for obj_id in new_objective_ids if obj_id in found_ids]})
 
     # Mise à jour des autres champs fournis dans session_update via setattr
     for key, value in update_data.items(): # update_data ne contient plus objective_ids
@@ -87,6 +88,7 @@ def delete_session(db: Session, session_id: int):
     if db_session is None:
         return None # Ou False
     db.delete(db_session)
+    increment_user_counter(db, db_session.user_id, "total_sessions", -1)
     db.commit()
     return True # Confirme la suppression
 
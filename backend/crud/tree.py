@@ -0,0 +1,140 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from models import Progression, Sequence, Session as SessionModel, Resource, Objective
+from models.resource import ResourceType
+from models.association_tables import (
+    sequence_objective_association,
+    session_objective_association,
+    session_resource_association,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+def get_user_tree(db: Session, user_id: int) -> dict:
+    """Charge tout l'arbre pédagogique d'un utilisateur en un nombre fixe de requêtes.
+
+    Progressions, séquences, séances, ressources et objectifs sont chargés
+    chacun par une requête ensembliste (sous-requêtes sur l'arbre de l'utilisateur),
+    plus une requête par table d'association. Le nombre de requêtes (8) ne dépend
+    pas de la taille de l'arbre.
+
+    Args:
+        db (Session): La session de base de données
+        user_id (int): ID de l'utilisateur propriétaire des progressions
+
+    Returns:
+        dict: Document compatible avec le schéma TreeDocument, où les relations
+        sont exprimées par des listes d'IDs.
+    """
+    # Sous-requêtes délimitant l'arbre de l'utilisateur (jamais matérialisées côté Python)
+    user_progression_ids = select(Progression.id).where(Progression.user_id == user_id)
+    user_sequence_ids = select(Sequence.id).where(Sequence.progression_id.in_(user_progression_ids))
+    user_session_ids = select(SessionModel.id).where(SessionModel.sequence_id.in_(user_sequence_ids))
+
+    progression_rows = (
+        db.query(Progression.id, Progression.title, Progression.description)
+        .filter(Progression.user_id == user_id)
+        .order_by(Progression.id)
+        .all()
+    )
+    sequence_rows = (
+        db.query(Sequence.id, Sequence.title, Sequence.description, Sequence.progression_id)
+        .filter(Sequence.progression_id.in_(user_progression_ids))
+        .order_by(Sequence.id)
+        .all()
+    )
+    session_rows = (
+        db.query(SessionModel.id, SessionModel.title, SessionModel.date, SessionModel.duration, SessionModel.sequence_id)
+        .filter(SessionModel.sequence_id.in_(user_sequence_ids))
+        .order_by(SessionModel.date, SessionModel.id)
+        .all()
+    )
+    session_resource_rows = (
+        db.query(session_resource_association.c.session_id, session_resource_association.c.resource_id)
+        .filter(session_resource_association.c.session_id.in_(user_session_ids))
+        .all()
+    )
+    resource_rows = (
+        db.query(
+            Resource.id, Resource.title, Resource.description,
+            Resource.source_type, Resource.file_type, ResourceType.key
+        )
+        .outerjoin(ResourceType, Resource.type_id == ResourceType.id)
+        .filter(Resource.id.in_(
+            select(session_resource_association.c.resource_id)
+            .where(session_resource_association.c.session_id.in_(user_session_ids))
+        ))
+        .order_by(Resource.id)
+        .all()
+    )
+    sequence_objective_rows = (
+        db.query(sequence_objective_association.c.sequence_id, sequence_objective_association.c.objective_id)
+        .filter(sequence_objective_association.c.sequence_id.in_(user_sequence_ids))
+        .all()
+    )
+    session_objective_rows = (
+        db.query(session_objective_association.c.session_id, session_objective_association.c.objective_id)
+        .filter(session_objective_association.c.session_id.in_(user_session_ids))
+        .all()
+    )
+    objective_ids = {row.objective_id for row in sequence_objective_rows}
+    objective_ids.update(row.objective_id for row in session_objective_rows)
+    objective_rows = []
+    if objective_ids:
+        objective_rows = (
+            db.query(Objective.id, Objective.title)
+            .filter(Objective.id.in_(objective_ids))
+            .order_by(Objective.id)
+            .all()
+        )
+
+    # --- Assemblage du document référencé par IDs ---
+    progressions = {
+        row.id: {"id": row.id, "title": row.title, "description": row.description, "sequence_ids": []}
+        for row in progression_rows
+    }
+    sequences = {
+        row.id: {
+            "id": row.id, "title": row.title, "description": row.description,
+            "progression_id": row.progression_id, "session_ids": [], "objective_ids": []
+        }
+        for row in sequence_rows
+    }
+    sessions = {
+        row.id: {
+            "id": row.id, "title": row.title, "date": row.date, "duration": row.duration,
+            "sequence_id": row.sequence_id, "resource_ids": [], "objective_ids": []
+        }
+        for row in session_rows
+    }
+
+    for sequence in sequences.values():
+        progressions[sequence["progression_id"]]["sequence_ids"].append(sequence["id"])
+    for session in sessions.values():
+        sequences[session["sequence_id"]]["session_ids"].append(session["id"])
+    for row in sorted(session_resource_rows):
+        sessions[row.session_id]["resource_ids"].append(row.resource_id)
+    for row in sorted(sequence_objective_rows):
+        sequences[row.sequence_id]["objective_ids"].append(row.objective_id)
+    for row in sorted(session_objective_rows):
+        sessions[row.session_id]["objective_ids"].append(row.objective_id)
+
+    logger.info(
+        f"Arbre chargé pour l'utilisateur {user_id}: {len(progressions)} progressions, "
+        f"{len(sequences)} séquences, {len(sessions)} séances, {len(resource_rows)} ressources"
+    )
+
+    return {
+        "progressions": list(progressions.values()),
+        "sequences": list(sequences.values()),
+        "sessions": list(sessions.values()),
+        "resources": [
+            {
+                "id": row.id, "title": row.title, "description": row.description,
+                "source_type": row.source_type, "file_type": row.file_type, "type_key": row.key
+            }
+            for row in resource_rows
+        ],
+        "objectives": [{"id": row.id, "title": row.title} for row in objective_rows],
+    }
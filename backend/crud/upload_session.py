@@ -0,0 +1,91 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+from models import UploadSession
+from typing import List, Optional
+from datetime import datetime, timedelta
+from config import get_settings
+import uuid
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def get_upload_session(db: Session, upload_id: str, user_id: int) -> Optional[UploadSession]:
+    """Récupère une session d'upload appartenant à l'utilisateur."""
+    return (
+        db.query(UploadSession)
+        .filter(UploadSession.id == upload_id, UploadSession.user_id == user_id)
+        .first()
+    )
+
+def create_upload_session(db: Session, user_id: int, file_name: str, total_size: int, chunk_size: int) -> UploadSession:
+    """Crée une session d'upload reprenable."""
+    db_upload = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        file_name=file_name,
+        total_size=total_size,
+        chunk_size=chunk_size,
+        status="pending",
+        expires_at=datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS),
+    )
+    db.add(db_upload)
+    db.commit()
+    db.refresh(db_upload)
+    return db_upload
+
+def claim_upload_session(db: Session, upload_id: str) -> bool:
+    """Réserve une session pour l'assemblage (pending -> assembling), en une mise à jour conditionnelle.
+
+    Deux appels concurrents à /complete ne peuvent pas réserver la même session : un seul
+    voit la ligne passer de `pending` à `assembling`, l'autre ne crée pas de ressource.
+
+    Returns:
+        bool: True si cet appel a obtenu la session
+    """
+    result = db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == "pending")
+        .values(status="assembling")
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def release_upload_session(db: Session, upload_id: str):
+    """Rend une session réservée (assemblage échoué) : le client peut rappeler /complete."""
+    db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == "assembling")
+        .values(status="pending")
+    )
+    db.commit()
+
+def complete_upload_session(db: Session, upload_id: str, resource_id: int) -> Optional[UploadSession]:
+    """Marque une session d'upload comme terminée (ressource créée)."""
+    db_upload = db.query(UploadSession).filter(UploadSession.id == upload_id).first()
+    if not db_upload:
+        return None
+    db_upload.status = "completed"
+    db_upload.resource_id = resource_id
+    db.commit()
+    db.refresh(db_upload)
+    return db_upload
+
+def delete_upload_session(db: Session, upload_id: str) -> bool:
+    """Supprime une session d'upload (les blocs sur le disque sont gérés par l'appelant)."""
+    db_upload = db.query(UploadSession).filter(UploadSession.id == upload_id).first()
+    if not db_upload:
+        return False
+    db.delete(db_upload)
+    db.commit()
+    return True
+
+def purge_expired_upload_sessions(db: Session) -> List[str]:
+    """Supprime les sessions expirées et renvoie leurs IDs (pour supprimer leurs blocs)."""
+    expired = db.query(UploadSession.id).filter(UploadSession.expires_at < datetime.utcnow()).all()
+    expired_ids = [row.id for row in expired]
+    if expired_ids:
+        db.query(UploadSession).filter(UploadSession.id.in_(expired_ids)).delete(synchronize_session=False)
+        db.commit()
+        logger.info(f"{len(expired_ids)} session(s) d'upload expirée(s) supprimée(s)")
+    return expired_ids
@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
+from typing import Optional
 from models import User, UserRole
 from schemas.user import UserCreate
 from hashing import get_password_hash, verify_password
+from principal_cache import invalidate_user
 
 def get_user(db: Session, user_id: int):
     """Récupère un utilisateur par son ID."""
@@ -15,15 +17,20 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
     """Récupère une liste d'utilisateurs."""
     return db.query(User).offset(skip).limit(limit).all()
 
-def create_user(db: Session, user: UserCreate):
-    """Crée un nouvel utilisateur."""
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
+    """Crée un nouvel utilisateur.
+
+    `hashed_password` permet de fournir un hash déjà calculé (ex: dans le pool de hachage)
+    plutôt que de hacher le mot de passe ici.
+    """
     # Vérifier si l'utilisateur existe déjà
     db_user = get_user_by_email(db, email=user.email)
     if db_user:
         return None
     
     # Créer l'utilisateur
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         first_name=user.first_name,
@@ -62,6 +69,17 @@ def update_user(db: Session, user_id: int, user_data: dict):
     
     db.commit()
     db.refresh(db_user)
+    # Rôle / statut actif potentiellement modifiés : invalider le cache d'authentification
+    invalidate_user(user_id)
+    return db_user
+
+def update_password_hash(db: Session, user_id: int, hashed_password: str):
+    """Remplace le hash du mot de passe d'un utilisateur (ex: rehash après changement du coût bcrypt)."""
+    db_user = get_user(db, user_id)
+    if not db_user:
+        return None
+    db_user.hashed_password = hashed_password
+    db.commit()
     return db_user
 
 def delete_user(db: Session, user_id: int):
@@ -72,4 +90,5 @@ def delete_user(db: Session, user_id: int):
     
     db.delete(db_user)
     db.commit()
+    invalidate_user(user_id)
     return db_user
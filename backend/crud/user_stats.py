@@ -0,0 +1,61 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from models import UserStats
+from crud.dashboard import compute_user_counts
+from typing import Dict, Optional
+from config import get_settings
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Correspondance clé du dashboard -> colonne de la table user_stats
+COUNTER_COLUMNS = {
+    "total_progressions": "progression_count",
+    "total_sequences": "sequence_count",
+    "total_sessions": "session_count",
+    "total_resources": "resource_count",
+}
+
+def increment_user_counter(db: Session, user_id: Optional[int], counter: str, delta: int = 1):
+    """Met à jour un compteur de user_stats dans la transaction courante (sans commit).
+
+    A appeler par les chemins de création/suppression du CRUD avant leur commit.
+    Si la ligne de l'utilisateur n'existe pas encore, rien n'est fait : elle sera
+    initialisée à partir des tables lors de la prochaine lecture.
+    """
+    if not settings.DASHBOARD_COUNTERS_ENABLED or user_id is None or delta == 0:
+        return
+    column = getattr(UserStats, COUNTER_COLUMNS[counter])
+    db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values({column: column + delta})
+    )
+
+def refresh_user_counters(db: Session, user_id: int) -> Dict[str, int]:
+    """Recalcule les compteurs d'un utilisateur depuis les tables et les enregistre."""
+    counts = compute_user_counts(db, user_id)
+    values = {COUNTER_COLUMNS[key]: value for key, value in counts.items()}
+    db_stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if db_stats is None:
+        db.add(UserStats(user_id=user_id, **values))
+    else:
+        for key, value in values.items():
+            setattr(db_stats, key, value)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Une autre requête a initialisé la ligne en parallèle : ses valeurs sont aussi exactes
+        db.rollback()
+        logger.info(f"Compteurs de l'utilisateur {user_id} initialisés en parallèle.")
+    return counts
+
+def get_user_counters(db: Session, user_id: int) -> Dict[str, int]:
+    """Lit les compteurs d'un utilisateur (une ligne), en les initialisant si nécessaire."""
+    db_stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if db_stats is None:
+        logger.info(f"Initialisation des compteurs du dashboard pour l'utilisateur {user_id}")
+        return refresh_user_counters(db, user_id)
+    return {key: getattr(db_stats, column) for key, column in COUNTER_COLUMNS.items()}
@@ -0,0 +1,147 @@
+"""
+Archives ZIP d'un programme complet (export / import, routers/curriculum.py).
+
+Contenu de l'archive :
+- manifest.json : progressions, séquences, séances, ressources et objectifs avec leurs
+  liens (schéma CurriculumManifest), écrit en premier ;
+- files/<sha256><extension> : le fichier de chaque ressource, une seule fois par contenu
+  (files/legacy/<id><extension> pour les fichiers antérieurs au stockage par contenu).
+
+Export : l'archive est produite au fil de l'envoi (`iter_curriculum_archive`, générateur
+synchrone itéré par StreamingResponse dans le pool de threads). ZipFile écrit dans un
+tampon non positionnable, vidé après chaque bloc : les en-têtes locaux utilisent des
+descripteurs de données (tailles et CRC écrits après le contenu) et la mémoire utilisée
+ne dépend pas de la taille de l'archive. Les médias (déjà compressés) sont stockés sans
+compression.
+
+Import : l'archive reçue est lue depuis le fichier temporaire de l'upload ; chaque fichier
+est copié en flux dans le stockage par contenu (`store_archive_files`).
+"""
+import io
+import json
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+import zipfile
+import logging
+
+from config import get_settings
+from file_storage import StoredUpload, discard_staged_blob, store_stream_blob
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# Taille maximale du manifeste décompressé (métadonnées seulement)
+MANIFEST_MAX_BYTES = 64 * 1024 * 1024
+# Types compressés dans l'archive ; les autres (images, audio, vidéo, PDF) sont stockés tels quels
+DEFLATED_SUFFIXES = {".txt", ".json"}
+
+class CurriculumArchiveError(ValueError):
+    """Archive illisible ou incomplète."""
+
+class _StreamBuffer(io.RawIOBase):
+    """Sortie non positionnable de ZipFile : accumule les octets écrits jusqu'au prochain `drain`."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_curriculum_archive(manifest_json: bytes, files: Dict[str, str]) -> Iterator[bytes]:
+    """Produit l'archive ZIP bloc par bloc.
+
+    Args:
+        manifest_json (bytes): Le manifeste sérialisé
+        files (Dict[str, str]): Chemin dans l'archive -> chemin relatif à UPLOADS_BASE_DIR
+    """
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    output = _StreamBuffer()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        archive.writestr(MANIFEST_NAME, manifest_json)
+        yield output.drain()
+        for archive_path, relative_path in files.items():
+            source_path = settings.UPLOADS_BASE_DIR / relative_path
+            compression = zipfile.ZIP_DEFLATED if source_path.suffix.lower() in DEFLATED_SUFFIXES else zipfile.ZIP_STORED
+            info = zipfile.ZipInfo(archive_path)
+            info.compress_type = compression
+            try:
+                source = open(source_path, "rb")
+            except FileNotFoundError:
+                # Vérifié avant l'envoi : ne peut arriver que si le fichier a été supprimé entre-temps
+                logger.error(f"Fichier introuvable pendant l'export, ignoré : {source_path}")
+                continue
+            with source, archive.open(info, "w", force_zip64=True) as entry:
+                while data := source.read(chunk_size):
+                    entry.write(data)
+                    yield output.drain()
+            yield output.drain()
+    # Répertoire central, écrit à la fermeture de l'archive
+    yield output.drain()
+
+def existing_files(files: Dict[str, str]) -> Dict[str, str]:
+    """Fichiers présents sur le disque (les absents sont signalés et exclus de l'export)."""
+    present = {}
+    for archive_path, relative_path in files.items():
+        if (settings.UPLOADS_BASE_DIR / relative_path).is_file():
+            present[archive_path] = relative_path
+        else:
+            logger.warning(f"Fichier d'une ressource introuvable, exclu de l'export : {relative_path}")
+    return present
+
+def read_manifest(archive: zipfile.ZipFile) -> dict:
+    """Lit et décode manifest.json (taille bornée)."""
+    try:
+        info = archive.getinfo(MANIFEST_NAME)
+    except KeyError:
+        raise CurriculumArchiveError(f"{MANIFEST_NAME} absent de l'archive")
+    if info.file_size > MANIFEST_MAX_BYTES:
+        raise CurriculumArchiveError(f"{MANIFEST_NAME} dépasse {MANIFEST_MAX_BYTES} octets")
+    with archive.open(info) as entry:
+        data = entry.read(MANIFEST_MAX_BYTES + 1)
+    if len(data) > MANIFEST_MAX_BYTES:
+        raise CurriculumArchiveError(f"{MANIFEST_NAME} dépasse {MANIFEST_MAX_BYTES} octets")
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        raise CurriculumArchiveError(f"{MANIFEST_NAME} invalide : {e}")
+
+def open_archive(source: BinaryIO) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise CurriculumArchiveError(f"Archive ZIP invalide : {e}")
+
+def store_archive_files(archive: zipfile.ZipFile, archive_paths: List[str], max_size: int, stored: Dict[str, StoredUpload]):
+    """Copie les fichiers de l'archive dans le stockage par contenu (fonction bloquante).
+
+    Chaque fichier copié est ajouté à `stored` (chemin dans l'archive -> blob) au fur et à
+    mesure : l'appelant supprime ensuite les fichiers reçus non publiés (`discard_staged_files`).
+
+    Raises:
+        CurriculumArchiveError: Fichier absent de l'archive ou archive corrompue
+        UploadTooLargeError, UploadTypeNotAllowedError: Fichier refusé (voir file_storage)
+    """
+    for archive_path in archive_paths:
+        try:
+            info = archive.getinfo(archive_path)
+        except KeyError:
+            raise CurriculumArchiveError(f"{archive_path} absent de l'archive")
+        try:
+            with archive.open(info) as entry:
+                stored[archive_path] = store_stream_blob(entry, max_size)
+        except (zipfile.BadZipFile, EOFError) as e:
+            raise CurriculumArchiveError(f"{archive_path} illisible : {e}")
+
+def discard_staged_files(stored: Iterable[StoredUpload]):
+    """Supprime les fichiers reçus qui n'ont pas été publiés par l'import (voir crud.blob.acquire_blob)."""
+    for upload in stored:
+        discard_staged_blob(upload.staged_path)
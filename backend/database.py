@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from config import get_settings
 import os
 import logging
@@ -91,6 +92,42 @@ except Exception as e:
     logger.error(f"Erreur lors du test de connexion: {e}")
     raise
 
+# --- Moteur asynchrone (routeurs FastAPI) ---
+# Le moteur synchrone ci-dessus reste utilisé par init_db.py / populate_db.py / Alembic.
+
+def get_async_database_url(url: str) -> str:
+    """Convertit l'URL synchrone (psycopg2 / sqlite) vers le driver asynchrone équivalent."""
+    if url.startswith("postgres://"):
+        # Render fournit parfois l'ancien schéma 'postgres://'
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql+psycopg2://"):
+        url = "postgresql://" + url[len("postgresql+psycopg2://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+async_connect_args = {}
+if settings.ENV == "production":
+    # asyncpg n'accepte pas 'sslmode', il attend 'ssl'
+    async_connect_args["ssl"] = "require"
+
+ASYNC_SQLALCHEMY_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    pool_timeout=pool_timeout,
+    pool_recycle=pool_recycle,
+    connect_args=async_connect_args
+)
+logger.info("Moteur SQLAlchemy asynchrone créé avec succès")
+
+# expire_on_commit=False : les objets restent lisibles après commit sans nouvel aller-retour
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base de données
 Base = declarative_base()
 
@@ -100,3 +137,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dépendance FastAPI fournissant une AsyncSession (une par requête)."""
+    async with AsyncSessionLocal() as db:
+        yield db
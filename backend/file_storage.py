@@ -0,0 +1,389 @@
+"""
+Enregistrement en flux des fichiers uploadés.
+
+Le fichier est lu par blocs de taille fixe et écrit dans un fichier temporaire du
+même répertoire que la destination. Pendant la copie :
+- la taille maximale (MAX_UPLOAD_SIZE_MB) est vérifiée à chaque bloc (abandon immédiat),
+- le SHA-256 est calculé au fil de l'eau,
+- le type MIME est déterminé à partir des premiers octets (le Content-Type du client
+  n'est pas utilisé).
+Le fichier temporaire est ensuite renommé atomiquement vers sa destination : un fichier
+visible sur le disque est donc toujours complet. La mémoire utilisée ne dépend pas de la
+taille du fichier.
+
+Les fichiers des ressources sont stockés par contenu (`store_upload_blob`) :
+UPLOADS_BASE_DIR/blobs/<sha[0:2]>/<sha[2:4]>/<sha><extension> ; les références sont
+comptées dans la table `blobs` (crud.blob). Le contenu reçu est d'abord écrit dans un
+fichier temporaire ("staged") du dossier des blobs ; il n'est publié vers son chemin
+(`publish_staged_blob`, renommage atomique) que par `crud.blob.acquire_blob`, dans la
+transaction qui crée la ligne du blob ; si le contenu est déjà référencé, le fichier
+temporaire est supprimé et seul le compteur est incrémenté. Un blob qui n'est plus référencé
+n'est supprimé (ligne puis fichier, `crud.blob.purge_blob`) qu'après le commit de la
+transaction qui a retiré sa dernière référence : une transaction annulée ne perd aucun
+fichier, et les verrous de la base ordonnent publication et suppression d'un même contenu.
+
+Les uploads reprenables (routers/upload.py) stockent chaque bloc reçu dans
+UPLOADS_BASE_DIR/upload_sessions/<id>/ ; `assemble_chunks_to_blob` les concatène
+ensuite vers le stockage par contenu, par copie en flux. Les fichiers d'une archive
+importée (curriculum_archive.py) y sont copiés par `store_stream_blob`.
+"""
+from dataclasses import dataclass
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import AsyncIterator, BinaryIO, List, Optional
+import uuid
+import logging
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from config import get_settings
+from metrics import registry
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Nombre d'octets nécessaires pour reconnaître les formats supportés
+SNIFF_BYTES = 512
+
+# Sous-répertoire de UPLOADS_BASE_DIR contenant les blobs
+BLOBS_DIR_NAME = "blobs"
+# Sous-répertoire de UPLOADS_BASE_DIR contenant les blocs des uploads reprenables
+UPLOAD_SESSIONS_DIR_NAME = "upload_sessions"
+CHUNK_FILE_PREFIX = "chunk_"
+
+# kind : "file" (upload direct d'une ressource) ou "chunk" (bloc d'un upload reprenable)
+UPLOAD_BYTES = registry.counter("upload_bytes_total", "Octets d'upload reçus et enregistrés", ["kind"])
+UPLOAD_SECONDS = registry.histogram(
+    "upload_duration_seconds", "Durée de réception et d'enregistrement d'un upload", ["kind", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+class UploadTooLargeError(Exception):
+    """Le fichier dépasse la taille maximale autorisée."""
+    def __init__(self, max_size: int):
+        super().__init__(f"Le fichier dépasse la taille maximale de {max_size} octets")
+        self.max_size = max_size
+
+class UploadTypeNotAllowedError(Exception):
+    """Le contenu du fichier ne correspond à aucun type MIME autorisé."""
+    def __init__(self, mime_type: Optional[str]):
+        super().__init__(f"Type de fichier non autorisé: {mime_type or 'inconnu'}")
+        self.mime_type = mime_type
+
+class UploadChunkSizeError(Exception):
+    """Le bloc reçu n'a pas la taille attendue."""
+    def __init__(self, expected_size: int, received_size: int):
+        super().__init__(f"Taille de bloc invalide: {received_size} octets reçus, {expected_size} attendus")
+        self.expected_size = expected_size
+        self.received_size = received_size
+
+@dataclass(frozen=True)
+class UploadDigest:
+    """Taille, SHA-256 et type MIME détecté d'un upload."""
+    size: int
+    sha256: str
+    mime_type: str
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """Résultat d'un upload enregistré sur le disque."""
+    path: Path
+    size: int
+    sha256: str
+    mime_type: str
+    # False si le contenu était déjà présent à la réception
+    created: bool = True
+    # Fichier temporaire à publier par crud.blob.acquire_blob (None : déjà à son chemin final)
+    staged_path: Optional[Path] = None
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """Détermine le type MIME d'un fichier à partir de ses premiers octets.
+
+    Seuls les formats de `ALLOWED_UPLOAD_MIME_TYPES` sont reconnus ; renvoie None sinon.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if len(head) >= 12 and head[4:8] == b"ftyp":
+        return "video/mp4"
+    if head.startswith(b"ID3") or (len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0):
+        return "audio/mpeg"
+    if b"\x00" not in head:
+        try:
+            # Le bloc peut couper un caractère multi-octets : ignorer une fin incomplète
+            head.decode("utf-8")
+            return "text/plain"
+        except UnicodeDecodeError as e:
+            if e.start >= len(head) - 3 and e.reason == "unexpected end of data":
+                return "text/plain"
+    return None
+
+async def _copy_checked(file: UploadFile, max_size: int, chunk_size: int, buffer=None) -> UploadDigest:
+    """Lit l'upload par blocs en vérifiant taille et type ; écrit chaque bloc dans `buffer` si fourni."""
+    hasher = hashlib.sha256()
+    size = 0
+    mime_type: Optional[str] = None
+    head = b""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            logger.warning(f"Upload '{file.filename}' interrompu: plus de {max_size} octets")
+            raise UploadTooLargeError(max_size)
+        if mime_type is None and len(head) < SNIFF_BYTES:
+            head += chunk[:SNIFF_BYTES - len(head)]
+            if len(head) >= SNIFF_BYTES:
+                mime_type = _check_mime_type(head)
+        hasher.update(chunk)
+        if buffer is not None:
+            await run_in_threadpool(buffer.write, chunk)
+    if mime_type is None:
+        # Fichier plus petit que SNIFF_BYTES
+        mime_type = _check_mime_type(head)
+    return UploadDigest(size=size, sha256=hasher.hexdigest(), mime_type=mime_type)
+
+def get_blob_storage_path(sha256: str, mime_type: str) -> str:
+    """Chemin du blob relatif à UPLOADS_BASE_DIR (extension déduite du type, pour le service des médias)."""
+    extension = mimetypes.guess_extension(mime_type) or ""
+    return f"{BLOBS_DIR_NAME}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+def _staging_path() -> Path:
+    """Nouveau fichier temporaire du dossier des blobs (même système de fichiers : publication par renommage)."""
+    blobs_dir = settings.UPLOADS_BASE_DIR / BLOBS_DIR_NAME
+    blobs_dir.mkdir(parents=True, exist_ok=True)
+    return blobs_dir / f".staged.{uuid.uuid4().hex}.part"
+
+def _staged_upload(staged_path: Path, size: int, sha256: str, mime_type: str) -> StoredUpload:
+    path = settings.UPLOADS_BASE_DIR / get_blob_storage_path(sha256, mime_type)
+    return StoredUpload(path=path, size=size, sha256=sha256, mime_type=mime_type, created=not path.exists(), staged_path=staged_path)
+
+def publish_staged_blob(staged_path: Optional[Path], storage_path: str):
+    """Publie un fichier temporaire vers le chemin de son blob (renommage atomique).
+
+    Appelé par `crud.blob.acquire_blob` seulement lorsque le blob n'était pas référencé ;
+    un fichier laissé par un blob précédent (même contenu) est remplacé.
+    """
+    if staged_path is None or not Path(staged_path).exists():
+        return
+    destination = settings.UPLOADS_BASE_DIR / storage_path
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged_path, destination)
+
+def discard_staged_blob(staged_path: Optional[Path]):
+    """Supprime un fichier temporaire non publié (requête refusée ou annulée)."""
+    if staged_path is not None:
+        Path(staged_path).unlink(missing_ok=True)
+
+async def store_upload_blob(file: UploadFile, max_size: Optional[int] = None) -> StoredUpload:
+    """Reçoit un upload destiné au stockage par contenu.
+
+    Le contenu est copié dans un fichier temporaire tout en étant haché et contrôlé
+    (taille, type) ; il est publié par `crud.blob.acquire_blob`. L'appelant supprime le
+    fichier temporaire s'il n'a pas été publié (`discard_staged_blob`).
+
+    Raises:
+        UploadTooLargeError, UploadTypeNotAllowedError: comme `save_upload_file`
+    """
+    max_size = max_size if max_size is not None else settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    started_at = time.perf_counter()
+    staged_path = _staging_path()
+    try:
+        with open(staged_path, "wb") as buffer:
+            digest = await _copy_checked(file, max_size, chunk_size, buffer=buffer)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+    except BaseException:
+        staged_path.unlink(missing_ok=True)
+        UPLOAD_SECONDS.observe(time.perf_counter() - started_at, kind="file", outcome="error")
+        raise
+    stored = _staged_upload(staged_path, digest.size, digest.sha256, digest.mime_type)
+    if not stored.created:
+        logger.info(f"Contenu déjà stocké ({digest.sha256[:12]}...): {stored.path}")
+    UPLOAD_SECONDS.observe(time.perf_counter() - started_at, kind="file", outcome="ok")
+    UPLOAD_BYTES.inc(stored.size, kind="file")
+    return stored
+
+async def save_upload_file(
+    file: UploadFile,
+    destination: Path,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> StoredUpload:
+    """Copie un UploadFile vers `destination` par blocs, avec contrôles de taille et de type.
+
+    Args:
+        file (UploadFile): Le fichier reçu
+        destination (Path): Chemin final du fichier
+        max_size (int, optional): Taille maximale en octets. Defaults to MAX_UPLOAD_SIZE_MB.
+        chunk_size (int, optional): Taille des blocs lus. Defaults to UPLOAD_CHUNK_SIZE_KB.
+
+    Raises:
+        UploadTooLargeError: Si la taille dépasse `max_size` (le fichier partiel est supprimé)
+        UploadTypeNotAllowedError: Si le contenu ne correspond à aucun type autorisé
+
+    Returns:
+        StoredUpload: Chemin, taille, SHA-256 et type MIME détecté
+    """
+    max_size = max_size if max_size is not None else settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE_KB * 1024
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # Fichier temporaire dans le même répertoire : le renommage final reste atomique
+    temp_path = destination.parent / f".{destination.name}.{uuid.uuid4().hex}.part"
+
+    try:
+        with open(temp_path, "wb") as buffer:
+            digest = await _copy_checked(file, max_size, chunk_size, buffer=buffer)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+        os.replace(temp_path, destination)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    stored = StoredUpload(path=destination, size=digest.size, sha256=digest.sha256, mime_type=digest.mime_type)
+    logger.info(f"Fichier enregistré: {destination} ({stored.size} octets, {stored.mime_type}, sha256={stored.sha256[:12]}...)")
+    return stored
+
+def _check_mime_type(head: bytes) -> str:
+    mime_type = sniff_mime_type(head)
+    if mime_type not in settings.ALLOWED_UPLOAD_MIME_TYPES:
+        raise UploadTypeNotAllowedError(mime_type)
+    return mime_type
+
+# --- Uploads reprenables : blocs sur le disque ---
+
+def get_upload_session_dir(upload_id: str) -> Path:
+    """Répertoire des blocs d'une session d'upload."""
+    return settings.UPLOADS_BASE_DIR / UPLOAD_SESSIONS_DIR_NAME / upload_id
+
+def get_chunk_path(upload_id: str, index: int) -> Path:
+    return get_upload_session_dir(upload_id) / f"{CHUNK_FILE_PREFIX}{index:06d}"
+
+def list_received_chunks(upload_id: str) -> List[int]:
+    """Index des blocs complètement reçus (les fichiers temporaires sont ignorés)."""
+    session_dir = get_upload_session_dir(upload_id)
+    if not session_dir.is_dir():
+        return []
+    return sorted(
+        int(path.name[len(CHUNK_FILE_PREFIX):])
+        for path in session_dir.iterdir()
+        if path.name.startswith(CHUNK_FILE_PREFIX)
+    )
+
+async def save_chunk(stream: AsyncIterator[bytes], upload_id: str, index: int, expected_size: int) -> int:
+    """Écrit un bloc reçu en flux, en vérifiant qu'il fait exactement `expected_size` octets.
+
+    Le bloc est écrit dans un fichier temporaire puis renommé : un bloc présent sur le
+    disque est toujours complet, et renvoyer un bloc déjà reçu le remplace simplement.
+
+    Raises:
+        UploadChunkSizeError: Si la taille reçue diffère de `expected_size`
+    """
+    destination = get_chunk_path(upload_id, index)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = destination.parent / f".{destination.name}.{uuid.uuid4().hex}.part"
+    size = 0
+    started_at = time.perf_counter()
+    try:
+        with open(temp_path, "wb") as buffer:
+            async for data in stream:
+                size += len(data)
+                if size > expected_size:
+                    raise UploadChunkSizeError(expected_size, size)
+                await run_in_threadpool(buffer.write, data)
+            if size != expected_size:
+                raise UploadChunkSizeError(expected_size, size)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+        os.replace(temp_path, destination)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        UPLOAD_SECONDS.observe(time.perf_counter() - started_at, kind="chunk", outcome="error")
+        raise
+    UPLOAD_SECONDS.observe(time.perf_counter() - started_at, kind="chunk", outcome="ok")
+    UPLOAD_BYTES.inc(size, kind="chunk")
+    return size
+
+def assemble_chunks_to_blob(upload_id: str, chunk_count: int, max_size: int) -> StoredUpload:
+    """Assemble les blocs d'une session vers le stockage par contenu (fonction bloquante).
+
+    Les blocs sont concaténés en flux dans un fichier temporaire tout en étant hachés ;
+    le fichier est publié par `crud.blob.acquire_blob` (voir `store_upload_blob`).
+    La mémoire utilisée ne dépend ni de la taille des blocs ni de celle du fichier.
+    """
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    staged_path = _staging_path()
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with open(staged_path, "wb") as buffer:
+            for index in range(chunk_count):
+                with open(get_chunk_path(upload_id, index), "rb") as part:
+                    while data := part.read(chunk_size):
+                        size += len(data)
+                        if size > max_size:
+                            raise UploadTooLargeError(max_size)
+                        if len(head) < SNIFF_BYTES:
+                            head += data[:SNIFF_BYTES - len(head)]
+                        hasher.update(data)
+                        buffer.write(data)
+            mime_type = _check_mime_type(head)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+    except BaseException:
+        staged_path.unlink(missing_ok=True)
+        raise
+    stored = _staged_upload(staged_path, size, hasher.hexdigest(), mime_type)
+    logger.info(f"Upload {upload_id} assemblé ({size} octets, {mime_type}, sha256={stored.sha256[:12]}...)")
+    return stored
+
+def store_stream_blob(source: BinaryIO, max_size: int) -> StoredUpload:
+    """Copie un flux (ex: entrée d'une archive ZIP) vers le stockage par contenu (fonction bloquante).
+
+    Une seule lecture : le contenu est écrit dans un fichier temporaire tout en étant haché ;
+    il est publié par `crud.blob.acquire_blob` (voir `store_upload_blob`).
+
+    Raises:
+        UploadTooLargeError, UploadTypeNotAllowedError: comme `save_upload_file`
+    """
+    chunk_size = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    staged_path = _staging_path()
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with open(staged_path, "wb") as buffer:
+            while data := source.read(chunk_size):
+                size += len(data)
+                if size > max_size:
+                    raise UploadTooLargeError(max_size)
+                if len(head) < SNIFF_BYTES:
+                    head += data[:SNIFF_BYTES - len(head)]
+                hasher.update(data)
+                buffer.write(data)
+            mime_type = _check_mime_type(head)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+    except BaseException:
+        staged_path.unlink(missing_ok=True)
+        raise
+    return _staged_upload(staged_path, size, hasher.hexdigest(), mime_type)
+
+def remove_upload_session_dir(upload_id: str):
+    """Supprime les blocs d'une session d'upload (terminée, annulée ou expirée)."""
+    shutil.rmtree(get_upload_session_dir(upload_id), ignore_errors=True)
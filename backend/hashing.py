@@ -1,7 +1,15 @@
+import asyncio
 import bcrypt
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Configuration de bcrypt
-bcrypt_rounds = 12  # Nombre de tours pour le hachage
+bcrypt_rounds = settings.BCRYPT_ROUNDS  # Nombre de tours pour le hachage
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifie si un mot de passe en clair correspond à un mot de passe haché."""
@@ -11,3 +19,52 @@ def get_password_hash(password: str) -> str:
     """Hache un mot de passe en utilisant bcrypt."""
     salt = bcrypt.gensalt(rounds=bcrypt_rounds)
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Indique si un hash a été calculé avec un nombre de tours différent de `bcrypt_rounds`."""
+    # Format bcrypt : $2b$<tours>$<sel+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+# --- Pool dédié au hachage (bcrypt libère le GIL : des threads suffisent) ---
+
+class PasswordHashingBusyError(Exception):
+    """Levée lorsque la file d'attente du pool de hachage est pleine."""
+    def __init__(self, retry_after: int):
+        super().__init__("Pool de hachage des mots de passe saturé")
+        self.retry_after = retry_after
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_pending = 0
+_pending_lock = threading.Lock()
+
+async def _run_in_pool(fn, *args):
+    """Exécute `fn` dans le pool de hachage, ou lève PasswordHashingBusyError si la file est pleine.
+
+    Au plus `PASSWORD_HASH_WORKERS` calculs tournent en parallèle et au plus
+    `PASSWORD_HASH_MAX_PENDING` demandes (en cours + en attente) sont acceptées.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            logger.warning(f"Pool de hachage saturé ({_pending} demandes en attente), requête refusée")
+            raise PasswordHashingBusyError(retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+        _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Version non bloquante de `verify_password` (exécutée dans le pool de hachage)."""
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Version non bloquante de `get_password_hash` (exécutée dans le pool de hachage)."""
+    return await _run_in_pool(get_password_hash, password)
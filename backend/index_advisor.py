@@ -0,0 +1,186 @@
+"""
+Conseiller d'index : exécute EXPLAIN sur les requêtes des fonctions CRUD courantes et
+signale les parcours séquentiels (table lue en entier faute d'index utilisable).
+
+Chaque fonction enregistrée dans ADVISED_QUERIES est exécutée sur la base configurée
+(DATABASE_URL), avec les ids d'un utilisateur existant ; les SELECT émis sont capturés
+puis passés à EXPLAIN. À lancer depuis le dossier backend, sur une base peuplée
+(ex: après populate_db.py) :
+
+    python index_advisor.py               # utilisateur ayant le plus de ressources
+    python index_advisor.py --user-id 3 --verbose
+
+- PostgreSQL : l'analyse se fait avec `enable_seqscan = off`, pour que le planificateur
+  n'écarte pas un index parce que la base de test est petite ; un « Seq Scan » restant
+  signifie qu'aucun index ne permet la requête.
+- SQLite : EXPLAIN QUERY PLAN ; un « SCAN <table> » sans « USING INDEX » est signalé.
+
+Une fonction qui lève ValueError (ex: aucune séquence pour l'utilisateur, id d'exemple
+absent) est signalée comme ignorée, sans interrompre l'analyse.
+
+Le code de sortie vaut 1 si un parcours séquentiel est détecté (utilisable en CI).
+"""
+from dotenv import load_dotenv
+
+# Charger les variables d'environnement AVANT d'importer database.py
+load_dotenv()
+
+import argparse
+import re
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+import crud
+from crud import chat_session, dashboard, job, tree
+from database import SessionLocal, engine
+from models import Objective, Progression, Resource, Sequence, Session as SessionModel, User
+from models.resource import ResourceSubType
+
+# Référentiels de quelques lignes : un parcours complet y est normal
+IGNORED_TABLES = {"resource_types", "resource_subtypes"}
+
+_SQLITE_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+SampleIds = Dict[str, int]
+
+# Requêtes analysées : nom -> fonction (session, ids d'exemple) appelant le CRUD
+ADVISED_QUERIES: Dict[str, Callable[[Session, SampleIds], Any]] = {
+    "ressources de l'utilisateur": lambda db, ids: crud.get_resources(db, user_id=ids["user_id"]),
+    "ressources, page suivante": lambda db, ids: crud.get_resources(db, user_id=ids["user_id"], after=(ids["resource_id"],)),
+    "ressources d'une séance": lambda db, ids: crud.get_resources_by_session(db, session_id=ids["session_id"], user_id=ids["user_id"]),
+    "ressources sans séance": lambda db, ids: crud.get_resources_standalone(db, user_id=ids["user_id"]),
+    "nombre de ressources": lambda db, ids: crud.resource.count_resources(db, user_id=ids["user_id"]),
+    "séquences de l'utilisateur": lambda db, ids: crud.get_sequences(db, user_id=ids["user_id"]),
+    "séquences d'une progression": lambda db, ids: crud.get_sequences_by_progression(db, progression_id=ids["progression_id"], user_id=ids["user_id"]),
+    "séquences sans séance": lambda db, ids: crud.sequence.get_sequences_with_no_sessions(db, user_id=ids["user_id"]),
+    "séances d'une séquence": lambda db, ids: crud.get_sessions_by_sequence(db, sequence_id=ids["sequence_id"], user_id=ids["user_id"]),
+    "séances sans ressource": lambda db, ids: crud.session.get_sessions_with_no_resources(db, user_id=ids["user_id"]),
+    "progressions de l'utilisateur": lambda db, ids: crud.get_progressions(db, user_id=ids["user_id"]),
+    "progressions sans séquence": lambda db, ids: crud.progression.get_progressions_with_no_sequences(db, user_id=ids["user_id"]),
+    "objectifs d'une séquence": lambda db, ids: crud.get_objectives_by_sequence(db, sequence_id=ids["sequence_id"]),
+    "objectifs d'une séance": lambda db, ids: crud.get_objectives_by_session(db, session_id=ids["session_id"]),
+    "séquences d'un objectif": lambda db, ids: crud.get_sequences_by_objective(db, objective_id=ids["objective_id"]),
+    "séances d'un objectif": lambda db, ids: crud.get_sessions_by_objective(db, objective_id=ids["objective_id"]),
+    "sous-types d'un type": lambda db, ids: crud.get_resource_subtypes(db, type_id=ids["type_id"]),
+    "arbre pédagogique": lambda db, ids: tree.get_user_tree(db, user_id=ids["user_id"]),
+    "tableau de bord": lambda db, ids: dashboard.get_dashboard_aggregates(db, user_id=ids["user_id"]),
+    "conversations IA": lambda db, ids: chat_session.get_chat_sessions(db, user_id=ids["user_id"]),
+    "tâches de fond": lambda db, ids: job.get_jobs(db, user_id=ids["user_id"]),
+}
+
+def sample_ids(db: Session, user_id: int = None) -> SampleIds:
+    """Ids d'exemple : l'utilisateur (par défaut celui qui a le plus de ressources) et ses premiers éléments."""
+    if user_id is None:
+        user_id = (
+            db.query(Resource.user_id)
+            .group_by(Resource.user_id)
+            .order_by(func.count(Resource.id).desc())
+            .limit(1)
+            .scalar()
+        ) or db.query(func.min(User.id)).scalar()
+    if user_id is None:
+        raise ValueError("La base ne contient aucun utilisateur (lancer populate_db.py)")
+
+    def first_id(query) -> int:
+        # 0 si absent : les fonctions qui vérifient l'existence de l'élément sont ignorées (run_advisor)
+        return query.scalar() or 0
+
+    # Séquences et séances rattachées via la progression (Sequence.user_id / Session.user_id
+    # ne sont pas renseignés par l'API)
+    sequences = db.query(func.min(Sequence.id)).join(Progression, Sequence.progression_id == Progression.id)
+    sessions = (
+        db.query(func.min(SessionModel.id))
+        .join(Sequence, SessionModel.sequence_id == Sequence.id)
+        .join(Progression, Sequence.progression_id == Progression.id)
+    )
+    return {
+        "user_id": user_id,
+        "progression_id": first_id(db.query(func.min(Progression.id)).filter(Progression.user_id == user_id)),
+        "sequence_id": first_id(sequences.filter(Progression.user_id == user_id)),
+        "session_id": first_id(sessions.filter(Progression.user_id == user_id)),
+        "resource_id": first_id(db.query(func.min(Resource.id)).filter(Resource.user_id == user_id)),
+        "objective_id": first_id(db.query(func.min(Objective.id))),
+        "type_id": db.query(func.min(ResourceSubType.type_id)).scalar() or 0,
+    }
+
+def capture_selects(db: Session, fn: Callable[[Session, SampleIds], Any], ids: SampleIds) -> List[Tuple[str, Any]]:
+    """Exécute `fn` et retourne les SELECT émis (requête, paramètres). Rien n'est écrit."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn(db, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.rollback()
+    return captured
+
+def explain(conn, statement: str, parameters: Any) -> Tuple[List[str], List[str]]:
+    """Plan d'exécution d'une requête et tables lues séquentiellement."""
+    if engine.dialect.name == "postgresql":
+        plan = [row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters)]
+        scanned = [match.group(1) for line in plan for match in [_POSTGRES_SCAN_RE.search(line)] if match]
+    else:
+        plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        scanned = [
+            match.group(1) for line in plan for match in [_SQLITE_SCAN_RE.match(line)]
+            if match and "USING" not in line and not line.startswith("SCAN CONSTANT ROW")
+        ]
+    # Alias générés par SQLAlchemy (resource_types_1) : ramenés au nom de la table
+    scanned = [table for table in scanned if re.sub(r"_\d+$", "", table) not in IGNORED_TABLES]
+    return plan, scanned
+
+def run_advisor(user_id: int = None, verbose: bool = False) -> int:
+    """Analyse toutes les requêtes enregistrées ; retourne le nombre de requêtes signalées."""
+    db = SessionLocal()
+    try:
+        ids = sample_ids(db, user_id)
+        print(f"Base : {engine.dialect.name}, ids d'exemple : {ids}")
+        flagged = 0
+        skipped = 0
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            for name, fn in ADVISED_QUERIES.items():
+                try:
+                    statements = capture_selects(db, fn, ids)
+                except ValueError as e:
+                    skipped += 1
+                    print(f"[ignorée] {name} : {e}")
+                    continue
+                for index, (statement, parameters) in enumerate(statements, start=1):
+                    plan, scanned = explain(conn, statement, parameters)
+                    label = name if len(statements) == 1 else f"{name} ({index}/{len(statements)})"
+                    if scanned:
+                        flagged += 1
+                        print(f"[PARCOURS SÉQUENTIEL] {label} : {', '.join(sorted(set(scanned)))}")
+                    else:
+                        print(f"[ok] {label}")
+                    if verbose or scanned:
+                        print("    " + " ".join(statement.split())[:300])
+                        for line in plan:
+                            print(f"      {line}")
+            conn.rollback()
+        print(f"{len(ADVISED_QUERIES) - skipped} fonction(s) analysée(s), {skipped} ignorée(s), {flagged} requête(s) à indexer")
+        return flagged
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signale les requêtes CRUD qui lisent une table en entier.")
+    parser.add_argument("--user-id", type=int, default=None, help="Utilisateur dont les ids servent d'exemple")
+    parser.add_argument("--verbose", action="store_true", help="Afficher le plan de toutes les requêtes")
+    args = parser.parse_args()
+    try:
+        sys.exit(1 if run_advisor(args.user_id, args.verbose) else 0)
+    except ValueError as e:
+        print(f"Erreur : {e}")
+        sys.exit(2)
@@ -0,0 +1,228 @@
+"""
+Tâches de fond exécutées dans le processus de l'API, avec une file durable (table `jobs`).
+
+Les routeurs mettent en file le travail long (génération IA, traitement de fichier) avec
+`enqueue(...)` et répondent immédiatement 202 ; le client suit la tâche sur /api/v1/jobs/{id}.
+
+- Handlers : fonctions `async def handler(job: JobContext) -> résultat JSON`, enregistrées
+  avec `@job_handler("kind")` à côté du code qui les met en file.
+- Workers : JOB_WORKER_CONCURRENCY boucles asyncio démarrées par le lifespan de l'app. Elles
+  prennent les tâches prêtes (crud.job.claim_next_job, sûr entre processus), réveillées
+  immédiatement par `enqueue` dans ce processus, sinon toutes les JOB_POLL_INTERVAL_SECONDS.
+- Échecs : une exception entraîne une nouvelle tentative après un délai exponentiel avec
+  gigue (JOB_RETRY_BASE_DELAY_SECONDS), jusqu'à JOB_MAX_ATTEMPTS ; ensuite la tâche passe
+  en 'dead' (lettres mortes, relançable via POST /jobs/{id}/retry). `JobPermanentError`
+  termine la tâche en 'failed' sans nouvelle tentative.
+- Arrêt : les tâches en cours sont annulées et remises en file ; après un arrêt brutal,
+  les tâches 'running' abandonnées sont reprises après JOB_STALE_AFTER_SECONDS.
+"""
+from dataclasses import dataclass, field
+import asyncio
+import os
+import random
+import socket
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from crud import aio as crud_aio
+from database import AsyncSessionLocal
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Intervalle minimal entre deux écritures de l'avancement d'une tâche
+PROGRESS_MIN_INTERVAL_SECONDS = 1.0
+# Intervalle de la maintenance (tâches abandonnées, purge des tâches réussies)
+MAINTENANCE_INTERVAL_SECONDS = 300
+
+class JobPermanentError(Exception):
+    """Erreur définitive d'un handler (donnée invalide, ressource supprimée...) : pas de nouvelle tentative."""
+
+@dataclass
+class JobContext:
+    """Tâche transmise au handler : données, propriétaire, tentative, et suivi de l'avancement."""
+    id: int
+    kind: str
+    user_id: Optional[int]
+    payload: Dict[str, Any]
+    attempt: int
+    _last_progress_at: float = field(default=0.0, repr=False)
+
+    async def set_progress(self, done: int, total: int):
+        """Enregistre l'avancement (au plus une écriture par seconde, sauf à la fin)."""
+        now = time.monotonic()
+        if done < total and now - self._last_progress_at < PROGRESS_MIN_INTERVAL_SECONDS:
+            return
+        self._last_progress_at = now
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud_aio.update_job_progress(db, job_id=self.id, progress=done / total if total else 1.0)
+        except Exception as e:
+            # L'avancement est indicatif : ne pas faire échouer la tâche pour autant
+            logger.warning(f"Avancement de la tâche {self.id} non enregistré: {e}")
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+_handlers: Dict[str, JobHandler] = {}
+
+def job_handler(kind: str):
+    """Décorateur : enregistre le handler des tâches de type `kind`."""
+    def decorator(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+def retry_delay(attempt: int) -> float:
+    """Délai avant la tentative suivante : base * 2^(tentative-1), avec une gigue de 50 à 100 %."""
+    return settings.JOB_RETRY_BASE_DELAY_SECONDS * 2 ** max(attempt - 1, 0) * random.uniform(0.5, 1.0)
+
+class JobWorkerPool:
+    """Boucles de workers du processus, avec compteurs pour la supervision."""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.running = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.dead = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Démarre les workers (appelé par le lifespan de l'app)."""
+        if not settings.JOBS_ENABLED or self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(index), name=f"job-worker-{index}")
+            for index in range(max(settings.JOB_WORKER_CONCURRENCY, 1))
+        ]
+        self._tasks.append(asyncio.create_task(self._maintenance_loop(), name="job-maintenance"))
+        logger.info(f"{settings.JOB_WORKER_CONCURRENCY} worker(s) de tâches de fond démarré(s) ({self.worker_id})")
+
+    async def stop(self):
+        """Arrête les workers ; les tâches en cours sont remises en file."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+        if tasks:
+            logger.info("Workers de tâches de fond arrêtés")
+
+    def notify(self):
+        """Réveille un worker (appelé après une mise en file ; sûr depuis un autre thread)."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass  # Boucle fermée (arrêt en cours)
+
+    def _count(self, counter: str, delta: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + delta)
+
+    async def _worker_loop(self, index: int):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    db_job = await crud_aio.claim_next_job(db, worker_id=f"{self.worker_id}#{index}")
+            except Exception as e:
+                logger.error(f"Worker {index}: impossible de lire la file des tâches: {e}")
+                db_job = None
+            if db_job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._run(db_job)
+
+    async def _run(self, db_job):
+        job = JobContext(id=db_job.id, kind=db_job.kind, user_id=db_job.user_id, payload=db_job.payload or {}, attempt=db_job.attempts)
+        handler = _handlers.get(job.kind)
+        started_at = time.perf_counter()
+        self._count("running")
+        try:
+            if handler is None:
+                raise JobPermanentError(f"Aucun handler pour les tâches de type '{job.kind}'")
+            result = await asyncio.wait_for(handler(job), timeout=settings.JOB_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            # Arrêt du serveur : la tâche sera reprise au prochain démarrage
+            async with AsyncSessionLocal() as db:
+                await crud_aio.release_job(db, job_id=job.id)
+            raise
+        except JobPermanentError as e:
+            await self._record_failure(job, str(e), retry=False)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"Délai dépassé ({settings.JOB_TIMEOUT_SECONDS} s)"
+            logger.error(f"Tâche {job.id} ({job.kind}) en échec, tentative {job.attempt}: {error}", exc_info=not isinstance(e, asyncio.TimeoutError))
+            await self._record_failure(job, error, retry=True)
+        else:
+            async with AsyncSessionLocal() as db:
+                await crud_aio.complete_job(db, job_id=job.id, result=result)
+            self._count("succeeded")
+            logger.info(f"Tâche {job.id} ({job.kind}) réussie en {(time.perf_counter() - started_at) * 1000:.0f} ms")
+        finally:
+            self._count("running", -1)
+
+    async def _record_failure(self, job: JobContext, error: str, retry: bool):
+        async with AsyncSessionLocal() as db:
+            db_job = await crud_aio.fail_job(db, job_id=job.id, error=error, retry_delay_seconds=retry_delay(job.attempt) if retry else None)
+        status = db_job.status if db_job is not None else "failed"
+        self._count({"queued": "retried", "dead": "dead"}.get(status, "failed"))
+        if status == "dead":
+            logger.error(f"Tâche {job.id} ({job.kind}) en lettres mortes après {job.attempt} tentative(s): {error}")
+
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await crud_aio.requeue_stale_jobs(db, stale_after_seconds=settings.JOB_STALE_AFTER_SECONDS)
+                    purged = await crud_aio.purge_finished_jobs(db, older_than_days=settings.JOB_RETENTION_DAYS)
+                if purged:
+                    logger.info(f"{purged} tâche(s) réussie(s) purgée(s)")
+            except Exception as e:
+                logger.error(f"Maintenance des tâches de fond en échec: {e}")
+            await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs du processus (les totaux par statut sont dans la table jobs)."""
+        with self._lock:
+            return {
+                "workers": max(len(self._tasks) - 1, 0),
+                "running": self.running,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "failed": self.failed,
+                "dead": self.dead,
+            }
+
+job_workers = JobWorkerPool()
+
+async def enqueue(db, kind: str, payload: Dict[str, Any], user_id: Optional[int] = None, max_attempts: Optional[int] = None):
+    """Met une tâche en file et réveille un worker. Retourne la ligne `jobs` créée."""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    db_job = await crud_aio.create_job(
+        db, kind=kind, payload=payload, user_id=user_id,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+    )
+    job_workers.notify()
+    logger.info(f"Tâche {db_job.id} ({kind}) mise en file")
+    return db_job
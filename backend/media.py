@@ -0,0 +1,136 @@
+"""
+Service HTTP des fichiers média (ressources de type 'file').
+
+- Range : `FileResponse` (Starlette) gère `Range` / `If-Range` (lecture et avance rapide
+  des MP3/MP4 sans télécharger tout le fichier).
+- Validateurs : un fichier stocké par contenu (blobs/<sha>) a pour ETag fort son SHA-256 ;
+  les anciens fichiers (uploads/<user_id>/...) gardent l'ETag dérivé de mtime/taille.
+  `If-None-Match` puis `If-Modified-Since` donnent une réponse 304 sans lire le fichier.
+- Cache : une URL de blob ne change jamais de contenu -> `immutable` pendant un an ;
+  les autres fichiers doivent être revalidés (`no-cache`), ce qui coûte un 304.
+- Envoi sans copie : si MEDIA_ACCEL_REDIRECT_PREFIX est défini (nginx devant l'API),
+  la réponse ne contient qu'un en-tête `X-Accel-Redirect` et nginx envoie le fichier
+  lui-même (sendfile, Range inclus). Sinon le fichier est lu par blocs par l'application.
+"""
+from email.utils import parsedate_to_datetime
+import os
+from pathlib import Path
+import re
+from typing import Optional
+import logging
+
+from fastapi import HTTPException, Request
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Scope
+
+from file_storage import BLOBS_DIR_NAME, UPLOAD_SESSIONS_DIR_NAME
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={365 * 24 * 3600}, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Fichiers servis via l'API authentifiée : pas de cache partagé (proxy)
+PRIVATE_REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+def get_blob_sha256(relative_path: str) -> Optional[str]:
+    """SHA-256 d'un chemin de blob (blobs/aa/bb/<sha><ext>), ou None pour un autre fichier."""
+    path = Path(relative_path)
+    if not path.parts or path.parts[0] != BLOBS_DIR_NAME:
+        return None
+    sha256 = path.name.split(".", 1)[0]
+    return sha256 if _SHA256_RE.match(sha256) else None
+
+def is_not_modified(request_headers: Headers, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """Indique si la copie du client est à jour (RFC 9110 §13.1).
+
+    `If-Modified-Since` n'est évalué qu'en l'absence de `If-None-Match`.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Comparaison faible : W/"x" et "x" désignent le même contenu
+        client_tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag.removeprefix("W/") in client_tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _media_file_response(
+    full_path: Path,
+    relative_path: str,
+    stat_result: os.stat_result,
+    request_headers: Headers,
+    cache_control: str,
+    media_type: Optional[str] = None,
+) -> Response:
+    """Réponse 304, X-Accel-Redirect ou FileResponse (avec Range) pour un fichier existant."""
+    headers = {"cache-control": cache_control}
+    sha256 = get_blob_sha256(relative_path)
+    if sha256 is not None:
+        headers["etag"] = f'"{sha256}"'
+
+    response = FileResponse(full_path, headers=headers, media_type=media_type, stat_result=stat_result)
+    if is_not_modified(request_headers, response.headers.get("etag"), response.headers.get("last-modified")):
+        return NotModifiedResponse(response.headers)
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        accel_headers = {
+            key: response.headers[key]
+            for key in ("cache-control", "etag", "last-modified")
+            if key in response.headers
+        }
+        accel_headers["x-accel-redirect"] = f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{Path(relative_path).as_posix()}"
+        return Response(status_code=200, headers=accel_headers, media_type=response.media_type)
+    return response
+
+def resolve_media_path(file_path: str) -> Optional[str]:
+    """Chemin relatif à UPLOADS_BASE_DIR d'un `Resource.file_path` (ex: uploads/blobs/... -> blobs/...)."""
+    parts = Path(file_path).parts
+    if not parts or parts[0] != "uploads" or ".." in parts:
+        return None
+    return str(Path(*parts[1:])) if len(parts) > 1 else None
+
+async def media_file_response(request: Request, file_path: str, media_type: Optional[str] = None) -> Response:
+    """Sert le fichier d'une ressource (route authentifiée GET /resources/{id}/file)."""
+    relative_path = resolve_media_path(file_path)
+    if relative_path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    full_path = settings.UPLOADS_BASE_DIR / relative_path
+    try:
+        stat_result = await run_in_threadpool(os.stat, full_path)
+    except FileNotFoundError:
+        logger.warning(f"Fichier média introuvable sur le disque: {full_path}")
+        raise HTTPException(status_code=404, detail="File not found")
+    # Même un blob passe par la revalidation ici : la ressource peut changer de fichier
+    return _media_file_response(
+        full_path, relative_path, stat_result, request.headers, PRIVATE_REVALIDATE_CACHE_CONTROL, media_type
+    )
+
+class MediaStaticFiles(StaticFiles):
+    """StaticFiles de MEDIA_URL_PREFIX : validateurs et cache ci-dessus, blocs d'upload non exposés."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if Path(path).parts[:1] == (UPLOAD_SESSIONS_DIR_NAME,):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        # lookup_path renvoie un chemin résolu (realpath) : comparer au dossier résolu
+        relative_path = os.path.relpath(full_path, os.path.realpath(self.directory))
+        cache_control = IMMUTABLE_CACHE_CONTROL if get_blob_sha256(relative_path) else REVALIDATE_CACHE_CONTROL
+        return _media_file_response(Path(full_path), relative_path, stat_result, Headers(scope=scope), cache_control)
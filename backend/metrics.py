@@ -0,0 +1,238 @@
+"""
+Registre de métriques en mémoire, exposé au format texte Prometheus sur GET /metrics.
+
+- `Counter` (inc), `Gauge` (inc/dec : requêtes en cours...) et `Histogram` (observe :
+  latences, tailles), avec des labels ; les percentiles (p50, p99) se calculent côté
+  Prometheus à partir des buckets (`histogram_quantile`).
+- Enregistrement sans verrou : chaque thread écrit dans sa propre copie des valeurs (la
+  boucle asyncio dans la sienne, chaque thread du pool dans la sienne). Les copies sont
+  additionnées à la lecture ; celles des threads terminés sont fusionnées puis oubliées.
+  Seul le premier enregistrement d'un thread prend un verrou.
+- Valeurs lues à la demande (taille du pool de connexions, taux de succès des caches...) :
+  fonctions enregistrées avec `registry.add_collector(...)`, appelées à chaque lecture.
+
+Ce module n'importe rien de l'application : il est utilisable depuis `backend.ai` comme
+depuis le reste du backend.
+"""
+from bisect import bisect_left
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Buckets par défaut (secondes) : de 5 ms à 10 s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+# Échantillon lu par un collecteur : (nom, type, aide, [(labels, valeur)])
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+class _ThreadShards:
+    """Une copie des valeurs par thread ; `merge` additionne deux copies."""
+
+    def __init__(self, factory: Callable[[], dict], merge: Callable[[dict, dict], None]):
+        self._factory = factory
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired = factory()
+
+    def local(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._factory()
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            self._local.values = values
+            return values
+
+    def snapshot(self) -> dict:
+        """Somme de toutes les copies (lecture seule, appelée hors du chemin critique)."""
+        total = self._factory()
+        with self._lock:
+            alive = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    self._merge(self._retired, values)
+            self._shards = alive
+            self._merge(total, self._retired)
+            for _, values in alive:
+                # Copie de la liste des clés : le thread propriétaire peut en ajouter pendant la lecture
+                self._merge(total, dict(values))
+        return total
+
+    def clear(self):
+        with self._lock:
+            for _, values in self._shards:
+                values.clear()
+            self._retired = self._factory()
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+class Counter(_Metric):
+    """Compteur croissant (requêtes, octets, tokens...)."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _ThreadShards(dict, _merge_sums)
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        values = self._shards.local()
+        key = self._key(labels)
+        values[key] = values.get(key, 0.0) + amount
+
+    def collect(self) -> Sample:
+        return self.name, self.type, self.documentation, [
+            (dict(zip(self.labelnames, key)), value) for key, value in sorted(self._shards.snapshot().items())
+        ]
+
+class Gauge(Counter):
+    """Valeur qui monte et descend (requêtes en cours) : somme des inc/dec de tous les threads."""
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Distribution d'observations par buckets cumulés (`le`), avec somme et nombre."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(dict, self._merge)
+
+    def _new_entry(self) -> list:
+        # Un compteur par bucket, plus +Inf, puis la somme des observations
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def _merge(self, target: dict, source: dict):
+        for key, entry in source.items():
+            current = target.get(key)
+            if current is None:
+                target[key] = list(entry)
+            else:
+                for index, value in enumerate(entry):
+                    current[index] += value
+
+    def observe(self, value: float, **labels: str):
+        values = self._shards.local()
+        key = self._key(labels)
+        entry = values.get(key)
+        if entry is None:
+            entry = values[key] = self._new_entry()
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def collect(self) -> Sample:
+        samples = []
+        for key, entry in sorted(self._shards.snapshot().items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), entry[:-1]):
+                cumulative += count
+                samples.append(({**labels, "le": _format_value(bound)}, cumulative, "_bucket"))
+            samples.append((labels, entry[-1], "_sum"))
+            samples.append((labels, cumulative, "_count"))
+        return self.name, self.type, self.documentation, samples
+
+def _merge_sums(target: dict, source: dict):
+    for key, value in source.items():
+        target[key] = target.get(key, 0.0) + value
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class MetricsRegistry:
+    """Métriques et collecteurs du processus, rendus au format texte Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, *metrics: _Metric):
+        with self._lock:
+            for metric in metrics:
+                self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Ajoute une fonction appelée à chaque lecture, qui renvoie des échantillons (nom, type, aide, valeurs)."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[Sample]:
+        with self._lock:
+            metrics, collectors = list(self._metrics.values()), list(self._collectors)
+        samples = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            samples.extend(collector())
+        return samples
+
+    def render(self) -> str:
+        """Format texte d'exposition Prometheus (version 0.0.4)."""
+        lines = []
+        for name, metric_type, documentation, values in self.collect():
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for value in values:
+                labels, number = value[0], value[1]
+                suffix = value[2] if len(value) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(number)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Remet les métriques à zéro (tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric._shards.clear()
+
+registry = MetricsRegistry()
+
+def collector_sample(name: str, documentation: str, values: Iterable[Tuple[Dict[str, str], Optional[float]]], metric_type: str = "gauge") -> Sample:
+    """Échantillon d'un collecteur (les valeurs None sont ignorées)."""
+    return name, metric_type, documentation, [(labels, value) for labels, value in values if value is not None]
@@ -6,7 +6,14 @@ from models.sequence import Sequence
 from models.session import Session
 from models.resource import Resource
 from models.objective import Objective
+from models.user_stats import UserStats
+from models.blob import Blob
+from models.upload_session import UploadSession
+from models.ai_response_cache import AIResponseCacheEntry
+from models.chat_session import ChatSession, ChatSessionMessage
+from models.job import Job
 from models.association_tables import sequence_objective_association, session_objective_association
+from models import search_index # Index de recherche plein texte (créé après create_all)
 
 # Vous pouvez définir __all__ pour contrôler ce qui est importé avec 'from models import *'
 __all__ = [
@@ -18,6 +25,13 @@ __all__ = [
     "Session",
     "Resource",
     "Objective",
+    "UserStats",
+    "Blob",
+    "UploadSession",
+    "AIResponseCacheEntry",
+    "ChatSession",
+    "ChatSessionMessage",
+    "Job",
     "sequence_objective_association",
     "session_objective_association",
 ]
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from database import Base
+from datetime import datetime
+
+class AIResponseCacheEntry(Base):
+    """Réponse du chat IA mémorisée (niveau persistant du cache de réponses).
+
+    La clé est le SHA-256 de (fournisseur, modèle, historique, message) normalisés :
+    une même question posée à nouveau est servie sans appel au LLM, y compris après
+    un redémarrage du serveur.
+    """
+    __tablename__ = "ai_response_cache"
+
+    key = Column(String(64), primary_key=True)
+    provider = Column(String(50), nullable=False)
+    model = Column(String(100), nullable=False)
+    response = Column(Text, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 from database import Base
 
 # Table d'association Many-to-Many entre Sequence et Objective
@@ -6,7 +6,9 @@ sequence_objective_association = Table(
     'sequence_objective_association',
     Base.metadata,
     Column('sequence_id', Integer, ForeignKey('sequences.id'), primary_key=True),
-    Column('objective_id', Integer, ForeignKey('objectives.id'), primary_key=True)
+    Column('objective_id', Integer, ForeignKey('objectives.id'), primary_key=True),
+    # La clé primaire (sequence_id, objective_id) ne sert pas les recherches par objectif
+    Index('ix_sequence_objective_association_objective_id', 'objective_id', 'sequence_id')
 )
 
 # Table d'association Many-to-Many entre Session et Objective
@@ -14,7 +16,8 @@ session_objective_association = Table(
     'session_objective_association',
     Base.metadata,
     Column('session_id', Integer, ForeignKey('sessions.id'), primary_key=True),
-    Column('objective_id', Integer, ForeignKey('objectives.id'), primary_key=True)
+    Column('objective_id', Integer, ForeignKey('objectives.id'), primary_key=True),
+    Index('ix_session_objective_association_objective_id', 'objective_id', 'session_id')
 )
 
 # Table d'association pour lier les séances aux ressources
@@ -22,5 +25,7 @@ session_resource_association = Table(
     'session_resource',
     Base.metadata,
     Column('session_id', Integer, ForeignKey('sessions.id'), primary_key=True),
-    Column('resource_id', Integer, ForeignKey('resources.id'), primary_key=True)
+    Column('resource_id', Integer, ForeignKey('resources.id'), primary_key=True),
+    # Ressources sans séance, séances d'une ressource, suppression d'une ressource
+    Index('ix_session_resource_resource_id', 'resource_id', 'session_id')
 )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.orm import relationship
+from database import Base
+from datetime import datetime
+
+class Blob(Base):
+    """Contenu de fichier stocké une seule fois, identifié par son SHA-256.
+
+    Plusieurs ressources peuvent référencer le même blob ; `ref_count` compte ces
+    références et le fichier n'est supprimé du disque que lorsqu'il atteint zéro.
+    """
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    mime_type = Column(String, nullable=False)
+    storage_path = Column(String, nullable=False, comment='Chemin relatif à UPLOADS_BASE_DIR')
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    resources = relationship("Resource", back_populates="blob")
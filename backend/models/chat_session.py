@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from database import Base
+from datetime import datetime
+
+class ChatSession(Base):
+    """Conversation avec l'assistant IA, stockée côté serveur.
+
+    Le client n'envoie que le nouveau message : l'historique est relu ici (ou dans la
+    fenêtre en mémoire des sessions récentes, voir ai/chat_sessions.py).
+    """
+    __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # Pagination par curseur : WHERE user_id = ? ORDER BY updated_at DESC, id DESC
+        Index("ix_chat_sessions_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String(200), nullable=True, comment='Début du premier message')
+    message_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = relationship("User")
+    messages = relationship(
+        "ChatSessionMessage", back_populates="chat_session",
+        cascade="all, delete-orphan", order_by="ChatSessionMessage.id"
+    )
+
+class ChatSessionMessage(Base):
+    """Message d'une conversation (rôle user, assistant ou system), dans l'ordre d'ajout."""
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    chat_session_id = Column(Integer, ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    role = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    chat_session = relationship("ChatSession", back_populates="messages")
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Text, Float, JSON, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from database import Base
+from datetime import datetime
+
+class Job(Base):
+    """Tâche de fond (génération IA, traitement de fichier), exécutée par les workers de job_queue.py.
+
+    La table sert de file durable : une tâche en file survit à un redémarrage et est reprise
+    par le premier worker libre. Statuts : queued -> running -> succeeded, ou failed (erreur
+    définitive), ou dead (nombre maximal de tentatives atteint : file des lettres mortes).
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Prise de la prochaine tâche : WHERE status = 'queued' AND run_after <= now ORDER BY run_after
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        # Pagination par curseur des tâches d'un utilisateur : WHERE user_id = ? AND id < ? ORDER BY id DESC
+        Index("ix_jobs_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+    kind = Column(String(50), nullable=False, comment='Nom du handler (ex: ai.generate_resources)')
+    status = Column(String(20), nullable=False, default="queued", comment='queued, running, succeeded, failed ou dead')
+    payload = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0, comment='Avancement entre 0 et 1')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow, comment='Pas avant cette date (délai entre tentatives)')
+    locked_by = Column(String(100), nullable=True, comment='Worker qui exécute la tâche')
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    user = relationship("User")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 # Importer les tables d'association
@@ -6,6 +6,10 @@ from models.association_tables import sequence_objective_association, session_ob
 
 class Objective(Base):
     __tablename__ = "objectives"
+    __table_args__ = (
+        # Objectifs d'un utilisateur : WHERE user_id = ? (ORDER BY id)
+        Index("ix_objectives_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, unique=True) # Titre unique pour éviter les doublons
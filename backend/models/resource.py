@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from models.association_tables import session_resource_association
@@ -18,6 +18,10 @@ class ResourceType(Base):
 # Modèle pour les sous-types de ressources
 class ResourceSubType(Base):
     __tablename__ = "resource_subtypes"
+    __table_args__ = (
+        # Pagination par curseur des sous-types d'un type : WHERE type_id = ? AND id > ? ORDER BY id
+        Index("ix_resource_subtypes_type_id_id", "type_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String, unique=True, index=True)
@@ -31,12 +35,16 @@ class ResourceSubType(Base):
 # Modèle principal pour les ressources
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        # Pagination par curseur : WHERE user_id = ? AND id > ? ORDER BY id
+        Index("ix_resources_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text, nullable=True)
-    type_id = Column(Integer, ForeignKey("resource_types.id"), nullable=False)
-    sub_type_id = Column(Integer, ForeignKey("resource_subtypes.id"), nullable=False)
+    type_id = Column(Integer, ForeignKey("resource_types.id"), nullable=False, index=True)
+    sub_type_id = Column(Integer, ForeignKey("resource_subtypes.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Champs ajoutés par la migration b6c5f8d9e0a1
@@ -45,6 +53,8 @@ class Resource(Base):
     file_name = Column(String, nullable=True, comment='Nom original du fichier uploadé')
     file_size = Column(Integer, nullable=True, comment='Taille du fichier en octets')
     file_type = Column(String, nullable=True, comment='Type MIME du fichier')
+    # Contenu du fichier dans le stockage dédupliqué (migration d2e3f4a5b6c7)
+    blob_sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True, index=True)
     
     # Relations
     type = relationship("ResourceType", back_populates="resources")
@@ -55,3 +65,4 @@ class Resource(Base):
         back_populates="resources"
     )
     user = relationship("User", back_populates="resources")
+    blob = relationship("Blob", back_populates="resources")
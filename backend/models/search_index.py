@@ -0,0 +1,147 @@
+"""
+Index de recherche plein texte (ressources, séances, séquences, progressions, objectifs).
+
+Les structures d'index ne sont pas des colonnes des modèles : elles sont créées en SQL
+brut, selon la base, par `create_search_index` (appelé après `Base.metadata.create_all`)
+et par la migration e9f0a1b2c3d4.
+
+- PostgreSQL : colonne générée `search_vector` (tsvector, configuration `french_unaccent`
+  = français + suppression des accents) sur chaque table, avec un index GIN. Le titre a le
+  poids A, la description le poids B, les notes de séance le poids C.
+- SQLite (développement, tests) : table virtuelle FTS5 `search_index`, tenue à jour par
+  des triggers. Le rowid encode le type et l'id de l'élément (id * 8 + code du type).
+
+Les séances et séquences créées par l'API n'ont pas de user_id : leur propriétaire est
+celui de leur progression (`owner_sql`), comme pour les contrôles d'accès.
+"""
+from typing import Dict, List, Tuple
+import logging
+
+from sqlalchemy import event
+
+from database import Base
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "french_unaccent"
+FTS_TABLE = "search_index"
+# Nombre de codes de type réservés dans le rowid FTS5
+KIND_SLOTS = 8
+
+# type -> (code FTS5, table, [(colonne, poids)])
+SEARCH_SOURCES: Dict[str, Tuple[int, str, List[Tuple[str, str]]]] = {
+    "resource": (1, "resources", [("title", "A"), ("description", "B")]),
+    "session": (2, "sessions", [("title", "A"), ("description", "B"), ("notes", "C")]),
+    "sequence": (3, "sequences", [("title", "A"), ("description", "B")]),
+    "progression": (4, "progressions", [("title", "A"), ("description", "B")]),
+    "objective": (5, "objectives", [("title", "A"), ("description", "B")]),
+}
+
+# type -> tables à remonter jusqu'à la progression : [(table parente, colonne de la clé étrangère)]
+OWNER_PATHS: Dict[str, List[Tuple[str, str]]] = {
+    "session": [("sequences", "sequence_id"), ("progressions", "progression_id")],
+    "sequence": [("progressions", "progression_id")],
+}
+
+def owner_sql(kind: str, row: str) -> str:
+    """Expression SQL du propriétaire d'un élément (`row` : alias de la ligne, ex: src, new)."""
+    path = OWNER_PATHS.get(kind)
+    if not path:
+        return f"{row}.user_id"
+    # Sous-requête scalaire : owner1 = parent direct, ..., ownerN = progression
+    first_table, first_key = path[0]
+    source = " ".join([f"{first_table} AS owner1"] + [
+        f"JOIN {parent} AS owner{index} ON owner{index}.id = owner{index - 1}.{foreign_key}"
+        for index, (parent, foreign_key) in enumerate(path[1:], start=2)
+    ])
+    return f"(SELECT owner{len(path)}.user_id FROM {source} WHERE owner1.id = {row}.{first_key})"
+
+def postgres_search_ddl() -> List[str]:
+    """Instructions idempotentes créant la configuration, les colonnes tsvector et les index GIN."""
+    statements = [
+        "CREATE EXTENSION IF NOT EXISTS unaccent",
+        f"""
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+                CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = french);
+                ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+            END IF;
+        END $$
+        """,
+    ]
+    for _, table, columns in SEARCH_SOURCES.values():
+        vector = " || ".join(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce({column}, '')), '{weight}')"
+            for column, weight in columns
+        )
+        statements.append(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+        statements.append(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)")
+    return statements
+
+def sqlite_search_ddl() -> List[str]:
+    """Instructions idempotentes créant la table FTS5, ses triggers et son remplissage initial.
+
+    Les triggers sont recréés à chaque appel (leur définition peut avoir changé) ; seules les
+    lignes absentes de l'index ou dont le propriétaire indexé est périmé sont (ré)indexées.
+    """
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "user_id UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+    for kind, (code, table, columns) in SEARCH_SOURCES.items():
+        body = " || ' ' || ".join(f"coalesce({{row}}.{column}, '')" for column, _ in columns[1:])
+        owner = owner_sql(kind, "{row}")
+        insert = (
+            f"INSERT OR REPLACE INTO {FTS_TABLE}(rowid, user_id, title, body) "
+            f"VALUES ({{row}}.id * {KIND_SLOTS} + {code}, {owner}, coalesce({{row}}.title, ''), {body});"
+        )
+        delete = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id * {KIND_SLOTS} + {code};"
+        for suffix in ("ai", "au", "ad"):
+            statements.append(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+        statements += [
+            f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert.format(row='new')} END",
+            f"CREATE TRIGGER {table}_search_au AFTER UPDATE ON {table} BEGIN {delete} {insert.format(row='new')} END",
+            f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END",
+            # Remplissage des lignes existantes (ignoré pour celles déjà indexées avec le bon propriétaire)
+            f"INSERT OR REPLACE INTO {FTS_TABLE}(rowid, user_id, title, body) "
+            f"SELECT src.id * {KIND_SLOTS} + {code}, {owner.format(row='src')}, coalesce(src.title, ''), {body.format(row='src')} "
+            f"FROM {table} AS src WHERE NOT EXISTS (SELECT 1 FROM {FTS_TABLE} AS indexed "
+            f"WHERE indexed.rowid = src.id * {KIND_SLOTS} + {code} AND indexed.user_id IS {owner.format(row='src')})",
+        ]
+    return statements
+
+def create_search_index(connection):
+    """Crée l'index de recherche adapté à la base (sans effet s'il existe déjà)."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = postgres_search_ddl()
+    elif dialect == "sqlite":
+        statements = sqlite_search_ddl()
+    else:
+        logger.warning(f"Recherche plein texte non disponible pour la base '{dialect}'")
+        return
+    # Point de sauvegarde : un échec (ex: extension unaccent non autorisée) ne doit pas
+    # annuler la création des tables
+    savepoint = connection.begin_nested()
+    try:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+        savepoint.commit()
+    except Exception as e:
+        savepoint.rollback()
+        logger.error(f"Index de recherche plein texte non créé: {e}")
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index_after_create(target, connection, **kw):
+    create_search_index(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index_before_drop(target, connection, **kw):
+    # Les colonnes PostgreSQL et les triggers SQLite disparaissent avec leurs tables ;
+    # la table FTS5 doit être supprimée à part (sinon ses lignes survivraient aux tables)
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from models.association_tables import sequence_objective_association
@@ -6,6 +6,11 @@ from datetime import datetime
 
 class Sequence(Base):
     __tablename__ = "sequences"
+    __table_args__ = (
+        # Pagination par curseur (liste de l'utilisateur, séquences d'une progression)
+        Index("ix_sequences_user_id_id", "user_id", "id"),
+        Index("ix_sequences_progression_id_id", "progression_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
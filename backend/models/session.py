@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Interval, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Interval, Text, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -7,6 +7,11 @@ from models.association_tables import session_objective_association, session_res
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Pagination par curseur (liste de l'utilisateur, séances d'une séquence)
+        Index("ix_sessions_user_id_id", "user_id", "id"),
+        Index("ix_sessions_sequence_id_id", "sequence_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from database import Base
+from datetime import datetime
+
+class UploadSession(Base):
+    """Upload reprenable d'un gros fichier, envoyé par blocs numérotés.
+
+    Les blocs reçus sont stockés sur le disque (UPLOADS_BASE_DIR/upload_sessions/<id>/) :
+    ils survivent aux nouvelles tentatives du client comme aux redémarrages du serveur.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_name = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="pending", comment='pending ou completed')
+    resource_id = Column(Integer, ForeignKey("resources.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    user = relationship("User")
+    resource = relationship("Resource")
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from database import Base
+from datetime import datetime
+
+class UserStats(Base):
+    """Compteurs agrégés par utilisateur, maintenus de façon incrémentale par le CRUD.
+
+    Permet au dashboard de lire les statistiques en une seule ligne au lieu de
+    compter chaque table à chaque visite.
+    """
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    user = relationship("User")
+    progression_count = Column(Integer, nullable=False, default=0)
+    sequence_count = Column(Integer, nullable=False, default=0)
+    session_count = Column(Integer, nullable=False, default=0)
+    resource_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
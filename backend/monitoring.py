@@ -0,0 +1,168 @@
+"""
+Métriques de l'application exposées sur GET /metrics (registre : metrics.py).
+
+- HTTP : histogramme de latence par route (modèle de chemin, ex: /api/v1/resources/{resource_id}),
+  méthode et code de statut, et nombre de requêtes en cours (`MetricsMiddleware`).
+- Base de données : attente pour obtenir une connexion du pool (histogramme, par moteur),
+  délais dépassés, et à chaque lecture taille, connexions prises, débordement et saturation.
+- LLM : latence et tokens de chaque appel (callback posé sur les clients, voir
+  backend/ai/llm_interface.py).
+- Uploads : octets et durées (file_storage.py).
+- Caches et files : taux de succès des caches (authentification, réponses IA, fenêtres de
+  conversation, résumés), workers de tâches de fond, pool de hachage, connexions HTTP LLM.
+"""
+import time
+from typing import Iterable
+import logging
+
+from sqlalchemy import exc
+
+from config import get_settings
+from database import engine, async_engine
+from metrics import Sample, collector_sample, registry
+from principal_cache import principal_cache
+from sql_instrumentation import sql_monitor
+import hashing
+from job_queue import job_workers
+from backend.ai.llm_interface import LLM_CALL_SECONDS, LLM_TOKENS, llm_registry
+from backend.ai.response_cache import response_cache
+from backend.ai.chat_sessions import chat_session_windows
+from backend.ai.history_manager import history_manager
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP (jusqu'au dernier octet de la réponse)",
+    ["method", "route", "status"],
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "Requêtes HTTP en cours de traitement")
+DB_CHECKOUT_SECONDS = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Attente pour obtenir une connexion du pool (dont l'ouverture d'une nouvelle connexion)",
+    ["engine"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_CHECKOUT_TIMEOUTS = registry.counter("db_pool_checkout_timeouts_total", "Connexions non obtenues dans le délai du pool", ["engine"])
+
+# backend.ai importe `backend.metrics`, module distinct de `metrics` : ses métriques sont ajoutées ici
+registry.register(LLM_CALL_SECONDS, LLM_TOKENS)
+
+# Pools instrumentés : nom du moteur -> moteur (les pools sont relus à chaque lecture)
+POOL_ENGINES = {"sync": engine, "async": async_engine.sync_engine}
+
+def _instrument_pool(engine_name: str, pool):
+    """Mesure chaque checkout du pool (`Pool.connect`, appelé par le moteur pour chaque connexion)."""
+    connect = pool.connect
+
+    def timed_connect():
+        started_at = time.perf_counter()
+        try:
+            return connect()
+        except exc.TimeoutError:
+            DB_CHECKOUT_TIMEOUTS.inc(engine=engine_name)
+            raise
+        finally:
+            DB_CHECKOUT_SECONDS.observe(time.perf_counter() - started_at, engine=engine_name)
+
+    pool.connect = timed_connect
+
+if settings.METRICS_ENABLED:
+    for _name, _engine in POOL_ENGINES.items():
+        _instrument_pool(_name, _engine.pool)
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if scope["path"].startswith(settings.MEDIA_URL_PREFIX):
+        return settings.MEDIA_URL_PREFIX
+    # Chemins inconnus (404) regroupés : pas une série par URL
+    return "<unmatched>"
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence par route et requêtes en cours (réponses en streaming comprises)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started_at,
+                method=scope["method"], route=_route_label(scope), status=str(status_code)
+            )
+
+# --- Valeurs lues à chaque appel de /metrics ---
+
+def _pool_metrics() -> Iterable[Sample]:
+    size, checked_out, overflow, saturation = [], [], [], []
+    for engine_name, pool_engine in POOL_ENGINES.items():
+        pool = pool_engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue  # Pools sans file (NullPool, StaticPool...)
+        labels = {"engine": engine_name}
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        size.append((labels, pool.size()))
+        checked_out.append((labels, pool.checkedout()))
+        overflow.append((labels, max(pool.overflow(), 0)))
+        saturation.append((labels, round(pool.checkedout() / capacity, 4) if capacity else None))
+    yield collector_sample("db_pool_size", "Connexions permanentes du pool", size)
+    yield collector_sample("db_pool_checked_out", "Connexions du pool actuellement utilisées", checked_out)
+    yield collector_sample("db_pool_overflow", "Connexions ouvertes au-delà de la taille du pool", overflow)
+    yield collector_sample("db_pool_saturation", "Connexions utilisées / capacité maximale (taille + débordement)", saturation)
+
+def _cache_metrics() -> Iterable[Sample]:
+    principal, responses, windows, summaries = (
+        principal_cache.stats(), response_cache.stats(), chat_session_windows.stats(), history_manager.stats()
+    )
+    caches = {
+        "principal": (principal["hits"], principal["misses"], principal["size"], principal["evictions"]),
+        "ai_response": (
+            responses["hits_exact"] + responses["hits_persistent"] + responses["hits_similar"],
+            responses["misses"], responses["size"], responses["evictions"],
+        ),
+        "chat_session_window": (windows["hits"], windows["misses"], windows["size"], windows["evictions"]),
+        "history_summary": (summaries["summaries_reused"], summaries["summaries_computed"], summaries["summaries_cached"], None),
+    }
+    yield collector_sample("cache_hits_total", "Lectures servies par le cache", [({"cache": name}, hits) for name, (hits, _, _, _) in caches.items()], "counter")
+    yield collector_sample("cache_misses_total", "Lectures absentes du cache", [({"cache": name}, misses) for name, (_, misses, _, _) in caches.items()], "counter")
+    yield collector_sample("cache_hit_ratio", "Taux de succès du cache depuis le démarrage", [
+        ({"cache": name}, round(hits / (hits + misses), 4) if hits + misses else 0.0) for name, (hits, misses, _, _) in caches.items()
+    ])
+    yield collector_sample("cache_entries", "Entrées présentes dans le cache", [({"cache": name}, size) for name, (_, _, size, _) in caches.items()])
+    yield collector_sample("cache_evictions_total", "Entrées évincées du cache", [({"cache": name}, evictions) for name, (_, _, _, evictions) in caches.items()], "counter")
+
+def _worker_metrics() -> Iterable[Sample]:
+    jobs = job_workers.stats()
+    yield collector_sample("job_workers", "Workers de tâches de fond du processus", [({}, jobs["workers"])])
+    yield collector_sample("jobs_running", "Tâches de fond en cours dans le processus", [({}, jobs["running"])])
+    yield collector_sample("jobs_finished_total", "Tâches de fond terminées par le processus", [
+        ({"outcome": outcome}, jobs[outcome]) for outcome in ("succeeded", "retried", "failed", "dead")
+    ], "counter")
+    yield collector_sample("password_hash_pending", "Calculs bcrypt en cours ou en attente dans le pool de hachage", [({}, hashing._pending)])
+    llm = llm_registry.stats()
+    yield collector_sample("llm_http_pool_connections", "Connexions HTTP vers le fournisseur LLM", [
+        ({"state": "idle"}, llm["pool_idle_connections"]),
+        ({"state": "active"}, llm["pool_connections"] - llm["pool_idle_connections"]),
+    ])
+    sql = sql_monitor.stats()
+    yield collector_sample("sql_n_plus_one_requests_total", "Requêtes HTTP où un N+1 a été détecté", [({}, sql["n_plus_one_requests"])], "counter")
+
+registry.add_collector(_pool_metrics)
+registry.add_collector(_cache_metrics)
+registry.add_collector(_worker_metrics)
@@ -0,0 +1,121 @@
+"""
+Pagination par curseur (keyset) des listes de l'API.
+
+Avec `.offset(skip)`, la base lit puis jette toutes les lignes qui précèdent la page : le
+coût augmente avec la profondeur. Ici, chaque liste est triée sur une clé stable terminée
+par l'id (`(id)`, ou `(updated_at, id)`...) et la page suivante est lue avec
+`WHERE (clé, id) > (dernière valeur lue)`, ce qui parcourt l'index composite
+correspondant (ex: ix_resources_user_id_id) à partir de la bonne position : une page
+profonde coûte autant que la première.
+
+- CRUD : les fonctions de liste acceptent `after` (valeurs décodées du curseur) et
+  appliquent `keyset(...)`. Sans curseur, `skip` reste accepté (compatibilité).
+- Routeurs : `cursor_param(...)` décode le paramètre `cursor` (400 si invalide), la
+  fonction CRUD est appelée avec `limit + 1` (l'élément en trop indique qu'une page suit),
+  puis `finish_page(...)` retire cet élément et renvoie le curseur suivant dans l'en-tête
+  `X-Next-Cursor` (absent sur la dernière page). Le corps reste une liste JSON.
+
+Les curseurs sont opaques : JSON encodé en base64url, signé (HMAC-SHA256 tronqué, avec
+SECRET_KEY) et lié à la liste qui l'a émis, pour qu'un client ne puisse pas les forger.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+from config import get_settings
+
+settings = get_settings()
+
+CURSOR_HEADER = "X-Next-Cursor"
+# Longueur de la signature conservée dans le curseur (96 bits)
+SIGNATURE_BYTES = 12
+
+class InvalidCursorError(ValueError):
+    """Curseur illisible, falsifié ou émis par une autre liste."""
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+def _sign(data: bytes) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), data, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """Curseur opaque pointant après `values` (clé de tri puis id) dans la liste `scope`."""
+    data = json.dumps([scope, [_encode_value(value) for value in values]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data + _sign(data)).decode().rstrip("=")
+
+def decode_cursor(scope: str, cursor: str) -> Tuple[Any, ...]:
+    """Valeurs de la clé de tri contenues dans le curseur.
+
+    Raises:
+        InvalidCursorError: Si le curseur est mal formé, mal signé ou émis pour une autre liste.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError("Malformed cursor")
+    data, signature = raw[:-SIGNATURE_BYTES], raw[-SIGNATURE_BYTES:]
+    if not data or not hmac.compare_digest(signature, _sign(data)):
+        raise InvalidCursorError("Invalid cursor signature")
+    try:
+        cursor_scope, values = json.loads(data)
+        if cursor_scope != scope or not isinstance(values, list) or not values:
+            raise InvalidCursorError("Cursor does not belong to this list")
+        return tuple(_decode_value(value) for value in values)
+    except (TypeError, ValueError) as e:
+        if isinstance(e, InvalidCursorError):
+            raise
+        raise InvalidCursorError("Malformed cursor")
+
+def keyset(query, columns: Sequence, after: Optional[Sequence[Any]], skip: int, limit: int, descending: bool = False):
+    """Trie `query` sur `columns` (clé de tri terminée par l'id) et lit la page qui suit `after`.
+
+    Sans `after`, la page est lue avec `offset(skip)` (première page ou anciens clients).
+    """
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+    if after is not None:
+        if len(after) != len(columns):
+            raise InvalidCursorError("Cursor does not match the list ordering")
+        if len(columns) == 1:
+            key, value = columns[0], after[0]
+        else:
+            key, value = tuple_(*columns), tuple_(*after)
+        query = query.filter(key < value if descending else key > value)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def cursor_param(cursor: Optional[str], scope: str) -> Optional[Tuple[Any, ...]]:
+    """Décode le paramètre `cursor` d'une route de liste (400 s'il est invalide)."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(scope, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def finish_page(response: Response, items: List[Any], limit: int, scope: str, key: Callable[[Any], Sequence[Any]]) -> List[Any]:
+    """Retire l'élément lu en trop et publie le curseur de la page suivante (s'il y en a une).
+
+    `items` doit provenir d'une lecture avec `limit + 1` ; `key(item)` renvoie les valeurs de
+    tri de l'élément (mêmes colonnes que `keyset`).
+    """
+    if limit <= 0 or len(items) <= limit:
+        return items[:max(limit, 0)]
+    items = items[:limit]
+    response.headers[CURSOR_HEADER] = encode_cursor(scope, key(items[-1]))
+    return items
@@ -0,0 +1,147 @@
+"""
+Cache en mémoire des utilisateurs authentifiés (token JWT -> utilisateur).
+
+Sans ce cache, chaque requête authentifiée relit l'utilisateur dans la table `users`
+après le décodage du token. Ici, l'utilisateur est mémorisé sous forme d'un instantané
+immuable (`UserPrincipal`) pendant `PRINCIPAL_CACHE_TTL_SECONDS`, la clé étant le `jti`
+du token (ou son `sub` pour les tokens émis avant l'ajout du `jti`).
+
+Le cache est local au processus : `crud.user.update_user` / `delete_user` l'invalident
+immédiatement, les autres workers voient le changement au plus tard à l'expiration du TTL.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+from typing import Dict, Optional, Set
+import logging
+
+from models.user import UserRole
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Instantané immuable de l'utilisateur authentifié (champs utilisés par les dépendances)."""
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserPrincipal":
+        return cls(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+
+class PrincipalCache:
+    """Cache LRU borné avec expiration (TTL), sûr entre threads, avec compteurs hit/miss."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, UserPrincipal]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[UserPrincipal]:
+        """Renvoie l'utilisateur en cache pour ce token, ou None (absent ou expiré)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def set(self, key: str, principal: UserPrincipal):
+        """Mémorise l'utilisateur d'un token, en évinçant le moins récemment utilisé si plein."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Supprime toutes les entrées (tous les tokens) d'un utilisateur."""
+        with self._lock:
+            keys = list(self._keys_by_user.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+            if keys:
+                self.invalidations += 1
+                logger.info(f"Cache d'authentification invalidé pour l'utilisateur {user_id} ({len(keys)} token(s))")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Compteurs du cache (pour le monitoring)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str):
+        # Appelé avec le verrou déjà pris
+        _, principal = self._entries.pop(key)
+        user_keys = self._keys_by_user.get(principal.id)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[principal.id]
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+def get_cache_key(payload: dict) -> Optional[str]:
+    """Clé de cache d'un token décodé : son `jti`, à défaut son `sub`."""
+    jti = payload.get("jti")
+    if jti:
+        return f"jti:{jti}"
+    sub = payload.get("sub")
+    return f"sub:{sub}" if sub else None
+
+def get_cached_principal(payload: dict) -> Optional[UserPrincipal]:
+    """Renvoie l'utilisateur en cache pour ce token, ou None (cache désactivé ou miss)."""
+    if not settings.PRINCIPAL_CACHE_ENABLED:
+        return None
+    key = get_cache_key(payload)
+    return principal_cache.get(key) if key else None
+
+def cache_principal(payload: dict, user) -> UserPrincipal:
+    """Construit l'instantané d'un utilisateur chargé en base et le met en cache."""
+    principal = UserPrincipal.from_user(user)
+    key = get_cache_key(payload)
+    if settings.PRINCIPAL_CACHE_ENABLED and key:
+        principal_cache.set(key, principal)
+    return principal
+
+def invalidate_user(user_id: int):
+    """Point d'invalidation appelé par le CRUD utilisateur après modification/suppression."""
+    principal_cache.invalidate_user(user_id)
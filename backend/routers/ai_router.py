@@ -1,11 +1,26 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from backend.ai.schemas import ChatInput, ChatOutput
-from backend.ai import generation_service
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.ai.schemas import ChatInput, ChatOutput, BatchGenerationInput, BatchGenerationOutput, GeneratedResource
+from backend.ai import generation_service, batch_generation
+from database import get_async_db, AsyncSessionLocal
+import crud
+from crud import aio as crud_aio
+from dependencies import get_current_active_user
+from models import User as UserModel
+from schemas.resource import ResourceCreate
+from schemas.job import JobRead
+from job_queue import JobContext, JobPermanentError, enqueue, job_handler
+from config import get_settings
+from typing import List, Optional, Union
+import json
 import logging
+import time
 
 # Configure logging (optional, if not handled globally)
 # logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter(
     # prefix="/ai", # Supprimé car géré dans app.py
@@ -41,3 +56,213 @@ async def handle_chat_message(input_data: ChatInput):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail=f"An unexpected error occurred while processing your request: {e}"
         )
+
+@router.post(
+    "/chat/stream",
+    response_class=StreamingResponse,
+    summary="Stream the AI chat assistant's response",
+    description=(
+        "Same input as /chat. The response is a Server-Sent Events stream: one `token` event per text delta "
+        "(`{\"content\": ...}`), then a `done` event with `ttft_ms` and `duration_ms`, or an `error` event."
+    )
+)
+async def handle_chat_message_stream(input_data: ChatInput):
+    """
+    Streaming variant of /chat.
+
+    The first event is awaited before the response starts, so configuration errors still
+    return a regular 503 instead of an empty stream. When the client disconnects, Starlette
+    cancels the streaming task, which closes the LLM stream (no more tokens are generated).
+    """
+    logger.info(f"Received request on /ai/chat/stream endpoint.")
+    events = generation_service.stream_chat_response(input_data)
+    try:
+        first_event = await events.__anext__()
+    except StopAsyncIteration:
+        first_event = None
+    except ValueError as ve:
+        logger.error(f"Configuration error in /ai/chat/stream: {ve}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"AI service configuration error: {ve}"
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in /ai/chat/stream: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred while processing your request: {e}"
+        )
+
+    async def event_stream():
+        try:
+            if first_event is not None:
+                yield first_event.to_sse()
+            async for event in events:
+                yield event.to_sse()
+        except Exception as e:
+            # Headers are already sent: report the error inside the stream
+            logger.error(f"Error while streaming /ai/chat/stream: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)}, ensure_ascii=False)}\n\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so tokens reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _owner_id(db, sequence_id: int) -> Optional[int]:
+    """Owner of a sequence through its progression (Sequence.user_id is not set by POST /sequences)."""
+    db_sequence = crud.sequence.get_sequence(db, sequence_id=sequence_id)
+    if db_sequence is None or db_sequence.progression is None:
+        return None
+    return db_sequence.progression.user_id
+
+
+async def _load_generation_targets(db: AsyncSession, input_data: BatchGenerationInput, user_id: int) -> List[batch_generation.GenerationTarget]:
+    """Sessions to generate for (owned by the user), with their context for the prompt."""
+    if input_data.session_id is not None:
+        db_session = await crud_aio.get_session(db, session_id=input_data.session_id)
+        if db_session is None or await crud_aio.run(db, _owner_id, db_session.sequence_id) != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        return [batch_generation.GenerationTarget(
+            session_id=db_session.id,
+            session_title=db_session.title,
+            session_description=db_session.description,
+            sequence_title=db_session.sequence.title if db_session.sequence else None,
+        )]
+
+    db_sequence = await crud_aio.get_sequence(db, sequence_id=input_data.sequence_id)
+    if db_sequence is None or await crud_aio.run(db, _owner_id, db_sequence.id) != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sequence not found")
+    # Ownership checked above: sessions are not filtered on Session.user_id (not set by POST /sessions)
+    db_sessions = await crud_aio.get_sessions_by_sequence(
+        db, sequence_id=db_sequence.id, limit=settings.AI_BATCH_MAX_RESOURCES
+    )
+    if not db_sessions:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The sequence has no session to generate resources for")
+    return [
+        batch_generation.GenerationTarget(
+            session_id=db_session.id,
+            session_title=db_session.title,
+            session_description=db_session.description,
+            sequence_title=db_sequence.title,
+        )
+        for db_session in db_sessions
+    ]
+
+async def _check_generation_request(db: AsyncSession, input_data: BatchGenerationInput, user_id: int) -> List[batch_generation.GenerationTarget]:
+    """Validates ownership, resource types and batch size; returns the target sessions."""
+    targets = await _load_generation_targets(db, input_data, user_id)
+    for spec in input_data.specs:
+        db_sub_type = await crud_aio.get_resource_subtype(db, subtype_id=spec.sub_type_id)
+        if db_sub_type is None or db_sub_type.type_id != spec.type_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Sub-type {spec.sub_type_id} does not exist or does not belong to type {spec.type_id}"
+            )
+    total = len(targets) * sum(spec.count for spec in input_data.specs)
+    if total > settings.AI_BATCH_MAX_RESOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many resources requested ({total}, maximum {settings.AI_BATCH_MAX_RESOURCES})"
+        )
+    return targets
+
+async def _generate_and_store(
+    db: AsyncSession, targets: List[batch_generation.GenerationTarget], input_data: BatchGenerationInput,
+    user_id: int, on_progress=None
+) -> BatchGenerationOutput:
+    """Runs the LLM calls and inserts the generated resources (one transaction)."""
+    started_at = time.perf_counter()
+    try:
+        drafts, failures = await batch_generation.generate_resources(targets, input_data.specs, on_progress=on_progress)
+    except ValueError as ve:
+        logger.error(f"AI configuration error during batch generation: {ve}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"AI service configuration error: {ve}"
+        )
+    if not drafts:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail={"message": "No resource could be generated", "failed": [failure.model_dump() for failure in failures]}
+        )
+
+    db_resources = await crud_aio.create_resources_bulk(db, resources=[
+        ResourceCreate(
+            title=draft.title,
+            description=draft.description,
+            type_id=draft.type_id,
+            sub_type_id=draft.sub_type_id,
+            source_type="ai",
+            session_ids=[draft.session_id],
+            user_id=user_id,
+        )
+        for draft in drafts
+    ])
+    return BatchGenerationOutput(
+        created=[
+            GeneratedResource(id=db_resource.id, session_id=draft.session_id, title=draft.title)
+            for db_resource, draft in zip(db_resources, drafts)
+        ],
+        failed=failures,
+        duration_ms=round((time.perf_counter() - started_at) * 1000, 1),
+    )
+
+@job_handler("ai.generate_resources")
+async def _generate_resources_job(job: JobContext):
+    """Background variant of /generate/resources: same checks (the session may have been deleted since)."""
+    input_data = BatchGenerationInput.model_validate(job.payload)
+    async with AsyncSessionLocal() as db:
+        try:
+            targets = await _check_generation_request(db, input_data, job.user_id)
+            output = await _generate_and_store(db, targets, input_data, job.user_id, on_progress=job.set_progress)
+        except HTTPException as e:
+            # 4xx / configuration errors will not fix themselves; 502 (nothing generated) is retried
+            if e.status_code == status.HTTP_502_BAD_GATEWAY:
+                raise RuntimeError(json.dumps(e.detail, ensure_ascii=False))
+            raise JobPermanentError(e.detail if isinstance(e.detail, str) else json.dumps(e.detail, ensure_ascii=False))
+    return output.model_dump(mode="json")
+
+@router.post(
+    "/generate/resources",
+    response_model=Union[JobRead, BatchGenerationOutput],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Generate resources for a session or a whole sequence",
+    description=(
+        "Generates `count` resources of every spec for the session, or for every session of the sequence. "
+        "LLM calls run concurrently (AI_BATCH_CONCURRENCY, per-provider AI_RATE_LIMITS) with retries on "
+        "transient errors; the generated resources are inserted in one transaction and linked to their session. "
+        "By default the generation runs as a background job: the response is 202 with the job "
+        "(follow it on /api/v1/jobs/{id}, the result is the BatchGenerationOutput). With `background=false` "
+        "the generation runs inline and the response is 201 with the BatchGenerationOutput; resources that "
+        "still fail are listed in `failed`."
+    )
+)
+async def generate_resources_batch(
+    input_data: BatchGenerationInput,
+    response: Response,
+    background: bool = Query(True, description="Run as a background job (202) instead of inline (201)."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """
+    Batch resource generation (source_type 'ai').
+
+    Everything is validated before enqueuing or the first LLM call (ownership, resource types,
+    batch size), so invalid requests fail immediately. Inline, returns 502 if no resource at
+    all could be generated.
+    """
+    targets = await _check_generation_request(db, input_data, current_user.id)
+
+    if background and settings.JOBS_ENABLED:
+        db_job = await enqueue(db, "ai.generate_resources", input_data.model_dump(mode="json"), user_id=current_user.id)
+        response.headers["Location"] = f"{settings.API_V1_PREFIX}/jobs/{db_job.id}"
+        return JobRead.model_validate(db_job)
+
+    response.status_code = status.HTTP_201_CREATED
+    return await _generate_and_store(db, targets, input_data, current_user.id)
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 from typing import Any
 
-from database import get_db
+from database import get_async_db
 from schemas.user import UserCreate, UserResponse, Token
-from security import authenticate_user, create_access_token, get_current_active_user
+from security import authenticate_user_async, create_access_token, get_current_active_user
+from hashing import get_password_hash_async, PasswordHashingBusyError
 from config import get_settings
 import logging
-from crud import user as crud
+from crud import aio as crud_aio
 
 load_dotenv()
 
@@ -21,23 +22,35 @@ auth_router = APIRouter()
 # Configuration
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+def _hashing_busy_exception(e: PasswordHashingBusyError) -> HTTPException:
+    """503 + Retry-After lorsque le pool de hachage des mots de passe est saturé."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Serveur d'authentification saturé, veuillez réessayer",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
 @auth_router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user: UserCreate, db: Session = Depends(get_db)) -> Any:
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)) -> Any:
     """
     Crée un nouvel utilisateur.
     """
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await crud_aio.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cet email est déjà utilisé"
         )
-    return crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await get_password_hash_async(user.password)
+    except PasswordHashingBusyError as e:
+        raise _hashing_busy_exception(e)
+    return await crud_aio.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @auth_router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Obtient un token JWT pour l'authentification.
@@ -46,7 +59,7 @@ def login_for_access_token(
     
     if env == "development":
         # Mode développement : accepter n'importe quel mot de passe
-        user = crud.get_user_by_email(db, email=form_data.username)
+        user = await crud_aio.get_user_by_email(db, email=form_data.username)
         if user:
             access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
             access_token = create_access_token(
@@ -62,7 +75,10 @@ def login_for_access_token(
             )
     
     # Mode production : vérification normale du mot de passe
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user_async(db, form_data.username, form_data.password)
+    except PasswordHashingBusyError as e:
+        raise _hashing_busy_exception(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,8 +94,15 @@ def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @auth_router.get("/me", response_model=UserResponse)
-def read_users_me(current_user = Depends(get_current_active_user)) -> Any:
+async def read_users_me(
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Any:
     """
     Récupère les informations de l'utilisateur connecté.
     """
-    return current_user
+    # current_user est un instantané (id, email, rôle, statut) : charger le profil complet
+    db_user = await crud_aio.get_user(db, user_id=current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Utilisateur non trouvé")
+    return db_user
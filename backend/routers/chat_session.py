@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import json
+import logging
+
+from database import get_async_db, AsyncSessionLocal
+from crud import aio as crud_aio
+from schemas.chat_session import ChatSessionCreate, ChatSessionRead, ChatSessionMessageRead, ChatSessionMessageCreate
+from dependencies import get_current_active_user
+from models import User as UserModel
+from backend.ai.schemas import ChatInput, ChatMessage, ChatOutput
+from backend.ai.chat_sessions import chat_session_windows
+from backend.ai import generation_service
+from config import get_settings
+from pagination import cursor_param, finish_page
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+chat_session_router = APIRouter(
+    # prefix="/chat-sessions", # Géré dans app.py
+    tags=["chat_sessions"],
+    responses={404: {"description": "Not found"}},
+)
+
+async def _load_history(db: AsyncSession, chat_session_id: int, user_id: int) -> List[ChatMessage]:
+    """Historique récent d'une conversation : fenêtre en mémoire, sinon lecture en base."""
+    window = chat_session_windows.get(chat_session_id)
+    if window is not None:
+        if window.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+        return window.messages
+
+    db_chat_session = await crud_aio.get_chat_session(db, chat_session_id=chat_session_id, user_id=user_id)
+    if db_chat_session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    rows = await crud_aio.get_chat_messages(
+        db, chat_session_id=chat_session_id, limit=settings.AI_CHAT_SESSION_WINDOW_MESSAGES,
+        response_model=List[ChatSessionMessageRead]
+    )
+    # Contenu déjà validé à l'écriture : pas de nouvelle validation Pydantic
+    messages = [ChatMessage.model_construct(role=row.role, content=row.content) for row in rows]
+    chat_session_windows.set(chat_session_id, user_id, messages)
+    return messages
+
+async def _record_exchange(db: AsyncSession, chat_session_id: int, message: str, response: str):
+    """Ajoute la question et la réponse à la conversation (base puis fenêtre en mémoire)."""
+    await crud_aio.append_chat_messages(
+        db, chat_session_id=chat_session_id, messages=[("user", message), ("assistant", response)]
+    )
+    chat_session_windows.append(chat_session_id, [
+        ChatMessage.model_construct(role="user", content=message),
+        ChatMessage.model_construct(role="assistant", content=response),
+    ])
+
+@chat_session_router.post("/", response_model=ChatSessionRead, status_code=status.HTTP_201_CREATED)
+async def create_chat_session_route(
+    chat_session: ChatSessionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Crée une conversation avec l'assistant IA."""
+    db_chat_session = await crud_aio.create_chat_session(db, user_id=current_user.id, title=chat_session.title, response_model=ChatSessionRead)
+    chat_session_windows.set(db_chat_session.id, current_user.id, [])
+    return db_chat_session
+
+@chat_session_router.get("/", response_model=List[ChatSessionRead])
+async def read_chat_sessions_route(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Liste les conversations de l'utilisateur (la plus récente d'abord, page suivante : en-tête X-Next-Cursor)."""
+    after = cursor_param(cursor, "chat_sessions")
+    chat_sessions = await crud_aio.get_chat_sessions(db, user_id=current_user.id, skip=skip, limit=limit + 1, after=after, response_model=List[ChatSessionRead])
+    return finish_page(response, chat_sessions, limit, "chat_sessions", key=lambda chat_session: (chat_session.updated_at, chat_session.id))
+
+@chat_session_router.get("/{chat_session_id}/messages", response_model=List[ChatSessionMessageRead])
+async def read_chat_messages_route(
+    chat_session_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Messages d'une conversation (pour réafficher une conversation existante)."""
+    db_chat_session = await crud_aio.get_chat_session(db, chat_session_id=chat_session_id, user_id=current_user.id)
+    if db_chat_session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    return await crud_aio.get_chat_messages(db, chat_session_id=chat_session_id, response_model=List[ChatSessionMessageRead])
+
+@chat_session_router.post("/{chat_session_id}/messages", response_model=ChatOutput)
+async def send_chat_message_route(
+    chat_session_id: int,
+    chat_message: ChatSessionMessageCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Envoie un message dans une conversation : seul le nouveau message transite, l'historique est côté serveur."""
+    history = await _load_history(db, chat_session_id, current_user.id)
+    try:
+        response = await generation_service.get_chat_response(
+            ChatInput.model_construct(message=chat_message.message, history=history)
+        )
+    except ValueError as ve:
+        logger.error(f"Erreur de configuration IA (conversation {chat_session_id}): {ve}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"AI service configuration error: {ve}")
+    except Exception as e:
+        logger.error(f"Erreur inattendue (conversation {chat_session_id}): {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"An unexpected error occurred while processing your request: {e}")
+
+    await _record_exchange(db, chat_session_id, chat_message.message, response.response)
+    return response
+
+@chat_session_router.post("/{chat_session_id}/messages/stream", response_class=StreamingResponse)
+async def stream_chat_message_route(
+    chat_session_id: int,
+    chat_message: ChatSessionMessageCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Variante en streaming (mêmes événements SSE que /ai/chat/stream).
+
+    L'échange n'est enregistré que si la réponse est complète (pas en cas de déconnexion).
+    """
+    history = await _load_history(db, chat_session_id, current_user.id)
+    events = generation_service.stream_chat_response(ChatInput.model_construct(message=chat_message.message, history=history))
+    try:
+        first_event = await events.__anext__()
+    except StopAsyncIteration:
+        first_event = None
+    except ValueError as ve:
+        logger.error(f"Erreur de configuration IA (conversation {chat_session_id}): {ve}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"AI service configuration error: {ve}")
+    except Exception as e:
+        logger.error(f"Erreur inattendue (conversation {chat_session_id}): {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"An unexpected error occurred while processing your request: {e}")
+
+    async def event_stream():
+        tokens = []
+        try:
+            event = first_event
+            while event is not None:
+                if event.type == "token":
+                    tokens.append(event.content)
+                elif event.type == "done":
+                    # La session de la requête est déjà fermée pendant le streaming : en ouvrir une
+                    async with AsyncSessionLocal() as record_db:
+                        await _record_exchange(record_db, chat_session_id, chat_message.message, "".join(tokens))
+                yield event.to_sse()
+                event = await events.__anext__()
+        except StopAsyncIteration:
+            pass
+        except Exception as e:
+            logger.error(f"Erreur pendant le streaming (conversation {chat_session_id}): {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)}, ensure_ascii=False)}\n\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@chat_session_router.delete("/{chat_session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_chat_session_route(
+    chat_session_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Supprime une conversation et ses messages."""
+    db_chat_session = await crud_aio.get_chat_session(db, chat_session_id=chat_session_id, user_id=current_user.id)
+    if db_chat_session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    await crud_aio.delete_chat_session(db, chat_session_id=chat_session_id)
+    chat_session_windows.invalidate(chat_session_id)
+    return None
@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from datetime import datetime
+from typing import Dict
+import logging
+
+from database import get_async_db
+from crud import aio as crud_aio
+from schemas.curriculum import CurriculumManifest, CurriculumImportResult
+from schemas.resource import ResourceFileUpload
+from dependencies import get_current_active_user
+from models import User as UserModel
+from file_storage import StoredUpload, UploadTooLargeError, UploadTypeNotAllowedError, get_blob_storage_path
+from curriculum_archive import (
+    CurriculumArchiveError, discard_staged_files, existing_files, iter_curriculum_archive,
+    open_archive, read_manifest, store_archive_files,
+)
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+curriculum_router = APIRouter(
+    # prefix="/api/v1", # Géré dans app.py (routes /export et /import)
+    tags=["curriculum"],
+    responses={404: {"description": "Not found"}},
+)
+
+@curriculum_router.get("/export", response_class=StreamingResponse)
+async def export_curriculum_route(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Exporte tout le programme de l'utilisateur (progressions, séquences, séances, ressources,
+    objectifs et fichiers) dans une archive ZIP envoyée en flux, à réimporter avec POST /import."""
+    manifest, files = await crud_aio.get_curriculum_export(db, user_id=current_user.id)
+    files = await run_in_threadpool(existing_files, files)
+    for resource in manifest["resources"]:
+        if resource["file"] is not None and resource["file"]["archive_path"] not in files:
+            resource["file"] = None
+    manifest_json = CurriculumManifest.model_validate(manifest).model_dump_json(indent=2).encode()
+    filename = f"programme-{datetime.utcnow():%Y%m%d}.zip"
+    logger.info(f"Export du programme de l'utilisateur {current_user.id} ({len(files)} fichier(s))")
+    # Générateur synchrone : itéré dans le pool de threads (lectures disque hors de la boucle)
+    return StreamingResponse(
+        iter_curriculum_archive(manifest_json, files),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+def _read_archive(upload: UploadFile, stored: Dict[str, StoredUpload]) -> CurriculumManifest:
+    """Lit le manifeste puis copie les fichiers de l'archive dans le stockage par contenu (bloquant)."""
+    archive = open_archive(upload.file)
+    with archive:
+        try:
+            manifest = CurriculumManifest.model_validate(read_manifest(archive))
+        except ValidationError as e:
+            raise CurriculumArchiveError(f"Manifeste invalide : {e.errors()[0]['msg']} ({e.errors()[0]['loc']})")
+        archive_paths = list(dict.fromkeys(resource.file.archive_path for resource in manifest.resources if resource.file))
+        store_archive_files(archive, archive_paths, settings.RESUMABLE_UPLOAD_MAX_SIZE_MB * 1024 * 1024, stored)
+    return manifest
+
+@curriculum_router.post("/import", response_model=CurriculumImportResult, status_code=status.HTTP_201_CREATED)
+async def import_curriculum_route(
+    file: UploadFile = File(..., description="Archive ZIP produite par GET /export"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Importe une archive de programme : tout est créé pour l'utilisateur connecté en une
+    seule transaction, avec de nouveaux ids. Les fichiers déjà stockés (même contenu) ne sont
+    pas réécrits ; les objectifs existants de même titre sont réutilisés."""
+    max_size = settings.CURRICULUM_IMPORT_MAX_SIZE_MB * 1024 * 1024
+    if file.size is not None and file.size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"L'archive est trop volumineuse. La taille maximale est de {settings.CURRICULUM_IMPORT_MAX_SIZE_MB} Mo."
+        )
+
+    stored: Dict[str, StoredUpload] = {}
+    try:
+        try:
+            manifest = await run_in_threadpool(_read_archive, file, stored)
+        except UploadTooLargeError:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Un fichier de l'archive dépasse la taille maximale de {settings.RESUMABLE_UPLOAD_MAX_SIZE_MB} Mo."
+            )
+        except UploadTypeNotAllowedError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Fichier de l'archive refusé : {e}")
+        except CurriculumArchiveError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        files = {
+            archive_path: ResourceFileUpload(
+                file_name=archive_path.rsplit("/", 1)[-1],
+                file_type=upload.mime_type,
+                file_size=upload.size,
+                sha256=upload.sha256,
+                storage_path=get_blob_storage_path(upload.sha256, upload.mime_type),
+                staged_path=str(upload.staged_path),
+            )
+            for archive_path, upload in stored.items()
+        }
+        try:
+            result = await crud_aio.import_curriculum(db, user_id=current_user.id, manifest=manifest, files=files)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        # Fichiers reçus non publiés (import annulé, ou fichier de l'archive non utilisé)
+        await run_in_threadpool(discard_staged_files, stored.values())
+
+    new_files = sum(1 for upload in stored.values() if upload.created)
+    logger.info(f"Import d'un programme par l'utilisateur {current_user.id}: {result}, {new_files} fichier(s) écrit(s)")
+    return CurriculumImportResult(**result, files_stored=new_files, files_deduplicated=len(stored) - new_files)
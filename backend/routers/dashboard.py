@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel # Importer BaseModel depuis Pydantic
 
 import models
 import crud
-from dependencies import get_db, get_current_active_user
-from crud.progression import count_progressions, get_progressions_with_no_sequences
-from crud.sequence import count_sequences, get_sequences_with_no_sessions
-from crud.resource import count_resources
-from crud.session import count_sessions, get_sessions_with_no_resources
+from database import get_async_db
+from dependencies import get_current_active_user
+from crud import aio as crud_aio
+from config import get_settings
+
+settings = get_settings()
 
 dashboard_router = APIRouter( # Renommé la variable pour cohérence
     # prefix="/api/v1/dashboard", # Préfixe géré dans app.py
@@ -39,16 +40,25 @@ class DashboardSummary(BaseModel): # Hériter de BaseModel (Pydantic)
 
 @dashboard_router.get("/summary", response_model=DashboardSummary)
 async def get_dashboard_summary(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     user_id = current_user.id
 
     # --- Calcul des Statistiques ---
-    total_progressions = crud.progression.count_progressions(db=db, user_id=user_id)
-    total_sequences = crud.sequence.count_sequences(db=db, user_id=user_id)
-    total_resources = crud.resource.count_resources(db=db, user_id=user_id)
-    total_sessions = crud.session.count_sessions(db=db, user_id=user_id)
+    # Une seule requête (CTE) pour les éléments vides ; les compteurs sont lus dans
+    # user_stats (une ligne) si activé, sinon calculés dans la même requête.
+    if settings.DASHBOARD_COUNTERS_ENABLED:
+        aggregates = await crud_aio.get_dashboard_aggregates(db=db, user_id=user_id, include_counts=False)
+        counts = await crud_aio.get_user_counters(db=db, user_id=user_id)
+    else:
+        aggregates = await crud_aio.get_dashboard_aggregates(db=db, user_id=user_id)
+        counts = aggregates["counts"]
+
+    total_progressions = counts["total_progressions"]
+    total_sequences = counts["total_sequences"]
+    total_resources = counts["total_resources"]
+    total_sessions = counts["total_sessions"]
 
     stats_data: List[StatItem] = [
         StatItem(key="total_progressions", label="Nombre total de progressions", value=total_progressions),
@@ -85,9 +95,10 @@ async def get_dashboard_summary(
             message="Commencez par créer votre première progression pédagogique !"
         ))
 
-    progressions_no_seq = crud.progression.get_progressions_with_no_sequences(db=db, user_id=user_id)
+    # Les listes contiennent des tuples (id, titre)
+    progressions_no_seq = aggregates["progressions_without_sequences"]
     if progressions_no_seq:
-        prog_names = [p.title for p in progressions_no_seq[:3]]
+        prog_names = [title for _, title in progressions_no_seq[:3]]
         message = f"Les progressions suivantes n'ont aucune séquence : {', '.join(prog_names)}"
         if len(progressions_no_seq) > 3:
             message += f" (et {len(progressions_no_seq) - 3} autres)."
@@ -96,12 +107,12 @@ async def get_dashboard_summary(
         warnings_data.append(WarningItem(
             id="progressions_empty",
             message=message,
-            details={"count": len(progressions_no_seq), "ids": [p.id for p in progressions_no_seq]}
+            details={"count": len(progressions_no_seq), "ids": [prog_id for prog_id, _ in progressions_no_seq]}
         ))
         
-    sequences_no_sess = crud.sequence.get_sequences_with_no_sessions(db=db, user_id=user_id)
+    sequences_no_sess = aggregates["sequences_without_sessions"]
     if sequences_no_sess:
-        seq_names = [s.title for s in sequences_no_sess[:3]]
+        seq_names = [title for _, title in sequences_no_sess[:3]]
         message = f"Les séquences suivantes sont vides (pas de session) : {', '.join(seq_names)}"
         if len(sequences_no_sess) > 3:
             message += f" (et {len(sequences_no_sess) - 3} autres)."
@@ -110,12 +121,12 @@ async def get_dashboard_summary(
         warnings_data.append(WarningItem(
             id="sequences_empty",
             message=message,
-            details={"count": len(sequences_no_sess), "ids": [s.id for s in sequences_no_sess]}
+            details={"count": len(sequences_no_sess), "ids": [seq_id for seq_id, _ in sequences_no_sess]}
         ))
         
-    sessions_no_res = crud.session.get_sessions_with_no_resources(db=db, user_id=user_id)
+    sessions_no_res = aggregates["sessions_without_resources"]
     if sessions_no_res:
-        sess_names = [s.title for s in sessions_no_res[:3]]
+        sess_names = [title for _, title in sessions_no_res[:3]]
         message = f"Les sessions suivantes sont vides (pas de ressource) : {', '.join(sess_names)}"
         if len(sessions_no_res) > 3:
             message += f" (et {len(sessions_no_res) - 3} autres)."
@@ -124,7 +135,7 @@ async def get_dashboard_summary(
         warnings_data.append(WarningItem(
             id="sessions_empty",
             message=message,
-            details={"count": len(sessions_no_res), "ids": [s.id for s in sessions_no_res]}
+            details={"count": len(sessions_no_res), "ids": [sess_id for sess_id, _ in sessions_no_res]}
         ))
 
     return DashboardSummary(stats=stats_data, warnings=warnings_data)
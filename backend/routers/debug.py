@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query, status
+
+from schemas.debug import SqlReport
+from sql_instrumentation import sql_monitor
+from dependencies import get_current_admin_user
+
+debug_router = APIRouter(
+    # prefix="/debug", # Géré dans app.py
+    tags=["debug"],
+    # Le rapport expose les requêtes SQL et les routes de tous les utilisateurs : réservé aux administrateurs
+    dependencies=[Depends(get_current_admin_user)],
+    responses={404: {"description": "Not found"}},
+)
+
+@debug_router.get("/sql", response_model=SqlReport)
+async def sql_report_route(
+    recent: int = Query(50, ge=0, le=500, description="Nombre de dernières requêtes HTTP à détailler")
+):
+    """Rapport d'instrumentation SQL : requêtes par route, N+1 détectés, dernières requêtes HTTP."""
+    return sql_monitor.report(limit=recent)
+
+@debug_router.delete("/sql", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_sql_report_route():
+    """Remet le rapport à zéro (ex: avant de mesurer un parcours précis)."""
+    sql_monitor.reset()
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from database import get_async_db
+from crud import aio as crud_aio
+from schemas.job import JobRead, JobStatus
+from dependencies import get_current_active_user
+from models import User as UserModel
+from job_queue import job_workers
+from pagination import cursor_param, finish_page
+
+job_router = APIRouter(
+    # prefix="/jobs", # Géré dans app.py
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+async def _get_user_job(db: AsyncSession, job_id: int, user_id: int):
+    db_job = await crud_aio.get_job(db, job_id=job_id, user_id=user_id)
+    if db_job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return db_job
+
+@job_router.get("/", response_model=List[JobRead])
+async def read_jobs_route(
+    response: Response,
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Liste les tâches de fond de l'utilisateur (filtrables par statut, ex: dead ; page suivante : en-tête X-Next-Cursor)."""
+    after = cursor_param(cursor, "jobs")
+    jobs = await crud_aio.get_jobs(db, user_id=current_user.id, status=status_filter, skip=skip, limit=limit + 1, after=after, response_model=List[JobRead])
+    return finish_page(response, jobs, limit, "jobs", key=lambda job: (job.id,))
+
+@job_router.get("/{job_id}", response_model=JobRead)
+async def read_job_route(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Statut, avancement et résultat (ou erreur) d'une tâche de fond."""
+    return JobRead.model_validate(await _get_user_job(db, job_id, current_user.id))
+
+@job_router.post("/{job_id}/retry", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def retry_job_route(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Relance une tâche en échec (failed) ou en lettres mortes (dead)."""
+    await _get_user_job(db, job_id, current_user.id)
+    db_job = await crud_aio.retry_job(db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Only failed or dead jobs can be retried")
+    job_workers.notify()
+    return JobRead.model_validate(db_job)
+
+@job_router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_job_route(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Annule une tâche en file, ou supprime une tâche terminée (pas une tâche en cours)."""
+    await _get_user_job(db, job_id, current_user.id)
+    if not await crud_aio.delete_job(db, job_id=job_id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A running job cannot be deleted")
+    return None
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import hmac
+
+from config import get_settings
+from metrics import registry
+import monitoring  # Enregistre les métriques et collecteurs de l'application
+
+settings = get_settings()
+
+metrics_router = APIRouter(
+    tags=["monitoring"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Type de contenu du format texte Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_route(authorization: Optional[str] = Header(None)):
+    """Métriques du processus au format texte Prometheus (latences par route, pool de connexions, LLM, uploads, caches)."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    if settings.METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
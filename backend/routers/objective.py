@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from database import get_db
-from crud import objective as crud_objective
+from database import get_async_db
+from crud import aio as crud_objective
 from schemas import objective as schemas_objective
+from pagination import cursor_param, finish_page
+from batching import batch_result, check_batch_size
+from schemas.batch import BatchResult
+from dependencies import get_current_active_user
+from models import User as UserModel
 # Importer les schémas "simples" si/quand ils seront créés
 from schemas.sequence import SequenceReadSimple
 from schemas.session import SessionReadSimple
@@ -14,32 +19,33 @@ objective_router = APIRouter()
 # --- CRUD Routes for Objective --- #
 
 @objective_router.post("/", response_model=schemas_objective.ObjectiveRead, status_code=status.HTTP_201_CREATED)
-def create_objective(objective: schemas_objective.ObjectiveCreate, db: Session = Depends(get_db)):
+async def create_objective(objective: schemas_objective.ObjectiveCreate, db: AsyncSession = Depends(get_async_db)):
     """Crée un nouvel objectif."""
     try:
-        return crud_objective.create_objective(db=db, objective=objective)
+        return await crud_objective.create_objective(db=db, objective=objective, response_model=schemas_objective.ObjectiveRead)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @objective_router.get("/", response_model=List[schemas_objective.ObjectiveRead])
-def read_objectives(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Récupère une liste d'objectifs."""
-    objectives = crud_objective.get_objectives(db, skip=skip, limit=limit)
-    return objectives
+async def read_objectives(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Récupère une liste d'objectifs (page suivante : en-tête X-Next-Cursor)."""
+    after = cursor_param(cursor, "objectives")
+    objectives = await crud_objective.get_objectives(db, skip=skip, limit=limit + 1, after=after, response_model=List[schemas_objective.ObjectiveRead])
+    return finish_page(response, objectives, limit, "objectives", key=lambda objective: (objective.id,))
 
 @objective_router.get("/{objective_id}", response_model=schemas_objective.ObjectiveRead)
-def read_objective(objective_id: int, db: Session = Depends(get_db)):
+async def read_objective(objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère un objectif par son ID."""
-    db_objective = crud_objective.get_objective(db, objective_id=objective_id)
+    db_objective = await crud_objective.get_objective(db, objective_id=objective_id, response_model=schemas_objective.ObjectiveRead)
     if db_objective is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Objective not found")
     return db_objective
 
 @objective_router.put("/{objective_id}", response_model=schemas_objective.ObjectiveRead)
-def update_objective(objective_id: int, objective: schemas_objective.ObjectiveUpdate, db: Session = Depends(get_db)):
+async def update_objective(objective_id: int, objective: schemas_objective.ObjectiveUpdate, db: AsyncSession = Depends(get_async_db)):
     """Met à jour un objectif."""
     try:
-        db_objective = crud_objective.update_objective(db, objective_id=objective_id, objective_update=objective)
+        db_objective = await crud_objective.update_objective(db, objective_id=objective_id, objective_update=objective, response_model=schemas_objective.ObjectiveRead)
         if db_objective is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Objective not found")
         return db_objective
@@ -47,48 +53,64 @@ def update_objective(objective_id: int, objective: schemas_objective.ObjectiveUp
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @objective_router.delete("/{objective_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_objective(objective_id: int, db: Session = Depends(get_db)):
+async def delete_objective(objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Supprime un objectif."""
-    deleted = crud_objective.delete_objective(db, objective_id=objective_id)
+    deleted = await crud_objective.delete_objective(db, objective_id=objective_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Objective not found")
     return None # Ou Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Association Routes --- #
 
+@objective_router.put("/links/batch", response_model=BatchResult)
+async def set_objective_links_batch(
+    batch: schemas_objective.ObjectiveLinksBatch,
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Remplace les objectifs de plusieurs séances et séquences en une seule transaction.
+
+    Chaque élément reçoit son résultat (updated, error). Avec all_or_nothing=true, rien n'est
+    écrit si un élément est en erreur.
+    """
+    check_batch_size(len(batch.items))
+    results = await crud_objective.set_objective_links_batch(db, user_id=current_user.id, items=batch.items, all_or_nothing=all_or_nothing)
+    return batch_result(results)
+
 # -- Sequence <-> Objective -- #
 
 @objective_router.post("/sequences/{sequence_id}/objectives/{objective_id}", status_code=status.HTTP_204_NO_CONTENT)
-def link_objective_to_sequence(sequence_id: int, objective_id: int, db: Session = Depends(get_db)):
+async def link_objective_to_sequence(sequence_id: int, objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Associe un objectif existant à une séquence existante."""
     try:
-        crud_objective.add_objective_to_sequence(db, sequence_id=sequence_id, objective_id=objective_id)
+        await crud_objective.add_objective_to_sequence(db, sequence_id=sequence_id, objective_id=objective_id)
         return None
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @objective_router.delete("/sequences/{sequence_id}/objectives/{objective_id}", status_code=status.HTTP_204_NO_CONTENT)
-def unlink_objective_from_sequence(sequence_id: int, objective_id: int, db: Session = Depends(get_db)):
+async def unlink_objective_from_sequence(sequence_id: int, objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Désassocie un objectif d'une séquence."""
     try:
-        crud_objective.remove_objective_from_sequence(db, sequence_id=sequence_id, objective_id=objective_id)
+        await crud_objective.remove_objective_from_sequence(db, sequence_id=sequence_id, objective_id=objective_id)
         return None
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @objective_router.get("/by_sequence/{sequence_id}", response_model=List[schemas_objective.ObjectiveRead])
-def get_objectives_for_sequence(sequence_id: int, db: Session = Depends(get_db)):
+async def get_objectives_for_sequence(sequence_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère tous les objectifs associés à une séquence spécifique."""
     try:
-        return crud_objective.get_objectives_by_sequence(db, sequence_id=sequence_id)
+        return await crud_objective.get_objectives_by_sequence(db, sequence_id=sequence_id, response_model=List[schemas_objective.ObjectiveRead])
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @objective_router.get("/{objective_id}/sequences", response_model=List[SequenceReadSimple])
-def get_sequences_for_objective(objective_id: int, db: Session = Depends(get_db)):
+async def get_sequences_for_objective(objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère la liste simplifiée des séquences associées à un objectif spécifique."""
     try:
-        sequences = crud_objective.get_sequences_by_objective(db, objective_id=objective_id)
+        sequences = await crud_objective.get_sequences_by_objective(db, objective_id=objective_id, response_model=List[SequenceReadSimple])
         # Pydantic convertira automatiquement les objets Sequence en SequenceReadSimple
         return sequences
     except ValueError as e:
@@ -97,36 +119,36 @@ def get_sequences_for_objective(objective_id: int, db: Session = Depends(get_db)
 # -- Session <-> Objective -- #
 
 @objective_router.post("/sessions/{session_id}/objectives/{objective_id}", status_code=status.HTTP_204_NO_CONTENT)
-def link_objective_to_session(session_id: int, objective_id: int, db: Session = Depends(get_db)):
+async def link_objective_to_session(session_id: int, objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Associe un objectif existant à une séance existante."""
     try:
-        crud_objective.add_objective_to_session(db, session_id=session_id, objective_id=objective_id)
+        await crud_objective.add_objective_to_session(db, session_id=session_id, objective_id=objective_id)
         return None
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @objective_router.delete("/sessions/{session_id}/objectives/{objective_id}", status_code=status.HTTP_204_NO_CONTENT)
-def unlink_objective_from_session(session_id: int, objective_id: int, db: Session = Depends(get_db)):
+async def unlink_objective_from_session(session_id: int, objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Désassocie un objectif d'une séance."""
     try:
-        crud_objective.remove_objective_from_session(db, session_id=session_id, objective_id=objective_id)
+        await crud_objective.remove_objective_from_session(db, session_id=session_id, objective_id=objective_id)
         return None
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @objective_router.get("/by_session/{session_id}", response_model=List[schemas_objective.ObjectiveRead])
-def get_objectives_for_session(session_id: int, db: Session = Depends(get_db)):
+async def get_objectives_for_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère tous les objectifs associés à une séance spécifique."""
     try:
-        return crud_objective.get_objectives_by_session(db, session_id=session_id)
+        return await crud_objective.get_objectives_by_session(db, session_id=session_id, response_model=List[schemas_objective.ObjectiveRead])
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @objective_router.get("/{objective_id}/sessions", response_model=List[SessionReadSimple])
-def get_sessions_for_objective(objective_id: int, db: Session = Depends(get_db)):
+async def get_sessions_for_objective(objective_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupère la liste simplifiée des séances associées à un objectif spécifique."""
     try:
-        sessions = crud_objective.get_sessions_by_objective(db, objective_id=objective_id)
+        sessions = await crud_objective.get_sessions_by_objective(db, objective_id=objective_id, response_model=List[SessionReadSimple])
         # Pydantic convertira automatiquement les objets Session en SessionReadSimple
         return sessions
     except ValueError as e:
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import crud
-from schemas.resource import ResourceCreate, ResourceUpdate, ResourceResponse, ResourceFileUpload
-from database import get_db
+from crud import aio as crud_aio
+from schemas.resource import ResourceCreate, ResourceUpdate, ResourceResponse, ResourceFileUpload, ResourceBatch
+from schemas.batch import BatchResult
+from database import get_async_db
 from dependencies import get_current_active_user # Import corrigé
 from models import User as UserModel # Pour l'info utilisateur
 import logging
 import os
-import shutil
 from pathlib import Path
 import json # Pour parser session_ids
 from fastapi import status
 from werkzeug.utils import secure_filename # Sécurité: importer depuis werkzeug.utils
+from file_storage import store_upload_blob, discard_staged_blob, get_blob_storage_path, UploadTooLargeError, UploadTypeNotAllowedError
+from media import media_file_response
 from config import get_settings
+from pagination import cursor_param, finish_page
+from batching import batch_result, check_batch_size
 settings = get_settings()
 
 logger = logging.getLogger(__name__)
@@ -25,12 +30,31 @@ DISK_UPLOADS_BASE = settings.UPLOADS_BASE_DIR
 resource_router = APIRouter()
 logger.info(">>> APIRouter() INSTANTIATED for resources <<<") # <--- ADD LOG 2
 
+def _get_session_owner_id(db, session_id: int) -> Optional[int]:
+    """Renvoie l'ID du propriétaire d'une séance (via séquence -> progression), ou None."""
+    db_session = crud.session.get_session(db=db, session_id=session_id) # Ne prend pas user_id
+    if db_session is None or db_session.sequence is None or db_session.sequence.progression is None:
+        return None
+    return db_session.sequence.progression.user_id
+
+def _upload_error_to_http(e: Exception) -> HTTPException:
+    """Convertit une erreur de file_storage en réponse HTTP (413 ou 400)."""
+    if isinstance(e, UploadTooLargeError):
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Le fichier est trop volumineux. La taille maximale est de {settings.MAX_UPLOAD_SIZE_MB} Mo."
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Type de fichier non autorisé. Seuls les fichiers {', '.join(settings.ALLOWED_UPLOAD_MIME_TYPES)} sont acceptés."
+    )
+
 # --- Routes pour les Ressources ---
 
 @resource_router.post("/", response_model=ResourceResponse)
 async def create_resource_route(
     *, # Force les arguments suivants à être keyword-only
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
     title: str = Form(...),
     description: Optional[str] = Form(None),
@@ -59,25 +83,9 @@ async def create_resource_route(
         raise HTTPException(status_code=400, detail=f"Format invalide pour session_ids_json: {e}")
 
     # --- Validation du fichier uploadé ---
-    if source_type == 'file':
-        if file is None:
-            raise HTTPException(status_code=400, detail="Un fichier est requis lorsque source_type est 'file'")
-        
-        if file.content_type not in settings.ALLOWED_UPLOAD_MIME_TYPES:
-            logger.error(f"File type not allowed: {file.content_type}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Type de fichier non autorisé. Seuls les fichiers {', '.join(settings.ALLOWED_UPLOAD_MIME_TYPES)} sont acceptés."
-            )
-        
-        actual_size = file.size
-        if actual_size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
-            logger.error(f"File size exceeded limit: {actual_size} bytes")
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Le fichier est trop volumineux. La taille maximale est de {settings.MAX_UPLOAD_SIZE_MB} Mo."
-            )
-        logger.info(f"File validation passed for {file.filename}")
+    # Type et taille sont vérifiés pendant l'écriture (save_upload_file), sur le contenu réel
+    if source_type == 'file' and file is None:
+        raise HTTPException(status_code=400, detail="Un fichier est requis lorsque source_type est 'file'")
     # -------------------------------------
 
     # Préparer les données pour le schéma ResourceCreate
@@ -101,42 +109,39 @@ async def create_resource_route(
         if not safe_filename: # Vérifier si secure_filename n'a pas tout supprimé
              raise HTTPException(status_code=400, detail="Nom de fichier invalide.")
 
-        # Construire le chemin ABSOLU sur le disque Render
-        user_upload_dir_on_disk = Path(DISK_UPLOADS_BASE) / str(current_user.id)
-        user_upload_dir_on_disk.mkdir(parents=True, exist_ok=True) # Crée /var/data/uploads-storage/uploads/USER_ID/
-        final_file_path_on_disk = user_upload_dir_on_disk / safe_filename
-
-        # Sauvegarder le fichier sur le disque
+        # Recevoir le contenu ; il est publié dans le stockage dédupliqué lors de la création
         try:
-            with open(final_file_path_on_disk, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            logger.info(f"Fichier '{safe_filename}' sauvegardé dans '{final_file_path_on_disk}' pour user {current_user.id}")
+            stored = await store_upload_blob(file)
+            logger.info(f"Fichier '{safe_filename}' reçu pour '{stored.path}' (user {current_user.id})")
+        except (UploadTooLargeError, UploadTypeNotAllowedError) as e:
+            logger.error(f"Fichier {safe_filename} refusé: {e}")
+            raise _upload_error_to_http(e)
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du fichier {safe_filename} sur disque: {e}")
-            # Supprimer le fichier potentiellement partiellement écrit ?
-            if final_file_path_on_disk.exists():
-                final_file_path_on_disk.unlink()
             raise HTTPException(status_code=500, detail="Erreur interne lors de la sauvegarde du fichier.")
         finally:
              # S'assurer que le file descriptor est fermé (important avec UploadFile)
              await file.close()
+        # Fichier reçu non publié : supprimé si la création échoue
+        temp_file_path = str(stored.staged_path)
 
-        # Obtenir le chemin RELATIF pour la BDD
-        file_path_relative_for_db = safe_filename
-
-        # Préparer les informations du fichier pour le CRUD
+        # Préparer les informations du fichier pour le CRUD (type détecté, taille réellement écrite)
         file_upload_data = ResourceFileUpload(
             file_name=safe_filename,
-            file_type=file.content_type,
-            file_size=file.size
+            file_type=stored.mime_type,
+            file_size=stored.size,
+            sha256=stored.sha256,
+            storage_path=get_blob_storage_path(stored.sha256, stored.mime_type),
+            staged_path=temp_file_path
         )
         
     # Appeler la fonction CRUD pour créer la ressource en BDD
     try:
-        db_resource = crud.resource.create_resource(
+        db_resource = await crud_aio.create_resource(
             db=db, 
             resource=resource_data, 
-            file_upload=file_upload_data # Passer les infos du fichier
+            file_upload=file_upload_data, # Passer les infos du fichier
+            response_model=ResourceResponse
         )
         logger.info(f"Ressource créée avec ID: {db_resource.id}")
         # La fonction CRUD retourne maintenant l'objet SQLAlchemy chargé
@@ -165,41 +170,41 @@ async def create_resource_route(
 
 # --- Route GET pour lister toutes les ressources de l'utilisateur ---
 @resource_router.get("/", response_model=List[ResourceResponse])
-def read_resources(
-    db: Session = Depends(get_db),
+async def read_resources(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
-    """Récupère la liste des ressources pour l'utilisateur courant."""
+    """Récupère la liste des ressources pour l'utilisateur courant (page suivante : en-tête X-Next-Cursor)."""
     logger.info(f"Lecture des ressources pour l'utilisateur {current_user.id}")
-    resources = crud.resource.get_resources(db, user_id=current_user.id, skip=skip, limit=limit)
-    # FastAPI convertit la liste d'objets SQLAlchemy en List[ResourceResponse]
-    return resources
+    after = cursor_param(cursor, "resources")
+    resources = await crud_aio.get_resources(db, user_id=current_user.id, skip=skip, limit=limit + 1, after=after, response_model=List[ResourceResponse])
+    return finish_page(response, resources, limit, "resources", key=lambda resource: (resource.id,))
 
 # --- Route GET pour les ressources d'une session spécifique ---
 @resource_router.get("/by_session/{session_id}", response_model=list[ResourceResponse])
 async def read_resources_by_session(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
 ):
     logger.info(f">>> ENTERING read_resources_by_session for session {session_id} <<<") # <--- ADD LOG 3
     """Récupère les ressources d'une session spécifique pour l'utilisateur courant."""
     # ---> AJOUT: Vérifier d'abord si la session existe et appartient à l'utilisateur
-    db_session = crud.session.get_session(db=db, session_id=session_id) # Ne prend pas user_id
+    # (la chaîne séance -> séquence -> progression est parcourue dans run_sync)
+    owner_id = await crud_aio.run(db, _get_session_owner_id, session_id)
     
     # Vérification existence ET appartenance
-    if db_session is None or \
-       db_session.sequence is None or \
-       db_session.sequence.progression is None or \
-       db_session.sequence.progression.user_id != current_user.id:
+    if owner_id is None or owner_id != current_user.id:
         logger.warning(f"Session {session_id} non trouvée ou non appartenant à l'utilisateur {current_user.id} lors de la demande de ressources.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Session {session_id} not found")
     
     logger.info(f"Lecture des ressources pour la session {session_id} par l'utilisateur {current_user.id}")
     # Utiliser les valeurs par défaut pour skip/limit dans la fonction CRUD
-    resources = crud.resource.get_resources_by_session(db=db, session_id=session_id, user_id=current_user.id) # Ici on passe user_id à la fonction CRUD des *ressources*
+    resources = await crud_aio.get_resources_by_session(db=db, session_id=session_id, user_id=current_user.id, response_model=List[ResourceResponse]) # Ici on passe user_id à la fonction CRUD des *ressources*
  
     if not resources:
         logger.warning(f"Aucune ressource trouvée pour la session {session_id} appartenant à l'utilisateur {current_user.id}")
@@ -207,32 +212,30 @@ async def read_resources_by_session(
 
 # --- Route GET pour les ressources standalone ---
 @resource_router.get("/standalone/", response_model=List[ResourceResponse])
-def read_standalone_resources(
-    db: Session = Depends(get_db), 
+async def read_standalone_resources(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db), 
     current_user: UserModel = Depends(get_current_active_user),
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """Récupère les ressources non associées à une session (pour l'utilisateur courant)."""
-    # NOTE: Cette route nécessite une fonction CRUD dédiée ou un filtrage spécifique.
-    # Pour l'instant, on utilise une fonction hypothétique qui filtre par user ET absence de session.
     logger.info(f"Lecture des ressources standalone pour l'utilisateur {current_user.id}")
-    resources = crud.resource.get_standalone_resources_for_user(db=db, user_id=current_user.id, skip=skip, limit=limit)
-    if resources is None: # Si la fonction CRUD n'est pas prête, retourne une liste vide
-        logger.warning(f"Fonctionnalité standalone pour user {current_user.id} non entièrement implémentée dans le CRUD.")
-        return []
-    return resources
+    after = cursor_param(cursor, "resources")
+    resources = await crud_aio.get_resources_standalone(db, user_id=current_user.id, skip=skip, limit=limit + 1, after=after, response_model=List[ResourceResponse])
+    return finish_page(response, resources, limit, "resources", key=lambda resource: (resource.id,))
 
 # --- Route GET pour une ressource spécifique par ID ---
 @resource_router.get("/{resource_id}", response_model=ResourceResponse)
-def read_resource(
+async def read_resource(
     resource_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Récupère une ressource spécifique par son ID."""
     logger.info(f"Lecture de la ressource {resource_id} pour l'utilisateur {current_user.id}")
-    db_resource = crud.resource.get_resource(db, resource_id=resource_id)
+    db_resource = await crud_aio.get_resource(db, resource_id=resource_id, response_model=ResourceResponse)
     if db_resource is None:
         logger.warning(f"Ressource {resource_id} non trouvée.")
         raise HTTPException(status_code=404, detail="Resource not found")
@@ -241,11 +244,29 @@ def read_resource(
         raise HTTPException(status_code=403, detail="Not authorized to access this resource")
     return db_resource
 
+@resource_router.get("/{resource_id}/file")
+async def read_resource_file(
+    resource_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Sert le fichier d'une ressource : requêtes Range (206), ETag et réponses 304."""
+    db_resource = await crud_aio.get_resource(db, resource_id=resource_id, response_model=ResourceResponse)
+    if db_resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    if db_resource.user_id != current_user.id:
+        logger.error(f"Accès non autorisé au fichier de la ressource {resource_id} par l'utilisateur {current_user.id}")
+        raise HTTPException(status_code=403, detail="Not authorized to access this resource")
+    if db_resource.source_type != 'file' or not db_resource.file_path:
+        raise HTTPException(status_code=404, detail="Resource has no file")
+    return await media_file_response(request, db_resource.file_path, media_type=db_resource.file_type)
+
 @resource_router.put("/{resource_id}", response_model=ResourceResponse)
 async def update_resource_route(
     resource_id: int,
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user),
     title: Optional[str] = Form(None),
     description: Optional[str] = Form(None),
@@ -261,7 +282,7 @@ async def update_resource_route(
     logger.info(f"Tentative de mise à jour de la ressource {resource_id} par l'utilisateur {current_user.id}")
 
     # Vérifier d'abord si la ressource existe et appartient à l'utilisateur
-    db_resource_check = crud.resource.get_resource(db, resource_id=resource_id)
+    db_resource_check = await crud_aio.get_resource(db, resource_id=resource_id)
     if db_resource_check is None:
         logger.warning(f"Ressource {resource_id} non trouvée pour la mise à jour.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
@@ -281,24 +302,7 @@ async def update_resource_route(
             logger.error(f"Erreur de parsing JSON pour session_ids lors de la mise à jour: {e}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Format invalide pour session_ids_json: {e}")
 
-    # --- Validation du fichier uploadé --- (déjà adapté aux settings)
-    if file:
-        if file.content_type not in settings.ALLOWED_UPLOAD_MIME_TYPES:
-            logger.error(f"File type not allowed: {file.content_type}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Type de fichier non autorisé. Seuls les fichiers {', '.join(settings.ALLOWED_UPLOAD_MIME_TYPES)} sont acceptés."
-            )
-        
-        actual_size = file.size
-        if actual_size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
-            logger.error(f"File size exceeded limit: {actual_size} bytes")
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Le fichier est trop volumineux. La taille maximale est de {settings.MAX_UPLOAD_SIZE_MB} Mo."
-            )
-        logger.info(f"File validation passed for {file.filename}")
-    # -------------------------------------
+    # La validation du fichier (type réel, taille) est faite pendant l'écriture (save_upload_file)
     
     # Préparer les données pour le schéma ResourceUpdate
     update_data = ResourceUpdate(
@@ -315,43 +319,45 @@ async def update_resource_route(
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Aucune donnée fournie pour la mise à jour.")
 
     file_upload_data: Optional[ResourceFileUpload] = None
-    temp_saved_file_path: Optional[Path] = None
 
     # Gérer le fichier uploadé s'il est fourni
     if file is not None:
         safe_filename = secure_filename(file.filename) # Sécuriser le nom
-        file_upload_data = ResourceFileUpload(
-            file_name=safe_filename, # Utiliser le nom sécurisé
-            file_type=file.content_type,
-            file_size=file.size
-        )
+        if not safe_filename:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nom de fichier invalide.")
         
-        # Utiliser UPLOADS_BASE_DIR des settings
-        user_upload_dir_on_disk = settings.UPLOADS_BASE_DIR / str(current_user.id)
-        user_upload_dir_on_disk.mkdir(parents=True, exist_ok=True)
-        final_file_path_on_disk = user_upload_dir_on_disk / safe_filename
-        temp_saved_file_path = final_file_path_on_disk # Garder une trace pour suppression en cas d'erreur CRUD
-
         try:
-            logger.info(f"Sauvegarde du nouveau fichier pour mise à jour vers : {final_file_path_on_disk}")
-            # Utiliser write() qui est asynchrone avec UploadFile
-            with open(final_file_path_on_disk, "wb") as buffer:
-                buffer.write(await file.read())
-            logger.info(f"Nouveau fichier sauvegardé avec succès : {final_file_path_on_disk}")
+            # Stockage dédupliqué : le fichier reçu est publié lors de la mise à jour
+            stored = await store_upload_blob(file)
+            logger.info(f"Nouveau fichier reçu pour : {stored.path}")
+        except (UploadTooLargeError, UploadTypeNotAllowedError) as e:
+            logger.error(f"Nouveau fichier {safe_filename} refusé: {e}")
+            raise _upload_error_to_http(e)
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du nouveau fichier {safe_filename}: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erreur lors de la sauvegarde du fichier: {e}")
         finally:
             await file.close()
 
+        # Informations du fichier pour le CRUD (type détecté, taille réellement écrite)
+        file_upload_data = ResourceFileUpload(
+            file_name=safe_filename, # Utiliser le nom sécurisé
+            file_type=stored.mime_type,
+            file_size=stored.size,
+            sha256=stored.sha256,
+            storage_path=get_blob_storage_path(stored.sha256, stored.mime_type),
+            staged_path=str(stored.staged_path)
+        )
+
     # Appeler la fonction CRUD pour mettre à jour
     try:
         # La fonction CRUD doit gérer la suppression de l'ancien fichier si nécessaire
-        updated_resource = crud.resource.update_resource(
+        updated_resource = await crud_aio.update_resource(
             db=db, 
             resource_id=resource_id, 
             resource_update=ResourceUpdate(**update_data), 
-            file_upload=file_upload_data # La fonction CRUD doit gérer l'user_id via resource_id
+            file_upload=file_upload_data, # La fonction CRUD doit gérer l'user_id via resource_id
+            response_model=ResourceResponse
         )
         if updated_resource is None: # Si CRUD retourne None (par ex. ressource non trouvée par lui)
              # Normalement déjà géré par la vérification initiale, mais double sécurité
@@ -360,38 +366,46 @@ async def update_resource_route(
         return updated_resource
     except ValueError as e:
         # Si le CRUD lève une ValueError (ex: session non trouvée, problème logique)
-        # Supprimer le fichier qu'on VIENT de sauvegarder si on en a sauvegardé un
-        if temp_saved_file_path and temp_saved_file_path.exists():
-            try:
-                os.remove(temp_saved_file_path)
-                logger.warning(f"Nouveau fichier uploadé {temp_saved_file_path} supprimé car la mise à jour a échoué: {e}")
-            except OSError as remove_err:
-                logger.error(f"Erreur lors de la suppression du nouveau fichier après échec mise à jour {temp_saved_file_path}: {remove_err}")
         logger.error(f"Erreur (ValueError) lors de la mise à jour de la ressource {resource_id}: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         # Autre erreur inattendue
-        if temp_saved_file_path and temp_saved_file_path.exists():
-            try:
-                os.remove(temp_saved_file_path)
-                logger.warning(f"Nouveau fichier uploadé {temp_saved_file_path} supprimé car la mise à jour a échoué: {e}")
-            except OSError as remove_err:
-                logger.error(f"Erreur lors de la suppression du nouveau fichier après échec mise à jour {temp_saved_file_path}: {remove_err}")
         logger.error(f"Erreur serveur inattendue lors de la mise à jour de la ressource {resource_id}: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur interne du serveur.")
+    finally:
+        # Fichier reçu non publié (mise à jour refusée) : le supprimer
+        if file_upload_data is not None:
+            discard_staged_blob(file_upload_data.staged_path)
+
+# --- Route PATCH pour modifier plusieurs ressources ---
+@resource_router.patch("/batch", response_model=BatchResult)
+async def update_resources_batch_route(
+    batch: ResourceBatch,
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Met à jour plusieurs ressources (champs et séances liées, sans fichier) en une seule transaction.
+
+    Chaque élément reçoit son résultat (updated, error). Avec all_or_nothing=true, rien n'est
+    écrit si un élément est en erreur.
+    """
+    check_batch_size(len(batch.items))
+    results = await crud_aio.update_resources_batch(db, user_id=current_user.id, items=batch.items, all_or_nothing=all_or_nothing)
+    return batch_result(results)
 
 # --- Route DELETE pour supprimer ---
 @resource_router.delete("/{resource_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_resource_route(
+async def delete_resource_route(
     resource_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Supprime une ressource et son fichier associé si elle en a un."""
     logger.info(f"Tentative de suppression de la ressource {resource_id} par l'utilisateur {current_user.id}")
     
     # Vérifier d'abord si la ressource existe et appartient à l'utilisateur
-    db_resource_check = crud.resource.get_resource(db, resource_id=resource_id)
+    db_resource_check = await crud_aio.get_resource(db, resource_id=resource_id)
     if db_resource_check is None:
         logger.warning(f"Ressource {resource_id} non trouvée pour la suppression.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
@@ -400,8 +414,9 @@ def delete_resource_route(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this resource")
 
     # Garder une trace du chemin du fichier avant de supprimer l'enregistrement BDD
+    # (les fichiers du stockage dédupliqué sont gérés par le CRUD, selon leur nombre de références)
     file_path_to_delete: Optional[Path] = None
-    if db_resource_check.file_path:
+    if db_resource_check.file_path and db_resource_check.blob_sha256 is None:
         # Reconstruire le chemin absolu basé sur UPLOADS_BASE_DIR
         # Note: db_resource_check.file_path devrait contenir le chemin relatif incluant le nom sécurisé
         relative_path = Path(db_resource_check.file_path)
@@ -409,7 +424,7 @@ def delete_resource_route(
         logger.info(f"Chemin du fichier à supprimer identifié : {file_path_to_delete}")
 
     # Appeler la fonction CRUD pour supprimer l'enregistrement en BDD
-    deleted = crud.resource.delete_resource(db=db, resource_id=resource_id)
+    deleted = await crud_aio.delete_resource(db=db, resource_id=resource_id)
     
     if not deleted:
         # Ceci ne devrait pas arriver si la vérification initiale a réussi, mais par sécurité
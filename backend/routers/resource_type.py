@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from database import get_db
-import crud
+from database import get_async_db
+from crud import aio as crud
 from schemas.resource_type import ResourceTypeResponse, ResourceSubTypeResponse, ResourceTypeWithSubTypes
+from pagination import cursor_param, finish_page
 
 resource_type_router = APIRouter(
     tags=["resource_types"],
@@ -12,24 +13,25 @@ resource_type_router = APIRouter(
 )
 
 @resource_type_router.get("/types", response_model=List[ResourceTypeResponse])
-def get_resource_types_route(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_resource_types_route(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
     Récupère la liste de tous les types de ressources.
     """
-    resource_types = crud.get_resource_types(db, skip=skip, limit=limit)
-    return resource_types
+    after = cursor_param(cursor, "resource_types")
+    resource_types = await crud.get_resource_types(db, skip=skip, limit=limit + 1, after=after, response_model=List[ResourceTypeResponse])
+    return finish_page(response, resource_types, limit, "resource_types", key=lambda resource_type: (resource_type.id,))
 
 @resource_type_router.get("/types/{type_id}", response_model=ResourceTypeWithSubTypes)
-def get_resource_type_route(type_id: int, db: Session = Depends(get_db)):
+async def get_resource_type_route(type_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Récupère un type de ressource par son ID avec ses sous-types.
     """
-    resource_type = crud.get_resource_type(db, type_id=type_id)
+    resource_type = await crud.get_resource_type(db, type_id=type_id)
     if resource_type is None:
         raise HTTPException(status_code=404, detail="Type de ressource non trouvé")
     
     # Récupérer les sous-types associés
-    subtypes = crud.get_resource_subtypes(db, type_id=type_id)
+    subtypes = await crud.get_resource_subtypes(db, type_id=type_id, response_model=List[ResourceSubTypeResponse])
     
     # Créer un objet ResourceTypeWithSubTypes
     return ResourceTypeWithSubTypes(
@@ -40,19 +42,20 @@ def get_resource_type_route(type_id: int, db: Session = Depends(get_db)):
     )
 
 @resource_type_router.get("/subtypes", response_model=List[ResourceSubTypeResponse])
-def get_resource_subtypes_route(type_id: int = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_resource_subtypes_route(response: Response, type_id: int = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
     Récupère la liste des sous-types de ressources, optionnellement filtrés par type_id.
     """
-    resource_subtypes = crud.get_resource_subtypes(db, type_id=type_id, skip=skip, limit=limit)
-    return resource_subtypes
+    after = cursor_param(cursor, "resource_subtypes")
+    resource_subtypes = await crud.get_resource_subtypes(db, type_id=type_id, skip=skip, limit=limit + 1, after=after, response_model=List[ResourceSubTypeResponse])
+    return finish_page(response, resource_subtypes, limit, "resource_subtypes", key=lambda subtype: (subtype.id,))
 
 @resource_type_router.get("/subtypes/{subtype_id}", response_model=ResourceSubTypeResponse)
-def get_resource_subtype_route(subtype_id: int, db: Session = Depends(get_db)):
+async def get_resource_subtype_route(subtype_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Récupère un sous-type de ressource par son ID.
     """
-    resource_subtype = crud.get_resource_subtype(db, subtype_id=subtype_id)
+    resource_subtype = await crud.get_resource_subtype(db, subtype_id=subtype_id, response_model=ResourceSubTypeResponse)
     if resource_subtype is None:
         raise HTTPException(status_code=404, detail="Sous-type de ressource non trouvé")
     return resource_subtype
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import logging
+import time
+
+from database import get_async_db
+from crud import aio as crud_aio
+from schemas.search import SearchKind, SearchResults
+from dependencies import get_current_active_user
+from models import User as UserModel
+
+logger = logging.getLogger(__name__)
+
+search_router = APIRouter(
+    # prefix="/search", # Géré dans app.py
+    tags=["search"],
+    responses={404: {"description": "Not found"}},
+)
+
+@search_router.get("/", response_model=SearchResults)
+async def search_route(
+    q: str = Query(..., min_length=1, max_length=200, description="Mots recherchés (le dernier peut être incomplet)"),
+    kind: Optional[List[SearchKind]] = Query(None, description="Types d'éléments à chercher (tous par défaut)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Recherche plein texte dans les ressources, séances, séquences, progressions et objectifs de l'utilisateur."""
+    started_at = time.perf_counter()
+    hits = await crud_aio.search_items(db, user_id=current_user.id, query=q, kinds=kind, limit=limit)
+    logger.info(f"Recherche de l'utilisateur {current_user.id}: {len(hits)} résultat(s) en {(time.perf_counter() - started_at) * 1000:.1f} ms")
+    return SearchResults(query=q, hits=hits)
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from database import get_db
-import crud
+from database import get_async_db
+from crud import aio as crud
 from schemas.sequence import SequenceCreate, SequenceRead, SequenceUpdate
 from models.user import User
 from security import get_current_active_user, get_current_user
+from pagination import cursor_param, finish_page
 
 sequence_router = APIRouter(
     # prefix="/sequences", # Supprimé car géré dans app.py
@@ -15,34 +16,39 @@ sequence_router = APIRouter(
 )
 
 @sequence_router.post("/", response_model=SequenceRead, name="create_sequence")
-def create_sequence_endpoint(sequence: SequenceCreate, db: Session = Depends(get_db)):
+async def create_sequence_endpoint(sequence: SequenceCreate, db: AsyncSession = Depends(get_async_db)):
     # Vérifier si la progression parente existe (optionnel mais bonne pratique)
-    db_progression = crud.get_progression(db, progression_id=sequence.progression_id)
+    db_progression = await crud.get_progression(db, progression_id=sequence.progression_id)
     if db_progression is None:
         raise HTTPException(status_code=404, detail=f"Progression with id {sequence.progression_id} not found")
-    return crud.create_sequence(db=db, sequence=sequence)
+    return await crud.create_sequence(db=db, sequence=sequence, response_model=SequenceRead)
 
 @sequence_router.get("/", response_model=List[SequenceRead])
-def read_sequences_route(
+async def read_sequences_route(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Récupère la liste des séquences de l'utilisateur connecté."""
-    sequences = crud.get_sequences(db, user_id=current_user.id, skip=skip, limit=limit)
-    return sequences
+    """Récupère la liste des séquences de l'utilisateur connecté (page suivante : en-tête X-Next-Cursor)."""
+    after = cursor_param(cursor, "sequences")
+    sequences = await crud.get_sequences(db, user_id=current_user.id, skip=skip, limit=limit + 1, after=after, response_model=List[SequenceRead])
+    return finish_page(response, sequences, limit, "sequences", key=lambda sequence: (sequence.id,))
 
 @sequence_router.get("/by_progression/{progression_id}", response_model=List[SequenceRead])
-def read_sequences_by_progression_route(
+async def read_sequences_by_progression_route(
     progression_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Vérifier si la progression parente existe
-    db_progression = crud.get_progression(db, progression_id=progression_id, user_id=current_user.id)
+    db_progression = await crud.get_progression(db, progression_id=progression_id, user_id=current_user.id)
     if db_progression is None:
         raise HTTPException(status_code=404, detail=f"Progression with id {progression_id} not found")
     
@@ -53,38 +59,41 @@ def read_sequences_by_progression_route(
             detail="Vous n'avez pas l'autorisation d'accéder aux séquences de cette progression"
         )
     
-    sequences = crud.get_sequences_by_progression(
+    after = cursor_param(cursor, "sequences")
+    sequences = await crud.get_sequences_by_progression(
         db,
         progression_id=progression_id,
         user_id=current_user.id,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        after=after,
+        response_model=List[SequenceRead]
     )
-    return sequences
+    return finish_page(response, sequences, limit, "sequences", key=lambda sequence: (sequence.id,))
 
 @sequence_router.get("/{sequence_id}", response_model=SequenceRead)
-def read_sequence_route(sequence_id: int, db: Session = Depends(get_db)):
-    db_sequence = crud.get_sequence(db, sequence_id=sequence_id)
+async def read_sequence_route(sequence_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_sequence = await crud.get_sequence(db, sequence_id=sequence_id, response_model=SequenceRead)
     if db_sequence is None:
         raise HTTPException(status_code=404, detail="Sequence not found")
     return db_sequence
 
 @sequence_router.put("/{sequence_id}", response_model=SequenceRead)
-def update_sequence_route(sequence_id: int, sequence: SequenceUpdate, db: Session = Depends(get_db)):
+async def update_sequence_route(sequence_id: int, sequence: SequenceUpdate, db: AsyncSession = Depends(get_async_db)):
     # Vérifier si la nouvelle progression_id existe si elle est fournie
     if sequence.progression_id is not None:
-        db_progression = crud.get_progression(db, progression_id=sequence.progression_id)
+        db_progression = await crud.get_progression(db, progression_id=sequence.progression_id)
         if db_progression is None:
             raise HTTPException(status_code=404, detail=f"Progression with id {sequence.progression_id} not found")
             
-    db_sequence = crud.update_sequence(db=db, sequence_id=sequence_id, sequence_update=sequence)
+    db_sequence = await crud.update_sequence(db=db, sequence_id=sequence_id, sequence_update=sequence, response_model=SequenceRead)
     if db_sequence is None:
         raise HTTPException(status_code=404, detail="Sequence not found")
     return db_sequence
 
 @sequence_router.delete("/{sequence_id}", status_code=204)
-def delete_sequence_route(sequence_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_sequence(db, sequence_id=sequence_id)
+async def delete_sequence_route(sequence_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await crud.delete_sequence(db, sequence_id=sequence_id)
     if not success:
         raise HTTPException(status_code=404, detail="Sequence not found")
     return # Retourne None pour 204
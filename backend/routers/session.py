@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from database import get_db
-import crud
-from schemas.session import SessionCreate, SessionUpdate, SessionRead
+from database import get_async_db
+from crud import aio as crud
+from schemas.session import SessionCreate, SessionUpdate, SessionRead, SessionBatch
+from schemas.batch import BatchResult
 from models.user import User
 from security import get_current_active_user
+from pagination import cursor_param, finish_page
+from batching import batch_result, check_batch_size
 
 session_router = APIRouter(
     # prefix="/sessions", # Supprimé car géré dans app.py
@@ -15,28 +18,47 @@ session_router = APIRouter(
 )
 
 @session_router.post("/", response_model=SessionRead)
-def create_session_route(session: SessionCreate, db: Session = Depends(get_db)):
+async def create_session_route(session: SessionCreate, db: AsyncSession = Depends(get_async_db)):
     # Vérifier si la séquence parente existe
-    db_sequence = crud.get_sequence(db, sequence_id=session.sequence_id)
+    db_sequence = await crud.get_sequence(db, sequence_id=session.sequence_id)
     if db_sequence is None:
         raise HTTPException(status_code=404, detail=f"Sequence with id {session.sequence_id} not found")
-    return crud.create_session(db=db, session=session)
+    return await crud.create_session(db=db, session=session, response_model=SessionRead)
+
+@session_router.post("/batch", response_model=BatchResult)
+async def batch_sessions_route(
+    batch: SessionBatch,
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Crée (éléments sans `id`) et met à jour plusieurs séances en une seule transaction.
+
+    Les ids sont validés en une requête par type ; chaque élément reçoit son résultat
+    (created, updated, error). Avec all_or_nothing=true, rien n'est écrit si un élément est en erreur.
+    """
+    check_batch_size(len(batch.items))
+    results = await crud.apply_session_batch(db, user_id=current_user.id, items=batch.items, all_or_nothing=all_or_nothing)
+    return batch_result(results)
 
 @session_router.get("/", response_model=List[SessionRead])
-def read_sessions_route(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    sessions = crud.get_sessions(db, skip=skip, limit=limit)
-    return sessions
+async def read_sessions_route(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    after = cursor_param(cursor, "sessions")
+    sessions = await crud.get_sessions(db, skip=skip, limit=limit + 1, after=after, response_model=List[SessionRead])
+    return finish_page(response, sessions, limit, "sessions", key=lambda session: (session.id,))
 
 @session_router.get("/by_sequence/{sequence_id}", response_model=List[SessionRead])
-def read_sessions_by_sequence_route(
+async def read_sessions_by_sequence_route(
     sequence_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     # Vérifier si la séquence parente existe
-    db_sequence = crud.get_sequence(db, sequence_id=sequence_id)
+    db_sequence = await crud.get_sequence(db, sequence_id=sequence_id)
     if db_sequence is None:
         raise HTTPException(status_code=404, detail=f"Séquence avec l'id {sequence_id} non trouvée")
     
@@ -47,38 +69,41 @@ def read_sessions_by_sequence_route(
             detail="Vous n'avez pas l'autorisation d'accéder aux séances de cette séquence"
         )
     
-    sessions = crud.get_sessions_by_sequence(
+    after = cursor_param(cursor, "sessions")
+    sessions = await crud.get_sessions_by_sequence(
         db,
         sequence_id=sequence_id,
         user_id=current_user.id,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        after=after,
+        response_model=List[SessionRead]
     )
-    return sessions
+    return finish_page(response, sessions, limit, "sessions", key=lambda session: (session.id,))
 
 @session_router.get("/{session_id}", response_model=SessionRead)
-def read_session_route(session_id: int, db: Session = Depends(get_db)):
-    db_session = crud.get_session(db, session_id=session_id)
+async def read_session_route(session_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_session = await crud.get_session(db, session_id=session_id, response_model=SessionRead)
     if db_session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     return db_session
 
 @session_router.put("/{session_id}", response_model=SessionRead)
-def update_session_route(session_id: int, session: SessionUpdate, db: Session = Depends(get_db)):
+async def update_session_route(session_id: int, session: SessionUpdate, db: AsyncSession = Depends(get_async_db)):
     # Vérifier si la nouvelle séquence_id existe si elle est fournie
     if session.sequence_id is not None:
-        db_sequence = crud.get_sequence(db, sequence_id=session.sequence_id)
+        db_sequence = await crud.get_sequence(db, sequence_id=session.sequence_id)
         if db_sequence is None:
             raise HTTPException(status_code=404, detail=f"Sequence with id {session.sequence_id} not found")
             
-    db_session = crud.update_session(db=db, session_id=session_id, session_update=session)
+    db_session = await crud.update_session(db=db, session_id=session_id, session_update=session, response_model=SessionRead)
     if db_session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     return db_session
 
 @session_router.delete("/{session_id}", status_code=204)
-def delete_session_route(session_id: int, db: Session = Depends(get_db)):
-    success = crud.delete_session(db, session_id=session_id)
+async def delete_session_route(session_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await crud.delete_session(db, session_id=session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
     return # Retourne None pour 204
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from crud import aio as crud_aio
+from schemas.tree import TreeDocument
+from dependencies import get_current_active_user
+from models import User
+
+tree_router = APIRouter(
+    # prefix="/tree", # Géré dans app.py
+    tags=["tree"],
+    responses={404: {"description": "Not found"}},
+)
+
+@tree_router.get("/", response_model=TreeDocument)
+async def read_tree_route(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Récupère l'arbre complet progressions → séquences → séances → ressources (et objectifs)
+    de l'utilisateur connecté, en un seul appel."""
+    return await crud_aio.get_user_tree(db, user_id=current_user.id)
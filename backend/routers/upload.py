@@ -0,0 +1,295 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from werkzeug.utils import secure_filename
+from typing import Union
+from datetime import datetime
+import logging
+import math
+
+from database import get_async_db, AsyncSessionLocal
+from crud import aio as crud_aio
+from schemas.upload import UploadSessionCreate, UploadSessionRead, UploadSessionComplete
+from schemas.resource import ResourceCreate, ResourceResponse, ResourceFileUpload
+from schemas.job import JobRead
+from dependencies import get_current_active_user
+from models import User as UserModel
+from file_storage import (
+    save_chunk, list_received_chunks, assemble_chunks_to_blob, discard_staged_blob, remove_upload_session_dir,
+    get_blob_storage_path, UploadChunkSizeError, UploadTooLargeError, UploadTypeNotAllowedError,
+)
+from job_queue import JobContext, JobPermanentError, enqueue, job_handler
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+upload_router = APIRouter(
+    # prefix="/uploads", # Géré dans app.py
+    tags=["uploads"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Session réservée par un autre appel à /complete (voir crud.upload_session.claim_upload_session)
+UPLOAD_BEING_COMPLETED = "Upload session is being completed"
+
+def _chunk_count(db_upload) -> int:
+    return math.ceil(db_upload.total_size / db_upload.chunk_size)
+
+def _expected_chunk_size(db_upload, index: int) -> int:
+    """Taille attendue d'un bloc : chunk_size, sauf pour le dernier (le reste)."""
+    return min(db_upload.chunk_size, db_upload.total_size - index * db_upload.chunk_size)
+
+async def _to_read(db_upload) -> UploadSessionRead:
+    received_chunks = await run_in_threadpool(list_received_chunks, db_upload.id) if db_upload.status == "pending" else []
+    return UploadSessionRead(
+        id=db_upload.id,
+        file_name=db_upload.file_name,
+        total_size=db_upload.total_size,
+        chunk_size=db_upload.chunk_size,
+        chunk_count=_chunk_count(db_upload),
+        received_chunks=received_chunks,
+        status=db_upload.status,
+        resource_id=db_upload.resource_id,
+        expires_at=db_upload.expires_at,
+    )
+
+async def _get_pending_upload(db: AsyncSession, upload_id: str, user_id: int):
+    db_upload = await crud_aio.get_upload_session(db, upload_id=upload_id, user_id=user_id)
+    if db_upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    if db_upload.status == "assembling":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=UPLOAD_BEING_COMPLETED)
+    if db_upload.status != "pending":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload session already completed")
+    if db_upload.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload session expired")
+    return db_upload
+
+@upload_router.post("/", response_model=UploadSessionRead, status_code=status.HTTP_201_CREATED)
+async def create_upload_session_route(
+    upload: UploadSessionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Démarre un upload reprenable. Le client envoie ensuite les blocs 0..chunk_count-1
+    (PUT /{upload_id}/chunks/{index}?offset=...), dans n'importe quel ordre, puis appelle /complete."""
+    max_size = settings.RESUMABLE_UPLOAD_MAX_SIZE_MB * 1024 * 1024
+    if upload.total_size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Le fichier est trop volumineux. La taille maximale est de {settings.RESUMABLE_UPLOAD_MAX_SIZE_MB} Mo."
+        )
+    safe_filename = secure_filename(upload.file_name)
+    if not safe_filename:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nom de fichier invalide.")
+
+    # Nettoyer au passage les sessions abandonnées
+    for expired_id in await crud_aio.purge_expired_upload_sessions(db):
+        await run_in_threadpool(remove_upload_session_dir, expired_id)
+
+    db_upload = await crud_aio.create_upload_session(
+        db,
+        user_id=current_user.id,
+        file_name=safe_filename,
+        total_size=upload.total_size,
+        chunk_size=settings.RESUMABLE_UPLOAD_CHUNK_SIZE_MB * 1024 * 1024,
+    )
+    logger.info(f"Session d'upload {db_upload.id} créée pour l'utilisateur {current_user.id} ({upload.total_size} octets)")
+    return await _to_read(db_upload)
+
+@upload_router.get("/{upload_id}", response_model=UploadSessionRead)
+async def read_upload_session_route(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """État d'un upload : blocs déjà reçus (pour reprendre après une coupure)."""
+    db_upload = await crud_aio.get_upload_session(db, upload_id=upload_id, user_id=current_user.id)
+    if db_upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    return await _to_read(db_upload)
+
+@upload_router.put("/{upload_id}/chunks/{index}", response_model=UploadSessionRead)
+async def upload_chunk_route(
+    upload_id: str,
+    index: int,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Position du bloc dans le fichier (index * chunk_size)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Reçoit un bloc (corps brut de la requête). Renvoyer un bloc déjà reçu le remplace."""
+    db_upload = await _get_pending_upload(db, upload_id, current_user.id)
+    if not 0 <= index < _chunk_count(db_upload):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Index de bloc invalide: {index}")
+    if offset != index * db_upload.chunk_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Offset invalide pour le bloc {index}: {index * db_upload.chunk_size} attendu"
+        )
+
+    try:
+        await save_chunk(request.stream(), upload_id, index, _expected_chunk_size(db_upload, index))
+    except UploadChunkSizeError as e:
+        logger.warning(f"Bloc {index} de l'upload {upload_id} refusé: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await _to_read(db_upload)
+
+async def _assemble_upload(db: AsyncSession, db_upload, resource: UploadSessionComplete, user_id: int):
+    """Assemble les blocs (tous reçus) dans le stockage par contenu et crée la ressource.
+
+    La session est d'abord réservée (pending -> assembling) : si un autre appel l'a déjà
+    fait, aucune ressource n'est créée ici. En cas d'échec, elle redevient `pending`.
+    """
+    upload_id = db_upload.id
+    if not await crud_aio.claim_upload_session(db, upload_id=upload_id):
+        db_upload = await crud_aio.get_upload_session(db, upload_id=upload_id, user_id=user_id)
+        if db_upload is not None and db_upload.status == "completed":
+            db_resource = await crud_aio.get_resource(db, resource_id=db_upload.resource_id, response_model=ResourceResponse)
+            if db_resource is not None:
+                return db_resource
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=UPLOAD_BEING_COMPLETED)
+    try:
+        db_resource = await _create_resource_from_chunks(db, db_upload, resource, user_id)
+    except BaseException:
+        await crud_aio.release_upload_session(db, upload_id=upload_id)
+        raise
+
+    await crud_aio.complete_upload_session(db, upload_id=upload_id, resource_id=db_resource.id)
+    await run_in_threadpool(remove_upload_session_dir, upload_id)
+    logger.info(f"Upload {upload_id} terminé: ressource {db_resource.id} créée")
+    return db_resource
+
+async def _create_resource_from_chunks(db: AsyncSession, db_upload, resource: UploadSessionComplete, user_id: int):
+    upload_id = db_upload.id
+    try:
+        stored = await run_in_threadpool(
+            assemble_chunks_to_blob, upload_id, _chunk_count(db_upload), settings.RESUMABLE_UPLOAD_MAX_SIZE_MB * 1024 * 1024
+        )
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Le fichier est trop volumineux. La taille maximale est de {settings.RESUMABLE_UPLOAD_MAX_SIZE_MB} Mo."
+        )
+    except UploadTypeNotAllowedError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Type de fichier non autorisé. Seuls les fichiers {', '.join(settings.ALLOWED_UPLOAD_MIME_TYPES)} sont acceptés."
+        )
+
+    try:
+        db_resource = await crud_aio.create_resource(
+            db=db,
+            resource=ResourceCreate(
+                title=resource.title,
+                description=resource.description,
+                type_id=resource.type_id,
+                sub_type_id=resource.sub_type_id,
+                source_type="file",
+                session_ids=resource.session_ids or [],
+                user_id=user_id
+            ),
+            file_upload=ResourceFileUpload(
+                file_name=db_upload.file_name,
+                file_type=stored.mime_type,
+                file_size=stored.size,
+                sha256=stored.sha256,
+                storage_path=get_blob_storage_path(stored.sha256, stored.mime_type),
+                staged_path=str(stored.staged_path)
+            ),
+            response_model=ResourceResponse
+        )
+    except ValueError as e:
+        # Les blocs sont conservés : le client peut corriger les métadonnées et rappeler /complete
+        logger.error(f"Erreur lors de la création de la ressource de l'upload {upload_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        # Fichier assemblé non publié (création refusée) : le supprimer
+        await run_in_threadpool(discard_staged_blob, stored.staged_path)
+    return db_resource
+
+async def _check_all_chunks_received(db_upload):
+    # Lecture du dossier des blocs : hors de la boucle d'événements, comme les autres accès disque
+    received_chunks = await run_in_threadpool(list_received_chunks, db_upload.id)
+    missing_chunks = sorted(set(range(_chunk_count(db_upload))) - set(received_chunks))
+    if missing_chunks:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Blocs manquants", "missing_chunks": missing_chunks}
+        )
+
+@job_handler("upload.complete")
+async def _complete_upload_job(job: JobContext):
+    """Variante en tâche de fond de /complete (assemblage et hachage des gros fichiers hors requête)."""
+    resource = UploadSessionComplete.model_validate(job.payload["resource"])
+    async with AsyncSessionLocal() as db:
+        db_upload = await crud_aio.get_upload_session(db, upload_id=job.payload["upload_id"], user_id=job.user_id)
+        if db_upload is None:
+            raise JobPermanentError("Upload session not found")
+        if db_upload.status == "completed":
+            return {"resource_id": db_upload.resource_id}
+        if db_upload.status == "assembling":
+            # Assemblage en cours par un autre appel : nouvelle tentative plus tard (renvoie alors sa ressource)
+            raise RuntimeError(UPLOAD_BEING_COMPLETED)
+        try:
+            await _check_all_chunks_received(db_upload)
+            db_resource = await _assemble_upload(db, db_upload, resource, job.user_id)
+        except HTTPException as e:
+            if e.detail == UPLOAD_BEING_COMPLETED:
+                raise RuntimeError(e.detail)
+            raise JobPermanentError(e.detail if isinstance(e.detail, str) else str(e.detail))
+    return {"resource_id": db_resource.id}
+
+@upload_router.post("/{upload_id}/complete", response_model=Union[ResourceResponse, JobRead])
+async def complete_upload_route(
+    upload_id: str,
+    resource: UploadSessionComplete,
+    response: Response,
+    background: bool = Query(False, description="Assembler le fichier dans une tâche de fond (réponse 202 avec la tâche)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Assemble les blocs reçus et crée la ressource correspondante.
+
+    Idempotent : rappeler /complete sur un upload terminé renvoie la ressource déjà créée.
+    Avec `background=true`, l'assemblage (copie et hachage du fichier) est fait par une tâche
+    de fond : la réponse est 202 avec la tâche, dont le résultat contient `resource_id`.
+    """
+    db_upload = await crud_aio.get_upload_session(db, upload_id=upload_id, user_id=current_user.id)
+    if db_upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    if db_upload.status == "completed":
+        db_resource = await crud_aio.get_resource(db, resource_id=db_upload.resource_id, response_model=ResourceResponse)
+        if db_resource is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resource not found")
+        return db_resource
+
+    await _check_all_chunks_received(db_upload)
+
+    if background and settings.JOBS_ENABLED:
+        db_job = await enqueue(
+            db, "upload.complete", {"upload_id": upload_id, "resource": resource.model_dump(mode="json")},
+            user_id=current_user.id
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{settings.API_V1_PREFIX}/jobs/{db_job.id}"
+        return JobRead.model_validate(db_job)
+
+    return await _assemble_upload(db, db_upload, resource, current_user.id)
+
+@upload_router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_upload_session_route(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Annule un upload et supprime les blocs reçus."""
+    db_upload = await crud_aio.get_upload_session(db, upload_id=upload_id, user_id=current_user.id)
+    if db_upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+    if db_upload.status == "assembling":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=UPLOAD_BEING_COMPLETED)
+    await crud_aio.delete_upload_session(db, upload_id=upload_id)
+    await run_in_threadpool(remove_upload_session_dir, upload_id)
+    return None
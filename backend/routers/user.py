@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
-from models import User
+from database import get_async_db
+from crud import aio as crud_aio
 from schemas.user import UserRead
 from dependencies import get_current_user
+from principal_cache import UserPrincipal
 
 user_router = APIRouter(
     prefix="/users",
@@ -13,5 +15,12 @@ user_router = APIRouter(
 )
 
 @user_router.get("/me", response_model=UserRead)
-async def read_users_me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def read_users_me(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # current_user est un instantané (id, email, rôle, statut) : charger le profil complet
+    db_user = await crud_aio.get_user(db, user_id=current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
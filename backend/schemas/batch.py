@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+# --- Résultats des opérations par lot (POST /sessions/batch, PATCH /resources/batch, PUT /objectives/links/batch) --- #
+
+class BatchItemResult(BaseModel):
+    # Position de l'élément dans la requête
+    index: int
+    # Id de l'élément créé ou modifié (séance, ressource, séance/séquence dont les objectifs sont remplacés)
+    id: Optional[int] = None
+    # skipped : élément valide non appliqué car un autre élément est en erreur (all_or_nothing=true)
+    status: Literal["created", "updated", "error", "skipped"]
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    applied: int
+    failed: int
+    results: List[BatchItemResult]
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
+from datetime import datetime
+
+# --- Schémas pour les conversations IA stockées côté serveur --- #
+
+class ChatSessionCreate(BaseModel):
+    title: Optional[str] = Field(None, max_length=200)
+
+class ChatSessionRead(BaseModel):
+    id: int
+    title: Optional[str] = None
+    message_count: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ChatSessionMessageRead(BaseModel):
+    id: int
+    role: Literal["user", "assistant", "system"]
+    content: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChatSessionMessageCreate(BaseModel):
+    # Seul le nouveau message est envoyé : l'historique est conservé par le serveur
+    message: str = Field(..., min_length=1)
@@ -0,0 +1,78 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal, Optional
+
+# --- Schémas de l'export/import d'un programme complet (archive ZIP) --- #
+# Les `id` sont ceux de la base d'origine : ils ne servent qu'à relier les éléments du
+# manifeste entre eux et sont remplacés par de nouveaux ids à l'import.
+
+CURRICULUM_FORMAT = "flash-francais-curriculum"
+CURRICULUM_FORMAT_VERSION = 1
+
+class CurriculumObjective(BaseModel):
+    id: int
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+
+class CurriculumProgression(BaseModel):
+    id: int
+    title: str = Field(..., min_length=1)
+    description: Optional[str] = None
+
+class CurriculumSequence(BaseModel):
+    id: int
+    progression_id: int
+    title: str = Field(..., min_length=1)
+    description: Optional[str] = None
+    objective_ids: List[int] = []
+
+class CurriculumSession(BaseModel):
+    id: int
+    sequence_id: int
+    title: str = Field(..., min_length=1)
+    description: Optional[str] = None
+    date: Optional[datetime] = None
+    duration: Optional[int] = None
+    notes: Optional[str] = None
+    objective_ids: List[int] = []
+
+class CurriculumFile(BaseModel):
+    # Chemin de l'entrée dans l'archive (files/<sha256><extension>)
+    archive_path: str
+    name: Optional[str] = None
+    type: Optional[str] = None
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+
+class CurriculumResource(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    # Types désignés par leur clé : les ids diffèrent d'une instance à l'autre
+    type_key: str
+    sub_type_key: str
+    source_type: str
+    file: Optional[CurriculumFile] = None
+    session_ids: List[int] = []
+
+class CurriculumManifest(BaseModel):
+    format: Literal["flash-francais-curriculum"] = CURRICULUM_FORMAT
+    version: int = CURRICULUM_FORMAT_VERSION
+    exported_at: Optional[datetime] = None
+    objectives: List[CurriculumObjective] = []
+    progressions: List[CurriculumProgression] = []
+    sequences: List[CurriculumSequence] = []
+    sessions: List[CurriculumSession] = []
+    resources: List[CurriculumResource] = []
+
+class CurriculumImportResult(BaseModel):
+    progressions: int
+    sequences: int
+    sessions: int
+    resources: int
+    # Objectifs : titre unique dans la base, un objectif existant de même titre est réutilisé
+    objectives_created: int
+    objectives_reused: int
+    # Fichiers : stockage par contenu, files_deduplicated compte les contenus déjà présents
+    files_stored: int
+    files_deduplicated: int
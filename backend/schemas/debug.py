@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+# --- Schémas du rapport d'instrumentation SQL (/debug/sql) --- #
+
+class RepeatedStatement(BaseModel):
+    # Requête normalisée (valeurs remplacées par ?) et nombre d'exécutions dans une même requête HTTP
+    fingerprint: str
+    count: int
+
+class SqlRouteStats(BaseModel):
+    method: str
+    route: str
+    requests: int
+    queries: int
+    avg_queries: float
+    max_queries: int
+    db_ms: float
+    n_plus_one_requests: int
+    repeated: List[RepeatedStatement]
+
+class SqlRequestStats(BaseModel):
+    method: str
+    path: str
+    route: Optional[str] = None
+    status_code: Optional[int] = None
+    queries: int
+    db_ms: float
+    duration_ms: float
+    repeated: List[RepeatedStatement]
+
+class SqlReport(BaseModel):
+    enabled: bool
+    n_plus_one_threshold: int
+    requests: int
+    queries: int
+    n_plus_one_requests: int
+    routes: List[SqlRouteStats]
+    recent: List[SqlRequestStats]
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Any, Literal, Optional
+from datetime import datetime
+
+# --- Schémas pour les tâches de fond --- #
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "dead"]
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    # Avancement entre 0 et 1 (mis à jour par le handler pendant l'exécution)
+    progress: float
+    attempts: int
+    max_attempts: int
+    # Résultat du handler (succeeded) ou dernière erreur (failed, dead, ou tentative à reprendre)
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 
 # Importer les schémas simplifiés pour éviter les dépendances circulaires
@@ -32,3 +32,18 @@ class ObjectiveRead(ObjectiveBase):
 # Note: Des schémas "simples" (ex: SequenceReadSimple ne contenant que id et title)
 # seraient utiles pour éviter les références circulaires et alléger les réponses
 # lorsque ObjectiveRead inclura les listes liées.
+
+# Élément de PUT /objectives/links/batch : remplace les objectifs d'une séance OU d'une séquence
+class ObjectiveLinksBatchItem(BaseModel):
+    session_id: Optional[int] = None
+    sequence_id: Optional[int] = None
+    objective_ids: List[int] = []
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.session_id is None) == (self.sequence_id is None):
+            raise ValueError("Fournir session_id ou sequence_id (un seul des deux)")
+        return self
+
+class ObjectiveLinksBatch(BaseModel):
+    items: List[ObjectiveLinksBatchItem] = Field(..., min_length=1)
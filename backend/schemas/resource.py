@@ -46,6 +46,11 @@ class ResourceFileUpload(BaseModel):
     file_name: str
     file_type: str
     file_size: int
+    # Contenu dans le stockage dédupliqué (file_storage.store_upload_blob)
+    sha256: Optional[str] = None
+    storage_path: Optional[str] = None
+    # Fichier reçu, publié vers storage_path si le blob n'était pas référencé, supprimé sinon (crud.blob.acquire_blob)
+    staged_path: Optional[str] = None
 
 # Schéma minimal pour Session (pour le computed_field session_ids)
 class SessionMinimalSchema(BaseModel):
@@ -97,3 +102,10 @@ class ResourceUpdate(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Élément de PATCH /resources/batch (sans fichier : les fichiers passent par PUT /resources/{id})
+class ResourceBatchItem(ResourceUpdate):
+    id: int
+
+class ResourceBatch(BaseModel):
+    items: List[ResourceBatchItem] = Field(..., min_length=1)
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+# --- Schémas pour la recherche plein texte --- #
+
+SearchKind = Literal["resource", "session", "sequence", "progression", "objective"]
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int
+    title: str
+    # Pertinence (plus grand = plus pertinent), comparable seulement au sein d'une même réponse
+    rank: float
+    # Titre et extrait en HTML échappé, termes trouvés entre <mark>...</mark>
+    title_highlight: str
+    snippet: str
+
+class SearchResults(BaseModel):
+    query: str
+    hits: List[SearchHit]
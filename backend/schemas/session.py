@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 from datetime import timedelta, datetime
 
@@ -47,3 +47,10 @@ class SessionReadSimple(BaseModel):
 
     class Config:
         from_attributes = True # Compatible avec l'ORM SQLAlchemy
+
+# Élément de POST /sessions/batch : création si `id` est absent, mise à jour partielle sinon
+class SessionBatchItem(SessionUpdate):
+    id: int | None = None
+
+class SessionBatch(BaseModel):
+    items: List[SessionBatchItem] = Field(..., min_length=1)
@@ -0,0 +1,49 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+# --- Schémas pour l'arbre pédagogique (GET /tree) --- #
+# Chaque entité n'apparaît qu'une seule fois dans le document ;
+# les relations sont exprimées par des listes d'IDs.
+
+class TreeObjective(BaseModel):
+    id: int
+    title: str
+
+class TreeResource(BaseModel):
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    source_type: str
+    file_type: Optional[str] = None
+    type_key: Optional[str] = None
+
+class TreeSession(BaseModel):
+    id: int
+    title: str
+    date: Optional[datetime] = None
+    duration: Optional[int] = None
+    sequence_id: int
+    resource_ids: List[int] = []
+    objective_ids: List[int] = []
+
+class TreeSequence(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    progression_id: int
+    session_ids: List[int] = []
+    objective_ids: List[int] = []
+
+class TreeProgression(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    sequence_ids: List[int] = []
+
+class TreeDocument(BaseModel):
+    progressions: List[TreeProgression] = []
+    sequences: List[TreeSequence] = []
+    sessions: List[TreeSession] = []
+    resources: List[TreeResource] = []
+    objectives: List[TreeObjective] = []
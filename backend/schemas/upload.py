@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+# --- Schémas pour les uploads reprenables (par blocs) --- #
+
+class UploadSessionCreate(BaseModel):
+    file_name: str
+    total_size: int = Field(..., gt=0, description="Taille totale du fichier en octets")
+
+class UploadSessionRead(BaseModel):
+    id: str
+    file_name: str
+    total_size: int
+    chunk_size: int
+    chunk_count: int
+    # Index des blocs déjà reçus (pour reprendre un upload interrompu)
+    received_chunks: List[int] = []
+    status: str
+    resource_id: Optional[int] = None
+    expires_at: datetime
+
+class UploadSessionComplete(BaseModel):
+    # Métadonnées de la ressource créée à partir du fichier assemblé
+    title: str
+    description: Optional[str] = None
+    type_id: int
+    sub_type_id: int
+    session_ids: Optional[List[int]] = None
@@ -4,8 +4,13 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 import crud.user as crud
+from crud import aio as crud_aio
+from principal_cache import get_cached_principal, cache_principal
+from hashing import verify_password_async, get_password_hash_async, needs_rehash, PasswordHashingBusyError
+import uuid
 from schemas.user import TokenData
 from config import get_settings
 import logging
@@ -34,6 +39,37 @@ def authenticate_user(db: Session, email: str, password: str):
     logger.info(f"Authentification réussie pour l'email: {email}")
     return user
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    """Version non bloquante de `authenticate_user` : la vérification bcrypt s'exécute
+    dans le pool de hachage, et le hash est recalculé si le coût bcrypt a changé.
+
+    Peut lever `PasswordHashingBusyError` si le pool est saturé pendant la vérification ;
+    la mise à niveau du hash est simplement reportée dans ce cas.
+    """
+    logger.info(f"Tentative d'authentification pour l'email: {email}")
+    user = await crud_aio.get_user_by_email(db, email=email)
+    if not user:
+        logger.warning(f"Utilisateur non trouvé pour l'email: {email}")
+        return False
+
+    if not await verify_password_async(password, user.hashed_password):
+        logger.warning(f"Mot de passe incorrect pour l'email: {email}")
+        return False
+
+    if needs_rehash(user.hashed_password):
+        # Le mot de passe en clair n'est disponible qu'ici : en profiter pour mettre le hash à niveau
+        logger.info(f"Mise à jour du hash du mot de passe (coût bcrypt modifié) pour l'email: {email}")
+        try:
+            new_hash = await get_password_hash_async(password)
+        except PasswordHashingBusyError:
+            # Pool saturé : l'utilisateur est authentifié, le hash sera mis à niveau à la prochaine connexion
+            logger.warning(f"Pool de hachage saturé, mise à jour du hash reportée pour l'email: {email}")
+        else:
+            await crud_aio.update_password_hash(db, user_id=user.id, hashed_password=new_hash)
+
+    logger.info(f"Authentification réussie pour l'email: {email}")
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crée un token JWT pour l'authentification."""
     to_encode = data.copy()
@@ -41,11 +77,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # jti : identifiant unique du token, clé du cache d'authentification
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """Récupère l'utilisateur actuel à partir du token JWT."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,10 +97,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = TokenData(email=email, role=payload.get("role"))
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_email(db, email=token_data.email)
+    principal = get_cached_principal(payload)
+    if principal is not None:
+        return principal
+    user = await crud_aio.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
-    return user
+    return cache_principal(payload, user)
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
     """Vérifie si l'utilisateur actuel est actif."""
@@ -0,0 +1,239 @@
+"""
+Instrumentation SQL par requête HTTP et détection des N+1.
+
+Des hooks SQLAlchemy (`before_cursor_execute` / `after_cursor_execute`, sur le moteur
+synchrone et le moteur asynchrone) comptent les requêtes exécutées pendant chaque requête
+HTTP, leur durée, et les regroupent par empreinte (requête normalisée : valeurs et listes
+IN remplacées par `?`). Un même SELECT exécuté SQL_N_PLUS_ONE_THRESHOLD fois ou plus dans
+une requête HTTP est signalé comme N+1 (ex: relation chargée paresseusement ligne par ligne).
+
+- En-têtes : `Server-Timing: db;dur=...;desc="N queries", app;dur=...` sur chaque réponse
+  (visible dans l'onglet Réseau du navigateur), et `X-SQL-N-Plus-One` si un N+1 est détecté
+  (utilisé par les tests d'API, voir tests/utils.py et FAIL_ON_N_PLUS_ONE).
+- Logs : avertissement (avec `extra={"sql": ...}`) pour chaque N+1, résumé en DEBUG sinon.
+- Rapport : GET /api/v1/debug/sql (agrégats par route et dernières requêtes), si
+  SQL_DEBUG_ENDPOINT_ENABLED.
+
+Le suivi passe par une ContextVar : seules les requêtes SQL émises pendant le traitement
+d'une requête HTTP sont comptées (pas celles des workers de tâches de fond).
+"""
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import re
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from config import get_settings
+from database import engine, async_engine
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_HEADER = "X-SQL-N-Plus-One"
+# Longueur maximale d'une empreinte dans les en-têtes et les logs
+FINGERPRINT_PREVIEW_CHARS = 200
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+_SELECT_LIST_RE = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+def fingerprint(statement: str) -> str:
+    """Requête normalisée : valeurs littérales et paramètres remplacés par `?`, listes IN réduites."""
+    normalized = _PLACEHOLDER_RE.sub("?", _STRING_RE.sub("?", statement))
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    return _SPACES_RE.sub(" ", normalized).strip()
+
+def preview(key: str) -> str:
+    """Empreinte raccourcie pour les en-têtes et les logs (liste des colonnes omise)."""
+    return _SELECT_LIST_RE.sub("SELECT ... FROM ", key)[:FINGERPRINT_PREVIEW_CHARS]
+
+@dataclass
+class RequestSqlStats:
+    """Requêtes SQL d'une requête HTTP : nombre, durée, et par empreinte [nombre, durée]."""
+    method: str
+    path: str
+    route: Optional[str] = None
+    status_code: Optional[int] = None
+    queries: int = 0
+    db_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    statements: Dict[str, List[float]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, seconds: float):
+        key = fingerprint(statement)
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            entry = self.statements.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """SELECT exécutés au moins `threshold` fois (N+1 probables), du plus répété au moins répété."""
+        with self._lock:
+            items = [
+                (key, int(count)) for key, (count, _) in self.statements.items()
+                if count >= threshold and key.upper().startswith(("SELECT", "WITH"))
+            ]
+        return sorted(items, key=lambda item: -item[1])
+
+    def server_timing(self, elapsed: float) -> str:
+        return f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", app;dur={elapsed * 1000:.1f}'
+
+    def summary(self, threshold: int) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "queries": self.queries,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "duration_ms": round(self.duration_seconds * 1000, 2),
+            "repeated": [{"fingerprint": key, "count": count} for key, count in self.repeated(threshold)],
+        }
+
+_current_request: ContextVar[Optional[RequestSqlStats]] = ContextVar("sql_request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_request.get() is not None:
+        context._sql_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    started_at = getattr(context, "_sql_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    for _engine in (engine, async_engine.sync_engine):
+        event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
+class SqlMonitor:
+    """Agrégats par route et dernières requêtes HTTP instrumentées (rapport /debug/sql)."""
+
+    def __init__(self, history_size: int):
+        self._lock = threading.Lock()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=max(history_size, 1))
+        self._routes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.requests = 0
+        self.queries = 0
+        self.n_plus_one = 0
+
+    def record(self, stats: RequestSqlStats):
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+        summary = stats.summary(threshold)
+        repeated = summary["repeated"]
+        with self._lock:
+            self.requests += 1
+            self.queries += stats.queries
+            self.n_plus_one += bool(repeated)
+            self._recent.append(summary)
+            route = self._routes.setdefault((stats.method, stats.route or stats.path), {
+                "method": stats.method, "route": stats.route or stats.path, "requests": 0,
+                "queries": 0, "max_queries": 0, "db_ms": 0.0, "n_plus_one_requests": 0, "repeated": {},
+            })
+            route["requests"] += 1
+            route["queries"] += stats.queries
+            route["max_queries"] = max(route["max_queries"], stats.queries)
+            route["db_ms"] += summary["db_ms"]
+            if repeated:
+                route["n_plus_one_requests"] += 1
+                for item in repeated:
+                    route["repeated"][item["fingerprint"]] = max(route["repeated"].get(item["fingerprint"], 0), item["count"])
+
+        if repeated:
+            worst = repeated[0]
+            logger.warning(
+                f"N+1 détecté sur {stats.method} {stats.route or stats.path}: {worst['count']}x "
+                f"{preview(worst['fingerprint'])} ({stats.queries} requêtes SQL)",
+                extra={"sql": summary}
+            )
+        elif stats.queries:
+            logger.debug(
+                f"SQL {stats.method} {stats.path}: {stats.queries} requêtes, {summary['db_ms']} ms",
+                extra={"sql": summary}
+            )
+
+    def report(self, limit: int = 50) -> Dict[str, Any]:
+        """Routes triées par nombre total de requêtes SQL, puis les `limit` dernières requêtes HTTP."""
+        with self._lock:
+            routes = [
+                {
+                    **{key: value for key, value in route.items() if key != "repeated"},
+                    "avg_queries": round(route["queries"] / route["requests"], 2),
+                    "db_ms": round(route["db_ms"], 2),
+                    "repeated": [
+                        {"fingerprint": key, "count": count}
+                        for key, count in sorted(route["repeated"].items(), key=lambda item: -item[1])
+                    ],
+                }
+                for route in self._routes.values()
+            ]
+            recent = list(self._recent)[-limit:] if limit > 0 else []
+        return {
+            "enabled": settings.SQL_INSTRUMENTATION_ENABLED,
+            "n_plus_one_threshold": settings.SQL_N_PLUS_ONE_THRESHOLD,
+            **self.stats(),
+            "routes": sorted(routes, key=lambda route: -route["queries"]),
+            "recent": list(reversed(recent)),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._routes.clear()
+            self.requests = self.queries = self.n_plus_one = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "queries": self.queries, "n_plus_one_requests": self.n_plus_one}
+
+sql_monitor = SqlMonitor(settings.SQL_DEBUG_HISTORY_SIZE)
+
+class SqlInstrumentationMiddleware:
+    """Middleware ASGI : suit les requêtes SQL de chaque requête HTTP et ajoute les en-têtes de mesure.
+
+    Les en-têtes sont écrits au début de la réponse : pour une réponse en streaming, les
+    requêtes exécutées pendant l'envoi du corps ne figurent que dans les logs et le rapport.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestSqlStats(method=scope["method"], path=scope["path"])
+        token = _current_request.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                stats.status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started_at))
+                repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+                if repeated:
+                    key, count = repeated[0]
+                    # Valeur d'en-tête en ASCII : nombre de N+1, puis le plus répété
+                    headers[N_PLUS_ONE_HEADER] = f"{len(repeated)}; {count}x " + preview(key).encode("ascii", "replace").decode()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            stats.duration_seconds = time.perf_counter() - started_at
+            route = scope.get("route")
+            stats.route = getattr(route, "path", None)
+            sql_monitor.record(stats)
@@ -0,0 +1,77 @@
+import json
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_ai_chat_stream():
+    """Teste le streaming SSE du chat IA (serveur lancé avec AI_PROVIDER=fake pour un test hors ligne)."""
+    print("\n--- Test du chat IA en streaming ---")
+    response = requests.post(
+        f"{BASE_URL}/ai/chat/stream", headers=HEADERS,
+        json={"message": "Bonjour", "history": []}, stream=True
+    )
+    success, error_detail = print_status(response, "Ouvrir le flux de réponse")
+    if not success:
+        return False, f"Ouverture du flux échouée: {error_detail}"
+
+    tokens = []
+    done_data = None
+    event_type = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event_type = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+            if event_type == "token":
+                tokens.append(data["content"])
+            elif event_type == "done":
+                done_data = data
+            elif event_type == "error":
+                return False, f"Erreur dans le flux: {data.get('detail')}"
+
+    print(f"  {len(tokens)} token(s) reçu(s), réponse: {''.join(tokens)[:60]!r}")
+    if not tokens:
+        return False, "Aucun token reçu"
+    if done_data is None or "ttft_ms" not in done_data:
+        return False, f"Événement 'done' absent ou incomplet: {done_data}"
+    print(f"  Temps jusqu'au premier token: {done_data['ttft_ms']} ms")
+
+    return True, None # Retourne succès
+
+def test_ai_chat_cache():
+    """Teste le cache des réponses : la même question (à la casse près) est servie depuis le cache."""
+    print("\n--- Test du cache des réponses IA ---")
+    message = f"Explique le passé composé avec être ({UNIQUE_SUFFIX})"
+    response_first = requests.post(f"{BASE_URL}/ai/chat", headers=HEADERS, json={"message": message, "history": []})
+    success, error_detail = print_status(response_first, "Première question")
+    if not success:
+        return False, f"Première question échouée: {error_detail}"
+
+    response_second = requests.post(f"{BASE_URL}/ai/chat", headers=HEADERS, json={"message": f"  {message.upper()} ", "history": []})
+    success, error_detail = print_status(response_second, "Même question reformulée (casse, espaces)")
+    if not success:
+        return False, f"Seconde question échouée: {error_detail}"
+    data = response_second.json()
+    print(f"  cached={data.get('cached')}, tier={data.get('cache_tier')}, temps={response_second.elapsed.total_seconds() * 1000:.0f} ms")
+    if not data.get("cached"):
+        return False, "La seconde réponse n'a pas été servie depuis le cache"
+    if data.get("response") != response_first.json().get("response"):
+        return False, "La réponse en cache diffère de la réponse d'origine"
+
+    return True, None # Retourne succès
+
+def test_ai_chat_long_history():
+    """Teste une conversation très longue : l'historique est compacté au lieu d'être rejeté."""
+    print("\n--- Test du chat IA avec un long historique ---")
+    history = [{"role": "system", "content": "Tu es un assistant pour les professeurs de français."}]
+    for turn in range(100):
+        history.append({"role": "user", "content": f"Question {turn} ({UNIQUE_SUFFIX}) : comment enseigner l'accord du participe passé ?"})
+        history.append({"role": "assistant", "content": f"Réponse {turn} : proposez des exercices progressifs avec correction collective."})
+
+    response = requests.post(f"{BASE_URL}/ai/chat", headers=HEADERS, json={"message": "Et pour l'imparfait ?", "history": history})
+    success, error_detail = print_status(response, f"Question avec {len(history)} messages d'historique")
+    if not success:
+        return False, f"Question avec long historique échouée: {error_detail}"
+    if not response.json().get("response"):
+        return False, "Réponse vide"
+
+    return True, None # Retourne succès
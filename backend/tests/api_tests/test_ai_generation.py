@@ -0,0 +1,61 @@
+import time
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_ai_generate_resources(session_id):
+    """Teste la génération de ressources IA par lots pour une séance, en tâche de fond (serveur lancé avec AI_PROVIDER=fake)."""
+    if session_id is None:
+        print("\n! Skipping AI generation test: Session ID manquant.")
+        return False, "Session ID manquant pour tester la génération de ressources."
+
+    print(f"\n--- Test de la génération de ressources IA (pour Session ID: {session_id}) ---")
+    response = requests.get(f"{BASE_URL}/resource-types/subtypes", headers=HEADERS)
+    success, error_detail = print_status(response, "Lire les sous-types de ressources")
+    if not success or not response.json():
+        return False, f"Aucun sous-type de ressource disponible: {error_detail}"
+    sub_type = response.json()[0]
+
+    payload = {
+        "session_id": session_id,
+        "specs": [{
+            "type_id": sub_type["type_id"],
+            "sub_type_id": sub_type["id"],
+            "instructions": f"Exercice sur les articles ({UNIQUE_SUFFIX})",
+            "count": 3
+        }]
+    }
+    response = requests.post(f"{BASE_URL}/ai/generate/resources", headers=HEADERS, json=payload)
+    success, error_detail = print_status(response, "Mettre en file la génération de 3 ressources", expected_code=202)
+    if not success:
+        return False, f"Mise en file de la génération échouée: {error_detail}"
+    job_id = response.json()["id"]
+
+    # Suivre la tâche jusqu'à sa fin
+    deadline = time.monotonic() + 60
+    job = response.json()
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.5)
+        job = requests.get(f"{BASE_URL}/jobs/{job_id}", headers=HEADERS).json()
+    print(f"  Tâche {job_id}: statut {job['status']}, avancement {job['progress']}, {job['attempts']} tentative(s)")
+    if job["status"] != "succeeded":
+        return False, f"Tâche de génération non réussie: {job['status']} ({job.get('error')})"
+    data = job["result"]
+    created = data.get("created", [])
+    print(f"  {len(created)} ressource(s) créée(s), {len(data.get('failed', []))} échec(s), en {data.get('duration_ms')} ms")
+
+    try:
+        if len(created) != 3:
+            return False, f"3 ressources attendues, {len(created)} créées (échecs: {data.get('failed')})"
+        response = requests.get(f"{BASE_URL}/resources/{created[0]['id']}", headers=HEADERS)
+        success, error_detail = print_status(response, "Lire une ressource générée")
+        if not success:
+            return False, f"Lecture de la ressource générée échouée: {error_detail}"
+        resource = response.json()
+        linked_session_ids = [session["id"] for session in resource.get("sessions", [])]
+        if resource.get("source_type") != "ai" or session_id not in linked_session_ids:
+            return False, f"Ressource générée incorrecte: source_type={resource.get('source_type')}, séances={linked_session_ids}"
+    finally:
+        for generated in created:
+            requests.delete(f"{BASE_URL}/resources/{generated['id']}", headers=HEADERS)
+
+    return True, None # Retourne succès
@@ -0,0 +1,53 @@
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_batch(sequence_id, objective_id):
+    """Teste les opérations par lot : séances (création puis mise à jour), liens d'objectifs et ressources."""
+    if sequence_id is None or objective_id is None:
+        print("\n! Skipping Batch tests: Sequence ID ou Objective ID manquant.")
+        return False, "Sequence ID ou Objective ID manquant pour tester les lots."
+
+    print(f"\n--- Test des opérations par lot (pour Sequence ID: {sequence_id}) ---")
+    items = [
+        {"title": f"Séance par lot {i} - {UNIQUE_SUFFIX}", "date": "2025-01-01T09:00:00", "sequence_id": sequence_id}
+        for i in range(3)
+    ]
+    response = requests.post(f"{BASE_URL}/sessions/batch", headers=HEADERS, json={"items": items})
+    success, error_detail = print_status(response, "Créer des séances par lot")
+    if not success:
+        return False, f"Création par lot échouée: {error_detail}"
+    session_ids = [result["id"] for result in response.json()["results"] if result["status"] == "created"]
+    if len(session_ids) != len(items):
+        return False, f"Création par lot: {len(items)} séances attendues, résultats {response.json()['results']}"
+
+    try:
+        # Mise à jour, avec un élément invalide signalé sans bloquer les autres
+        items = [{"id": session_id, "notes": "Réorganisée"} for session_id in session_ids] + [{"id": 0, "title": "Inconnue"}]
+        response = requests.post(f"{BASE_URL}/sessions/batch", headers=HEADERS, json={"items": items})
+        success, error_detail = print_status(response, "Mettre à jour des séances par lot")
+        if not success:
+            return False, f"Mise à jour par lot échouée: {error_detail}"
+        if (response.json()["applied"], response.json()["failed"]) != (len(session_ids), 1):
+            return False, f"Mise à jour par lot: résultats inattendus {response.json()}"
+
+        items = [{"session_id": session_id, "objective_ids": [objective_id]} for session_id in session_ids]
+        response = requests.put(f"{BASE_URL}/objectives/links/batch", headers=HEADERS, json={"items": items})
+        success, error_detail = print_status(response, "Lier des objectifs par lot")
+        if not success:
+            return False, f"Liens par lot échoués: {error_detail}"
+        response = requests.get(f"{BASE_URL}/objectives/by_session/{session_ids[0]}", headers=HEADERS)
+        if [objective["id"] for objective in response.json()] != [objective_id]:
+            return False, f"Objectifs de la séance {session_ids[0]} inattendus: {response.json()}"
+
+        # all_or_nothing : aucun élément appliqué si un élément est invalide
+        response = requests.patch(f"{BASE_URL}/resources/batch?all_or_nothing=true", headers=HEADERS, json={"items": [{"id": 0, "title": "Inconnue"}]})
+        success, error_detail = print_status(response, "Modifier des ressources par lot")
+        if not success:
+            return False, f"Modification de ressources par lot échouée: {error_detail}"
+        if response.json()["results"][0]["status"] != "error":
+            return False, f"Ressource inconnue non signalée: {response.json()}"
+    finally:
+        for session_id in session_ids:
+            requests.delete(f"{BASE_URL}/sessions/{session_id}", headers=HEADERS)
+
+    return True, None # Retourne succès
@@ -0,0 +1,46 @@
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_chat_sessions():
+    """Teste les conversations IA côté serveur : seul le nouveau message est envoyé, l'historique est conservé."""
+    print("\n--- Test des conversations IA ---")
+    response = requests.post(f"{BASE_URL}/chat-sessions/", headers=HEADERS, json={})
+    success, error_detail = print_status(response, "Créer une conversation", expected_code=201)
+    if not success:
+        return False, f"Création de la conversation échouée: {error_detail}"
+    chat_session_id = response.json()["id"]
+
+    try:
+        for index in range(2):
+            response = requests.post(
+                f"{BASE_URL}/chat-sessions/{chat_session_id}/messages", headers=HEADERS,
+                json={"message": f"Question {index} ({UNIQUE_SUFFIX})"}
+            )
+            success, error_detail = print_status(response, f"Envoyer le message {index}")
+            if not success:
+                return False, f"Envoi du message {index} échoué: {error_detail}"
+
+        response = requests.get(f"{BASE_URL}/chat-sessions/{chat_session_id}/messages", headers=HEADERS)
+        success, error_detail = print_status(response, "Lire les messages")
+        if not success:
+            return False, f"Lecture des messages échouée: {error_detail}"
+        roles = [message["role"] for message in response.json()]
+        print(f"  {len(roles)} message(s) enregistré(s)")
+        if roles != ["user", "assistant", "user", "assistant"]:
+            return False, f"Historique inattendu: {roles}"
+
+        response = requests.get(f"{BASE_URL}/chat-sessions/", headers=HEADERS)
+        chat_session = next((s for s in response.json() if s["id"] == chat_session_id), None)
+        if chat_session is None or chat_session["message_count"] != 4:
+            return False, f"Conversation absente de la liste ou compteur incorrect: {chat_session}"
+        if not chat_session["title"].startswith("Question 0"):
+            return False, f"Titre inattendu: {chat_session['title']}"
+    finally:
+        response = requests.delete(f"{BASE_URL}/chat-sessions/{chat_session_id}", headers=HEADERS)
+        print_status(response, "Supprimer la conversation", expected_code=204)
+
+    response = requests.get(f"{BASE_URL}/chat-sessions/{chat_session_id}/messages", headers=HEADERS)
+    if response.status_code != 404:
+        return False, f"Conversation toujours accessible après suppression (statut {response.status_code})"
+
+    return True, None # Retourne succès
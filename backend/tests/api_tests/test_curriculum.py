@@ -0,0 +1,51 @@
+import io
+import json
+import zipfile
+import requests
+from ..utils import BASE_URL, HEADERS, print_status
+
+def test_curriculum():
+    """Teste l'export ZIP du programme puis l'import d'une archive minimale (une progression)."""
+    print("\n--- Test de l'export / import du programme ---")
+    # Multipart : ne pas envoyer le Content-Type JSON
+    auth_headers = {key: value for key, value in HEADERS.items() if key.lower() != "content-type"}
+    response = requests.get(f"{BASE_URL}/export", headers=HEADERS)
+    success, error_detail = print_status(response, "Exporter le programme")
+    if not success:
+        return False, f"Export échoué: {error_detail}"
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        manifest = json.loads(archive.read("manifest.json"))
+    except (zipfile.BadZipFile, KeyError, ValueError) as e:
+        return False, f"Archive exportée illisible: {e}"
+    missing = [r["file"]["archive_path"] for r in manifest["resources"] if r["file"] and r["file"]["archive_path"] not in archive.namelist()]
+    if missing:
+        return False, f"Fichiers absents de l'archive: {missing}"
+    print(f"  {len(manifest['progressions'])} progression(s), {len(manifest['resources'])} ressource(s), {len(archive.namelist()) - 1} fichier(s)")
+
+    # Archive invalide : refusée sans effet
+    response = requests.post(f"{BASE_URL}/import", headers=auth_headers, files={"file": ("programme.zip", b"pas un zip", "application/zip")})
+    if response.status_code != 400:
+        return False, f"Archive invalide: 400 attendu, reçu {response.status_code}"
+
+    title = "Progression importée (test)"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as minimal:
+        minimal.writestr("manifest.json", json.dumps({
+            "format": manifest["format"], "version": manifest["version"],
+            "progressions": [{"id": 1, "title": title}],
+        }))
+    response = requests.post(f"{BASE_URL}/import", headers=auth_headers, files={"file": ("programme.zip", buffer.getvalue(), "application/zip")})
+    success, error_detail = print_status(response, "Importer une archive", expected_code=201)
+    if not success:
+        return False, f"Import échoué: {error_detail}"
+    if response.json()["progressions"] != 1:
+        return False, f"Import: 1 progression attendue, reçu {response.json()}"
+
+    # Nettoyage de la progression importée
+    progressions = requests.get(f"{BASE_URL}/progressions", headers=HEADERS).json()
+    for progression in progressions:
+        if progression["title"] == title:
+            requests.delete(f"{BASE_URL}/progressions/{progression['id']}", headers=HEADERS)
+
+    return True, None # Retourne succès
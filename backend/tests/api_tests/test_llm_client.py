@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Le package backend.ai s'importe depuis la racine du dépôt (comme dans app.py)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from backend.ai.llm_interface import LLMClientRegistry, settings
+
+class _StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Répond comme l'API OpenAI (chat/completions) et note les connexions TCP ouvertes et fermées."""
+    protocol_version = "HTTP/1.1"  # Keep-alive : une connexion peut servir plusieurs requêtes
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.connections.add(self.client_address)
+        body = json.dumps({
+            "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "Bonjour"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def finish(self):
+        super().finish()
+        # Appelé quand le client ferme la connexion
+        self.server.closed.add(self.client_address)
+
+def _start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenAIHandler)
+    server.daemon_threads = True
+    server.connections, server.closed = set(), set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _check(label, condition, detail):
+    print(f"- {label}: {'OK' if condition else 'Échec'} ({detail})")
+    return condition
+
+async def _run_pool_checks(server):
+    registry = LLMClientRegistry()
+    client = registry.get(provider="openai", model="stub")
+    if not _check("Réutiliser le client", registry.get(provider="openai", model="stub") is client and registry.created == 1,
+                  f"{registry.created} créé(s), {registry.hits} réutilisation(s)"):
+        return False, "Le registre a créé un nouveau client au lieu de réutiliser le premier"
+
+    for _ in range(3):
+        await client.ainvoke("Bonjour")
+    stats = registry.stats()
+    if not _check("Une connexion pour 3 appels successifs", len(server.connections) == 1 and stats["pool_connections"] == 1,
+                  f"{len(server.connections)} connexion(s) côté serveur, {stats['pool_connections']} dans le pool, {stats['http_requests']} requête(s)"):
+        return False, f"Connexions ouvertes: {len(server.connections)} (1 attendue)"
+
+    http_async_client = registry._http_async_client
+    await registry.shutdown()
+    deadline = time.monotonic() + 2
+    while server.closed != server.connections and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    if not _check("Fermer le pool (shutdown)", http_async_client.is_closed and server.closed == server.connections,
+                  f"{len(server.closed)} connexion(s) fermée(s), {registry.stats()['clients']} client(s)"):
+        return False, "Les connexions du pool sont restées ouvertes après shutdown()"
+    return True, None
+
+def test_llm_client_pool():
+    """Teste la réutilisation des clients LLM et de leur pool HTTP contre un serveur OpenAI local (bouchon)."""
+    print("\n--- Test du pool de connexions LLM (serveur bouchon local) ---")
+    server = _start_stub_server()
+    saved = (settings.OPENAI_API_KEY, settings.OPENAI_BASE_URL)
+    settings.OPENAI_API_KEY = "stub-key"
+    settings.OPENAI_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    try:
+        return asyncio.run(_run_pool_checks(server))
+    finally:
+        settings.OPENAI_API_KEY, settings.OPENAI_BASE_URL = saved
+        server.shutdown()
+        server.server_close()
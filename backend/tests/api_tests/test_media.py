@@ -0,0 +1,57 @@
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_media():
+    """Teste le service des fichiers de ressource : Range (206), ETag et 304."""
+    print("\n--- Test du service des fichiers média ---")
+    # Multipart : ne pas envoyer le Content-Type JSON
+    auth_headers = {key: value for key, value in HEADERS.items() if key.lower() != "content-type"}
+
+    response_types = requests.get(f"{BASE_URL}/resource-types/types", headers=auth_headers)
+    success, error_detail = print_status(response_types, "Lire les types de ressource")
+    if not success or not response_types.json():
+        return False, f"Aucun type de ressource disponible: {error_detail}"
+    type_id = response_types.json()[0]["id"]
+    response_subtypes = requests.get(f"{BASE_URL}/resource-types/subtypes", params={"type_id": type_id}, headers=auth_headers)
+    if response_subtypes.status_code != 200 or not response_subtypes.json():
+        return False, f"Aucun sous-type pour le type {type_id}"
+    sub_type_id = response_subtypes.json()[0]["id"]
+
+    content = b"%PDF-1.4\n" + f"Fichier média de test {UNIQUE_SUFFIX}\n".encode("utf-8") * 50
+    response_create = requests.post(
+        f"{BASE_URL}/resources/", headers=auth_headers,
+        data={"title": f"Média de test - {UNIQUE_SUFFIX}", "type_id": type_id, "sub_type_id": sub_type_id, "source_type": "file"},
+        files={"file": (f"media_{UNIQUE_SUFFIX}.pdf", content, "application/pdf")}
+    )
+    success, error_detail = print_status(response_create, "Créer une ressource fichier")
+    if not success:
+        return False, f"Création de la ressource fichier échouée: {error_detail}"
+    resource_id = response_create.json()["id"]
+    file_url = f"{BASE_URL}/resources/{resource_id}/file"
+
+    try:
+        response_full = requests.get(file_url, headers=auth_headers)
+        success, error_detail = print_status(response_full, "Lire le fichier")
+        if not success:
+            return False, f"Lecture du fichier échouée: {error_detail}"
+        if response_full.content != content:
+            return False, "Contenu du fichier différent de celui envoyé"
+        etag = response_full.headers.get("etag")
+        if not etag:
+            return False, "ETag absent de la réponse"
+
+        response_range = requests.get(file_url, headers={**auth_headers, "Range": "bytes=0-7"})
+        success, error_detail = print_status(response_range, "Lire une plage d'octets", expected_code=206)
+        if not success:
+            return False, f"Requête Range échouée: {error_detail}"
+        if response_range.content != content[:8]:
+            return False, f"Plage reçue inattendue: {response_range.content!r}"
+
+        response_cached = requests.get(file_url, headers={**auth_headers, "If-None-Match": etag})
+        success, error_detail = print_status(response_cached, "Revalider avec If-None-Match", expected_code=304)
+        if not success:
+            return False, f"Revalidation échouée: {error_detail}"
+    finally:
+        requests.delete(f"{BASE_URL}/resources/{resource_id}", headers=auth_headers)
+
+    return True, None # Retourne succès
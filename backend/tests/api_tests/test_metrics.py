@@ -0,0 +1,33 @@
+import requests
+from ..utils import BASE_URL, HEADERS, print_status
+
+# /metrics est servi à la racine du serveur, hors préfixe /api/v1
+METRICS_URL = BASE_URL.rsplit("/api/v1", 1)[0] + "/metrics"
+
+def test_metrics():
+    """Teste l'endpoint /metrics : format Prometheus, latences par route et métriques du pool."""
+    print("\n--- Test des métriques ---")
+    response = requests.get(f"{BASE_URL}/progressions", headers=HEADERS)
+    success, error_detail = print_status(response, "Lire les progressions")
+    if not success:
+        return False, f"Lecture des progressions échouée: {error_detail}"
+
+    response = requests.get(METRICS_URL)
+    if response.status_code == 401:
+        print("  /metrics protégé par METRICS_TOKEN, vérification ignorée")
+        return True, None
+    success, error_detail = print_status(response, "Lire les métriques")
+    if not success:
+        return False, f"Lecture des métriques échouée: {error_detail}"
+    text = response.text
+    for expected in (
+        'http_request_duration_seconds_bucket{method="GET",route="/api/v1/progressions/"',
+        "http_requests_in_flight",
+        "db_pool_checkout_wait_seconds_count",
+        'cache_hit_ratio{cache="principal"}',
+    ):
+        if expected not in text:
+            return False, f"Métrique absente de /metrics: {expected}"
+    print(f"  {sum(1 for line in text.splitlines() if line and not line.startswith('#'))} échantillon(s) exposé(s)")
+
+    return True, None # Retourne succès
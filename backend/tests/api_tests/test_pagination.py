@@ -0,0 +1,54 @@
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_cursor_pagination():
+    """Teste la pagination par curseur : parcours page à page via l'en-tête X-Next-Cursor."""
+    print("\n--- Test de la pagination par curseur ---")
+    created_ids = []
+    try:
+        for index in range(3):
+            response = requests.post(
+                f"{BASE_URL}/progressions", headers=HEADERS,
+                json={"title": f"Progression paginée {index} - {UNIQUE_SUFFIX}"}
+            )
+            success, error_detail = print_status(response, f"Créer la progression {index}")
+            if not success:
+                return False, f"Création de la progression {index} échouée: {error_detail}"
+            created_ids.append(response.json()["id"])
+
+        response = requests.get(f"{BASE_URL}/progressions", headers=HEADERS, params={"limit": 1000})
+        success, error_detail = print_status(response, "Lire toutes les progressions")
+        if not success:
+            return False, f"Lecture des progressions échouée: {error_detail}"
+        expected_ids = [progression["id"] for progression in response.json()]
+
+        page_ids, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BASE_URL}/progressions", headers=HEADERS, params=params)
+            success, error_detail = print_status(response, f"Lire la page {pages + 1}")
+            if not success:
+                return False, f"Lecture de la page {pages + 1} échouée: {error_detail}"
+            page = response.json()
+            if len(page) > 2:
+                return False, f"Page trop grande: {len(page)} élément(s)"
+            page_ids.extend(progression["id"] for progression in page)
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor or pages > len(expected_ids):
+                break
+        print(f"  {len(page_ids)} progression(s) lue(s) en {pages} page(s)")
+        if page_ids != expected_ids:
+            return False, f"Parcours par curseur différent de la liste complète: {page_ids} != {expected_ids}"
+
+        response = requests.get(f"{BASE_URL}/progressions", headers=HEADERS, params={"cursor": "curseur-invalide"})
+        success, error_detail = print_status(response, "Curseur invalide refusé", expected_code=400)
+        if not success:
+            return False, f"Curseur invalide accepté: {error_detail}"
+    finally:
+        for progression_id in created_ids:
+            requests.delete(f"{BASE_URL}/progressions/{progression_id}", headers=HEADERS)
+
+    return True, None # Retourne succès
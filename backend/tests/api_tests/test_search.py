@@ -0,0 +1,76 @@
+import requests
+from datetime import datetime
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_search():
+    """Teste la recherche plein texte : accents ignorés, dernier mot en préfixe, filtre par type."""
+    print("\n--- Test de la recherche plein texte ---")
+    response = requests.post(
+        f"{BASE_URL}/progressions", headers=HEADERS,
+        json={"title": f"Éphéméride {UNIQUE_SUFFIX}", "description": "Progression créée pour la recherche <b>plein texte</b>"}
+    )
+    success, error_detail = print_status(response, "Créer la progression à rechercher")
+    if not success:
+        return False, f"Création de la progression échouée: {error_detail}"
+    progression_id = response.json()["id"]
+    try:
+        # Sans accents et avec un mot incomplet (saisie en cours)
+        response = requests.get(f"{BASE_URL}/search", headers=HEADERS, params={"q": f"{UNIQUE_SUFFIX} ephemer"})
+        success, error_detail = print_status(response, "Rechercher la progression")
+        if not success:
+            return False, f"Recherche échouée: {error_detail}"
+        hits = [hit for hit in response.json()["hits"] if hit["kind"] == "progression" and hit["id"] == progression_id]
+        if not hits:
+            return False, f"Progression {progression_id} absente des résultats: {response.json()}"
+        if "<mark>" not in hits[0]["title_highlight"]:
+            return False, f"Titre non mis en évidence: {hits[0]['title_highlight']}"
+        print(f"  Résultat: {hits[0]['title_highlight']}")
+
+        response = requests.get(f"{BASE_URL}/search", headers=HEADERS, params={"q": f"{UNIQUE_SUFFIX} ephemer", "kind": "resource"})
+        success, error_detail = print_status(response, "Rechercher parmi les ressources seulement")
+        if not success:
+            return False, f"Recherche filtrée échouée: {error_detail}"
+        if any(hit["kind"] != "resource" for hit in response.json()["hits"]):
+            return False, f"Filtre par type ignoré: {response.json()}"
+    finally:
+        requests.delete(f"{BASE_URL}/progressions/{progression_id}", headers=HEADERS)
+
+    # La suppression retire l'élément de l'index
+    response = requests.get(f"{BASE_URL}/search", headers=HEADERS, params={"q": f"{UNIQUE_SUFFIX} ephemer"})
+    success, error_detail = print_status(response, "Rechercher la progression supprimée")
+    if not success:
+        return False, f"Recherche échouée: {error_detail}"
+    if any(hit["kind"] == "progression" and hit["id"] == progression_id for hit in response.json()["hits"]):
+        return False, "Progression supprimée toujours présente dans les résultats"
+
+    return True, None # Retourne succès
+
+def test_search_session(sequence_id):
+    """Teste la recherche d'une séance créée par l'API (propriétaire : celui de la progression)."""
+    if sequence_id is None:
+        print("\n! Skipping Search Session test: Sequence ID manquant.")
+        return False, "Sequence ID manquant pour tester la recherche de séances."
+
+    print(f"\n--- Test de la recherche d'une séance (Séquence ID: {sequence_id}) ---")
+    response = requests.post(
+        f"{BASE_URL}/sessions", headers=HEADERS,
+        json={
+            "title": f"Séance chrysanthème {UNIQUE_SUFFIX}", "date": datetime.now().isoformat(),
+            "notes": "Séance créée pour la recherche", "sequence_id": sequence_id,
+        }
+    )
+    success, error_detail = print_status(response, "Créer la séance à rechercher")
+    if not success:
+        return False, f"Création de la séance échouée: {error_detail}"
+    session_id = response.json()["id"]
+    try:
+        response = requests.get(f"{BASE_URL}/search", headers=HEADERS, params={"q": f"{UNIQUE_SUFFIX} chrysantheme", "kind": "session"})
+        success, error_detail = print_status(response, "Rechercher la séance")
+        if not success:
+            return False, f"Recherche échouée: {error_detail}"
+        if not any(hit["kind"] == "session" and hit["id"] == session_id for hit in response.json()["hits"]):
+            return False, f"Séance {session_id} absente des résultats: {response.json()}"
+    finally:
+        requests.delete(f"{BASE_URL}/sessions/{session_id}", headers=HEADERS)
+
+    return True, None # Retourne succès
@@ -0,0 +1,39 @@
+import requests
+from ..utils import BASE_URL, HEADERS, print_status
+
+def test_sql_instrumentation():
+    """Teste l'instrumentation SQL : en-tête Server-Timing et rapport /debug/sql."""
+    print("\n--- Test de l'instrumentation SQL ---")
+    response = requests.get(f"{BASE_URL}/progressions", headers=HEADERS)
+    success, error_detail = print_status(response, "Lire les progressions")
+    if not success:
+        return False, f"Lecture des progressions échouée: {error_detail}"
+    server_timing = response.headers.get("Server-Timing", "")
+    if "db;dur=" not in server_timing:
+        return False, f"En-tête Server-Timing absent ou incomplet: '{server_timing}'"
+    print(f"  Server-Timing: {server_timing}")
+
+    response = requests.get(f"{BASE_URL}/debug/sql", headers=HEADERS, params={"recent": 5})
+    if response.status_code == 404:
+        print("  Rapport /debug/sql désactivé (SQL_DEBUG_ENDPOINT_ENABLED=false), vérification ignorée")
+        return True, None
+    if response.status_code in (401, 403):
+        # Rapport réservé aux administrateurs : la remise à zéro doit aussi être refusée
+        response_reset = requests.delete(f"{BASE_URL}/debug/sql", headers=HEADERS)
+        if response_reset.status_code not in (401, 403):
+            return False, f"Remise à zéro du rapport SQL acceptée pour un non-administrateur (Code: {response_reset.status_code})"
+        print("  Rapport /debug/sql réservé aux administrateurs (utilisateur de test non administrateur), contenu non vérifié")
+        return True, None
+    success, error_detail = print_status(response, "Lire le rapport SQL")
+    if not success:
+        return False, f"Lecture du rapport SQL échouée: {error_detail}"
+    report = response.json()
+    routes = [route for route in report["routes"] if route["method"] == "GET" and route["route"].startswith("/api/v1/progressions")]
+    if not routes or not any(route["queries"] > 0 for route in routes):
+        return False, f"Route des progressions absente du rapport SQL: {report['routes']}"
+    print(f"  {report['requests']} requête(s) HTTP, {report['queries']} requête(s) SQL, {report['n_plus_one_requests']} N+1")
+    for route in report["routes"]:
+        for repeated in route["repeated"]:
+            print(f"  N+1 sur {route['method']} {route['route']}: {repeated['count']}x {repeated['fingerprint'][:120]}")
+
+    return True, None # Retourne succès
@@ -0,0 +1,40 @@
+import requests
+from ..utils import BASE_URL, HEADERS, print_status
+
+def test_tree(progression_id, sequence_id, session_id):
+    """Teste l'endpoint GET /tree : l'arbre doit référencer la progression, la séquence et la séance créées."""
+    if progression_id is None or sequence_id is None or session_id is None:
+        print("\n! Skipping Tree tests: IDs manquants.")
+        return False, "IDs manquants pour tester l'arbre."
+
+    print(f"\n--- Test de l'Arbre (Progression {progression_id} → Séquence {sequence_id} → Séance {session_id}) ---")
+    response_tree = requests.get(f"{BASE_URL}/tree/", headers=HEADERS)
+    success, error_detail = print_status(response_tree, "Lire l'arbre complet")
+    if not success:
+        return False, f"Lecture de l'arbre échouée: {error_detail}"
+
+    tree = response_tree.json()
+    progressions = {p["id"]: p for p in tree.get("progressions", [])}
+    sequences = {s["id"]: s for s in tree.get("sequences", [])}
+    sessions = {s["id"]: s for s in tree.get("sessions", [])}
+
+    if progression_id not in progressions:
+        return False, f"Progression {progression_id} absente de l'arbre."
+    if sequence_id not in progressions[progression_id].get("sequence_ids", []):
+        return False, f"Séquence {sequence_id} non référencée par la progression {progression_id}."
+    if sequence_id not in sequences or session_id not in sequences[sequence_id].get("session_ids", []):
+        return False, f"Séance {session_id} non référencée par la séquence {sequence_id}."
+    if session_id not in sessions:
+        return False, f"Séance {session_id} absente de l'arbre."
+
+    # Toutes les références doivent pointer vers des entités présentes dans le document
+    resource_ids = {r["id"] for r in tree.get("resources", [])}
+    objective_ids = {o["id"] for o in tree.get("objectives", [])}
+    for session in sessions.values():
+        if not set(session.get("resource_ids", [])) <= resource_ids:
+            return False, f"Séance {session['id']} référence des ressources absentes du document."
+        if not set(session.get("objective_ids", [])) <= objective_ids:
+            return False, f"Séance {session['id']} référence des objectifs absents du document."
+    print(f"  Arbre cohérent: {len(progressions)} progressions, {len(sequences)} séquences, {len(sessions)} séances")
+
+    return True, None # Retourne succès
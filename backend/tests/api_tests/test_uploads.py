@@ -0,0 +1,50 @@
+import requests
+from ..utils import BASE_URL, HEADERS, UNIQUE_SUFFIX, print_status
+
+def test_uploads():
+    """Teste le cycle d'un upload reprenable : création, envoi d'un bloc, reprise (état), annulation."""
+    print("\n--- Test des Uploads reprenables ---")
+    content = f"Fichier de test {UNIQUE_SUFFIX}\n".encode("utf-8")
+
+    response_create = requests.post(
+        f"{BASE_URL}/uploads/", headers=HEADERS,
+        json={"file_name": f"test_{UNIQUE_SUFFIX}.txt", "total_size": len(content)}
+    )
+    success, error_detail = print_status(response_create, "Créer une session d'upload", expected_code=201)
+    if not success:
+        return False, f"Création de la session d'upload échouée: {error_detail}"
+    upload = response_create.json()
+    upload_id = upload["id"]
+    if upload.get("chunk_count") != 1:
+        return False, f"chunk_count inattendu: {upload.get('chunk_count')} (1 attendu)"
+
+    # Un bloc à un mauvais offset doit être refusé
+    response_bad = requests.put(
+        f"{BASE_URL}/uploads/{upload_id}/chunks/0", params={"offset": 1},
+        headers={**HEADERS, "Content-Type": "application/octet-stream"}, data=content
+    )
+    success, error_detail = print_status(response_bad, "Refuser un bloc au mauvais offset", expected_code=400)
+    if not success:
+        return False, f"Bloc au mauvais offset accepté: {error_detail}"
+
+    response_chunk = requests.put(
+        f"{BASE_URL}/uploads/{upload_id}/chunks/0", params={"offset": 0},
+        headers={**HEADERS, "Content-Type": "application/octet-stream"}, data=content
+    )
+    success, error_detail = print_status(response_chunk, "Envoyer le bloc 0")
+    if not success:
+        return False, f"Envoi du bloc échoué: {error_detail}"
+
+    response_status = requests.get(f"{BASE_URL}/uploads/{upload_id}", headers=HEADERS)
+    success, error_detail = print_status(response_status, "Lire l'état de l'upload")
+    if not success:
+        return False, f"Lecture de l'état échouée: {error_detail}"
+    if response_status.json().get("received_chunks") != [0]:
+        return False, f"Blocs reçus inattendus: {response_status.json().get('received_chunks')}"
+
+    response_delete = requests.delete(f"{BASE_URL}/uploads/{upload_id}", headers=HEADERS)
+    success, error_detail = print_status(response_delete, "Annuler l'upload", expected_code=204)
+    if not success:
+        return False, f"Annulation échouée: {error_detail}"
+
+    return True, None # Retourne succès
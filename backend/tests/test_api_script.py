@@ -8,6 +8,19 @@ from .api_tests.test_sequences import test_sequences
 from .api_tests.test_sessions import test_sessions
 from .api_tests.test_resources import test_resources
 from .api_tests.test_links import test_session_objective_link
+from .api_tests.test_tree import test_tree
+from .api_tests.test_uploads import test_uploads
+from .api_tests.test_media import test_media
+from .api_tests.test_ai_chat import test_ai_chat_stream, test_ai_chat_cache, test_ai_chat_long_history
+from .api_tests.test_chat_sessions import test_chat_sessions
+from .api_tests.test_ai_generation import test_ai_generate_resources
+from .api_tests.test_pagination import test_cursor_pagination
+from .api_tests.test_search import test_search, test_search_session
+from .api_tests.test_sql_instrumentation import test_sql_instrumentation
+from .api_tests.test_metrics import test_metrics
+from .api_tests.test_curriculum import test_curriculum
+from .api_tests.test_batch import test_batch
+from .api_tests.test_llm_client import test_llm_client_pool
 from .api_tests.cleanup import cleanup
 
 print("--- DEBUG: Début du fichier test_api_script.py ---", flush=True)
@@ -52,6 +65,69 @@ def run_all_tests():
         success, msg = test_session_objective_link(session_id_holder.get("id"), objective_id_holder.get("id"))
         results.append(("Lien Session-Objective", success, msg))
 
+        # Vérifier que l'arbre complet référence les entités créées
+        success, msg = test_tree(progression_id_holder.get("id"), sequence_id_holder.get("id"), session_id_holder.get("id"))
+        results.append(("Arbre", success, msg))
+
+        # Upload reprenable (création, bloc, état, annulation)
+        success, msg = test_uploads()
+        results.append(("Uploads", success, msg))
+
+        # Service des fichiers (Range, ETag, 304)
+        success, msg = test_media()
+        results.append(("Média", success, msg))
+
+        # Chat IA en streaming (SSE)
+        success, msg = test_ai_chat_stream()
+        results.append(("Chat IA (stream)", success, msg))
+
+        # Cache des réponses du chat IA
+        success, msg = test_ai_chat_cache()
+        results.append(("Chat IA (cache)", success, msg))
+
+        # Historique long (compaction sous budget de tokens)
+        success, msg = test_ai_chat_long_history()
+        results.append(("Chat IA (historique)", success, msg))
+
+        # Conversations IA côté serveur
+        success, msg = test_chat_sessions()
+        results.append(("Conversations IA", success, msg))
+
+        # Génération de ressources IA par lots
+        success, msg = test_ai_generate_resources(session_id_holder.get("id"))
+        results.append(("Génération IA", success, msg))
+
+        # Pagination par curseur des listes
+        success, msg = test_cursor_pagination()
+        results.append(("Pagination", success, msg))
+
+        # Recherche plein texte
+        success, msg = test_search()
+        results.append(("Recherche", success, msg))
+
+        success, msg = test_search_session(sequence_id_holder.get("id"))
+        results.append(("Recherche d'une séance", success, msg))
+
+        # Métriques Prometheus
+        success, msg = test_metrics()
+        results.append(("Métriques", success, msg))
+
+        # Export / import du programme
+        success, msg = test_curriculum()
+        results.append(("Export / import du programme", success, msg))
+
+        # Opérations par lot (séances, ressources, liens d'objectifs)
+        success, msg = test_batch(sequence_id_holder.get("id"), objective_id_holder.get("id"))
+        results.append(("Opérations par lot", success, msg))
+
+        # Pool de connexions des clients LLM (serveur bouchon local, sans appel à l'API)
+        success, msg = test_llm_client_pool()
+        results.append(("Pool LLM", success, msg))
+
+        # Instrumentation SQL (en dernier : le rapport couvre les tests précédents)
+        success, msg = test_sql_instrumentation()
+        results.append(("Instrumentation SQL", success, msg))
+
     finally:
         # --- Nettoyage ---
         # Appelé même si une erreur survient pendant les tests
@@ -1,5 +1,6 @@
 import requests
 import json
+import os
 import uuid
 from datetime import datetime, timedelta
 
@@ -8,15 +9,31 @@ BASE_URL = "http://localhost:10000/api/v1"
 HEADERS = {"Content-Type": "application/json"}
 # Générer un suffixe unique pour cette exécution de test
 UNIQUE_SUFFIX = str(uuid.uuid4())[:8]
+# Si activé, une réponse signalant un N+1 (en-tête X-SQL-N-Plus-One) fait échouer le test
+FAIL_ON_N_PLUS_ONE = os.getenv("FAIL_ON_N_PLUS_ONE", "false").lower() == "true"
+N_PLUS_ONE_HEADER = "X-SQL-N-Plus-One"
 
 # --- Fonctions Utilitaires --- #
 def print_status(response, action="Action", expected_code=200):
-    """Affiche le statut d'une requête API et retourne True si le code est celui attendu."""
+    """Affiche le statut d'une requête API et retourne True si le code est celui attendu.
+
+    Avec FAIL_ON_N_PLUS_ONE=true, une réponse signalant un N+1 est aussi un échec.
+    """
     status_code = response.status_code
     result = "OK" if status_code == expected_code else "Échec"
+    # Requête SQL répétée pendant la requête HTTP (détail sur /api/v1/debug/sql)
+    n_plus_one = response.headers.get(N_PLUS_ONE_HEADER)
+    n_plus_one_failure = result == "OK" and n_plus_one and FAIL_ON_N_PLUS_ONE
+    if n_plus_one_failure:
+        result = "Échec"
     print(f"- {action}: {result} (Code: {status_code})", end="")
+    if n_plus_one:
+        print(f" - N+1 détecté: {n_plus_one}", end="")
     error_detail = None
-    if result == "Échec":
+    if n_plus_one_failure:
+        error_detail = f"N+1 détecté: {n_plus_one}"
+        print()
+    elif result == "Échec":
         try:
             error_detail = response.json().get("detail", response.text)
             print(f" - Détail: {error_detail}")
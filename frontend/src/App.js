@@ -71,21 +71,54 @@ function ProtectedLayout() {
         // Optionnel: attendre un peu ou ne rien faire
         return; 
       }
-      // Utiliser l'instance api pour faire l'appel (le token est injecté par l'intercepteur)
-      const response = await api.get('/progressions'); 
-      const progressions = response.data;
+      // Un seul appel charge tout l'arbre (progressions, séquences, séances, ressources, objectifs)
+      // Le token est injecté par l'intercepteur de l'instance api
+      const response = await api.get('/tree/');
+      const tree = response.data;
 
-      console.log("ProtectedLayout: Progressions data fetched:", progressions);
+      console.log("ProtectedLayout: Tree data fetched:", tree);
+
+      // Index par ID pour reconstruire l'arbre à partir du document référencé par IDs
+      const sequencesById = new Map(tree.sequences.map(seq => [seq.id, seq]));
+      const sessionsById = new Map(tree.sessions.map(session => [session.id, session]));
+      const resourcesById = new Map(tree.resources.map(res => [res.id, res]));
+      const objectivesById = new Map(tree.objectives.map(obj => [obj.id, obj]));
 
       // Adapter les données reçues au format attendu par SideTreeView
-      // TODO: Il faudra enrichir ce format pour inclure objectifs, séquences, etc.
-      const formattedProgressions = progressions.map(prog => ({
+      const formattedProgressions = tree.progressions.map(prog => ({
         id: prog.id,
         name: prog.title, 
         type: 'progression', 
         description: prog.description,
-        // La logique d'expansion dynamique reste dans SideTreeView pour l'instant
-        children: [{ id: `loading-${prog.id}`, name: 'Chargement...', type: 'loading' }]
+        children: prog.sequence_ids.map(seqId => {
+          const seq = sequencesById.get(seqId);
+          return {
+            id: seq.id,
+            name: seq.title,
+            type: 'sequence',
+            description: seq.description,
+            objectives: seq.objective_ids.map(objId => objectivesById.get(objId)).filter(Boolean),
+            children: seq.session_ids.map(sessionId => {
+              const session = sessionsById.get(sessionId);
+              return {
+                id: session.id,
+                name: session.title || `Séance ${session.id}`,
+                type: 'seance',
+                children: session.resource_ids.map(resId => {
+                  const res = resourcesById.get(resId);
+                  return {
+                    id: res.id,
+                    name: res.title || `Ressource ${res.id}`,
+                    type: 'resource',
+                    url: res.description,
+                    resource_type: res.type_key || 'unknown',
+                    children: []
+                  };
+                })
+              };
+            })
+          };
+        })
       }));
 
       setTreeData(prevData => ({ ...prevData, children: formattedProgressions }));
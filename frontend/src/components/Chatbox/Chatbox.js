@@ -20,6 +20,9 @@ const Chatbox = ({ onClose }) => {
     const [inputValue, setInputValue] = useState('');
     const [isLoading, setIsLoading] = useState(false);
     const messagesEndRef = useRef(null); 
+    const abortControllerRef = useRef(null);
+    // Conversation côté serveur : seul le nouveau message est envoyé, pas tout l'historique
+    const chatSessionIdRef = useRef(null);
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -29,6 +32,9 @@ const Chatbox = ({ onClose }) => {
         scrollToBottom();
     }, [messages]); 
 
+    // Fermer la chatbox interrompt la réponse en cours (le backend arrête la génération)
+    useEffect(() => () => abortControllerRef.current?.abort(), []);
+
     const handleSendMessage = async () => {
         const trimmedInput = inputValue.trim();
         if (!trimmedInput || isLoading) return;
@@ -38,18 +44,39 @@ const Chatbox = ({ onClose }) => {
         setInputValue('');
         setIsLoading(true);
 
-        const historyForAPI = messages.filter(m => m.role === 'user' || m.role === 'assistant');
+        const abortController = new AbortController();
+        abortControllerRef.current = abortController;
+        let assistantStarted = false;
 
         try {
-            const response = await aiService.sendChatMessage(trimmedInput, historyForAPI);
-            const aiMessage = { role: 'assistant', content: response.response }; 
-            setMessages(prev => [...prev, aiMessage]);
+            if (chatSessionIdRef.current === null) {
+                const chatSession = await aiService.createChatSession();
+                chatSessionIdRef.current = chatSession.id;
+            }
+            // La réponse s'affiche au fur et à mesure de la génération
+            await aiService.streamChatSessionMessage(chatSessionIdRef.current, trimmedInput, {
+                onToken: (token) => {
+                    if (!assistantStarted) {
+                        assistantStarted = true;
+                        setMessages(prev => [...prev, { role: 'assistant', content: token }]);
+                        return;
+                    }
+                    setMessages(prev => {
+                        const last = prev[prev.length - 1];
+                        return [...prev.slice(0, -1), { ...last, content: last.content + token }];
+                    });
+                },
+            }, abortController.signal);
         } catch (error) {
+            if (error.name === 'AbortError') return;
             console.error("Chat API error:", error);
             const errorDetail = error.response?.data?.detail || 'Impossible de contacter l\'assistant IA.';
             const errorMessage = { role: 'error', content: `Erreur: ${errorDetail}` };
             setMessages(prev => [...prev, errorMessage]);
         } finally {
+            if (abortControllerRef.current === abortController) {
+                abortControllerRef.current = null;
+            }
             setIsLoading(false);
         }
     };
@@ -126,7 +153,8 @@ const Chatbox = ({ onClose }) => {
                             </Paper>
                         </ListItem>
                     ))}
-                    {isLoading && (
+                    {/* Indicateur d'attente jusqu'au premier token */}
+                    {isLoading && messages[messages.length - 1]?.role !== 'assistant' && (
                         <ListItem sx={{ display: 'flex', justifyContent: 'flex-start' }}>
                              <CircularProgress size={20} sx={{ ml: 1 }} />
                         </ListItem>
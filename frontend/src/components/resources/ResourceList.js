@@ -18,11 +18,17 @@ import {
   DialogContent,
   DialogActions,
   Button as MuiButton,
+  TextField,
+  InputAdornment,
+  List,
+  ListItemButton,
+  ListItemText,
 } from '@mui/material';
 import AddIcon from '@mui/icons-material/Add';
 import EditIcon from '@mui/icons-material/Edit';
 import DeleteIcon from '@mui/icons-material/Delete';
 import VisibilityIcon from '@mui/icons-material/Visibility'; // Importer l'icône
+import SearchIcon from '@mui/icons-material/Search';
 import { DataGrid } from '@mui/x-data-grid';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../contexts/AuthContext';
@@ -63,6 +69,9 @@ const columns = [
   }
 ];
 
+// Délai avant d'interroger la recherche pendant la frappe
+const SEARCH_DEBOUNCE_MS = 300;
+
 const ResourceList = () => {
   const { user } = useAuth();
   const [resources, setResources] = useState([]);
@@ -70,6 +79,9 @@ const ResourceList = () => {
   const [viewMode, setViewMode] = useState('grid'); 
   const [openConfirmDialog, setOpenConfirmDialog] = useState(false);
   const [resourceToDelete, setResourceToDelete] = useState(null);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchHits, setSearchHits] = useState([]);
+  const [searching, setSearching] = useState(false);
   const navigate = useNavigate();
 
   // Fonction de chargement des ressources
@@ -161,6 +173,39 @@ const ResourceList = () => {
     fetchResources();
   }, []);
 
+  // Recherche plein texte (côté serveur), relancée après une pause dans la frappe
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchHits([]);
+      setSearching(false);
+      return undefined;
+    }
+    let cancelled = false;
+    setSearching(true);
+    const timer = setTimeout(async () => {
+      try {
+        const response = await api.get('/search/', { params: { q: query, kind: 'resource', limit: 50 } });
+        if (!cancelled) {
+          setSearchHits(response.data.hits);
+        }
+      } catch (err) {
+        if (!cancelled) {
+          console.error('Erreur lors de la recherche de ressources:', err);
+          setSearchHits([]);
+        }
+      } finally {
+        if (!cancelled) {
+          setSearching(false);
+        }
+      }
+    }, SEARCH_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery]);
+
   if (loading) {
     return (
       <Box sx={{ display: 'flex', justifyContent: 'center', pt: 4 }}>
@@ -188,6 +233,22 @@ const ResourceList = () => {
               Nouvelle ressource
             </Button>
           </Grid>
+          <Grid item xs>
+            <TextField
+              size="small"
+              fullWidth
+              placeholder="Rechercher dans les ressources"
+              value={searchQuery}
+              onChange={(e) => setSearchQuery(e.target.value)}
+              InputProps={{
+                startAdornment: (
+                  <InputAdornment position="start">
+                    {searching ? <CircularProgress size={18} /> : <SearchIcon />}
+                  </InputAdornment>
+                ),
+              }}
+            />
+          </Grid>
           <Grid item xs="auto">
             <FormControlLabel
               control={
@@ -203,7 +264,27 @@ const ResourceList = () => {
         </Grid>
       </Box>
 
-      {viewMode === 'table' ? (
+      {searchQuery.trim() ? (
+        <Paper sx={{ width: '100%', mb: 2 }}>
+          {searchHits.length === 0 && !searching ? (
+            <Typography variant="body2" color="text.secondary" sx={{ p: 2 }}>
+              Aucune ressource ne correspond à « {searchQuery.trim()} ».
+            </Typography>
+          ) : (
+            <List>
+              {/* title_highlight et snippet sont échappés par le serveur, seuls les <mark> sont du HTML */}
+              {searchHits.map((hit) => (
+                <ListItemButton key={hit.id} onClick={() => handleViewResource(hit.id)}>
+                  <ListItemText
+                    primary={<span dangerouslySetInnerHTML={{ __html: hit.title_highlight }} />}
+                    secondary={hit.snippet ? <span dangerouslySetInnerHTML={{ __html: hit.snippet }} /> : null}
+                  />
+                </ListItemButton>
+              ))}
+            </List>
+          )}
+        </Paper>
+      ) : viewMode === 'table' ? (
         <Paper sx={{ width: '100%', mb: 2 }}>
           <DataGrid
             rows={resources}
@@ -19,6 +19,102 @@ const sendChatMessage = async (message, history) => {
   }
 };
 
+/**
+ * POSTs to an SSE endpoint and dispatches its events.
+ * axios cannot read a response body incrementally, so fetch is used here.
+ *
+ * @param {string} path - Endpoint path under the API base URL.
+ * @param {object} body - JSON request body.
+ * @param {object} handlers - { onToken(text), onDone({ ttft_ms, duration_ms }) }.
+ * @param {AbortSignal} [signal] - Aborting closes the connection; the backend then stops generating.
+ * @returns {Promise<void>} - Resolves when the stream ends; rejects on HTTP or stream error.
+ */
+const postEventStream = async (path, body, { onToken, onDone } = {}, signal) => {
+  const token = localStorage.getItem('token');
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}));
+    const error = new Error(data.detail || `HTTP ${response.status}`);
+    error.response = { status: response.status, data };
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    // Events are separated by a blank line
+    let separatorIndex;
+    while ((separatorIndex = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, separatorIndex);
+      buffer = buffer.slice(separatorIndex + 2);
+      let eventType = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach((line) => {
+        if (line.startsWith('event: ')) eventType = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      });
+      const payload = data ? JSON.parse(data) : {};
+      if (eventType === 'token' && onToken) onToken(payload.content);
+      else if (eventType === 'done' && onDone) onDone(payload);
+      else if (eventType === 'error') {
+        const error = new Error(payload.detail || 'Stream error');
+        error.response = { data: payload };
+        throw error;
+      }
+    }
+  }
+};
+
+/**
+ * Streams the AI response (Server-Sent Events from /ai/chat/stream).
+ *
+ * @param {string} message - The new message from the user.
+ * @param {Array<object>} history - The chat history.
+ * @param {object} handlers - { onToken(text), onDone({ ttft_ms, duration_ms }) }.
+ * @param {AbortSignal} [signal] - Aborts the request.
+ * @returns {Promise<void>}
+ */
+const streamChatMessage = (message, history, handlers, signal) =>
+  postEventStream('/ai/chat/stream', { message, history }, handlers, signal);
+
+/**
+ * Creates a server-side chat session (the backend then keeps the history).
+ *
+ * @param {string} [title] - Optional title (defaults to the first message).
+ * @returns {Promise<object>} - The session ({ id, title, message_count, ... }).
+ */
+const createChatSession = async (title) => {
+  const response = await api.post('/chat-sessions/', { title });
+  return response.data;
+};
+
+/**
+ * Sends only the new message of a chat session and streams the answer.
+ *
+ * @param {number} chatSessionId - Id returned by createChatSession.
+ * @param {string} message - The new message from the user.
+ * @param {object} handlers - { onToken(text), onDone({ ttft_ms, duration_ms }) }.
+ * @param {AbortSignal} [signal] - Aborts the request (the exchange is then not saved).
+ * @returns {Promise<void>}
+ */
+const streamChatSessionMessage = (chatSessionId, message, handlers, signal) =>
+  postEventStream(`/chat-sessions/${chatSessionId}/messages/stream`, { message }, handlers, signal);
+
 export const aiService = {
   sendChatMessage,
+  streamChatMessage,
+  createChatSession,
+  streamChatSessionMessage,
 };